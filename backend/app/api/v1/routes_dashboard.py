@@ -17,6 +17,7 @@ import logging
 from app.core.deps import get_db, get_current_user
 from app.core.rbac import Permission, role_has_permission
 from app.services.data_health_service import get_data_health_overview
+from app.services.data_snapshot import latest_snapshot
 from app.services.data_validation_service import run_comprehensive_validation
 from app.services.clean_data_service import (
     get_clean_data_for_optimization,
@@ -26,6 +27,8 @@ from app.services.clean_data_service import (
 from app.services.optimization.model_builder import build_clinker_model
 from app.services.optimization.solvers import solve_model
 from app.services.optimization.result_parser import extract_solution
+from app.services.optimization.time_aggregation import solve_time_aggregated
+from app.services.optimization.coarse_to_fine import solve_coarse_to_fine
 from app.services.kpi_calculator import compute_kpis
 from app.services.scenarios.scenario_runner import run_single_scenario_from_config
 from app.services.scenarios.scenario_generator import ScenarioConfig
@@ -55,6 +58,7 @@ def get_data_health_status(
 
 @router.get("/validation-report")
 def get_validation_report(
+    refresh: bool = Query(False, description="Ignore cached results and re-run every stage"),
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
@@ -67,13 +71,17 @@ def get_validation_report(
     3. Referential integrity
     4. Unit consistency  
     5. Missing data scan
+    
+    Reports are cached per data version: an unchanged database returns the
+    previous report, and after a change only the stages reading the changed
+    tables are re-run.
     """
     
     if not role_has_permission(current_user.get("role"), Permission.READ_DATA):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     
     try:
-        validation_result = run_comprehensive_validation(db)
+        validation_result = run_comprehensive_validation(db, use_cache=not refresh)
         return validation_result
     except Exception as e:
         logger.error(f"Error running validation report: {e}")
@@ -237,6 +245,8 @@ def run_optimization(
     solver: str = Query("highs", description="Solver to use: highs, cbc, gurobi"),
     time_limit: int = Query(600, ge=60, le=3600, description="Time limit in seconds"),
     mip_gap: float = Query(0.01, ge=0.001, le=0.1, description="MIP gap tolerance"),
+    time_aggregation: Optional[str] = Query(None, description="Solve daily data in week or month buckets, then disaggregate to days"),
+    coarse_to_fine: bool = Query(False, description="Solve a customer-clustered model first and restrict the full model to its lanes"),
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
@@ -245,14 +255,22 @@ def run_optimization(
     
     Button is enabled ONLY IF all validation stages pass.
     Returns job ID for status tracking.
+    
+    With ``time_aggregation`` set to "week" or "month" the model is solved
+    at that granularity and disaggregated back to a daily plan; the solver
+    result then includes a ``time_aggregation`` cost/runtime report.
+    ``coarse_to_fine`` solves a clustered model first and only keeps its
+    lanes plus the cheapest alternatives per customer in the full model.
     """
     
     if not role_has_permission(current_user.get("role"), Permission.RUN_OPTIMIZATION):
         raise HTTPException(status_code=403, detail="Insufficient permissions")
     
     try:
-        # First check if data is ready for optimization
-        validation_result = run_comprehensive_validation(db)
+        # First check if data is ready for optimization; validation and
+        # cleaning share one snapshot so the validated rows are the ones solved
+        snapshot = latest_snapshot(db)
+        validation_result = run_comprehensive_validation(db, snapshot)
         
         if not validation_result["optimization_ready"]:
             raise HTTPException(
@@ -265,11 +283,20 @@ def run_optimization(
             )
         
         # Get clean data for optimization
-        clean_data = get_clean_data_for_optimization(db, validate_first=False)  # Already validated
+        clean_data = get_clean_data_for_optimization(db, validate_first=False, snapshot=snapshot)  # Already validated
         
         # Build and solve model
-        model = build_clinker_model(clean_data)
-        solver_result = solve_model(model, solver_name=solver, time_limit_seconds=time_limit, mip_gap=mip_gap)
+        if time_aggregation:
+            model, solver_result = solve_time_aggregated(
+                clean_data, time_aggregation, solver_name=solver, time_limit_seconds=time_limit, mip_gap=mip_gap
+            )
+        elif coarse_to_fine:
+            model, solver_result = solve_coarse_to_fine(
+                clean_data, solver_name=solver, time_limit_seconds=time_limit, mip_gap=mip_gap
+            )
+        else:
+            model = build_clinker_model(clean_data)
+            solver_result = solve_model(model, solver_name=solver, time_limit_seconds=time_limit, mip_gap=mip_gap)
         solution = extract_solution(model)
         
         # Compute KPIs
@@ -42,6 +42,8 @@ inventory_crud = CRUDService(InitialInventoryModel)
 async def upload_csv_to_staging(
     file: UploadFile = File(...),
     table_name: Optional[str] = Query(default=None, description="Optional logical table name override"),
+    skip_unchanged_rows: bool = Query(default=False, description="Only stage rows that differ from production"),
+    force: bool = Query(default=False, description="Stage again even if an identical file is already staged"),
     db: Session = Depends(get_db),
 ):
     """
@@ -52,10 +54,15 @@ async def upload_csv_to_staging(
     2. Returns batch_id for validation and promotion
     3. NO direct writes to production tables
     
+    Re-uploading an identical file returns its existing batch (status
+    "duplicate") unless force is set.
+    
     Use the returned batch_id with /validate_batch and /promote_batch endpoints.
     """
     try:
-        result = await ingest_to_staging(file=file, db=db, table_name=table_name)
+        result = await ingest_to_staging(
+            file=file, db=db, table_name=table_name, skip_unchanged_rows=skip_unchanged_rows, force=force,
+        )
         return result
     except DataValidationError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -2,6 +2,9 @@ from fastapi import APIRouter
 from datetime import datetime
 from typing import Dict, Any
 
+from app.services.reference_data_cache import reference_cache
+from app.services.validation_cache import validation_cache
+
 router = APIRouter()
 
 
@@ -20,3 +23,21 @@ def health_check() -> Dict[str, Any]:
         },
         "timestamp": datetime.now().isoformat()
     }
+
+
+@router.get("/health/reference-cache")
+def reference_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters and table versions of the reference-data cache."""
+    return {
+        **reference_cache.stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@router.get("/health/validation-cache")
+def validation_cache_stats() -> Dict[str, Any]:
+    """Report and stage hit/miss counters of the validation cache."""
+    return {
+        **validation_cache.stats(),
+        "timestamp": datetime.now().isoformat()
+    }
@@ -9,6 +9,8 @@ from app.schemas.kpi import KPIDashboard, ScenarioComparison
 from app.services.audit_service import audit_timer
 from app.services.optimization_service import OptimizationService
 from app.services.kpi_calculator import KPICalculator, get_latest_kpi_data, get_kpi_history
+from app.services.kpi_cube import KPICubeService
+from app.services.reference_data_cache import get_customer_nodes, get_plant_names
 from app.utils.exceptions import DataValidationError, OptimizationError
 from app.db.models.optimization_run import OptimizationRun
 
@@ -30,6 +32,14 @@ async def get_kpi_dashboard(
         
         logger.info(f"Getting KPI dashboard for scenario: {scenario_name}")
         
+        # Runs completed since the KPI cube exists are answered from it directly
+        try:
+            cube_kpis = KPICubeService.get_dashboard(db, scenario_name, run_id)
+            if cube_kpis is not None:
+                return cube_kpis
+        except Exception as e:
+            logger.warning(f"KPI cube lookup failed for {scenario_name}: {e}")
+        
         # ETL Step 1: Extract - Get the latest optimization run for this scenario
         try:
             if run_id:
@@ -180,12 +190,9 @@ def _generate_kpi_from_optimization_result(
 ) -> Dict[str, Any]:
     """Generate KPI dashboard data from real optimization results."""
     
-    # Get real customer names from database
-    from sqlalchemy import text
-    
+    # Get real customer names from the reference-data cache
     try:
-        result = db.execute(text("SELECT DISTINCT customer_node_id FROM demand_forecast LIMIT 7"))
-        customers = [row[0] for row in result.fetchall()]
+        customers = get_customer_nodes(db)[:7]
     except:
         customers = [
             "Larsen & Toubro Construction",
@@ -199,9 +206,7 @@ def _generate_kpi_from_optimization_result(
     
     # Get real plant names
     try:
-        result = db.execute(text("SELECT plant_id, plant_name FROM plant_master"))
-        plants_data = result.fetchall()
-        plants = [(row[0], row[1]) for row in plants_data]
+        plants = list(get_plant_names(db).items())
         logger.info(f"Found {len(plants)} plants in database: {plants}")
     except Exception as e:
         logger.warning(f"Could not fetch plants from database: {e}")
@@ -337,11 +342,17 @@ async def compare_scenarios(
     """
     try:
         scenario_names = request.get("scenarios", [])
+        # Optional {"baseline": ["name"]}; defaults to the first scenario
+        baseline = (request.get("baseline") or [None])[0]
         
         with audit_timer("system", "kpi_scenario_comparison", db):
             comparison_data = []
+            cube_rows = KPICubeService.compare(db, scenario_names, baseline)
             
             for scenario_name in scenario_names:
+                if scenario_name in cube_rows:
+                    comparison_data.append(cube_rows[scenario_name])
+                    continue
                 try:
                     # Get KPIs for this scenario
                     scenario_kpis = await get_kpi_dashboard(scenario_name, None, db)
@@ -553,37 +564,34 @@ async def get_kpi_summary(
     """
     try:
         with audit_timer("system", "kpi_summary_fetch", db):
-            # Mock summary data
-            summary = {
-                "period_hours": period_hours,
-                "summary_timestamp": datetime.utcnow().isoformat(),
-                "total_runs": 12,
-                "successful_runs": 11,
-                "failed_runs": 1,
-                "average_total_cost": 1523456.78,
-                "average_service_level": 0.945,
-                "cost_trend": "stable",  # increasing, decreasing, stable
-                "service_trend": "improving",
-                "top_performers": {
-                    "lowest_cost": {"scenario": "base", "cost": 1450000.0},
-                    "highest_service": {"scenario": "base", "service_level": 0.98}
-                },
-                "issues": [
-                    {
-                        "type": "solver_timeout",
-                        "count": 1,
-                        "scenario": "high_demand_extreme"
-                    }
-                ]
-            }
-            
-            return summary
+            return KPICubeService.summary(db, period_hours)
             
     except Exception as e:
         logger.error(f"Failed to fetch KPI summary: {e}")
         raise HTTPException(status_code=500, detail=f"Summary fetch failed: {str(e)}")
 
 
+@router.get("/history/{scenario_name}")
+async def get_kpi_history_endpoint(
+    scenario_name: str,
+    limit: int = Query(20, ge=1, le=500, description="Number of most recent runs"),
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Run-level KPIs of the most recent runs of a scenario from the KPI cube,
+    each with its delta to the previous run.
+    """
+    try:
+        return {
+            "scenario_name": scenario_name,
+            "runs": KPICubeService.history(db, scenario_name, limit),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Failed to fetch KPI history for {scenario_name}: {e}")
+        raise HTTPException(status_code=500, detail=f"History fetch failed: {str(e)}")
+
+
 @router.get("/health")
 async def kpi_health_check(db: Session = Depends(get_db)) -> Dict[str, Any]:
     """
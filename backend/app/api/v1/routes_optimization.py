@@ -15,6 +15,7 @@ import asyncio
 from pydantic import BaseModel
 
 from app.core.deps import get_db
+from app.services.data_snapshot import DataSnapshot, latest_snapshot
 from app.services.optimization.optimization_engine import optimization_engine, create_sample_input_data
 from app.services.optimization.optimization_engine_fixed import OptimizationEngine, create_sample_input_data
 from app.utils.exceptions import OptimizationError, DataValidationError
@@ -59,7 +60,9 @@ async def run_optimization(
         # CRITICAL: Check data validation status FIRST
         from app.services.data_validation_gateway import check_optimization_readiness
         
-        readiness_check = check_optimization_readiness(db)
+        # The background run validates and solves the same snapshot
+        snapshot = latest_snapshot(db)
+        readiness_check = check_optimization_readiness(db, snapshot)
         
         if not readiness_check["optimization_ready"]:
             logger.error(f"Optimization blocked by data validation errors: {readiness_check['blocking_errors']}")
@@ -92,7 +95,8 @@ async def run_optimization(
             _run_optimization_task,
             run_id,
             request,
-            db
+            db,
+            snapshot
         )
         
         return {
@@ -111,7 +115,8 @@ async def run_optimization(
         raise HTTPException(status_code=500, detail=f"Failed to start optimization: {str(e)}")
 
 
-async def _run_optimization_task(run_id: str, request: OptimizationRequest, db: Session):
+async def _run_optimization_task(run_id: str, request: OptimizationRequest, db: Session,
+                                snapshot: Optional[DataSnapshot] = None):
     """Background task to run the REAL optimization engine with validated data."""
     try:
         # Update status to validating data
@@ -121,7 +126,7 @@ async def _run_optimization_task(run_id: str, request: OptimizationRequest, db:
         # Get clean, validated data through the gateway
         from app.services.data_validation_gateway import DataValidationGateway
         
-        gateway = DataValidationGateway(db)
+        gateway = DataValidationGateway(db, snapshot)
         is_ready, clean_data, blocking_errors = gateway.validate_and_prepare_optimization_data()
         
         if not is_ready:
@@ -158,7 +163,8 @@ async def _run_optimization_task(run_id: str, request: OptimizationRequest, db:
             scenario_name=request.scenario_name,
             solver_name=request.solver,
             time_limit=request.time_limit,
-            mip_gap=request.mip_gap
+            mip_gap=request.mip_gap,
+            snapshot=snapshot
         )
         
         # Update status to processing results
@@ -13,6 +13,8 @@ from datetime import datetime, timedelta
 import random
 
 from app.core.deps import get_db
+from app.db.models.optimization_results import OptimizationResults
+from app.services.result_store import PLAN_COLUMNS, PLAN_TABLES, load_plan
 from app.utils.exceptions import DataValidationError, OptimizationError
 
 router = APIRouter()
@@ -216,15 +218,72 @@ def get_optimization_runs(
         raise HTTPException(status_code=500, detail="Failed to fetch optimization runs")
 
 
+def _stored_run_results(
+    results: OptimizationResults,
+    tables: List[str],
+    period: Optional[List[str]],
+    plant_id: Optional[str],
+    columns: Optional[List[str]]
+) -> Dict[str, Any]:
+    """Summary scalars of a stored run plus the requested plan slices."""
+    
+    payload = {
+        "run_id": results.run_id,
+        "plan_storage": results.plan_storage or "json",
+        "total_cost": results.total_cost,
+        "cost_breakdown": {
+            "production_cost": results.production_cost,
+            "transport_cost": results.transport_cost,
+            "inventory_cost": results.inventory_cost,
+            "penalty_cost": results.penalty_cost
+        },
+        "service_level": results.service_level,
+        "stockout_events": results.stockout_events,
+        "plans": {}
+    }
+    
+    for table in tables:
+        filters: Dict[str, Any] = {}
+        if period:
+            filters["period"] = period
+        if plant_id:
+            filters["plant_id" if table in ("production", "inventory") else "origin"] = plant_id
+        wanted = [c for c in (columns or []) if c in PLAN_COLUMNS[table]] or None
+        df = load_plan(results, table, columns=wanted, filters=filters)
+        payload["plans"][table] = df.to_dict(orient="records")
+    
+    return payload
+
+
 @router.get("/runs/{run_id}/results")
-def get_optimization_results(run_id: str, db: Session = Depends(get_db)):
-    """Get detailed results for a specific optimization run."""
+def get_optimization_results(
+    run_id: str,
+    table: Optional[List[str]] = Query(None, description="Plan tables to include: shipments, production, inventory, trips"),
+    period: Optional[List[str]] = Query(None, description="Only these periods"),
+    plant_id: Optional[str] = Query(None, description="Plant for production/inventory, origin for shipments/trips"),
+    columns: Optional[List[str]] = Query(None, description="Only these plan columns"),
+    db: Session = Depends(get_db)
+):
+    """Get detailed results for a specific optimization run.
+    
+    Stored runs return their summary plus the requested plan slices, read
+    with column projection and period/plant filters from the result store.
+    """
     
     try:
         # Validate run_id format
         if not run_id.startswith("RUN_"):
             raise HTTPException(status_code=400, detail="Invalid run ID format")
         
+        tables = table or list(PLAN_TABLES)
+        unknown = [t for t in tables if t not in PLAN_TABLES]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown result tables: {unknown}")
+        
+        stored = db.query(OptimizationResults).filter(OptimizationResults.run_id == run_id).first()
+        if stored is not None:
+            return _stored_run_results(stored, tables, period, plant_id, columns)
+        
         # Check if run exists and is completed
         run_hash = hash(run_id) % 100
         
@@ -9,7 +9,10 @@ import logging
 
 from app.db.session import get_db
 from app.services.optimization.uncertainty_optimizer import UncertaintyOptimizer
+from app.db.models.optimization_run import OptimizationRun
 from app.services.audit_service import audit_timer
+from app.services.kpi_calculator import cost_risk_metrics, service_level_risk
+from app.services.kpi_cube import KPICubeService
 from app.utils.exceptions import OptimizationError
 
 router = APIRouter()
@@ -137,15 +140,21 @@ async def compare_deterministic_uncertain(
 
 @router.get("/risk-metrics")
 async def get_risk_metrics(
-    run_id: Optional[str] = Query(None),
+    run_id: Optional[str] = Query(None, description="Use the runs of this run's scenario"),
+    scenario_names: Optional[List[str]] = Query(None, description="Scenarios whose runs form the distribution"),
     confidence_levels: List[float] = Query([0.90, 0.95, 0.99]),
     db: Session = Depends(get_db)
 ) -> Dict[str, Any]:
     """
     Get risk metrics and Value at Risk calculations.
     
+    The cost and service-level distributions are taken over the completed
+    runs in the KPI cube (all runs, the runs of ``scenario_names``, or the
+    runs of ``run_id``'s scenario), one equally likely outcome per run.
+    
     Args:
-        run_id: Optional specific run ID
+        run_id: Optional run ID whose scenario's runs are used
+        scenario_names: Optional scenarios to include
         confidence_levels: List of confidence levels for VaR
         db: Database session
         
@@ -154,38 +163,30 @@ async def get_risk_metrics(
     """
     try:
         with audit_timer("risk_metrics_fetch", db):
-            # Mock risk metrics
-            risk_metrics = {
-                "cost_distribution": {
-                    "mean": 1466666.67,
-                    "median": 1450000.0,
-                    "std_dev": 244948.97,
-                    "min": 1200000.0,
-                    "max": 1800000.0
-                },
-                "value_at_risk": {
-                    "90%": 1650000.0,
-                    "95%": 1720000.0,
-                    "99%": 1780000.0
-                },
-                "conditional_var": {
-                    "95%": 1760000.0,  # Expected value beyond 95% VaR
-                    "99%": 1790000.0
-                },
-                "service_level_risk": {
-                    "target_95%": 0.92,  # Probability of achieving 95% service
-                    "target_90%": 0.96,  # Probability of achieving 90% service
-                    "expected_service": 0.963
-                },
-                "sensitivity_analysis": {
-                    "demand_sensitivity": 0.85,  # Cost change per 1% demand change
-                    "capacity_sensitivity": 0.12,  # Cost change per 1% capacity change
-                    "cost_sensitivity": 0.03      # Cost change per 1% cost parameter change
+            if run_id:
+                run = db.query(OptimizationRun).filter(OptimizationRun.run_id == run_id).first()
+                if run is None:
+                    raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
+                scenario_names = [run.scenario_name]
+            
+            totals = KPICubeService.run_totals(db, ["total_cost", "service_level"], scenario_names)
+            totals = totals.dropna(subset=["total_cost"])
+            if totals.empty:
+                return {
+                    "status": "no_data",
+                    "message": "No completed runs available for risk metrics",
+                    "runs_used": 0
                 }
-            }
+            
+            risk_metrics = cost_risk_metrics(totals["total_cost"].to_numpy(), confidence_levels)
+            risk_metrics["service_level_risk"] = service_level_risk(totals["service_level"].fillna(0.0).to_numpy())
+            risk_metrics["runs_used"] = int(len(totals))
+            risk_metrics["scenarios"] = scenario_names
             
             return risk_metrics
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to fetch risk metrics: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -67,7 +67,26 @@ class Settings(BaseSettings):
     ROUTING_MAX_RETRIES: int = 3
     ROUTING_RETRY_DELAY: float = 1.0  # Initial delay in seconds
     ROUTING_RETRY_BACKOFF: float = 2.0  # Exponential backoff multiplier
-    
+    # Distance-matrix request limits: coordinates (sources + destinations) per
+    # OSRM /table request, cells (sources x destinations) per ORS /matrix request
+    OSRM_TABLE_MAX_LOCATIONS: int = 100
+    ORS_MATRIX_MAX_ROUTES: int = 3500
+    # Shared routing HTTP clients (http_pool): connections kept open per
+    # provider, requests in flight per provider, and the request rate per
+    # provider as a token bucket (requests per second, 0 = unlimited; burst)
+    ROUTING_MAX_CONNECTIONS: int = 10
+    ROUTING_KEEPALIVE_SECONDS: float = 30.0
+    ROUTING_HTTP2: bool = True
+    ROUTING_MAX_CONCURRENCY: int = 8
+    OSRM_REQUESTS_PER_SECOND: float = 1.0
+    ORS_REQUESTS_PER_SECOND: float = 0.6
+    ROUTING_RATE_BURST: int = 1
+    # In-memory route cache in front of transport_lookup: routes kept per
+    # process (least recently used are evicted), and whether the whole table
+    # is loaded at startup
+    ROUTE_CACHE_MAX_ENTRIES: int = 100000
+    ROUTE_CACHE_PRELOAD: bool = True
+
     # Demand Streaming Settings
     DEMAND_SOURCE_TYPE: str = "rest"
     DEMAND_POLL_URL: str = "https://api.example.com/demand"
@@ -102,6 +121,40 @@ class Settings(BaseSettings):
     DEFAULT_TIME_LIMIT: int = 600
     DEFAULT_MIP_GAP: float = 0.01
     
+    # Result plan storage ("parquet" needs pyarrow, otherwise JSON columns are used)
+    RESULTS_STORAGE: str = "parquet"
+    RESULTS_STORE_DIR: str = "./data/results"
+    
+    # Reference-data cache: entries are also reloaded after this many seconds so
+    # writes made by other worker processes become visible (0 = never)
+    REFERENCE_CACHE_MAX_AGE_SECONDS: int = 300
+
+    # Worker threads parsing sheets of an uploaded workbook ahead of the
+    # staging inserts (parsing holds the GIL, so more rarely helps)
+    INGESTION_PARSE_WORKERS: int = 2
+
+    # PDF table extraction: worker processes, pages per task, and the on-disk
+    # cache of extracted tables per (file hash, page)
+    PDF_EXTRACT_WORKERS: int = 4
+    PDF_PAGES_PER_TASK: int = 4
+    PDF_PAGE_CACHE_DIR: str = "./data/pdf_cache"
+
+    # Rows fetched per round trip when loading an input-data snapshot
+    SNAPSHOT_CHUNK_SIZE: int = 50000
+
+    # Incremental snapshot refreshes also re-read rows updated this many seconds
+    # before the last watermark, and fall back to a full read after
+    # SNAPSHOT_MAX_AGE_SECONDS (0 = never)
+    SNAPSHOT_WATERMARK_OVERLAP_SECONDS: int = 300
+    SNAPSHOT_MAX_AGE_SECONDS: int = 3600
+
+    # Cached validation reports are rebuilt after this many seconds even if
+    # the table fingerprints did not move (0 = never)
+    VALIDATION_CACHE_MAX_AGE_SECONDS: int = 300
+
+    # Threads running independent validation stages side by side (1 = sequential)
+    VALIDATION_MAX_WORKERS: int = 4
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index, text
 
 from app.db.base import Base
 
@@ -16,3 +16,8 @@ class DemandForecast(Base):
     source = Column(String)  # manual, api, forecast_model
     created_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"))
     updated_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"), onupdate=text("CURRENT_TIMESTAMP"))
+
+    # Business key used to match staged rows on promotion
+    __table_args__ = (
+        Index('idx_demand_customer_period', 'customer_node_id', 'period'),
+    )
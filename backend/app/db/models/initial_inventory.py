@@ -2,7 +2,7 @@
 from sqlalchemy import Column, Integer, String, Float, DateTime
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index, text
 
 
 from app.db.base import Base
@@ -26,3 +26,7 @@ class InitialInventory(Base):
     created_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"))
     updated_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"), onupdate=text("CURRENT_TIMESTAMP"))
 
+    # Business key used to match staged rows on promotion
+    __table_args__ = (
+        Index('idx_inventory_node_period', 'node_id', 'period'),
+    )
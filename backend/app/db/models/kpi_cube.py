@@ -0,0 +1,63 @@
+"""
+KPI Cube Tables
+
+Cells of a scenario x run x period x member x metric cube, maintained
+incrementally when an optimization run completes, plus one row per scenario
+with its latest totals and precomputed deltas against the base scenario.
+"""
+
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, Index, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class KPICubeCell(Base):
+    """One metric value of one run, at run or period level, for the whole
+    network (``dimension="total"``), a plant or a route."""
+
+    __tablename__ = "kpi_cube_cell"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    scenario_name = Column(String(255), nullable=False)
+    run_id = Column(String(255), nullable=False)
+
+    # "" = whole planning horizon
+    period = Column(String(50), nullable=False, default="")
+
+    # "total", "plant" (member = plant_id) or "route" (member = origin|destination|mode)
+    dimension = Column(String(20), nullable=False)
+    member = Column(String(255), nullable=False, default="")
+
+    metric = Column(String(100), nullable=False)
+    value = Column(Float, nullable=False)
+
+    completed_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('run_id', 'period', 'dimension', 'member', 'metric', name='uq_kpi_cube_cell'),
+        Index('idx_cube_scenario_metric', 'scenario_name', 'dimension', 'metric', 'period'),
+        Index('idx_cube_metric_completed', 'dimension', 'metric', 'completed_at'),
+    )
+
+
+class KPICubeScenario(Base):
+    """Latest run of a scenario with its run-level totals and deltas."""
+
+    __tablename__ = "kpi_cube_scenario"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    scenario_name = Column(String(255), nullable=False, unique=True, index=True)
+    latest_run_id = Column(String(255), nullable=False)
+    run_count = Column(Integer, nullable=False, default=0)
+    completed_at = Column(DateTime, nullable=True)
+
+    # {metric: value} of the latest run, run level, whole network
+    totals = Column(JSON, nullable=False)
+    # {metric: {"absolute": x, "percent": y}} against the base scenario
+    delta_vs_base = Column(JSON, nullable=True)
+
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
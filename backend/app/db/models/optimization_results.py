@@ -39,6 +39,10 @@ class OptimizationResults(Base):
     capacity_utilization = Column(JSON)  # {plant_id: {period: utilization}}
     capacity_violations = Column(JSON)  # {plant_id: {period: violation_amount}}
     
+    # Plan storage: "json" keeps plans in the columns above, "parquet" in the
+    # result store (app.services.result_store) with only scalars in this row
+    plan_storage = Column(String(20), default="json")
+    
     created_at = Column(DateTime, server_default=func.now())
     
     # Relationship
@@ -2,7 +2,7 @@
 from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index, ForeignKey, text
 
 from app.db.base import Base
 
@@ -21,3 +21,7 @@ class ProductionCapacityCost(Base):
     created_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"))
     updated_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"), onupdate=text("CURRENT_TIMESTAMP"))
 
+    # Business key used to match staged rows on promotion
+    __table_args__ = (
+        Index('idx_production_plant_period', 'plant_id', 'period'),
+    )
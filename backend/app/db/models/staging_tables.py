@@ -24,7 +24,7 @@ class StagingPlantMaster(Base):
     country = Column(String)
     
     # Staging metadata
-    batch_id = Column(String, nullable=False)  # Track upload batches
+    batch_id = Column(String, nullable=False, index=True)  # Track upload batches
     source_file = Column(String)
     source_row = Column(Integer)  # Original row number in CSV
     validation_status = Column(String, default="pending")  # pending, valid, invalid
@@ -46,7 +46,7 @@ class StagingDemandForecast(Base):
     source = Column(String)
     
     # Staging metadata
-    batch_id = Column(String, nullable=False)
+    batch_id = Column(String, nullable=False, index=True)
     source_file = Column(String)
     source_row = Column(Integer)
     validation_status = Column(String, default="pending")
@@ -72,7 +72,7 @@ class StagingTransportRoutes(Base):
     is_active = Column(String)
     
     # Staging metadata
-    batch_id = Column(String, nullable=False)
+    batch_id = Column(String, nullable=False, index=True)
     source_file = Column(String)
     source_row = Column(Integer)
     validation_status = Column(String, default="pending")
@@ -94,7 +94,7 @@ class StagingProductionCosts(Base):
     holding_cost_per_tonne = Column(Float)
     
     # Staging metadata
-    batch_id = Column(String, nullable=False)
+    batch_id = Column(String, nullable=False, index=True)
     source_file = Column(String)
     source_row = Column(Integer)
     validation_status = Column(String, default="pending")
@@ -112,7 +112,7 @@ class StagingInitialInventory(Base):
     inventory_tonnes = Column(Float)
     
     # Staging metadata
-    batch_id = Column(String, nullable=False)
+    batch_id = Column(String, nullable=False, index=True)
     source_file = Column(String)
     source_row = Column(Integer)
     validation_status = Column(String, default="pending")
@@ -132,7 +132,7 @@ class StagingSafetyStock(Base):
     effective_to = Column(String)
     
     # Staging metadata
-    batch_id = Column(String, nullable=False)
+    batch_id = Column(String, nullable=False, index=True)
     source_file = Column(String)
     source_row = Column(Integer)
     validation_status = Column(String, default="pending")
@@ -148,10 +148,12 @@ class ValidationBatch(Base):
     source_file = Column(String, nullable=False)
     table_name = Column(String, nullable=False)
     total_rows = Column(Integer, nullable=False)
+    unchanged_rows = Column(Integer, default=0)  # Rows left out as identical to production
     valid_rows = Column(Integer, default=0)
     invalid_rows = Column(Integer, default=0)
     status = Column(String, default="pending")  # pending, validated, promoted, failed
     validation_errors = Column(Text)  # Summary of validation errors
     created_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"))
     validated_at = Column(DateTime)
-    promoted_at = Column(DateTime)  # When moved to production tables
\ No newline at end of file
+    promoted_at = Column(DateTime)  # When moved to production tables
+    content_hash = Column(String, index=True)  # SHA-256 of the uploaded file
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index, ForeignKey, text
 
 from app.db.base import Base
 
@@ -20,3 +20,8 @@ class TransportRoutesModes(Base):
     is_active = Column(String, default="Y")
     created_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"))
     updated_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"), onupdate=text("CURRENT_TIMESTAMP"))
+
+    # Business key used to match staged rows on promotion
+    __table_args__ = (
+        Index('idx_route_origin_destination_mode', 'origin_plant_id', 'destination_node_id', 'transport_mode'),
+    )
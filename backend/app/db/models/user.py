@@ -44,7 +44,7 @@ class User(Base):
     last_login = Column(DateTime, nullable=True)
     
     # Relationships
-    audit_logs = relationship("AuditLog", back_populates="user")
+    audit_logs = relationship("AuditLog", back_populates="user_obj")
 
 
 class Role(Base):
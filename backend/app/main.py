@@ -1,9 +1,15 @@
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.config import get_settings
 from app.core.logging_config import setup_logging, configure_uvicorn_logging
+from app.db.session import SessionLocal
+from app.services.external.http_pool import routing_http
+from app.services.routing_cache import route_cache
 from app.api.v1 import (
     routes_auth,
     routes_dashboard_simple,  # Use simple version instead of routes_dashboard_demo
@@ -28,6 +34,7 @@ except ImportError:
 
 setup_logging()
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -59,6 +66,27 @@ app.include_router(routes_runs.router, prefix=f"{settings.API_V1_STR}", tags=["r
 # app.include_router(routes_optimization_new.router, prefix=f"{settings.API_V1_STR}/optimize", tags=["optimization-engine"])
 
 
+@app.on_event("startup")
+def preload_route_cache():
+    """Load transport_lookup into the in-memory route cache."""
+    if not settings.ROUTE_CACHE_PRELOAD:
+        return
+    db = SessionLocal()
+    try:
+        route_cache.preload(db)
+    except SQLAlchemyError as e:
+        # Routes are then read from the database as they are requested
+        logger.warning(f"Route cache preload failed: {e}")
+    finally:
+        db.close()
+
+
+@app.on_event("shutdown")
+async def close_routing_clients():
+    """Close the pooled routing provider connections."""
+    await routing_http.aclose()
+
+
 @app.get("/")
 def root():
     return {
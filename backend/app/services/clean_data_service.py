@@ -5,68 +5,57 @@ Provides cleaned, validated, and normalized data views for the optimization mode
 This service ensures that ONLY clean data reaches the optimization engine.
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Tuple
+import logging
+import threading
+
+import numpy as np
 import pandas as pd
 from sqlalchemy.orm import Session
-import logging
 
-from app.db.models.plant_master import PlantMaster
-from app.db.models.production_capacity_cost import ProductionCapacityCost
-from app.db.models.transport_routes_modes import TransportRoutesModes
-from app.db.models.demand_forecast import DemandForecast
-from app.db.models.initial_inventory import InitialInventory
-from app.db.models.safety_stock_policy import SafetyStockPolicy
+from app.services.data_snapshot import DataSnapshot, latest_snapshot, snapshot_table
 from app.services.data_validation_service import run_comprehensive_validation
+from app.services.reference_data_cache import get_plants, get_routes
 from app.utils.exceptions import DataValidationError
 
 logger = logging.getLogger(__name__)
 
 
-def _clean_and_normalize_plants(db: Session) -> pd.DataFrame:
-    """Load and clean plant master data."""
-    
-    plants = db.query(PlantMaster).all()
-    
-    df = pd.DataFrame([
-        {
-            "plant_id": p.plant_id.strip().upper() if p.plant_id else None,
-            "plant_name": p.plant_name.strip() if p.plant_name else None,
-            "plant_type": p.plant_type.strip().lower() if p.plant_type else None,
-            "latitude": float(p.latitude) if p.latitude is not None else None,
-            "longitude": float(p.longitude) if p.longitude is not None else None,
-            "region": p.region.strip() if p.region else None,
-            "country": p.country.strip() if p.country else None
-        }
-        for p in plants
-    ])
+def _strip(series: pd.Series, case=None) -> pd.Series:
+    # object dtype whatever the values, so partial re-normalizations concatenate cleanly
+    return series.map(lambda v: (case(v.strip()) if case else v.strip()) if v else None).astype(object)
+
+
+def _numeric(series: pd.Series, default: Optional[float]) -> pd.Series:
+    values = pd.to_numeric(series, errors="coerce").astype(float)
+    return values if default is None else values.fillna(default)
+
+
+def _normalize_plants(plants: pd.DataFrame) -> pd.DataFrame:
+    df = pd.DataFrame({
+        "plant_id": _strip(plants["plant_id"], str.upper),
+        "plant_name": _strip(plants["plant_name"]),
+        "plant_type": _strip(plants["plant_type"], str.lower),
+        "latitude": _numeric(plants["latitude"], None),
+        "longitude": _numeric(plants["longitude"], None),
+        "region": _strip(plants["region"]),
+        "country": _strip(plants["country"]),
+    })
     
     # Remove rows with missing critical fields
-    df = df.dropna(subset=["plant_id", "plant_name", "plant_type"])
-    
-    # Remove duplicates
-    df = df.drop_duplicates(subset=["plant_id"])
-    
-    logger.info(f"Cleaned plant_master: {len(df)} records")
-    return df
+    return df.dropna(subset=["plant_id", "plant_name", "plant_type"])
 
 
-def _clean_and_normalize_production_capacity(db: Session) -> pd.DataFrame:
-    """Load and clean production capacity data."""
-    
-    records = db.query(ProductionCapacityCost).all()
-    
-    df = pd.DataFrame([
-        {
-            "plant_id": r.plant_id.strip().upper() if r.plant_id else None,
-            "period": str(r.period).strip() if r.period else None,
-            "max_capacity_tonnes": float(r.max_capacity_tonnes) if r.max_capacity_tonnes is not None else 0.0,
-            "variable_cost_per_tonne": float(r.variable_cost_per_tonne) if r.variable_cost_per_tonne is not None else 0.0,
-            "fixed_cost_per_period": float(r.fixed_cost_per_period) if r.fixed_cost_per_period is not None else 0.0,
-            "min_run_level": float(r.min_run_level) if r.min_run_level is not None else 0.0,
-            "holding_cost_per_tonne": 10.0  # Default holding cost
-        }
-        for r in records
-    ])
+def _normalize_production_capacity(records: pd.DataFrame) -> pd.DataFrame:
+    df = pd.DataFrame({
+        "plant_id": _strip(records["plant_id"], str.upper),
+        "period": _strip(records["period"]),
+        "max_capacity_tonnes": _numeric(records["max_capacity_tonnes"], 0.0),
+        "variable_cost_per_tonne": _numeric(records["variable_cost_per_tonne"], 0.0),
+        "fixed_cost_per_period": _numeric(records["fixed_cost_per_period"], 0.0),
+        "min_run_level": _numeric(records["min_run_level"], 0.0),
+        "holding_cost_per_tonne": 10.0  # Default holding cost
+    })
     
     # Remove rows with missing critical fields
     df = df.dropna(subset=["plant_id", "period"])
@@ -75,37 +64,24 @@ def _clean_and_normalize_production_capacity(db: Session) -> pd.DataFrame:
     df = df[df["max_capacity_tonnes"] > 0]
     
     # Remove rows with negative costs
-    df = df[df["variable_cost_per_tonne"] >= 0]
-    
-    # Remove duplicates
-    df = df.drop_duplicates(subset=["plant_id", "period"])
-    
-    logger.info(f"Cleaned production_capacity_cost: {len(df)} records")
-    return df
+    return df[df["variable_cost_per_tonne"] >= 0]
 
 
-def _clean_and_normalize_transport_routes(db: Session) -> pd.DataFrame:
-    """Load and clean transport routes data."""
-    
-    records = db.query(TransportRoutesModes).filter(
-        TransportRoutesModes.is_active == "Y"
-    ).all()
-    
-    df = pd.DataFrame([
-        {
-            "origin_plant_id": r.origin_plant_id.strip().upper() if r.origin_plant_id else None,
-            "destination_node_id": r.destination_node_id.strip().upper() if r.destination_node_id else None,
-            "transport_mode": r.transport_mode.strip().lower() if r.transport_mode else None,
-            "distance_km": float(r.distance_km) if r.distance_km is not None else 100.0,  # Default distance
-            "cost_per_tonne": float(r.cost_per_tonne) if r.cost_per_tonne is not None else 0.0,
-            "cost_per_tonne_km": float(r.cost_per_tonne_km) if r.cost_per_tonne_km is not None else 0.1,  # Default rate
-            "fixed_cost_per_trip": float(r.fixed_cost_per_trip) if r.fixed_cost_per_trip is not None else 0.0,
-            "vehicle_capacity_tonnes": float(r.vehicle_capacity_tonnes) if r.vehicle_capacity_tonnes is not None else 25.0,
-            "min_batch_quantity_tonnes": float(r.min_batch_quantity_tonnes) if r.min_batch_quantity_tonnes is not None else 0.0,
-            "lead_time_days": float(r.lead_time_days) if r.lead_time_days is not None else 1.0
-        }
-        for r in records
-    ])
+def _normalize_transport_routes(routes: pd.DataFrame) -> pd.DataFrame:
+    routes = routes[routes["is_active"] == "Y"]
+    
+    df = pd.DataFrame({
+        "origin_plant_id": _strip(routes["origin_plant_id"], str.upper),
+        "destination_node_id": _strip(routes["destination_node_id"], str.upper),
+        "transport_mode": _strip(routes["transport_mode"], str.lower),
+        "distance_km": _numeric(routes["distance_km"], 100.0),  # Default distance
+        "cost_per_tonne": _numeric(routes["cost_per_tonne"], 0.0),
+        "cost_per_tonne_km": _numeric(routes["cost_per_tonne_km"], 0.1),  # Default rate
+        "fixed_cost_per_trip": _numeric(routes["fixed_cost_per_trip"], 0.0),
+        "vehicle_capacity_tonnes": _numeric(routes["vehicle_capacity_tonnes"], 25.0),
+        "min_batch_quantity_tonnes": _numeric(routes["min_batch_quantity_tonnes"], 0.0),
+        "lead_time_days": _numeric(routes["lead_time_days"], 1.0),
+    })
     
     # Remove rows with missing critical fields
     df = df.dropna(subset=["origin_plant_id", "destination_node_id", "transport_mode"])
@@ -114,115 +90,186 @@ def _clean_and_normalize_transport_routes(db: Session) -> pd.DataFrame:
     df = df[df["origin_plant_id"] != df["destination_node_id"]]
     
     # Remove rows with non-positive vehicle capacity
-    df = df[df["vehicle_capacity_tonnes"] > 0]
+    df = df[df["vehicle_capacity_tonnes"] > 0].copy()
     
     # Ensure SBQ <= vehicle capacity
     df.loc[df["min_batch_quantity_tonnes"] > df["vehicle_capacity_tonnes"], "min_batch_quantity_tonnes"] = df["vehicle_capacity_tonnes"]
     
     # Calculate total transport cost per tonne
     df["total_cost_per_tonne"] = df["cost_per_tonne"] + (df["cost_per_tonne_km"] * df["distance_km"])
-    
-    # Remove duplicates
-    df = df.drop_duplicates(subset=["origin_plant_id", "destination_node_id", "transport_mode"])
-    
-    logger.info(f"Cleaned transport_routes_modes: {len(df)} records")
     return df
 
 
-def _clean_and_normalize_demand_forecast(db: Session) -> pd.DataFrame:
-    """Load and clean demand forecast data."""
-    
-    records = db.query(DemandForecast).all()
-    
-    df = pd.DataFrame([
-        {
-            "customer_node_id": r.customer_node_id.strip().upper() if r.customer_node_id else None,
-            "period": str(r.period).strip() if r.period else None,
-            "demand_tonnes": float(r.demand_tonnes) if r.demand_tonnes is not None else 0.0,
-            "demand_low_tonnes": float(r.demand_low_tonnes) if r.demand_low_tonnes is not None else None,
-            "demand_high_tonnes": float(r.demand_high_tonnes) if r.demand_high_tonnes is not None else None,
-            "confidence_level": float(r.confidence_level) if r.confidence_level is not None else 0.95,
-            "source": r.source.strip() if r.source else "unknown"
-        }
-        for r in records
-    ])
+def _normalize_demand_forecast(records: pd.DataFrame) -> pd.DataFrame:
+    df = pd.DataFrame({
+        "customer_node_id": _strip(records["customer_node_id"], str.upper),
+        "period": _strip(records["period"]),
+        "demand_tonnes": _numeric(records["demand_tonnes"], 0.0),
+        "demand_low_tonnes": _numeric(records["demand_low_tonnes"], None),
+        "demand_high_tonnes": _numeric(records["demand_high_tonnes"], None),
+        "confidence_level": _numeric(records["confidence_level"], 0.95),
+        "source": _strip(records["source"]).fillna("unknown")
+    })
     
     # Remove rows with missing critical fields
     df = df.dropna(subset=["customer_node_id", "period"])
     
     # Remove rows with negative demand
-    df = df[df["demand_tonnes"] >= 0]
-    
-    # Remove duplicates (keep first occurrence)
-    df = df.drop_duplicates(subset=["customer_node_id", "period"])
-    
-    logger.info(f"Cleaned demand_forecast: {len(df)} records")
-    return df
+    return df[df["demand_tonnes"] >= 0]
 
 
-def _clean_and_normalize_initial_inventory(db: Session) -> pd.DataFrame:
-    """Load and clean initial inventory data."""
-    
-    records = db.query(InitialInventory).all()
-    
-    df = pd.DataFrame([
-        {
-            "node_id": r.node_id.strip().upper() if r.node_id else None,
-            "period": str(r.period).strip() if r.period else None,
-            "inventory_tonnes": float(r.inventory_tonnes) if r.inventory_tonnes is not None else 0.0
-        }
-        for r in records
-    ])
+def _normalize_initial_inventory(records: pd.DataFrame) -> pd.DataFrame:
+    df = pd.DataFrame({
+        "node_id": _strip(records["node_id"], str.upper),
+        "period": _strip(records["period"]),
+        "inventory_tonnes": _numeric(records["inventory_tonnes"], 0.0)
+    })
     
     # Remove rows with missing critical fields
     df = df.dropna(subset=["node_id", "period"])
     
     # Remove rows with negative inventory
-    df = df[df["inventory_tonnes"] >= 0]
-    
-    # Remove duplicates
-    df = df.drop_duplicates(subset=["node_id", "period"])
-    
-    logger.info(f"Cleaned initial_inventory: {len(df)} records")
-    return df
+    return df[df["inventory_tonnes"] >= 0]
 
 
-def _clean_and_normalize_safety_stock_policy(db: Session) -> pd.DataFrame:
-    """Load and clean safety stock policy data."""
-    
-    records = db.query(SafetyStockPolicy).all()
-    
-    df = pd.DataFrame([
-        {
-            "node_id": r.node_id.strip().upper() if r.node_id else None,
-            "policy_type": r.policy_type.strip().lower() if r.policy_type else None,
-            "policy_value": float(r.policy_value) if r.policy_value is not None else 0.0,
-            "safety_stock_tonnes": float(r.safety_stock_tonnes) if r.safety_stock_tonnes is not None else 0.0,
-            "max_inventory_tonnes": float(r.max_inventory_tonnes) if r.max_inventory_tonnes is not None else None
-        }
-        for r in records
-    ])
+def _normalize_safety_stock_policy(records: pd.DataFrame) -> pd.DataFrame:
+    df = pd.DataFrame({
+        "node_id": _strip(records["node_id"], str.upper),
+        "policy_type": _strip(records["policy_type"], str.lower),
+        "policy_value": _numeric(records["policy_value"], 0.0),
+        "safety_stock_tonnes": _numeric(records["safety_stock_tonnes"], 0.0),
+        "max_inventory_tonnes": _numeric(records["max_inventory_tonnes"], None)
+    })
     
     # Remove rows with missing critical fields
     df = df.dropna(subset=["node_id", "policy_type"])
     
     # Remove rows with negative safety stock
-    df = df[df["safety_stock_tonnes"] >= 0]
+    return df[df["safety_stock_tonnes"] >= 0]
+
+
+# Snapshot table -> (table name in logs, row-level normalization, keys that must be unique).
+# Normalization looks at one row at a time, so it is cached per table version
+# and re-applied only to the rows a snapshot refresh changed; de-duplication
+# (first occurrence wins) then runs over the whole table.
+CLEANING_STEPS: Dict[str, Tuple[str, Callable[[pd.DataFrame], pd.DataFrame], List[str]]] = {
+    "plants": ("plant_master", _normalize_plants, ["plant_id"]),
+    "production_capacity_cost": ("production_capacity_cost", _normalize_production_capacity, ["plant_id", "period"]),
+    "transport_routes_modes": (
+        "transport_routes_modes", _normalize_transport_routes,
+        ["origin_plant_id", "destination_node_id", "transport_mode"],
+    ),
+    "demand_forecast": ("demand_forecast", _normalize_demand_forecast, ["customer_node_id", "period"]),
+    "initial_inventory": ("initial_inventory", _normalize_initial_inventory, ["node_id", "period"]),
+    "safety_stock_policy": ("safety_stock_policy", _normalize_safety_stock_policy, ["node_id"]),
+}
+
+
+class NormalizedRowsCache:
+    """Normalized rows per table, indexed by primary key, for the last table version seen."""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[str, pd.DataFrame]] = {}
+        self._lock = threading.Lock()
+
+    def rows(self, snapshot: DataSnapshot, name: str) -> Tuple[pd.DataFrame, Optional[int]]:
+        """Normalized rows of ``name`` in ``snapshot``, and how many rows were normalized (None = all)."""
+        _, normalize, _ = CLEANING_STEPS[name]
+        version = snapshot.table_versions[name]
+        with self._lock:
+            entry = self._entries.get(name)
+        if entry is not None and entry[0] == version:
+            return entry[1], 0
+        
+        delta = snapshot.delta(name)
+        if entry is not None and delta is not None and entry[0] == snapshot.base_versions[name]:
+            # Replace the changed rows and restore table order
+            kept = entry[1][~entry[1].index.isin(delta.keys)]
+            merged = pd.concat([kept, normalize(snapshot.keyed_rows(name, delta.keys))])
+            order = np.argsort(snapshot.row_keys[name].get_indexer(merged.index), kind="stable")
+            rows, normalized = merged.iloc[order], len(delta.keys)
+        else:
+            rows, normalized = normalize(snapshot.keyed_rows(name)), None
+        
+        with self._lock:
+            self._entries[name] = (version, rows)
+        return rows, normalized
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+normalized_rows_cache = NormalizedRowsCache()
+
+
+def _clean_table(
+    db: Session, snapshot: Optional[DataSnapshot], name: str, changed_rows: Optional[Dict[str, Optional[int]]] = None
+) -> pd.DataFrame:
+    """Clean ``name`` from ``snapshot`` (reusing normalized rows), or freshly read without one."""
+    table_name, normalize, unique_keys = CLEANING_STEPS[name]
+    
+    if snapshot is None:
+        records = {"plants": get_plants, "transport_routes_modes": get_routes}.get(name)
+        records = records(db) if records is not None else snapshot_table(db, None, name)
+        df = normalize(records.reset_index(drop=True))
+    else:
+        df, normalized = normalized_rows_cache.rows(snapshot, name)
+        if changed_rows is not None:
+            changed_rows[name] = normalized
     
-    # Remove duplicates
-    df = df.drop_duplicates(subset=["node_id"])
+    # Remove duplicates (keep first occurrence)
+    df = df.drop_duplicates(subset=unique_keys)
+    if snapshot is not None:
+        # Index by row position, as when cleaning the frame directly
+        df = df.set_axis(snapshot.row_keys[name].get_indexer(df.index))
     
-    logger.info(f"Cleaned safety_stock_policy: {len(df)} records")
+    logger.info(f"Cleaned {table_name}: {len(df)} records")
     return df
 
 
-def get_clean_data_for_optimization(db: Session, validate_first: bool = True) -> Dict[str, Any]:
+def _clean_and_normalize_plants(db: Session, snapshot: Optional[DataSnapshot] = None) -> pd.DataFrame:
+    """Load and clean plant master data."""
+    return _clean_table(db, snapshot, "plants")
+
+
+def _clean_and_normalize_production_capacity(db: Session, snapshot: Optional[DataSnapshot] = None) -> pd.DataFrame:
+    """Load and clean production capacity data."""
+    return _clean_table(db, snapshot, "production_capacity_cost")
+
+
+def _clean_and_normalize_transport_routes(db: Session, snapshot: Optional[DataSnapshot] = None) -> pd.DataFrame:
+    """Load and clean transport routes data."""
+    return _clean_table(db, snapshot, "transport_routes_modes")
+
+
+def _clean_and_normalize_demand_forecast(db: Session, snapshot: Optional[DataSnapshot] = None) -> pd.DataFrame:
+    """Load and clean demand forecast data."""
+    return _clean_table(db, snapshot, "demand_forecast")
+
+
+def _clean_and_normalize_initial_inventory(db: Session, snapshot: Optional[DataSnapshot] = None) -> pd.DataFrame:
+    """Load and clean initial inventory data."""
+    return _clean_table(db, snapshot, "initial_inventory")
+
+
+def _clean_and_normalize_safety_stock_policy(db: Session, snapshot: Optional[DataSnapshot] = None) -> pd.DataFrame:
+    """Load and clean safety stock policy data."""
+    return _clean_table(db, snapshot, "safety_stock_policy")
+
+
+def get_clean_data_for_optimization(
+    db: Session, validate_first: bool = True, snapshot: Optional[DataSnapshot] = None
+) -> Dict[str, Any]:
     """
     Get cleaned and validated data ready for optimization model.
     
     Args:
         db: Database session
         validate_first: If True, run validation first and fail if critical errors found
+        snapshot: Input data to validate and clean; the latest snapshot of
+            ``db`` if omitted, so validation and cleaning always see the same
+            rows and only rows changed since the last call are re-normalized
     
     Returns:
         Dict containing cleaned DataFrames and metadata
@@ -231,9 +278,12 @@ def get_clean_data_for_optimization(db: Session, validate_first: bool = True) ->
         DataValidationError: If validation fails and validate_first=True
     """
     
+    if snapshot is None:
+        snapshot = latest_snapshot(db)
+    
     if validate_first:
         # Run comprehensive validation first
-        validation_result = run_comprehensive_validation(db)
+        validation_result = run_comprehensive_validation(db, snapshot)
         
         if not validation_result["optimization_ready"]:
             error_summary = validation_result["summary"]
@@ -246,12 +296,13 @@ def get_clean_data_for_optimization(db: Session, validate_first: bool = True) ->
     
     # Load and clean all data tables
     try:
-        plants_df = _clean_and_normalize_plants(db)
-        production_df = _clean_and_normalize_production_capacity(db)
-        routes_df = _clean_and_normalize_transport_routes(db)
-        demand_df = _clean_and_normalize_demand_forecast(db)
-        inventory_df = _clean_and_normalize_initial_inventory(db)
-        safety_stock_df = _clean_and_normalize_safety_stock_policy(db)
+        rows_normalized: Dict[str, Optional[int]] = {}
+        plants_df = _clean_table(db, snapshot, "plants", rows_normalized)
+        production_df = _clean_table(db, snapshot, "production_capacity_cost", rows_normalized)
+        routes_df = _clean_table(db, snapshot, "transport_routes_modes", rows_normalized)
+        demand_df = _clean_table(db, snapshot, "demand_forecast", rows_normalized)
+        inventory_df = _clean_table(db, snapshot, "initial_inventory", rows_normalized)
+        safety_stock_df = _clean_table(db, snapshot, "safety_stock_policy", rows_normalized)
         
         # Derive time periods from demand
         time_periods = sorted(demand_df["period"].unique().tolist()) if not demand_df.empty else []
@@ -292,6 +343,9 @@ def get_clean_data_for_optimization(db: Session, validate_first: bool = True) ->
                 "total_customers": len(known_customer_ids),
                 "total_routes": len(routes_df),
                 "total_periods": len(time_periods),
+                "data_version": snapshot.version,
+                # Rows normalized per table in this call (None = whole table)
+                "rows_normalized": rows_normalized,
                 "data_cleaned_at": pd.Timestamp.now().isoformat()
             }
         }
@@ -8,18 +8,16 @@ It provides the real lat/lng data needed for OSRM and ORS routing APIs.
 """
 
 import logging
-from typing import Dict, Tuple, Optional
+from typing import Tuple, Optional
+import pandas as pd
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
-from app.db.models.plant_master import PlantMaster
+from app.services.reference_data_cache import get_plants, invalidate_reference_data
 from app.utils.exceptions import DataValidationError
 
 logger = logging.getLogger(__name__)
 
-# Cache for coordinate lookups to avoid repeated DB queries
-_coordinate_cache: Dict[str, Tuple[float, float]] = {}
-
 
 class CoordinateResolver:
     """
@@ -45,38 +43,30 @@ class CoordinateResolver:
         Raises:
             DataValidationError: If plant not found or coordinates missing
         """
-        # Check cache first
-        cache_key = f"plant_{plant_id}"
-        if cache_key in _coordinate_cache:
-            return _coordinate_cache[cache_key]
-        
         try:
-            plant = self.db.query(PlantMaster).filter(PlantMaster.plant_id == plant_id).first()
-            
-            if not plant:
-                raise DataValidationError(f"Plant {plant_id} not found")
-            
-            if plant.latitude is None or plant.longitude is None:
-                raise DataValidationError(f"Plant {plant_id} has missing coordinates (lat: {plant.latitude}, lng: {plant.longitude})")
-            
-            # Validate coordinate ranges
-            if not (-90 <= plant.latitude <= 90):
-                raise DataValidationError(f"Plant {plant_id} has invalid latitude: {plant.latitude}")
-            
-            if not (-180 <= plant.longitude <= 180):
-                raise DataValidationError(f"Plant {plant_id} has invalid longitude: {plant.longitude}")
-            
-            coordinates = (plant.latitude, plant.longitude)
-            
-            # Cache the result
-            _coordinate_cache[cache_key] = coordinates
-            
-            logger.debug(f"Resolved plant {plant_id} to coordinates {coordinates}")
-            return coordinates
-            
+            plants = get_plants(self.db)
         except SQLAlchemyError as e:
             logger.error(f"Database error resolving coordinates for plant {plant_id}: {e}")
             raise DataValidationError(f"Failed to resolve coordinates for plant {plant_id}: {e}")
+        
+        if plant_id not in plants.index:
+            raise DataValidationError(f"Plant {plant_id} not found")
+        
+        plant = plants.loc[plant_id]
+        latitude, longitude = plant["latitude"], plant["longitude"]
+        if pd.isna(latitude) or pd.isna(longitude):
+            raise DataValidationError(f"Plant {plant_id} has missing coordinates (lat: {latitude}, lng: {longitude})")
+        
+        # Validate coordinate ranges
+        if not (-90 <= latitude <= 90):
+            raise DataValidationError(f"Plant {plant_id} has invalid latitude: {latitude}")
+        
+        if not (-180 <= longitude <= 180):
+            raise DataValidationError(f"Plant {plant_id} has invalid longitude: {longitude}")
+        
+        coordinates = (float(latitude), float(longitude))
+        logger.debug(f"Resolved plant {plant_id} to coordinates {coordinates}")
+        return coordinates
     
     def get_node_coordinates(self, node_id: str) -> Tuple[float, float]:
         """
@@ -91,37 +81,31 @@ class CoordinateResolver:
         Raises:
             DataValidationError: If node not found or coordinates missing
         """
-        # Check cache first
-        cache_key = f"node_{node_id}"
-        if cache_key in _coordinate_cache:
-            return _coordinate_cache[cache_key]
-        
         try:
-            # First try to find as a plant
-            plant = self.db.query(PlantMaster).filter(PlantMaster.plant_id == node_id).first()
-            
-            if plant and plant.latitude is not None and plant.longitude is not None:
-                coordinates = (plant.latitude, plant.longitude)
-                _coordinate_cache[cache_key] = coordinates
-                logger.debug(f"Resolved node {node_id} as plant to coordinates {coordinates}")
-                return coordinates
-            
-            # TODO: In future, add customer/node table lookup here
-            # For now, if it's not a plant, we need to handle it
-            
-            # If node_id looks like a customer ID, use predefined customer locations
-            # This is a temporary solution until customer coordinate table is implemented
-            customer_coordinates = self._get_customer_coordinates(node_id)
-            if customer_coordinates:
-                _coordinate_cache[cache_key] = customer_coordinates
-                logger.debug(f"Resolved node {node_id} as customer to coordinates {customer_coordinates}")
-                return customer_coordinates
-            
-            raise DataValidationError(f"Node {node_id} not found in plants or customer locations")
-            
+            plants = get_plants(self.db)
         except SQLAlchemyError as e:
             logger.error(f"Database error resolving coordinates for node {node_id}: {e}")
             raise DataValidationError(f"Failed to resolve coordinates for node {node_id}: {e}")
+        
+        # First try to find as a plant
+        if node_id in plants.index:
+            plant = plants.loc[node_id]
+            if not pd.isna(plant["latitude"]) and not pd.isna(plant["longitude"]):
+                coordinates = (float(plant["latitude"]), float(plant["longitude"]))
+                logger.debug(f"Resolved node {node_id} as plant to coordinates {coordinates}")
+                return coordinates
+        
+        # TODO: In future, add customer/node table lookup here
+        # For now, if it's not a plant, we need to handle it
+        
+        # If node_id looks like a customer ID, use predefined customer locations
+        # This is a temporary solution until customer coordinate table is implemented
+        customer_coordinates = self._get_customer_coordinates(node_id)
+        if customer_coordinates:
+            logger.debug(f"Resolved node {node_id} as customer to coordinates {customer_coordinates}")
+            return customer_coordinates
+        
+        raise DataValidationError(f"Node {node_id} not found in plants or customer locations")
     
     def _get_customer_coordinates(self, customer_id: str) -> Optional[Tuple[float, float]]:
         """
@@ -191,9 +175,8 @@ class CoordinateResolver:
         return (-90 <= lat <= 90) and (-180 <= lng <= 180)
     
     def clear_cache(self):
-        """Clear the coordinate cache. Useful for testing or when data changes."""
-        global _coordinate_cache
-        _coordinate_cache.clear()
+        """Reload plant coordinates on the next lookup. Useful for testing or when data changes."""
+        invalidate_reference_data("plant_master")
         logger.info("Coordinate cache cleared")
 
 
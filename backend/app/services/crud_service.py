@@ -12,6 +12,7 @@ from fastapi import HTTPException
 from pydantic import BaseModel
 import logging
 
+from app.services.reference_data_cache import invalidate_reference_data
 from app.utils.exceptions import DataValidationError
 
 logger = logging.getLogger(__name__)
@@ -88,6 +89,7 @@ class CRUDService(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             db_obj = self.model(**obj_data)
             db.add(db_obj)
             db.commit()
+            invalidate_reference_data(self.model.__tablename__)
             db.refresh(db_obj)
             logger.info(f"Created {self.model.__name__} with id: {getattr(db_obj, 'id', 'N/A')}")
             return db_obj
@@ -106,6 +108,7 @@ class CRUDService(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             
             db.add(db_obj)
             db.commit()
+            invalidate_reference_data(self.model.__tablename__)
             db.refresh(db_obj)
             logger.info(f"Updated {self.model.__name__} with id: {getattr(db_obj, 'id', 'N/A')}")
             return db_obj
@@ -123,6 +126,7 @@ class CRUDService(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             
             db.delete(obj)
             db.commit()
+            invalidate_reference_data(self.model.__tablename__)
             logger.info(f"Deleted {self.model.__name__} with id: {id}")
             return True
         except Exception as e:
@@ -151,6 +155,7 @@ class PlantCRUDService(CRUDService):
             
             db.delete(obj)
             db.commit()
+            invalidate_reference_data(self.model.__tablename__)
             logger.info(f"Deleted plant with plant_id: {plant_id}")
             return True
         except Exception as e:
@@ -9,15 +9,12 @@ It provides safe data access methods that only read from validated production ta
 
 import logging
 from typing import List, Dict, Any, Optional
+import pandas as pd
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
-from app.db.models.plant_master import PlantMaster
-from app.db.models.production_capacity_cost import ProductionCapacityCost
-from app.db.models.transport_routes_modes import TransportRoutesModes
-from app.db.models.demand_forecast import DemandForecast
-from app.db.models.initial_inventory import InitialInventory
-from app.db.models.safety_stock_policy import SafetyStockPolicy
+from app.services.data_snapshot import DataSnapshot, snapshot_table
+from app.services.reference_data_cache import get_plants, get_routes
 from app.utils.exceptions import DataValidationError
 
 logger = logging.getLogger(__name__)
@@ -33,6 +30,13 @@ STAGING_TABLE_NAMES = {
     "validation_batch"
 }
 
+INVENTORY_COLUMNS = ["location_id", "initial_stock_tonnes", "period"]
+SAFETY_STOCK_COLUMNS = ["location_id", "safety_stock_tonnes", "penalty_cost_per_tonne", "policy_type", "policy_value"]
+
+
+def _records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
 
 class DataAccessGuard:
     """
@@ -48,8 +52,10 @@ class DataAccessGuard:
     4. Logs all data access for audit
     """
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, snapshot: Optional[DataSnapshot] = None):
         self.db = db
+        # Data snapshot of the current run; tables are read on demand without one
+        self.snapshot = snapshot
         self._validate_database_safety()
     
     def _validate_database_safety(self):
@@ -59,13 +65,82 @@ class DataAccessGuard:
         """
         try:
             # Check that production tables exist and are accessible
-            plant_count = self.db.query(PlantMaster).count()
+            plant_count = len(self._frame("plants"))
             logger.info(f"Data access guard initialized - {plant_count} plants in production tables")
             
         except Exception as e:
             logger.error(f"Database safety validation failed: {e}")
             raise DataValidationError(f"Cannot initialize data access guard: {e}")
     
+    def _frame(self, name: str) -> pd.DataFrame:
+        """Production table ``name`` from the guard's snapshot, or read now."""
+        if self.snapshot is None and name == "plants":
+            return get_plants(self.db)
+        if self.snapshot is None and name == "transport_routes_modes":
+            return get_routes(self.db)
+        return snapshot_table(self.db, self.snapshot, name)
+    
+    def _plants_frame(self) -> pd.DataFrame:
+        try:
+            plants = self._frame("plants")
+        except SQLAlchemyError as e:
+            logger.error(f"Database error accessing plants: {e}")
+            raise DataValidationError(f"Failed to access plant data: {e}")
+        
+        if plants.empty:
+            raise DataValidationError("No plants found in production tables. Cannot run optimization.")
+        return plants.reset_index(drop=True)
+    
+    def _production_capacity_frame(self) -> pd.DataFrame:
+        try:
+            capacity = self._frame("production_capacity_cost")
+        except SQLAlchemyError as e:
+            logger.error(f"Database error accessing production capacity: {e}")
+            raise DataValidationError(f"Failed to access production capacity data: {e}")
+        
+        if capacity.empty:
+            raise DataValidationError("No production capacity data found in production tables. Cannot run optimization.")
+        return capacity
+    
+    def _transport_routes_frame(self, active_only: bool = True) -> pd.DataFrame:
+        try:
+            routes = self._frame("transport_routes_modes")
+        except SQLAlchemyError as e:
+            logger.error(f"Database error accessing transport routes: {e}")
+            raise DataValidationError(f"Failed to access transport routes data: {e}")
+        
+        if active_only:
+            routes = routes[routes["is_active"] == "Y"]
+        
+        if routes.empty:
+            raise DataValidationError("No transport routes found in production tables. Cannot run optimization.")
+        return routes.reset_index(drop=True)
+    
+    def _demand_forecast_frame(self) -> pd.DataFrame:
+        try:
+            demand = self._frame("demand_forecast")
+        except SQLAlchemyError as e:
+            logger.error(f"Database error accessing demand forecast: {e}")
+            raise DataValidationError(f"Failed to access demand forecast data: {e}")
+        
+        if demand.empty:
+            raise DataValidationError("No demand forecast data found in production tables. Cannot run optimization.")
+        return demand
+    
+    def _initial_inventory_frame(self) -> pd.DataFrame:
+        try:
+            return self._frame("initial_inventory")[INVENTORY_COLUMNS]
+        except SQLAlchemyError as e:
+            logger.error(f"Database error accessing initial inventory: {e}")
+            raise DataValidationError(f"Failed to access initial inventory data: {e}")
+    
+    def _safety_stock_frame(self) -> pd.DataFrame:
+        try:
+            return self._frame("safety_stock_policy")[SAFETY_STOCK_COLUMNS]
+        except SQLAlchemyError as e:
+            logger.error(f"Database error accessing safety stock policies: {e}")
+            raise DataValidationError(f"Failed to access safety stock policy data: {e}")
+    
     def get_plants(self) -> List[Dict[str, Any]]:
         """
         Get all plants from PRODUCTION tables only.
@@ -76,31 +151,9 @@ class DataAccessGuard:
         Raises:
             DataValidationError: If no plants found or data access fails
         """
-        try:
-            plants = self.db.query(PlantMaster).all()
-            
-            if not plants:
-                raise DataValidationError("No plants found in production tables. Cannot run optimization.")
-            
-            result = [
-                {
-                    "plant_id": p.plant_id,
-                    "plant_name": p.plant_name,
-                    "plant_type": p.plant_type,
-                    "latitude": p.latitude,
-                    "longitude": p.longitude,
-                    "region": p.region,
-                    "country": p.country
-                }
-                for p in plants
-            ]
-            
-            logger.info(f"Retrieved {len(result)} plants from production tables")
-            return result
-            
-        except SQLAlchemyError as e:
-            logger.error(f"Database error accessing plants: {e}")
-            raise DataValidationError(f"Failed to access plant data: {e}")
+        result = _records(self._plants_frame())
+        logger.info(f"Retrieved {len(result)} plants from production tables")
+        return result
     
     def get_production_capacity(self) -> List[Dict[str, Any]]:
         """
@@ -112,31 +165,9 @@ class DataAccessGuard:
         Raises:
             DataValidationError: If no capacity data found
         """
-        try:
-            capacity_data = self.db.query(ProductionCapacityCost).all()
-            
-            if not capacity_data:
-                raise DataValidationError("No production capacity data found in production tables. Cannot run optimization.")
-            
-            result = [
-                {
-                    "plant_id": c.plant_id,
-                    "period": c.period,
-                    "max_capacity_tonnes": c.max_capacity_tonnes,
-                    "variable_cost_per_tonne": c.variable_cost_per_tonne,
-                    "fixed_cost_per_period": c.fixed_cost_per_period,
-                    "min_run_level": c.min_run_level,
-                    "holding_cost_per_tonne": c.holding_cost_per_tonne
-                }
-                for c in capacity_data
-            ]
-            
-            logger.info(f"Retrieved {len(result)} production capacity records from production tables")
-            return result
-            
-        except SQLAlchemyError as e:
-            logger.error(f"Database error accessing production capacity: {e}")
-            raise DataValidationError(f"Failed to access production capacity data: {e}")
+        result = _records(self._production_capacity_frame())
+        logger.info(f"Retrieved {len(result)} production capacity records from production tables")
+        return result
     
     def get_transport_routes(self, active_only: bool = True) -> List[Dict[str, Any]]:
         """
@@ -151,39 +182,9 @@ class DataAccessGuard:
         Raises:
             DataValidationError: If no routes found
         """
-        try:
-            query = self.db.query(TransportRoutesModes)
-            if active_only:
-                query = query.filter(TransportRoutesModes.is_active == "Y")
-            
-            routes = query.all()
-            
-            if not routes:
-                raise DataValidationError("No transport routes found in production tables. Cannot run optimization.")
-            
-            result = [
-                {
-                    "origin_plant_id": r.origin_plant_id,
-                    "destination_node_id": r.destination_node_id,
-                    "transport_mode": r.transport_mode,
-                    "distance_km": r.distance_km,
-                    "cost_per_tonne": r.cost_per_tonne,
-                    "cost_per_tonne_km": r.cost_per_tonne_km,
-                    "fixed_cost_per_trip": r.fixed_cost_per_trip,
-                    "vehicle_capacity_tonnes": r.vehicle_capacity_tonnes,
-                    "min_batch_quantity_tonnes": r.min_batch_quantity_tonnes,
-                    "lead_time_days": r.lead_time_days,
-                    "is_active": r.is_active
-                }
-                for r in routes
-            ]
-            
-            logger.info(f"Retrieved {len(result)} transport routes from production tables")
-            return result
-            
-        except SQLAlchemyError as e:
-            logger.error(f"Database error accessing transport routes: {e}")
-            raise DataValidationError(f"Failed to access transport routes data: {e}")
+        result = _records(self._transport_routes_frame(active_only))
+        logger.info(f"Retrieved {len(result)} transport routes from production tables")
+        return result
     
     def get_demand_forecast(self) -> List[Dict[str, Any]]:
         """
@@ -195,31 +196,9 @@ class DataAccessGuard:
         Raises:
             DataValidationError: If no demand data found
         """
-        try:
-            demand_data = self.db.query(DemandForecast).all()
-            
-            if not demand_data:
-                raise DataValidationError("No demand forecast data found in production tables. Cannot run optimization.")
-            
-            result = [
-                {
-                    "customer_node_id": d.customer_node_id,
-                    "period": d.period,
-                    "demand_tonnes": d.demand_tonnes,
-                    "demand_low_tonnes": d.demand_low_tonnes,
-                    "demand_high_tonnes": d.demand_high_tonnes,
-                    "confidence_level": d.confidence_level,
-                    "source": d.source
-                }
-                for d in demand_data
-            ]
-            
-            logger.info(f"Retrieved {len(result)} demand forecast records from production tables")
-            return result
-            
-        except SQLAlchemyError as e:
-            logger.error(f"Database error accessing demand forecast: {e}")
-            raise DataValidationError(f"Failed to access demand forecast data: {e}")
+        result = _records(self._demand_forecast_frame())
+        logger.info(f"Retrieved {len(result)} demand forecast records from production tables")
+        return result
     
     def get_initial_inventory(self) -> List[Dict[str, Any]]:
         """
@@ -228,24 +207,9 @@ class DataAccessGuard:
         Returns:
             List of initial inventory dictionaries
         """
-        try:
-            inventory_data = self.db.query(InitialInventory).all()
-            
-            result = [
-                {
-                    "location_id": i.location_id,
-                    "initial_stock_tonnes": i.initial_stock_tonnes,
-                    "period": getattr(i, 'period', None)  # Handle optional period field
-                }
-                for i in inventory_data
-            ]
-            
-            logger.info(f"Retrieved {len(result)} initial inventory records from production tables")
-            return result
-            
-        except SQLAlchemyError as e:
-            logger.error(f"Database error accessing initial inventory: {e}")
-            raise DataValidationError(f"Failed to access initial inventory data: {e}")
+        result = _records(self._initial_inventory_frame())
+        logger.info(f"Retrieved {len(result)} initial inventory records from production tables")
+        return result
     
     def get_safety_stock_policies(self) -> List[Dict[str, Any]]:
         """
@@ -254,62 +218,58 @@ class DataAccessGuard:
         Returns:
             List of safety stock policy dictionaries
         """
-        try:
-            safety_stock_data = self.db.query(SafetyStockPolicy).all()
-            
-            result = [
-                {
-                    "location_id": s.location_id,
-                    "safety_stock_tonnes": s.safety_stock_tonnes,
-                    "penalty_cost_per_tonne": s.penalty_cost_per_tonne,
-                    "policy_type": getattr(s, 'policy_type', 'fixed'),  # Handle optional field
-                    "policy_value": getattr(s, 'policy_value', s.safety_stock_tonnes)  # Handle optional field
-                }
-                for s in safety_stock_data
-            ]
-            
-            logger.info(f"Retrieved {len(result)} safety stock policy records from production tables")
-            return result
-            
-        except SQLAlchemyError as e:
-            logger.error(f"Database error accessing safety stock policies: {e}")
-            raise DataValidationError(f"Failed to access safety stock policy data: {e}")
+        result = _records(self._safety_stock_frame())
+        logger.info(f"Retrieved {len(result)} safety stock policy records from production tables")
+        return result
     
-    def get_complete_optimization_dataset(self) -> Dict[str, Any]:
+    def get_optimization_frames(self) -> Dict[str, pd.DataFrame]:
         """
-        Get complete dataset for optimization from PRODUCTION tables only.
+        Get the complete optimization dataset as DataFrames.
         
-        This is the ONLY approved method for the optimizer to get data.
+        Same tables, columns and checks as get_complete_optimization_dataset,
+        without the round trip through lists of dicts. The frames are private
+        copies and may be modified.
         
-        Returns:
-            Complete dataset dictionary with all required data
-            
         Raises:
             DataValidationError: If any required data is missing
         """
         try:
             logger.info("Loading complete optimization dataset from production tables")
             
-            dataset = {
-                "plants": self.get_plants(),
-                "production_capacity": self.get_production_capacity(),
-                "transport_routes": self.get_transport_routes(),
-                "demand_forecast": self.get_demand_forecast(),
-                "initial_inventory": self.get_initial_inventory(),
-                "safety_stock_policies": self.get_safety_stock_policies()
+            frames = {
+                "plants": self._plants_frame(),
+                "production_capacity": self._production_capacity_frame(),
+                "transport_routes": self._transport_routes_frame(),
+                "demand_forecast": self._demand_forecast_frame(),
+                "initial_inventory": self._initial_inventory_frame(),
+                "safety_stock_policies": self._safety_stock_frame()
             }
             
             # Validate dataset completeness
-            self._validate_dataset_completeness(dataset)
+            self._validate_dataset_completeness(frames)
             
             logger.info("Successfully loaded complete optimization dataset from production tables")
-            return dataset
+            return {name: df.copy() for name, df in frames.items()}
             
         except Exception as e:
             logger.error(f"Failed to load complete optimization dataset: {e}")
             raise DataValidationError(f"Cannot load optimization dataset: {e}")
     
-    def _validate_dataset_completeness(self, dataset: Dict[str, Any]):
+    def get_complete_optimization_dataset(self) -> Dict[str, Any]:
+        """
+        Get complete dataset for optimization from PRODUCTION tables only.
+        
+        This is the ONLY approved method for the optimizer to get data.
+        
+        Returns:
+            Complete dataset dictionary with all required data
+            
+        Raises:
+            DataValidationError: If any required data is missing
+        """
+        return {name: _records(df) for name, df in self.get_optimization_frames().items()}
+    
+    def _validate_dataset_completeness(self, dataset: Dict[str, pd.DataFrame]):
         """
         Validate that the dataset is complete enough for optimization.
         
@@ -321,29 +281,29 @@ class DataAccessGuard:
         """
         errors = []
         
-        if not dataset["plants"]:
+        if dataset["plants"].empty:
             errors.append("No plants found")
         
-        if not dataset["production_capacity"]:
+        if dataset["production_capacity"].empty:
             errors.append("No production capacity data found")
         
-        if not dataset["transport_routes"]:
+        if dataset["transport_routes"].empty:
             errors.append("No transport routes found")
         
-        if not dataset["demand_forecast"]:
+        if dataset["demand_forecast"].empty:
             errors.append("No demand forecast data found")
         
         # Check referential integrity
-        plant_ids = {p["plant_id"] for p in dataset["plants"]}
+        plant_ids = set(dataset["plants"]["plant_id"])
         
         # Check that all production capacity references valid plants
-        capacity_plant_ids = {c["plant_id"] for c in dataset["production_capacity"]}
+        capacity_plant_ids = set(dataset["production_capacity"]["plant_id"])
         invalid_capacity_plants = capacity_plant_ids - plant_ids
         if invalid_capacity_plants:
             errors.append(f"Production capacity references invalid plants: {invalid_capacity_plants}")
         
         # Check that all transport routes reference valid plants
-        route_plant_ids = {r["origin_plant_id"] for r in dataset["transport_routes"]}
+        route_plant_ids = set(dataset["transport_routes"]["origin_plant_id"])
         invalid_route_plants = route_plant_ids - plant_ids
         if invalid_route_plants:
             errors.append(f"Transport routes reference invalid plants: {invalid_route_plants}")
@@ -385,7 +345,7 @@ class DataAccessGuard:
             pass
 
 
-def get_safe_optimization_data(db: Session) -> Dict[str, Any]:
+def get_safe_optimization_data(db: Session, snapshot: Optional[DataSnapshot] = None) -> Dict[str, Any]:
     """
     SAFE ENTRY POINT for optimization data access.
     
@@ -393,6 +353,25 @@ def get_safe_optimization_data(db: Session) -> Dict[str, Any]:
     
     Args:
         db: Database session
+        snapshot: Data snapshot of the current run, if one was loaded
+        
+    Returns:
+        Complete optimization dataset from production tables only
+        
+    Raises:
+        DataValidationError: If data access fails or data is incomplete
+    """
+    guard = DataAccessGuard(db, snapshot)
+    guard.validate_no_staging_access()
+    return guard.get_complete_optimization_dataset()
+
+def get_safe_optimization_frames(db: Session, snapshot: Optional[DataSnapshot] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Same as get_safe_optimization_data, with each table as a DataFrame.
+    
+    Args:
+        db: Database session
+        snapshot: Data snapshot of the current run, if one was loaded
         
     Returns:
         Complete optimization dataset from production tables only
@@ -400,6 +379,6 @@ def get_safe_optimization_data(db: Session) -> Dict[str, Any]:
     Raises:
         DataValidationError: If data access fails or data is incomplete
     """
-    guard = DataAccessGuard(db)
+    guard = DataAccessGuard(db, snapshot)
     guard.validate_no_staging_access()
-    return guard.get_complete_optimization_dataset()
\ No newline at end of file
+    return guard.get_optimization_frames()
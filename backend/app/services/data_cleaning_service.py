@@ -5,7 +5,7 @@ Implements comprehensive data cleaning and normalization before optimization.
 Ensures all data is in consistent format with proper units and data types.
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Tuple
 import pandas as pd
 import numpy as np
 import re
@@ -14,12 +14,103 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+NUMERIC_COLUMN_PATTERNS = (
+    'capacity', 'demand', 'cost', 'distance', 'inventory',
+    'stock', 'tonnes', 'km', 'price', 'rate'
+)
+NON_NEGATIVE_COLUMN_PATTERNS = ('capacity', 'demand', 'distance', 'inventory')
+
+# YYYY-MM, YYYY/MM and YYYYMM in one pattern
+PERIOD_PATTERN = r'^(?P<year>\d{4})[-/]?(?P<month>\d{2})$'
+MONTH_NUMBERS = {
+    'jan': '01', 'feb': '02', 'mar': '03', 'apr': '04',
+    'may': '05', 'jun': '06', 'jul': '07', 'aug': '08',
+    'sep': '09', 'oct': '10', 'nov': '11', 'dec': '12'
+}
+
+
+def _factorized(series: pd.Series, transform: Callable[[pd.Series], pd.Series]) -> Tuple[np.ndarray, pd.Series]:
+    """Codes of ``series`` and ``transform`` applied to its distinct values (missing values included)."""
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    return codes, transform(pd.Series(uniques, dtype=object))
+
+
+def map_unique(series: pd.Series, transform: Callable[[pd.Series], pd.Series]) -> pd.Series:
+    """
+    Apply a vectorized ``transform`` once per distinct value and map the result back.
+    
+    IDs, periods and labels repeat heavily, so this does the string work on a
+    few thousand values instead of every row.
+    """
+    codes, mapped = _factorized(series, transform)
+    result = mapped.take(codes)
+    result.index = series.index
+    return result.rename(series.name)
+
+
+def clean_string_values(values: pd.Series) -> pd.Series:
+    """Trim, collapse inner whitespace and blank out empty strings."""
+    values = values.astype(str).str.strip().str.replace(r'\s+', ' ', regex=True)
+    return values.replace('', np.nan).replace('nan', np.nan)
+
+
+def clean_id_values(values: pd.Series) -> pd.Series:
+    """Uppercase IDs and drop everything except letters, digits and underscores."""
+    return values.astype(str).str.upper().str.strip().str.replace(r'[^A-Z0-9_]', '', regex=True)
+
+
+def normalize_period(period: Any) -> Any:
+    """Normalize a single period value to YYYY-MM (unrecognized values are returned stripped)."""
+    if pd.isna(period):
+        return period
+    
+    period_str = str(period).strip()
+    
+    match = re.match(PERIOD_PATTERN, period_str)
+    if match:
+        return f"{match.group('year')}-{match.group('month')}"
+    
+    # Handle Mon YYYY format
+    for month_name, month_num in MONTH_NUMBERS.items():
+        if month_name in period_str.lower():
+            year_match = re.search(r'\d{4}', period_str)
+            if year_match:
+                return f"{year_match.group()}-{month_num}"
+    
+    # Default: return as-is
+    return period_str
+
+
+def normalize_period_values(values: pd.Series) -> pd.Series:
+    """Vectorized ``normalize_period``."""
+    missing = values.isna()
+    text = values.astype(str).str.strip()
+    result = text.astype(object)
+    
+    parts = text.str.extract(PERIOD_PATTERN)
+    numeric = parts["year"].notna() & ~missing
+    result[numeric] = parts["year"][numeric] + "-" + parts["month"][numeric]
+    
+    # Mon YYYY: the first month name found (in calendar order) wins
+    lowered = text.str.lower()
+    year = text.str.extract(r'(\d{4})', expand=False)
+    pending = ~numeric & ~missing & year.notna()
+    for month_name, month_num in MONTH_NUMBERS.items():
+        hit = pending & lowered.str.contains(month_name, regex=False)
+        result[hit] = year[hit] + "-" + month_num
+        pending &= ~hit
+    
+    result[missing] = values[missing]
+    return result
+
 
 class DataCleaner:
     """Comprehensive data cleaning service."""
     
-    def __init__(self):
+    def __init__(self, categorical_ids: bool = True):
         self.cleaning_log = []
+        # Return ID columns as pandas categoricals (values are unchanged)
+        self.categorical_ids = categorical_ids
         
     def clean_all_data(self, raw_data: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
         """Clean all data tables."""
@@ -83,43 +174,34 @@ class DataCleaner:
         """Clean string columns."""
         
         for col in df.select_dtypes(include=['object']).columns:
-            # Remove leading/trailing whitespace
-            df[col] = df[col].astype(str).str.strip()
-            
-            # Replace multiple spaces with single space
-            df[col] = df[col].str.replace(r'\s+', ' ', regex=True)
-            
-            # Handle empty strings
-            df[col] = df[col].replace('', np.nan)
-            df[col] = df[col].replace('nan', np.nan)
+            df[col] = map_unique(df[col], clean_string_values)
         
         return df
     
     def _clean_numeric_columns(self, df: pd.DataFrame) -> pd.DataFrame:
         """Clean numeric columns."""
         
-        numeric_patterns = [
-            'capacity', 'demand', 'cost', 'distance', 'inventory', 
-            'stock', 'tonnes', 'km', 'price', 'rate'
-        ]
-        
         for col in df.columns:
+            name = col.lower()
             # Check if column should be numeric
-            if any(pattern in col.lower() for pattern in numeric_patterns):
-                # Convert to numeric, handling errors
+            if not any(pattern in name for pattern in NUMERIC_COLUMN_PATTERNS):
+                continue
+            
+            # Convert to numeric, handling errors
+            if not pd.api.types.is_numeric_dtype(df[col]):
                 df[col] = pd.to_numeric(df[col], errors='coerce')
-                
-                # Handle negative values where they shouldn't exist
-                if any(pattern in col.lower() for pattern in ['capacity', 'demand', 'distance', 'inventory']):
-                    negative_count = (df[col] < 0).sum()
-                    if negative_count > 0:
-                        self.cleaning_log.append({
-                            "table": "unknown",
-                            "column": col,
-                            "transformation": "negative_values_set_to_zero",
-                            "count": negative_count
-                        })
-                        df[col] = df[col].clip(lower=0)
+            
+            # Handle negative values where they shouldn't exist
+            if any(pattern in name for pattern in NON_NEGATIVE_COLUMN_PATTERNS):
+                negative_count = (df[col] < 0).sum()
+                if negative_count > 0:
+                    self.cleaning_log.append({
+                        "table": "unknown",
+                        "column": col,
+                        "transformation": "negative_values_set_to_zero",
+                        "count": negative_count
+                    })
+                    df[col] = df[col].clip(lower=0)
         
         return df
     
@@ -129,12 +211,12 @@ class DataCleaner:
         id_columns = [col for col in df.columns if 'id' in col.lower()]
         
         for col in id_columns:
-            if col in df.columns:
-                # Convert to string and uppercase
-                df[col] = df[col].astype(str).str.upper().str.strip()
-                
-                # Remove special characters except underscore
-                df[col] = df[col].str.replace(r'[^A-Z0-9_]', '', regex=True)
+            codes, cleaned = _factorized(df[col], clean_id_values)
+            if self.categorical_ids:
+                category_codes, categories = pd.factorize(cleaned)
+                df[col] = pd.Categorical.from_codes(category_codes[codes], categories)
+            else:
+                df[col] = cleaned.take(codes).to_numpy()
         
         return df
     
@@ -312,43 +394,9 @@ class DataCleaner:
         return df
     
     def _standardize_period_format(self, period_series: pd.Series) -> pd.Series:
-        """Standardize period format to YYYY-MM."""
-        
-        def clean_period(period_str):
-            if pd.isna(period_str):
-                return period_str
-            
-            period_str = str(period_str).strip()
-            
-            # Handle YYYY-MM format
-            if re.match(r'^\d{4}-\d{2}$', period_str):
-                return period_str
-            
-            # Handle YYYY/MM format
-            if re.match(r'^\d{4}/\d{2}$', period_str):
-                return period_str.replace('/', '-')
-            
-            # Handle YYYYMM format
-            if re.match(r'^\d{6}$', period_str):
-                return f"{period_str[:4]}-{period_str[4:]}"
-            
-            # Handle Mon YYYY format
-            month_mapping = {
-                'jan': '01', 'feb': '02', 'mar': '03', 'apr': '04',
-                'may': '05', 'jun': '06', 'jul': '07', 'aug': '08',
-                'sep': '09', 'oct': '10', 'nov': '11', 'dec': '12'
-            }
-            
-            for month_name, month_num in month_mapping.items():
-                if month_name in period_str.lower():
-                    year_match = re.search(r'\d{4}', period_str)
-                    if year_match:
-                        return f"{year_match.group()}-{month_num}"
-            
-            # Default: return as-is
-            return period_str
+        """Standardize period format to YYYY-MM (once per distinct period)."""
         
-        return period_series.apply(clean_period)
+        return map_unique(period_series, normalize_period_values)
     
     def _remove_duplicates(self, df: pd.DataFrame, table_name: str) -> pd.DataFrame:
         """Remove duplicate records based on business keys."""
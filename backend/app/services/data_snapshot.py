@@ -0,0 +1,389 @@
+"""
+Snapshot of the optimization input tables.
+
+Validation, cleaning and model building each used to read the six input
+tables on their own, as full ORM objects turned into DataFrames row by row.
+:func:`load_snapshot` reads every table once with a projected Core
+``select()`` in chunks straight into typed DataFrames and tags each table with
+a content hash, so one run validates, cleans and models exactly the same data
+and later code can tell which tables changed between two snapshots.
+
+Frames are shared by everything holding the snapshot and must be treated as
+read-only; use :meth:`DataSnapshot.frame` for a private copy.
+
+:func:`refresh_snapshot` brings a snapshot up to date by reading only rows
+changed since its per-table watermark (``updated_at`` and highest key) and
+records which rows changed (:class:`TableChanges`), so validation and
+cleaning can re-process just those. ``snapshot_store`` keeps the latest
+snapshot per database for that purpose.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Float, Integer, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.models.demand_forecast import DemandForecast
+from app.db.models.initial_inventory import InitialInventory
+from app.db.models.plant_master import PlantMaster
+from app.db.models.production_capacity_cost import ProductionCapacityCost
+from app.db.models.safety_stock_policy import SafetyStockPolicy
+from app.db.models.transport_routes_modes import TransportRoutesModes
+from app.services.reference_data_cache import PLANT_COLUMNS, ROUTE_COLUMNS, reference_cache
+
+logger = logging.getLogger(__name__)
+
+# Snapshot name -> (model, projected columns). The names are the keys the
+# validation pipeline and the model builder already use.
+SNAPSHOT_TABLES: Dict[str, Tuple[Any, List[str]]] = {
+    "plants": (PlantMaster, PLANT_COLUMNS),
+    "production_capacity_cost": (ProductionCapacityCost, [
+        "plant_id", "period", "max_capacity_tonnes", "variable_cost_per_tonne", "fixed_cost_per_period",
+        "min_run_level", "holding_cost_per_tonne",
+    ]),
+    "transport_routes_modes": (TransportRoutesModes, ROUTE_COLUMNS),
+    "demand_forecast": (DemandForecast, [
+        "customer_node_id", "period", "demand_tonnes", "demand_low_tonnes", "demand_high_tonnes",
+        "confidence_level", "source",
+    ]),
+    "initial_inventory": (InitialInventory, [
+        "node_id", "period", "inventory_tonnes", "location_id", "initial_stock_tonnes",
+    ]),
+    "safety_stock_policy": (SafetyStockPolicy, [
+        "node_id", "policy_type", "policy_value", "safety_stock_tonnes", "max_inventory_tonnes", "location_id",
+        "penalty_cost_per_tonne",
+    ]),
+}
+
+
+def _content_hash(df: pd.DataFrame) -> str:
+    digest = hashlib.sha256("|".join(df.columns).encode())
+    if not df.empty:
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _no_tables() -> Mapping[str, Any]:
+    return MappingProxyType({})
+
+
+@dataclass(frozen=True)
+class TableChanges:
+    """Rows of one table that differ from the snapshot it was refreshed from."""
+
+    # Primary keys of inserted or updated rows
+    keys: pd.Index = field(default_factory=lambda: pd.Index([]))
+    # Base-snapshot versions of the updated rows, indexed by primary key
+    previous: Optional[pd.DataFrame] = None
+    # No usable base (first load, deleted rows, non-integer key): every row changed
+    full: bool = True
+
+    @property
+    def row_count(self) -> Optional[int]:
+        return None if self.full else len(self.keys)
+
+
+@dataclass(frozen=True)
+class DataSnapshot:
+    """Input tables read at one point in time, with a content hash per table."""
+
+    tables: Mapping[str, pd.DataFrame]
+    table_versions: Mapping[str, str]
+    loaded_at: datetime = field(default_factory=datetime.utcnow)
+    load_seconds: float = 0.0
+    # Primary key of every frame row, in frame order
+    row_keys: Mapping[str, pd.Index] = field(default_factory=_no_tables)
+    # (write version, row count, highest key, latest updated_at) when read
+    watermarks: Mapping[str, Tuple[Any, ...]] = field(default_factory=_no_tables)
+    # Table versions of the snapshot this one was refreshed from, and what changed since
+    base_versions: Mapping[str, str] = field(default_factory=_no_tables)
+    changes: Mapping[str, TableChanges] = field(default_factory=_no_tables)
+
+    @property
+    def version(self) -> str:
+        """Hash over every table version; equal snapshots have equal versions."""
+        digest = hashlib.sha256()
+        for name in sorted(self.table_versions):
+            digest.update(f"{name}:{self.table_versions[name]};".encode())
+        return digest.hexdigest()[:16]
+
+    def __getitem__(self, name: str) -> pd.DataFrame:
+        if name not in self.tables:
+            raise KeyError(f"Table '{name}' is not part of this snapshot")
+        return self.tables[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.tables
+
+    def frame(self, name: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Private copy of a table, optionally restricted to ``columns``."""
+        df = self[name]
+        return (df[list(columns)] if columns is not None else df).copy()
+
+    def frames(self) -> Dict[str, pd.DataFrame]:
+        """``{name: frame}`` of the shared (read-only) frames."""
+        return dict(self.tables)
+
+    def changed_tables(self, other: Optional["DataSnapshot"]) -> List[str]:
+        """Tables whose content differs from ``other`` (all of them if None)."""
+        if other is None:
+            return list(self.table_versions)
+        return [name for name, version in self.table_versions.items() if other.table_versions.get(name) != version]
+
+    def delta(self, name: str) -> Optional[TableChanges]:
+        """Row-level changes of ``name`` since ``base_versions``; None if every row must be treated as new."""
+        changes = self.changes.get(name)
+        if changes is None or changes.full or name not in self.base_versions:
+            return None
+        return changes
+
+    def keyed_rows(self, name: str, keys: Optional[pd.Index] = None) -> pd.DataFrame:
+        """Rows of ``name`` (all, or those with primary key in ``keys``) indexed by primary key."""
+        df, row_keys = self[name], self.row_keys[name]
+        if keys is None:
+            return df.set_axis(row_keys)
+        positions = row_keys.get_indexer(keys)
+        rows = df.iloc[positions[positions >= 0]]
+        return rows.set_axis(row_keys[positions[positions >= 0]])
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "table_versions": dict(self.table_versions),
+            "row_counts": {name: len(df) for name, df in self.tables.items()},
+            "changed_rows": {name: changes.row_count for name, changes in self.changes.items()},
+            "loaded_at": self.loaded_at.isoformat(),
+            "load_seconds": round(self.load_seconds, 6),
+        }
+
+
+def _resolve_names(tables: Optional[Iterable[str]]) -> List[str]:
+    names = list(tables) if tables is not None else list(SNAPSHOT_TABLES)
+    unknown = [name for name in names if name not in SNAPSHOT_TABLES]
+    if unknown:
+        raise ValueError(f"Unknown snapshot table(s): {', '.join(unknown)}")
+    return names
+
+
+def _read_table(db: Session, name: str, chunk_size: int, *where) -> Tuple[pd.DataFrame, pd.Index]:
+    """Rows of ``name`` (optionally filtered) in key order, and their primary keys."""
+    model, columns = SNAPSHOT_TABLES[name]
+    table = model.__table__
+    key = _key_column(table)
+    stmt = select(key, *[table.c[c] for c in columns]).where(*where).order_by(key)
+    result = db.execute(stmt.execution_options(yield_per=chunk_size))
+    chunks = [pd.DataFrame(partition, columns=["__key__", *columns]) for partition in result.partitions()]
+    df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=["__key__", *columns])
+    keys = pd.Index(df.pop("__key__"), name=key.name)
+    dtypes = {c: "float64" if isinstance(table.c[c].type, Float) else object for c in columns}
+    df = df.astype(dtypes)
+    # Missing values are None in every object column, whatever dtype a chunk was inferred as
+    objects = [c for c, dtype in dtypes.items() if dtype is object]
+    df[objects] = df[objects].astype(object).where(df[objects].notna(), None)
+    return df, keys
+
+
+def _key_column(table):
+    return list(table.primary_key.columns)[0]
+
+
+def _watermark(db: Session, table) -> Tuple[Any, ...]:
+    count, max_key, updated_at = db.execute(
+        select(func.count(), func.max(_key_column(table)), func.max(table.c.updated_at))
+    ).one()
+    return reference_cache.write_version(table.name), count, max_key, updated_at
+
+
+def load_snapshot(
+    db: Session, tables: Optional[Iterable[str]] = None, chunk_size: Optional[int] = None
+) -> DataSnapshot:
+    """Read ``tables`` (default: all input tables) into a :class:`DataSnapshot`.
+
+    Raises:
+        ValueError: If a table name is unknown
+    """
+    return refresh_snapshot(db, None, tables, chunk_size)
+
+
+def _merge_changes(
+    db: Session, name: str, base: DataSnapshot, watermark: Tuple[Any, ...], chunk_size: int
+) -> Optional[Tuple[pd.DataFrame, pd.Index, TableChanges]]:
+    """``name`` from ``base`` plus rows changed since its watermark; None if a full read is needed."""
+    table = SNAPSHOT_TABLES[name][0].__table__
+    key = _key_column(table)
+    base_watermark = base.watermarks.get(name)
+    if (
+        base_watermark is None or name not in base.tables
+        or not isinstance(key.type, Integer) or base_watermark[3] is None
+    ):
+        return None
+
+    # Re-read an overlap before the watermark: rows written by transactions
+    # that started earlier can carry an older updated_at
+    since = base_watermark[3] - timedelta(seconds=get_settings().SNAPSHOT_WATERMARK_OVERLAP_SECONDS)
+    delta, delta_keys = _read_table(
+        db, name, chunk_size, or_(table.c.updated_at >= since, table.c.updated_at.is_(None), key > base_watermark[2])
+    )
+
+    base_df, base_keys = base.tables[name], base.row_keys[name]
+    kept = ~base_keys.isin(delta_keys)
+    if kept.sum() + len(delta) != watermark[1]:
+        return None  # rows were deleted
+
+    merged_keys = base_keys[kept].append(delta_keys)
+    order = np.argsort(merged_keys.to_numpy(), kind="stable")
+    merged = pd.concat([base_df[kept], delta], ignore_index=True).iloc[order].reset_index(drop=True)
+    merged_keys = merged_keys[order]
+
+    # Only rows whose content differs count as changed
+    previous = base.keyed_rows(name, delta_keys)
+    current = delta.set_axis(delta_keys)
+    unchanged = pd.Series(False, index=delta_keys)
+    if not previous.empty:
+        row_hash = lambda df: pd.util.hash_pandas_object(df, index=True)
+        unchanged[previous.index] = row_hash(current.loc[previous.index]).to_numpy() == row_hash(previous).to_numpy()
+    changed_keys = delta_keys[~unchanged.to_numpy()]
+    changes = TableChanges(
+        keys=changed_keys, previous=previous.loc[previous.index.isin(changed_keys)], full=False
+    )
+    return merged, merged_keys, changes
+
+
+def refresh_snapshot(
+    db: Session,
+    base: Optional[DataSnapshot],
+    tables: Optional[Iterable[str]] = None,
+    chunk_size: Optional[int] = None,
+) -> DataSnapshot:
+    """Snapshot of ``tables`` built from ``base`` plus the rows changed since it was read.
+
+    Tables whose watermark did not move are reused as they are. Otherwise
+    rows with ``updated_at`` at or after the base watermark (less
+    ``SNAPSHOT_WATERMARK_OVERLAP_SECONDS``) or a higher key are read and
+    merged by primary key. Tables without an integer key, or that lost rows,
+    are read in full. With ``base=None`` this is a full load.
+
+    Raises:
+        ValueError: If a table name is unknown
+    """
+    names = _resolve_names(tables)
+    chunk_size = chunk_size or get_settings().SNAPSHOT_CHUNK_SIZE
+    start = time.monotonic()
+    frames, keys, watermarks, versions, changes = {}, {}, {}, {}, {}
+    for name in names:
+        table = SNAPSHOT_TABLES[name][0].__table__
+        watermarks[name] = _watermark(db, table)
+        if base is not None and base.watermarks.get(name) == watermarks[name] and name in base.tables:
+            frames[name], keys[name] = base.tables[name], base.row_keys[name]
+            versions[name] = base.table_versions[name]
+            changes[name] = TableChanges(previous=base.tables[name].iloc[:0], full=False)
+            continue
+
+        merged = _merge_changes(db, name, base, watermarks[name], chunk_size) if base is not None else None
+        if merged is None:
+            frames[name], keys[name] = _read_table(db, name, chunk_size)
+            changes[name] = TableChanges()
+        else:
+            frames[name], keys[name], changes[name] = merged
+        versions[name] = _content_hash(frames[name])
+
+    snapshot = DataSnapshot(
+        tables=MappingProxyType(frames),
+        table_versions=MappingProxyType(versions),
+        load_seconds=time.monotonic() - start,
+        row_keys=MappingProxyType(keys),
+        watermarks=MappingProxyType(watermarks),
+        base_versions=MappingProxyType(
+            {name: base.table_versions[name] for name in names if name in base.table_versions}
+            if base is not None else {}
+        ),
+        changes=MappingProxyType(changes),
+    )
+    logger.info(
+        f"{'Refreshed' if base is not None else 'Loaded'} data snapshot {snapshot.version} "
+        f"in {snapshot.load_seconds:.3f}s: "
+        + ", ".join(
+            f"{name}={len(df)}" + (f" ({changes[name].row_count} changed)" if base is not None else "")
+            for name, df in frames.items()
+        )
+    )
+    return snapshot
+
+
+class SnapshotStore:
+    """Latest snapshot per database, refreshed incrementally on each request.
+
+    A full re-read happens every ``SNAPSHOT_MAX_AGE_SECONDS`` as a bound on
+    writes that bypass ``updated_at``.
+    """
+
+    def __init__(self, max_age_seconds: Optional[float] = None):
+        self._max_age_seconds = max_age_seconds
+        self._latest: "weakref.WeakKeyDictionary[Any, Tuple[DataSnapshot, float]]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    @property
+    def max_age_seconds(self) -> float:
+        if self._max_age_seconds is not None:
+            return self._max_age_seconds
+        return get_settings().SNAPSHOT_MAX_AGE_SECONDS
+
+    def latest(self, db: Session) -> DataSnapshot:
+        bind = db.get_bind()
+        engine = getattr(bind, "engine", bind)
+        with self._lock:
+            previous, full_load_at = self._latest.get(engine, (None, 0.0))
+        max_age = self.max_age_seconds
+        if previous is not None and max_age and time.monotonic() - full_load_at >= max_age:
+            previous = None
+
+        snapshot = refresh_snapshot(db, previous)
+        with self._lock:
+            self._latest[engine] = (snapshot, full_load_at if previous is not None else time.monotonic())
+        return snapshot
+
+    def clear(self) -> None:
+        with self._lock:
+            self._latest.clear()
+
+
+snapshot_store = SnapshotStore()
+
+
+def latest_snapshot(db: Session) -> DataSnapshot:
+    """Current snapshot of all input tables, refreshed from the last one read in this process."""
+    return snapshot_store.latest(db)
+
+
+def table_fingerprints(db: Session, tables: Optional[Iterable[str]] = None) -> Dict[str, str]:
+    """Cheap data version per table, without reading the rows.
+
+    Row count, highest key and latest ``updated_at`` from one aggregate query
+    per table, plus the writes this process reported through
+    ``invalidate_reference_data``. Inserts, deletes and ORM updates move at
+    least one of them; unlike :attr:`DataSnapshot.table_versions` it says
+    nothing about content and only tells whether a table may have changed.
+    """
+    fingerprints = {}
+    for name in _resolve_names(tables):
+        write_version, count, max_key, updated_at = _watermark(db, SNAPSHOT_TABLES[name][0].__table__)
+        fingerprints[name] = f"{write_version}:{count}:{max_key}:{updated_at}"
+    return fingerprints
+
+
+def snapshot_table(db: Session, snapshot: Optional[DataSnapshot], name: str) -> pd.DataFrame:
+    """Table ``name`` from ``snapshot``, or freshly read when there is none."""
+    if snapshot is not None:
+        return snapshot[name]
+    return load_snapshot(db, [name])[name]
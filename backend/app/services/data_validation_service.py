@@ -9,18 +9,16 @@ Implements the 5-stage validation pipeline required before optimization:
 5. Missing data scan
 """
 
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from datetime import datetime
+import numpy as np
 import pandas as pd
 from sqlalchemy.orm import Session
 import logging
 
-from app.db.models.plant_master import PlantMaster
-from app.db.models.production_capacity_cost import ProductionCapacityCost
-from app.db.models.transport_routes_modes import TransportRoutesModes
-from app.db.models.demand_forecast import DemandForecast
-from app.db.models.initial_inventory import InitialInventory
-from app.db.models.safety_stock_policy import SafetyStockPolicy
+from app.services.data_snapshot import DataSnapshot, latest_snapshot, load_snapshot, table_fingerprints
+from app.services.validation_cache import validation_cache
+from app.services.validation.stage_executor import StageRun, run_stages
 from app.services.validation.validators import validate_referential_integrity
 from app.services.validation.rules import reject_negative_demand, reject_illegal_routes, enforce_unit_consistency
 from app.utils.exceptions import DataValidationError
@@ -37,13 +35,17 @@ class ValidationResult:
         status: str,  # PASS, WARN, FAIL
         errors: Optional[List[Dict[str, Any]]] = None,
         warnings: Optional[List[Dict[str, Any]]] = None,
-        row_level_errors: Optional[List[Dict[str, Any]]] = None
+        row_level_errors: Optional[List[Dict[str, Any]]] = None,
+        state: Optional[Dict[str, Any]] = None
     ):
         self.stage = stage
         self.status = status
         self.errors = errors or []
         self.warnings = warnings or []
         self.row_level_errors = row_level_errors or []
+        # Intermediate results keyed by row/business key, so the next run can
+        # update them from the rows that changed instead of starting over
+        self.state = state
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -58,99 +60,13 @@ class ValidationResult:
         }
 
 
-def _load_data_for_validation(db: Session) -> Dict[str, pd.DataFrame]:
-    """Load all data tables as DataFrames for validation."""
+def _load_data_for_validation(db: Session, snapshot: Optional[DataSnapshot] = None) -> Dict[str, pd.DataFrame]:
+    """Input tables as DataFrames for validation, from ``snapshot`` if given."""
     
     try:
-        # Plant master
-        plants_df = pd.DataFrame([
-            {
-                "plant_id": p.plant_id,
-                "plant_name": p.plant_name,
-                "plant_type": p.plant_type,
-                "latitude": p.latitude,
-                "longitude": p.longitude,
-                "region": p.region,
-                "country": p.country
-            }
-            for p in db.query(PlantMaster).all()
-        ])
-        
-        # Production capacity
-        production_df = pd.DataFrame([
-            {
-                "plant_id": r.plant_id,
-                "period": r.period,
-                "max_capacity_tonnes": r.max_capacity_tonnes,
-                "variable_cost_per_tonne": r.variable_cost_per_tonne,
-                "fixed_cost_per_period": r.fixed_cost_per_period,
-                "min_run_level": r.min_run_level
-            }
-            for r in db.query(ProductionCapacityCost).all()
-        ])
-        
-        # Transport routes
-        routes_df = pd.DataFrame([
-            {
-                "origin_plant_id": r.origin_plant_id,
-                "destination_node_id": r.destination_node_id,
-                "transport_mode": r.transport_mode,
-                "distance_km": r.distance_km,
-                "cost_per_tonne": r.cost_per_tonne,
-                "cost_per_tonne_km": r.cost_per_tonne_km,
-                "fixed_cost_per_trip": r.fixed_cost_per_trip,
-                "vehicle_capacity_tonnes": r.vehicle_capacity_tonnes,
-                "min_batch_quantity_tonnes": r.min_batch_quantity_tonnes,
-                "lead_time_days": r.lead_time_days,
-                "is_active": r.is_active
-            }
-            for r in db.query(TransportRoutesModes).all()
-        ])
-        
-        # Demand forecast
-        demand_df = pd.DataFrame([
-            {
-                "customer_node_id": d.customer_node_id,
-                "period": d.period,
-                "demand_tonnes": d.demand_tonnes,
-                "demand_low_tonnes": d.demand_low_tonnes,
-                "demand_high_tonnes": d.demand_high_tonnes,
-                "confidence_level": d.confidence_level,
-                "source": d.source
-            }
-            for d in db.query(DemandForecast).all()
-        ])
-        
-        # Initial inventory
-        inventory_df = pd.DataFrame([
-            {
-                "node_id": inv.node_id,
-                "period": inv.period,
-                "inventory_tonnes": inv.inventory_tonnes
-            }
-            for inv in db.query(InitialInventory).all()
-        ])
-        
-        # Safety stock policy
-        safety_stock_df = pd.DataFrame([
-            {
-                "node_id": s.node_id,
-                "policy_type": s.policy_type,
-                "policy_value": s.policy_value,
-                "safety_stock_tonnes": s.safety_stock_tonnes,
-                "max_inventory_tonnes": s.max_inventory_tonnes
-            }
-            for s in db.query(SafetyStockPolicy).all()
-        ])
-        
-        return {
-            "plants": plants_df,
-            "production_capacity_cost": production_df,
-            "transport_routes_modes": routes_df,
-            "demand_forecast": demand_df,
-            "initial_inventory": inventory_df,
-            "safety_stock_policy": safety_stock_df
-        }
+        if snapshot is None:
+            snapshot = load_snapshot(db)
+        return snapshot.frames()
         
     except Exception as e:
         logger.error(f"Error loading data for validation: {e}")
@@ -201,6 +117,8 @@ def _validate_stage1_schema(data: Dict[str, pd.DataFrame]) -> ValidationResult:
         if table_name in numeric_columns:
             for col in numeric_columns[table_name]:
                 if col in df.columns:
+                    if pd.api.types.is_numeric_dtype(df[col]):
+                        continue
                     non_numeric = df[col].apply(lambda x: x is not None and not isinstance(x, (int, float))).sum()
                     if non_numeric > 0:
                         warnings.append({
@@ -215,209 +133,285 @@ def _validate_stage1_schema(data: Dict[str, pd.DataFrame]) -> ValidationResult:
     return ValidationResult("schema_validation", status, errors, warnings)
 
 
-def _validate_stage2_business_rules(data: Dict[str, pd.DataFrame]) -> ValidationResult:
-    """Stage 2: Business rule validation."""
+VALID_TRANSPORT_MODES = {"road", "rail", "sea", "barge", "pipeline"}
+
+# Row-level business rules: (rule, table, severity, violation mask, finding details).
+# Each depends on its own row only, so after a refresh just the changed rows
+# are checked again.
+BUSINESS_ROW_RULES: List[Tuple[str, str, str, Callable[[pd.DataFrame], pd.Series], Callable[[pd.Series], Dict[str, Any]]]] = [
+    (
+        "no_negative_demand", "demand_forecast", "error",
+        lambda df: df["demand_tonnes"] < 0,
+        lambda row: {
+            "message": f"Negative demand: {row['demand_tonnes']} for customer {row['customer_node_id']}, period {row['period']}",
+            "customer_node_id": row["customer_node_id"],
+            "period": row["period"],
+            "value": float(row["demand_tonnes"])
+        },
+    ),
+    (
+        "positive_capacity", "production_capacity_cost", "error",
+        lambda df: df["max_capacity_tonnes"] <= 0,
+        lambda row: {
+            "message": f"Non-positive capacity: {row['max_capacity_tonnes']} for plant {row['plant_id']}, period {row['period']}",
+            "plant_id": row["plant_id"],
+            "period": row["period"],
+            "value": float(row["max_capacity_tonnes"])
+        },
+    ),
+    (
+        "valid_transport_mode", "transport_routes_modes", "warning",
+        lambda df: ~df["transport_mode"].str.lower().isin(VALID_TRANSPORT_MODES),
+        lambda row: {
+            "message": f"Unknown transport mode: {row['transport_mode']}",
+            "transport_mode": row["transport_mode"]
+        },
+    ),
+    (
+        "sbq_capacity_constraint", "transport_routes_modes", "error",
+        lambda df: (
+            df["min_batch_quantity_tonnes"].notna() & df["vehicle_capacity_tonnes"].notna()
+            & (df["min_batch_quantity_tonnes"] > df["vehicle_capacity_tonnes"])
+        ),
+        lambda row: {
+            "message": f"SBQ ({row['min_batch_quantity_tonnes']}) > vehicle capacity ({row['vehicle_capacity_tonnes']})",
+            "origin_plant_id": row["origin_plant_id"],
+            "destination_node_id": row["destination_node_id"],
+            "sbq": float(row["min_batch_quantity_tonnes"]),
+            "capacity": float(row["vehicle_capacity_tonnes"])
+        },
+    ),
+] + [
+    (
+        "positive_costs", table_name, "error",
+        lambda df, col=cost_col: df[col].notna() & (df[col] < 0) if col in df.columns else pd.Series(False, index=df.index),
+        lambda row, col=cost_col: {
+            "message": f"Negative cost: {row[col]} in column {col}",
+            "column": col,
+            "value": float(row[col])
+        },
+    )
+    for table_name, cost_col in [
+        ("production_capacity_cost", "variable_cost_per_tonne"),
+        ("transport_routes_modes", "cost_per_tonne"),
+        ("transport_routes_modes", "cost_per_tonne_km")
+    ]
+]
+
+# Tables whose business keys must be unique
+UNIQUE_KEY_RULES = [
+    ("demand_forecast", ["customer_node_id", "period"]),
+    ("production_capacity_cost", ["plant_id", "period"]),
+    ("initial_inventory", ["node_id", "period"])
+]
+
+
+def _keyed(data: Dict[str, pd.DataFrame], snapshot: Optional[DataSnapshot], table_name: str) -> pd.DataFrame:
+    """``table_name`` indexed by primary key (by position without a snapshot)."""
+    if snapshot is not None:
+        return snapshot.keyed_rows(table_name)
+    return data[table_name]
+
+
+def _delta(snapshot: Optional[DataSnapshot], previous: Optional["ValidationResult"], table_name: str):
+    """Changed rows of ``table_name`` if ``previous`` can be updated from them, else None."""
+    if snapshot is None or previous is None or previous.state is None:
+        return None
+    return snapshot.delta(table_name)
+
+
+def _key_groups(df: pd.DataFrame, key_cols: List[str]) -> set:
+    return set(df[key_cols].itertuples(index=False, name=None))
+
+
+def _duplicate_groups(df: pd.DataFrame, key_cols: List[str]) -> Dict[tuple, int]:
+    sizes = df.groupby(key_cols, dropna=False, sort=False).size()
+    return {key: int(size) for key, size in sizes[sizes > 1].items()}
+
+
+def _validate_stage2_business_rules(
+    data: Dict[str, pd.DataFrame],
+    snapshot: Optional[DataSnapshot] = None,
+    previous: Optional["ValidationResult"] = None
+) -> ValidationResult:
+    """Stage 2: Business rule validation.
+    
+    With the run's snapshot and the result for its base snapshot
+    (``previous``), only changed rows are re-checked and duplicate keys are
+    recounted only for the keys those rows had or have.
+    """
     
     errors = []
     warnings = []
     row_level_errors = []
+    state = {"rule_rows": {}, "duplicate_groups": {}}
     
     try:
-        # Rule 1: No negative demand
-        if not data["demand_forecast"].empty:
-            negative_demand = data["demand_forecast"][data["demand_forecast"]["demand_tonnes"] < 0]
-            for idx, row in negative_demand.iterrows():
-                row_level_errors.append({
-                    "table": "demand_forecast",
-                    "row_index": int(idx),
-                    "rule": "no_negative_demand",
-                    "message": f"Negative demand: {row['demand_tonnes']} for customer {row['customer_node_id']}, period {row['period']}",
-                    "customer_node_id": row["customer_node_id"],
-                    "period": row["period"],
-                    "value": float(row["demand_tonnes"])
-                })
-        
-        # Rule 2: Production capacity > 0
-        if not data["production_capacity_cost"].empty:
-            zero_capacity = data["production_capacity_cost"][data["production_capacity_cost"]["max_capacity_tonnes"] <= 0]
-            for idx, row in zero_capacity.iterrows():
-                row_level_errors.append({
-                    "table": "production_capacity_cost",
-                    "row_index": int(idx),
-                    "rule": "positive_capacity",
-                    "message": f"Non-positive capacity: {row['max_capacity_tonnes']} for plant {row['plant_id']}, period {row['period']}",
-                    "plant_id": row["plant_id"],
-                    "period": row["period"],
-                    "value": float(row["max_capacity_tonnes"])
-                })
-        
-        # Rule 3: Valid transport mode values
-        if not data["transport_routes_modes"].empty:
-            valid_modes = {"road", "rail", "sea", "barge", "pipeline"}
-            invalid_modes = data["transport_routes_modes"][
-                ~data["transport_routes_modes"]["transport_mode"].str.lower().isin(valid_modes)
-            ]
-            for idx, row in invalid_modes.iterrows():
-                warnings.append({
-                    "table": "transport_routes_modes",
-                    "row_index": int(idx),
-                    "rule": "valid_transport_mode",
-                    "message": f"Unknown transport mode: {row['transport_mode']}",
-                    "transport_mode": row["transport_mode"]
-                })
-        
-        # Rule 4: No duplicate keys per (node, period)
-        for table_name, key_cols in [
-            ("demand_forecast", ["customer_node_id", "period"]),
-            ("production_capacity_cost", ["plant_id", "period"]),
-            ("initial_inventory", ["node_id", "period"])
-        ]:
-            if table_name in data and not data[table_name].empty:
-                df = data[table_name]
-                duplicates = df[df.duplicated(subset=key_cols, keep=False)]
-                if not duplicates.empty:
-                    errors.append({
-                        "table": table_name,
-                        "type": "duplicate_keys",
-                        "message": f"Duplicate keys found in {table_name}",
-                        "count": len(duplicates),
-                        "key_columns": key_cols
-                    })
-        
-        # Rule 5: SBQ <= vehicle capacity
-        if not data["transport_routes_modes"].empty:
-            df = data["transport_routes_modes"]
-            invalid_sbq = df[
-                (df["min_batch_quantity_tonnes"].notna()) & 
-                (df["vehicle_capacity_tonnes"].notna()) &
-                (df["min_batch_quantity_tonnes"] > df["vehicle_capacity_tonnes"])
-            ]
-            for idx, row in invalid_sbq.iterrows():
-                row_level_errors.append({
-                    "table": "transport_routes_modes",
-                    "row_index": int(idx),
-                    "rule": "sbq_capacity_constraint",
-                    "message": f"SBQ ({row['min_batch_quantity_tonnes']}) > vehicle capacity ({row['vehicle_capacity_tonnes']})",
-                    "origin_plant_id": row["origin_plant_id"],
-                    "destination_node_id": row["destination_node_id"],
-                    "sbq": float(row["min_batch_quantity_tonnes"]),
-                    "capacity": float(row["vehicle_capacity_tonnes"])
+        # Row-level rules: violating rows by primary key
+        for rule_id, (rule, table_name, severity, violates, details) in enumerate(BUSINESS_ROW_RULES):
+            if table_name not in data or data[table_name].empty:
+                state["rule_rows"][rule_id] = pd.Index([])
+                continue
+            delta = _delta(snapshot, previous, table_name)
+            if delta is None:
+                df = _keyed(data, snapshot, table_name)
+                state["rule_rows"][rule_id] = df.index[violates(df).to_numpy()]
+            else:
+                kept = previous.state["rule_rows"][rule_id]
+                changed = snapshot.keyed_rows(table_name, delta.keys)
+                state["rule_rows"][rule_id] = kept[~kept.isin(delta.keys)].append(
+                    changed.index[violates(changed).to_numpy()]
+                )
+            
+            # Report rows in table order
+            row_keys = snapshot.row_keys[table_name] if snapshot is not None else data[table_name].index
+            positions = np.sort(row_keys.get_indexer(state["rule_rows"][rule_id]))
+            findings = warnings if severity == "warning" else row_level_errors
+            for position, (_, row) in zip(positions, data[table_name].iloc[positions].iterrows()):
+                findings.append({"table": table_name, "row_index": int(position), "rule": rule, **details(row)})
+        
+        # Duplicate keys per (node, period)
+        for table_name, key_cols in UNIQUE_KEY_RULES:
+            if table_name not in data or data[table_name].empty:
+                continue
+            df = data[table_name]
+            delta = _delta(snapshot, previous, table_name)
+            if delta is None:
+                groups = _duplicate_groups(df, key_cols)
+            else:
+                # Recount only the keys changed rows had before or have now
+                affected = _key_groups(snapshot.keyed_rows(table_name, delta.keys), key_cols)
+                affected |= _key_groups(delta.previous, key_cols)
+                groups = {
+                    key: size for key, size in previous.state["duplicate_groups"].get(table_name, {}).items()
+                    if key not in affected
+                }
+                if affected:
+                    rows = df[df[key_cols[0]].isin({key[0] for key in affected})]
+                    rows = rows[pd.MultiIndex.from_frame(rows[key_cols]).isin(list(affected))]
+                    groups.update(_duplicate_groups(rows, key_cols))
+            state["duplicate_groups"][table_name] = groups
+            
+            if groups:
+                errors.append({
+                    "table": table_name,
+                    "type": "duplicate_keys",
+                    "message": f"Duplicate keys found in {table_name}",
+                    "count": sum(groups.values()),
+                    "key_columns": key_cols
                 })
         
-        # Rule 6: Costs must be positive
-        cost_checks = [
-            ("production_capacity_cost", "variable_cost_per_tonne"),
-            ("transport_routes_modes", "cost_per_tonne"),
-            ("transport_routes_modes", "cost_per_tonne_km")
-        ]
-        
-        for table_name, cost_col in cost_checks:
-            if table_name in data and not data[table_name].empty:
-                df = data[table_name]
-                if cost_col in df.columns:
-                    negative_costs = df[(df[cost_col].notna()) & (df[cost_col] < 0)]
-                    for idx, row in negative_costs.iterrows():
-                        row_level_errors.append({
-                            "table": table_name,
-                            "row_index": int(idx),
-                            "rule": "positive_costs",
-                            "message": f"Negative cost: {row[cost_col]} in column {cost_col}",
-                            "column": cost_col,
-                            "value": float(row[cost_col])
-                        })
-        
     except Exception as e:
+        state = None
         errors.append({
             "type": "validation_error",
             "message": f"Business rule validation failed: {str(e)}"
         })
     
     status = "FAIL" if errors or row_level_errors else ("WARN" if warnings else "PASS")
-    return ValidationResult("business_rules", status, errors, warnings, row_level_errors)
+    return ValidationResult("business_rules", status, errors, warnings, row_level_errors, state)
+
+
+# Referential checks: (table, column, tables/columns the values must exist in, severity)
+REFERENCE_CHECKS = [
+    ("production_capacity_cost", "plant_id", (("plants", "plant_id"),), "error"),
+    ("transport_routes_modes", "origin_plant_id", (("plants", "plant_id"),), "error"),
+    ("transport_routes_modes", "destination_node_id",
+     (("plants", "plant_id"), ("demand_forecast", "customer_node_id")), "warning"),
+    ("initial_inventory", "node_id", (("plants", "plant_id"), ("demand_forecast", "customer_node_id")), "warning"),
+    ("safety_stock_policy", "node_id", (("plants", "plant_id"), ("demand_forecast", "customer_node_id")), "warning"),
+]
+
 
+def _missing_references(
+    data: Dict[str, pd.DataFrame], table_name: str, column: str, targets, candidates: Optional[pd.Index] = None
+) -> set:
+    """Values of ``table_name.column`` (restricted to ``candidates``) found in none of ``targets``."""
+    values = data[table_name][column].dropna()
+    if candidates is not None:
+        values = values[values.isin(candidates)]
+    referenced = pd.Index(values.unique())
+    present = np.zeros(len(referenced), dtype=bool)
+    for target_table, target_column in targets:
+        if not data[target_table].empty:
+            present |= referenced.isin(data[target_table][target_column])
+    return set(referenced[~present])
 
-def _validate_stage3_referential_integrity(db: Session, data: Dict[str, pd.DataFrame]) -> ValidationResult:
-    """Stage 3: Referential integrity checks."""
+
+def _validate_stage3_referential_integrity(
+    db: Session,
+    data: Dict[str, pd.DataFrame],
+    snapshot: Optional[DataSnapshot] = None,
+    previous: Optional["ValidationResult"] = None
+) -> ValidationResult:
+    """Stage 3: Referential integrity checks.
+    
+    With the run's snapshot and the result for its base snapshot
+    (``previous``), each check is re-evaluated only for the key values that
+    changed rows had or have, plus the values missing before.
+    """
     
     errors = []
     warnings = []
+    state = {"missing": {}}
     
     try:
-        # Check plant_id references in production_capacity_cost
-        if not data["production_capacity_cost"].empty:
-            prod_plant_ids = set(data["production_capacity_cost"]["plant_id"].unique())
-            existing_plant_ids = set(data["plants"]["plant_id"].unique()) if not data["plants"].empty else set()
-            missing_plants = prod_plant_ids - existing_plant_ids
+        for check_id, (table_name, column, targets, severity) in enumerate(REFERENCE_CHECKS):
+            if data[table_name].empty:
+                continue
             
-            if missing_plants:
-                errors.append({
-                    "type": "foreign_key_violation",
-                    "table": "production_capacity_cost",
-                    "column": "plant_id",
-                    "message": f"plant_id not found in plant_master: {', '.join(sorted(missing_plants))}",
-                    "missing_values": sorted(list(missing_plants))
-                })
-        
-        # Check origin_plant_id references in transport_routes_modes
-        if not data["transport_routes_modes"].empty:
-            route_plant_ids = set(data["transport_routes_modes"]["origin_plant_id"].unique())
-            existing_plant_ids = set(data["plants"]["plant_id"].unique()) if not data["plants"].empty else set()
-            missing_origins = route_plant_ids - existing_plant_ids
+            involved = [(table_name, column), *targets]
+            deltas = [_delta(snapshot, previous, t) for t, _ in involved]
+            if any(delta is None for delta in deltas):
+                missing = _missing_references(data, table_name, column, targets)
+            else:
+                affected = set(previous.state["missing"].get(check_id, set()))
+                for (t, c), delta in zip(involved, deltas):
+                    affected.update(snapshot.keyed_rows(t, delta.keys)[c].dropna())
+                    affected.update(delta.previous[c].dropna())
+                missing = {key for key in previous.state["missing"].get(check_id, set()) if key not in affected}
+                if affected:
+                    missing |= _missing_references(data, table_name, column, targets, pd.Index(list(affected)))
+            state["missing"][check_id] = missing
             
-            if missing_origins:
+            # Node checks only apply once some plants/customers are known
+            if not missing or (severity == "warning" and all(data[t].empty for t, _ in targets)):
+                continue
+            missing_values = sorted(missing)
+            if severity == "error":
                 errors.append({
                     "type": "foreign_key_violation",
-                    "table": "transport_routes_modes",
-                    "column": "origin_plant_id",
-                    "message": f"origin_plant_id not found in plant_master: {', '.join(sorted(missing_origins))}",
-                    "missing_values": sorted(list(missing_origins))
+                    "table": table_name,
+                    "column": column,
+                    "message": f"{column} not found in plant_master: {', '.join(missing_values)}",
+                    "missing_values": missing_values
+                })
+            elif column == "destination_node_id":
+                warnings.append({
+                    "type": "unknown_destination",
+                    "table": table_name,
+                    "column": column,
+                    "message": f"destination_node_id not found in known plants/customers: {', '.join(missing_values)}",
+                    "missing_values": missing_values
+                })
+            else:
+                warnings.append({
+                    "type": "unknown_node",
+                    "table": table_name,
+                    "column": column,
+                    "message": f"{column} not found in known plants/customers: {', '.join(missing_values)}",
+                    "missing_values": missing_values
                 })
-        
-        # Check destination_node_id references (should be plants or customers)
-        if not data["transport_routes_modes"].empty:
-            dest_node_ids = set(data["transport_routes_modes"]["destination_node_id"].unique())
-            plant_ids = set(data["plants"]["plant_id"].unique()) if not data["plants"].empty else set()
-            customer_ids = set(data["demand_forecast"]["customer_node_id"].unique()) if not data["demand_forecast"].empty else set()
-            known_nodes = plant_ids | customer_ids
-            
-            if known_nodes:  # Only check if we have reference data
-                missing_destinations = dest_node_ids - known_nodes
-                if missing_destinations:
-                    warnings.append({
-                        "type": "unknown_destination",
-                        "table": "transport_routes_modes",
-                        "column": "destination_node_id",
-                        "message": f"destination_node_id not found in known plants/customers: {', '.join(sorted(missing_destinations))}",
-                        "missing_values": sorted(list(missing_destinations))
-                    })
-        
-        # Check node_id references in inventory and safety stock
-        for table_name, node_col in [("initial_inventory", "node_id"), ("safety_stock_policy", "node_id")]:
-            if table_name in data and not data[table_name].empty:
-                node_ids = set(data[table_name][node_col].unique())
-                plant_ids = set(data["plants"]["plant_id"].unique()) if not data["plants"].empty else set()
-                customer_ids = set(data["demand_forecast"]["customer_node_id"].unique()) if not data["demand_forecast"].empty else set()
-                known_nodes = plant_ids | customer_ids
-                
-                if known_nodes:  # Only check if we have reference data
-                    missing_nodes = node_ids - known_nodes
-                    if missing_nodes:
-                        warnings.append({
-                            "type": "unknown_node",
-                            "table": table_name,
-                            "column": node_col,
-                            "message": f"{node_col} not found in known plants/customers: {', '.join(sorted(missing_nodes))}",
-                            "missing_values": sorted(list(missing_nodes))
-                        })
         
     except Exception as e:
+        state = None
         errors.append({
             "type": "validation_error",
             "message": f"Referential integrity validation failed: {str(e)}"
         })
     
     status = "FAIL" if errors else ("WARN" if warnings else "PASS")
-    return ValidationResult("referential_integrity", status, errors, warnings)
+    return ValidationResult("referential_integrity", status, errors, warnings, state=state)
 
 
 def _validate_stage4_unit_consistency(data: Dict[str, pd.DataFrame]) -> ValidationResult:
@@ -583,10 +577,56 @@ def _validate_stage5_missing_data(data: Dict[str, pd.DataFrame]) -> ValidationRe
     return ValidationResult("missing_data_scan", status, errors, warnings)
 
 
-def run_comprehensive_validation(db: Session) -> Dict[str, Any]:
+# Stage name -> (check, snapshot tables it reads). A cached stage result is
+# reused while all of its tables keep their content hash. Checks are called as
+# ``check(db, data, snapshot, previous)``; ``previous`` is the stage's result
+# at the snapshot's base versions (if cached), which business rules and
+# referential integrity update from the changed rows only. Stages run
+# concurrently, so a check must only read its inputs and not use the session.
+StageCheck = Callable[[Session, Dict[str, pd.DataFrame], Optional[DataSnapshot], Optional[ValidationResult]], ValidationResult]
+
+VALIDATION_STAGES: Dict[str, Tuple[StageCheck, Tuple[str, ...]]] = {
+    "schema_validation": (
+        lambda db, data, snapshot, previous: _validate_stage1_schema(data),
+        ("plants", "production_capacity_cost", "transport_routes_modes", "demand_forecast",
+         "initial_inventory", "safety_stock_policy"),
+    ),
+    "business_rules": (
+        lambda db, data, snapshot, previous: _validate_stage2_business_rules(data, snapshot, previous),
+        ("production_capacity_cost", "transport_routes_modes", "demand_forecast", "initial_inventory"),
+    ),
+    "referential_integrity": (
+        _validate_stage3_referential_integrity,
+        ("plants", "production_capacity_cost", "transport_routes_modes", "demand_forecast",
+         "initial_inventory", "safety_stock_policy"),
+    ),
+    "unit_consistency": (
+        lambda db, data, snapshot, previous: _validate_stage4_unit_consistency(data),
+        ("production_capacity_cost", "transport_routes_modes", "demand_forecast"),
+    ),
+    "missing_data_scan": (
+        lambda db, data, snapshot, previous: _validate_stage5_missing_data(data),
+        ("plants", "production_capacity_cost", "transport_routes_modes", "demand_forecast"),
+    ),
+}
+
+
+def run_comprehensive_validation(
+    db: Session, snapshot: Optional[DataSnapshot] = None, use_cache: bool = True
+) -> Dict[str, Any]:
     """
     Run the complete 5-stage validation pipeline.
     
+    Args:
+        db: Database session
+        snapshot: Input data to validate; the latest snapshot of ``db`` if
+            omitted. Pass the run's snapshot so the data validated is the data
+            optimized.
+        use_cache: Reuse results for unchanged data. Without a snapshot the
+            last report is returned as long as the table fingerprints match;
+            otherwise only the stages reading a changed table are re-run, and
+            those that can update the previous result from the changed rows.
+    
     Returns:
         Dict containing:
         - stages: List of ValidationResult dicts
@@ -594,20 +634,55 @@ def run_comprehensive_validation(db: Session) -> Dict[str, Any]:
         - optimization_ready: bool
         - summary: Aggregated counts
         - error_report_csv: CSV-formatted error report
+        - data_version: Version hash of the validated snapshot
+        - cache: Whether the report was cached and which stages were re-run
+        - timing: Seconds per re-run stage and wall time of the stage run
     """
     
     try:
-        # Load data
-        data = _load_data_for_validation(db)
-        
-        # Run all validation stages
-        stages = [
-            _validate_stage1_schema(data),
-            _validate_stage2_business_rules(data),
-            _validate_stage3_referential_integrity(db, data),
-            _validate_stage4_unit_consistency(data),
-            _validate_stage5_missing_data(data)
-        ]
+        fingerprints = None
+        if snapshot is None and use_cache:
+            fingerprints = table_fingerprints(db)
+            cached = validation_cache.get_report(fingerprints)
+            if cached is not None:
+                logger.info(f"Validation report for data version {cached['data_version']} served from cache")
+                return {**cached, "cache": {
+                    "report_hit": True, "stages_run": [], "stages_reused": list(VALIDATION_STAGES),
+                    "stages_incremental": [], "changed_rows": {},
+                }, "timing": StageRun().timing()}
+        
+        # Load data, refreshing the previous snapshot from the changed rows
+        if snapshot is None:
+            snapshot = latest_snapshot(db) if use_cache else load_snapshot(db)
+        data = _load_data_for_validation(db, snapshot)
+        
+        # Run the validation stages whose tables changed since the cached
+        # result; they only read the snapshot, so they run concurrently
+        cached_stages = {}
+        pending = {}
+        for name, (check, tables) in VALIDATION_STAGES.items():
+            versions = tuple(snapshot.table_versions[t] for t in tables)
+            result = validation_cache.get_stage(name, versions) if use_cache else None
+            if result is not None:
+                cached_stages[name] = result
+                continue
+            # The last result can be updated if it was built at the base of this snapshot
+            last = validation_cache.last_stage(name) if use_cache else None
+            base_versions = tuple(snapshot.base_versions.get(t) for t in tables)
+            previous = last[1] if last is not None and last[0] == base_versions else None
+            pending[name] = (check, versions, previous)
+        
+        run = run_stages({
+            name: (lambda check=check, previous=previous: check(db, data, snapshot, previous))
+            for name, (check, _, previous) in pending.items()
+        })
+        stages_run = list(pending)
+        stages_incremental = []
+        for name, (_, versions, previous) in pending.items():
+            validation_cache.store_stage(name, versions, run.results[name])
+            if previous is not None and previous.state is not None:
+                stages_incremental.append(name)
+        stages = [cached_stages[name] if name in cached_stages else run.results[name] for name in VALIDATION_STAGES]
         
         # Convert to dicts
         stage_results = [stage.to_dict() for stage in stages]
@@ -669,7 +744,7 @@ def run_comprehensive_validation(db: Session) -> Dict[str, Any]:
         else:
             error_report_csv = "stage,type,table,column,row_index,message,severity\n"
         
-        return {
+        report = {
             "stages": stage_results,
             "overall_status": overall_status,
             "optimization_ready": optimization_ready,
@@ -682,8 +757,20 @@ def run_comprehensive_validation(db: Session) -> Dict[str, Any]:
                 "total_warnings": total_warnings
             },
             "error_report_csv": error_report_csv,
+            "data_version": snapshot.version,
             "timestamp": datetime.utcnow().isoformat()
         }
+        if fingerprints is not None:
+            validation_cache.store_report(fingerprints, report)
+        
+        logger.info(f"Validated data version {snapshot.version}; re-ran stages: {', '.join(stages_run) or 'none'}")
+        return {**report, "cache": {
+            "report_hit": False,
+            "stages_run": stages_run,
+            "stages_reused": [name for name in VALIDATION_STAGES if name not in stages_run],
+            "stages_incremental": stages_incremental,
+            "changed_rows": snapshot.summary()["changed_rows"],
+        }, "timing": run.timing()}
         
     except Exception as e:
         logger.error(f"Comprehensive validation failed: {e}")
@@ -1,49 +1,37 @@
-from typing import Optional, Dict, Any
-from sqlalchemy.orm import Session
-
-from app.db.base import Base
-from app.db.session import engine
-from sqlalchemy import Column, String, Float, DateTime, Text
-from datetime import datetime, timedelta
+"""
+Route cache helpers keyed by origin and destination.
 
+Routes used to be cached here in a table of their own (``route_cache``).
+There is a single routing cache now, ``routing_cache.route_cache``: an
+in-memory LRU in front of transport_lookup. These helpers read and write it
+for driving routes.
+"""
 
-class RouteCache(Base):
-    __tablename__ = "route_cache"
-    id = Column(String, primary_key=True)  # e.g., "origin;destination"
-    distance_km = Column(Float)
-    duration_seconds = Column(Float)
-    provider = Column(String)
-    raw_response = Column(Text)  # optional full JSON for debugging
-    created_at = Column(DateTime, server_default="now()")
-    expires_at = Column(DateTime)
-
+from typing import Optional, Dict, Any
+from sqlalchemy.orm import Session
 
-Base.metadata.create_all(bind=engine)
+from app.services.routing_cache import route_cache, store_routes
 
 
 def get_cached_route(origin: str, destination: str, db: Session) -> Optional[Dict[str, Any]]:
     """Return cached route if not expired."""
-    cache_key = f"{origin};{destination}"
-    record = db.query(RouteCache).filter(RouteCache.id == cache_key).filter(RouteCache.expires_at > datetime.utcnow()).first()
-    if record:
+    route = route_cache.get(db, (origin, destination, "driving"))
+    if route and route.is_fresh:
         return {
-            "distance_km": record.distance_km,
-            "duration_seconds": record.duration_seconds,
-            "provider": record.provider,
+            "distance_km": route.distance_km,
+            "duration_seconds": route.duration_minutes * 60.0,
+            "provider": route.source,
         }
     return None
 
 
-def cache_route(origin: str, destination: str, distance_km: float, duration_seconds: float, provider: str, db: Session, ttl_hours: int = 24):
-    """Cache a route result with TTL."""
-    cache_key = f"{origin};{destination}"
-    expires = datetime.utcnow() + timedelta(hours=ttl_hours)
-    record = RouteCache(
-        id=cache_key,
-        distance_km=distance_km,
-        duration_seconds=duration_seconds,
-        provider=provider,
-        expires_at=expires,
-    )
-    db.merge(record)  # upsert
-    db.commit()
+def cache_route(origin: str, destination: str, distance_km: float, duration_seconds: float, provider: str, db: Session):
+    """Cache a route result; it expires after ROUTE_CACHE_MAX_AGE_DAYS."""
+    store_routes(db, [{
+        "origin_plant_id": origin,
+        "destination_node_id": destination,
+        "transport_mode": "driving",
+        "distance_km": distance_km,
+        "duration_minutes": duration_seconds / 60.0,
+        "source": provider,
+    }])
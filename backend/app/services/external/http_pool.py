@@ -0,0 +1,147 @@
+"""
+Shared HTTP clients for the routing providers.
+
+One ``httpx.AsyncClient`` per provider stays open for the life of the
+process (closed on application shutdown), so lookups reuse keep-alive
+connections instead of paying a TCP/TLS handshake per request; HTTP/2 is
+used when the optional ``h2`` package is installed. Every request passes the
+provider's limits: a semaphore bounds the requests in flight and a token
+bucket their rate, so bulk callers can ``asyncio.gather`` hundreds of lookups
+without overrunning a provider.
+
+Clients and limits belong to the event loop that created them: every loop
+(each ``asyncio.run`` in a script, test or worker thread) gets its own.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProviderLimits:
+    """Requests in flight and request rate (per second, 0 = unlimited) for one provider."""
+
+    max_concurrency: int
+    requests_per_second: float
+    burst: int = 1
+
+
+def provider_limits(provider: str) -> ProviderLimits:
+    rates = {"osrm": settings.OSRM_REQUESTS_PER_SECOND, "ors": settings.ORS_REQUESTS_PER_SECOND}
+    return ProviderLimits(
+        max_concurrency=settings.ROUTING_MAX_CONCURRENCY,
+        requests_per_second=rates.get(provider, 0.0),
+        burst=settings.ROUTING_RATE_BURST,
+    )
+
+
+class TokenBucket:
+    """Up to ``rate`` acquisitions per second, in bursts of at most ``burst``."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        # Waiters queue on the lock, so tokens go out in arrival order
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            while True:
+                now = loop.time()
+                if self._updated is not None:
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+class _ProviderClient:
+    def __init__(self, limits: ProviderLimits, transport: Optional[httpx.AsyncBaseTransport]):
+        self.client = httpx.AsyncClient(
+            http2=settings.ROUTING_HTTP2 and _http2_available(),
+            limits=httpx.Limits(
+                max_connections=settings.ROUTING_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.ROUTING_MAX_CONNECTIONS,
+                keepalive_expiry=settings.ROUTING_KEEPALIVE_SECONDS,
+            ),
+            timeout=settings.ROUTING_TIMEOUT_SECONDS,
+            transport=transport,
+        )
+        self.semaphore = asyncio.Semaphore(max(1, limits.max_concurrency))
+        self.bucket = TokenBucket(limits.requests_per_second, limits.burst)
+
+
+class RoutingHttpPool:
+    """Per-provider clients with concurrency and rate limits.
+
+    Args:
+        limits: Limits per provider name; ``provider_limits`` (the settings)
+            for providers not listed
+        transport: httpx transport for all clients (tests use a mock one)
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, ProviderLimits]] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self._limits = limits or {}
+        self._transport = transport
+        self._lock = threading.Lock()
+        self._by_loop: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, _ProviderClient]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _provider(self, provider: str) -> _ProviderClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._by_loop.setdefault(loop, {})
+            if provider not in clients:
+                limits = self._limits.get(provider) or provider_limits(provider)
+                clients[provider] = _ProviderClient(limits, self._transport)
+                logger.debug(f"Opened {provider} routing client ({limits})")
+            return clients[provider]
+
+    def client(self, provider: str) -> httpx.AsyncClient:
+        """The keep-alive client of ``provider`` (without the limits) on the running loop."""
+        return self._provider(provider).client
+
+    async def request(self, provider: str, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request through ``provider``'s client, within its limits."""
+        entry = self._provider(provider)
+        async with entry.semaphore:
+            await entry.bucket.acquire()
+            return await entry.client.request(method, url, **kwargs)
+
+    async def aclose(self) -> None:
+        """Close the clients of the running loop."""
+        with self._lock:
+            clients = self._by_loop.pop(asyncio.get_running_loop(), {})
+        for entry in clients.values():
+            await entry.client.aclose()
+
+
+routing_http = RoutingHttpPool()
@@ -0,0 +1,241 @@
+"""
+Distance-matrix client for OSRM ``/table`` and ORS ``/matrix``.
+
+``get_route_osrm``/``get_route_ors`` fetch one origin-destination pair per
+HTTP round trip, so filling a plant x node matrix costs one request per
+cell. The matrix endpoints return distance and duration for many sources x
+destinations at once. Larger matrices are split into blocks that respect
+the provider's limits (``OSRM_TABLE_MAX_LOCATIONS`` coordinates per OSRM
+request, ``ORS_MATRIX_MAX_ROUTES`` cells per ORS request), one request per
+block, with the same retry and exponential backoff as the route clients.
+Blocks are requested concurrently through the shared routing clients
+(``http_pool``), whose per-provider limits pace them.
+
+Coordinates are (latitude, longitude) tuples, as everywhere else; both
+providers take longitude first on the wire.
+"""
+
+import asyncio
+import logging
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+import numpy as np
+
+from app.core.config import get_settings
+from app.services.external.http_pool import routing_http
+from app.utils.exceptions import ExternalAPIError
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+Coordinates = Tuple[float, float]
+
+# OSRM codes that a retry cannot fix
+OSRM_PERMANENT_ERRORS = ("InvalidInput", "InvalidOptions", "InvalidQuery", "InvalidUrl", "TooBig", "NoTable")
+
+
+@dataclass
+class RouteMatrix:
+    """Distances (m) and durations (s), sources x destinations.
+
+    Cells are NaN where the provider found no route, or where the request for
+    their block failed (``failed`` is True there).
+    """
+
+    distance_m: np.ndarray
+    duration_s: np.ndarray
+    failed: np.ndarray
+    provider: str
+    requests: int = 0
+
+    @classmethod
+    def empty(cls, n_sources: int, n_destinations: int, provider: str) -> "RouteMatrix":
+        shape = (n_sources, n_destinations)
+        return cls(np.full(shape, np.nan), np.full(shape, np.nan), np.zeros(shape, dtype=bool), provider)
+
+
+def matrix_blocks(
+    n_sources: int,
+    n_destinations: int,
+    max_locations: Optional[int] = None,
+    max_routes: Optional[int] = None,
+) -> List[Tuple[slice, slice]]:
+    """(source slice, destination slice) blocks covering the matrix.
+
+    The larger side of the block is halved until a block has at most
+    ``max_locations`` coordinates (sources + destinations) and at most
+    ``max_routes`` cells.
+    """
+    if not n_sources or not n_destinations:
+        return []
+
+    def too_big(s: int, d: int) -> bool:
+        return bool((max_locations and s + d > max_locations) or (max_routes and s * d > max_routes))
+
+    s, d = n_sources, n_destinations
+    while too_big(s, d) and (s, d) != (1, 1):
+        if s >= d:
+            s = math.ceil(s / 2)
+        else:
+            d = math.ceil(d / 2)
+    return [
+        (slice(i, min(i + s, n_sources)), slice(j, min(j + d, n_destinations)))
+        for i in range(0, n_sources, s)
+        for j in range(0, n_destinations, d)
+    ]
+
+
+def _validate(points: Sequence[Coordinates]) -> None:
+    for lat, lng in points:
+        if not ((-90 <= lat <= 90) and (-180 <= lng <= 180)):
+            raise ExternalAPIError(f"Invalid coordinates: {(lat, lng)}")
+
+
+def _as_array(rows: Optional[List[List[Optional[float]]]], shape: Tuple[int, int]) -> np.ndarray:
+    if rows is None:
+        return np.full(shape, np.nan)
+    # Unreachable cells come back as null
+    return np.array([[np.nan if value is None else value for value in row] for row in rows], dtype=float).reshape(shape)
+
+
+async def _request_with_retries(
+    provider: str,
+    send: Callable[[], Awaitable[httpx.Response]],
+    retry_statuses: Tuple[int, ...] = (),
+) -> Optional[Dict[str, Any]]:
+    """JSON body of ``send()``, retried with exponential backoff; None if it fails.
+
+    Timeouts, transport errors and 5xx responses (and ``retry_statuses``)
+    are retried; other 4xx responses are not.
+    """
+    for attempt in range(settings.ROUTING_MAX_RETRIES):
+        last_attempt = attempt == settings.ROUTING_MAX_RETRIES - 1
+        try:
+            start_time = datetime.now()
+            response = await send()
+            response.raise_for_status()
+            elapsed_ms = (datetime.now() - start_time).total_seconds() * 1000
+            logger.debug(f"{provider} matrix request took {elapsed_ms:.0f}ms (attempt {attempt + 1})")
+            return response.json()
+
+        except httpx.TimeoutException:
+            logger.warning(f"{provider} matrix timeout on attempt {attempt + 1}/{settings.ROUTING_MAX_RETRIES}")
+
+        except httpx.HTTPStatusError as e:
+            status = e.response.status_code
+            logger.warning(f"{provider} matrix HTTP error {status} on attempt {attempt + 1}/{settings.ROUTING_MAX_RETRIES}")
+            if 400 <= status < 500 and status not in retry_statuses:
+                logger.error(f"{provider} matrix client error {status}: {e.response.text}")
+                return None
+
+        except httpx.RequestError as e:
+            logger.warning(f"{provider} matrix request error on attempt {attempt + 1}/{settings.ROUTING_MAX_RETRIES}: {e}")
+
+        if last_attempt:
+            break
+        delay = settings.ROUTING_RETRY_DELAY * (settings.ROUTING_RETRY_BACKOFF ** attempt)
+        logger.debug(f"{provider} matrix retry delay: {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+    logger.error(f"{provider} matrix request failed after {settings.ROUTING_MAX_RETRIES} attempts")
+    return None
+
+
+async def _osrm_block(
+    sources: Sequence[Coordinates], destinations: Sequence[Coordinates]
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    coordinates = ";".join(f"{lng},{lat}" for lat, lng in [*sources, *destinations])
+    url = f"{settings.OSRM_BASE_URL}/table/v1/driving/{coordinates}"
+    params = {
+        "sources": ";".join(str(i) for i in range(len(sources))),
+        "destinations": ";".join(str(len(sources) + j) for j in range(len(destinations))),
+        "annotations": "distance,duration",
+    }
+    data = await _request_with_retries(
+        "OSRM",
+        lambda: routing_http.request("osrm", "GET", url, params=params, timeout=settings.ROUTING_TIMEOUT_SECONDS),
+    )
+    if data is None:
+        return None
+    if data.get("code") != "Ok":
+        message = data.get("message", "Unknown OSRM error")
+        if data.get("code") in OSRM_PERMANENT_ERRORS:
+            logger.error(f"OSRM table error {data.get('code')}: {message}")
+        else:
+            logger.warning(f"OSRM table error: {message}")
+        return None
+    shape = (len(sources), len(destinations))
+    return _as_array(data.get("distances"), shape), _as_array(data.get("durations"), shape)
+
+
+async def _ors_block(
+    sources: Sequence[Coordinates], destinations: Sequence[Coordinates]
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    url = f"{settings.ORS_BASE_URL}/v2/matrix/driving-car"
+    headers = {
+        "Authorization": f"Bearer {settings.ORS_API_KEY}",
+        "Content-Type": "application/json"
+    }
+    payload = {
+        "locations": [[lng, lat] for lat, lng in [*sources, *destinations]],
+        "sources": list(range(len(sources))),
+        "destinations": [len(sources) + j for j in range(len(destinations))],
+        "metrics": ["distance", "duration"],
+        "units": "m",
+    }
+    # Rate limits (429) are worth waiting for
+    data = await _request_with_retries(
+        "ORS",
+        lambda: routing_http.request(
+            "ors", "POST", url, headers=headers, json=payload, timeout=settings.ROUTING_TIMEOUT_SECONDS,
+        ),
+        retry_statuses=(429,),
+    )
+    if data is None:
+        return None
+    shape = (len(sources), len(destinations))
+    return _as_array(data.get("distances"), shape), _as_array(data.get("durations"), shape)
+
+
+async def _get_matrix(
+    provider: str,
+    fetch_block,
+    blocks: List[Tuple[slice, slice]],
+    sources: Sequence[Coordinates],
+    destinations: Sequence[Coordinates],
+) -> RouteMatrix:
+    _validate(sources)
+    _validate(destinations)
+    matrix = RouteMatrix.empty(len(sources), len(destinations), provider)
+    fetched = await asyncio.gather(*(fetch_block(sources[rows], destinations[columns]) for rows, columns in blocks))
+    for (rows, columns), block in zip(blocks, fetched):
+        matrix.requests += 1
+        if block is None:
+            matrix.failed[rows, columns] = True
+            continue
+        matrix.distance_m[rows, columns], matrix.duration_s[rows, columns] = block
+    logger.info(f"{provider} matrix {len(sources)}x{len(destinations)}: {matrix.requests} requests, "
+                f"{int(matrix.failed.sum())} cells failed")
+    return matrix
+
+
+async def get_matrix_osrm(sources: Sequence[Coordinates], destinations: Sequence[Coordinates]) -> RouteMatrix:
+    """OSRM ``/table`` distances and durations, sources x destinations."""
+    blocks = matrix_blocks(len(sources), len(destinations), max_locations=settings.OSRM_TABLE_MAX_LOCATIONS)
+    return await _get_matrix("osrm", _osrm_block, blocks, list(sources), list(destinations))
+
+
+async def get_matrix_ors(sources: Sequence[Coordinates], destinations: Sequence[Coordinates]) -> RouteMatrix:
+    """ORS ``/v2/matrix`` distances and durations, sources x destinations.
+
+    Raises:
+        ExternalAPIError: If ORS_API_KEY is not configured
+    """
+    if not settings.ORS_API_KEY:
+        raise ExternalAPIError("ORS_API_KEY not configured")
+    blocks = matrix_blocks(len(sources), len(destinations), max_routes=settings.ORS_MATRIX_MAX_ROUTES)
+    return await _get_matrix("ors", _ors_block, blocks, list(sources), list(destinations))
@@ -7,6 +7,7 @@ This module provides a robust ORS client that:
 3. Has proper timeout handling
 4. Provides structured error logging
 5. Handles API failures gracefully
+6. Reuses pooled keep-alive connections within per-provider limits (http_pool)
 
 NO MORE SILENT FAILURES!
 """
@@ -18,6 +19,7 @@ from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
 
 from app.core.config import get_settings
+from app.services.external.http_pool import routing_http
 from app.utils.exceptions import ExternalAPIError
 
 settings = get_settings()
@@ -70,42 +72,43 @@ async def get_route_ors(origin_coords: Tuple[float, float], dest_coords: Tuple[f
         try:
             logger.debug(f"ORS attempt {attempt + 1}/{settings.ROUTING_MAX_RETRIES}: {url}")
             
-            async with httpx.AsyncClient() as client:
-                start_time = datetime.now()
-                
-                response = await client.post(
-                    url,
-                    headers=headers,
-                    json=payload,
-                    timeout=settings.ROUTING_TIMEOUT_SECONDS
-                )
-                
-                elapsed_ms = (datetime.now() - start_time).total_seconds() * 1000
-                
-                response.raise_for_status()
-                data = response.json()
-                
-                # Check ORS response structure
-                routes = data.get("routes", [])
-                if not routes:
-                    logger.warning(f"ORS returned no routes for {origin_coords} -> {dest_coords}")
-                    return None
-                
-                route = routes[0]
-                summary = route.get("summary", {})
-                distance_m = summary.get("distance", 0)
-                duration_s = summary.get("duration", 0)
-                
-                logger.info(f"ORS success: {distance_m/1000:.1f}km, {duration_s/60:.1f}min ({elapsed_ms:.0f}ms)")
-                
-                return {
-                    "distance_m": distance_m,
-                    "duration_s": duration_s,
-                    "provider": "ors",
-                    "response_time_ms": elapsed_ms,
-                    "attempt": attempt + 1
-                }
-                
+            start_time = datetime.now()
+            
+            response = await routing_http.request(
+                "ors",
+                "POST",
+                url,
+                headers=headers,
+                json=payload,
+                timeout=settings.ROUTING_TIMEOUT_SECONDS
+            )
+            
+            elapsed_ms = (datetime.now() - start_time).total_seconds() * 1000
+            
+            response.raise_for_status()
+            data = response.json()
+            
+            # Check ORS response structure
+            routes = data.get("routes", [])
+            if not routes:
+                logger.warning(f"ORS returned no routes for {origin_coords} -> {dest_coords}")
+                return None
+            
+            route = routes[0]
+            summary = route.get("summary", {})
+            distance_m = summary.get("distance", 0)
+            duration_s = summary.get("duration", 0)
+            
+            logger.info(f"ORS success: {distance_m/1000:.1f}km, {duration_s/60:.1f}min ({elapsed_ms:.0f}ms)")
+            
+            return {
+                "distance_m": distance_m,
+                "duration_s": duration_s,
+                "provider": "ors",
+                "response_time_ms": elapsed_ms,
+                "attempt": attempt + 1
+            }
+            
         except httpx.TimeoutException:
             logger.warning(f"ORS timeout on attempt {attempt + 1}/{settings.ROUTING_MAX_RETRIES}")
             if attempt == settings.ROUTING_MAX_RETRIES - 1:
@@ -7,6 +7,7 @@ This module provides a robust OSRM client that:
 3. Has proper timeout handling
 4. Provides structured error logging
 5. Handles API failures gracefully
+6. Reuses pooled keep-alive connections within per-provider limits (http_pool)
 
 NO MORE SILENT FAILURES!
 """
@@ -18,6 +19,7 @@ from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
 
 from app.core.config import get_settings
+from app.services.external.http_pool import routing_http
 from app.utils.exceptions import ExternalAPIError
 
 settings = get_settings()
@@ -61,52 +63,53 @@ async def get_route_osrm(origin_coords: Tuple[float, float], dest_coords: Tuple[
         try:
             logger.debug(f"OSRM attempt {attempt + 1}/{settings.ROUTING_MAX_RETRIES}: {url}")
             
-            async with httpx.AsyncClient() as client:
-                start_time = datetime.now()
-                
-                response = await client.get(
-                    url, 
-                    params=params, 
-                    timeout=settings.ROUTING_TIMEOUT_SECONDS
-                )
-                
-                elapsed_ms = (datetime.now() - start_time).total_seconds() * 1000
-                
-                response.raise_for_status()
-                data = response.json()
-                
-                # Check OSRM response structure
-                if data.get("code") != "Ok":
-                    error_msg = data.get("message", "Unknown OSRM error")
-                    logger.warning(f"OSRM API error: {error_msg}")
-                    
-                    # Don't retry for certain errors
-                    if data.get("code") in ["NoRoute", "InvalidInput"]:
-                        logger.error(f"OSRM permanent error for route {origin_coords} -> {dest_coords}: {error_msg}")
-                        return None
-                    
-                    # Retry for other errors
-                    raise ExternalAPIError(f"OSRM API error: {error_msg}")
+            start_time = datetime.now()
+            
+            response = await routing_http.request(
+                "osrm",
+                "GET",
+                url, 
+                params=params, 
+                timeout=settings.ROUTING_TIMEOUT_SECONDS
+            )
+            
+            elapsed_ms = (datetime.now() - start_time).total_seconds() * 1000
+            
+            response.raise_for_status()
+            data = response.json()
+            
+            # Check OSRM response structure
+            if data.get("code") != "Ok":
+                error_msg = data.get("message", "Unknown OSRM error")
+                logger.warning(f"OSRM API error: {error_msg}")
                 
-                routes = data.get("routes", [])
-                if not routes:
-                    logger.warning(f"OSRM returned no routes for {origin_coords} -> {dest_coords}")
+                # Don't retry for certain errors
+                if data.get("code") in ["NoRoute", "InvalidInput"]:
+                    logger.error(f"OSRM permanent error for route {origin_coords} -> {dest_coords}: {error_msg}")
                     return None
                 
-                route = routes[0]
-                distance_m = route.get("distance", 0)
-                duration_s = route.get("duration", 0)
-                
-                logger.info(f"OSRM success: {distance_m/1000:.1f}km, {duration_s/60:.1f}min ({elapsed_ms:.0f}ms)")
-                
-                return {
-                    "distance_m": distance_m,
-                    "duration_s": duration_s,
-                    "provider": "osrm",
-                    "response_time_ms": elapsed_ms,
-                    "attempt": attempt + 1
-                }
-                
+                # Retry for other errors
+                raise ExternalAPIError(f"OSRM API error: {error_msg}")
+            
+            routes = data.get("routes", [])
+            if not routes:
+                logger.warning(f"OSRM returned no routes for {origin_coords} -> {dest_coords}")
+                return None
+            
+            route = routes[0]
+            distance_m = route.get("distance", 0)
+            duration_s = route.get("duration", 0)
+            
+            logger.info(f"OSRM success: {distance_m/1000:.1f}km, {duration_s/60:.1f}min ({elapsed_ms:.0f}ms)")
+            
+            return {
+                "distance_m": distance_m,
+                "duration_s": duration_s,
+                "provider": "osrm",
+                "response_time_ms": elapsed_ms,
+                "attempt": attempt + 1
+            }
+            
         except httpx.TimeoutException:
             logger.warning(f"OSRM timeout on attempt {attempt + 1}/{settings.ROUTING_MAX_RETRIES}")
             if attempt == settings.ROUTING_MAX_RETRIES - 1:
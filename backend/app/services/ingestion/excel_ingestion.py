@@ -4,13 +4,23 @@ from fastapi import UploadFile
 from sqlalchemy.orm import Session
 
 from app.utils.exceptions import DataValidationError
+from app.services.ingestion.excel_streaming import (
+    STREAMING_EXCEL_EXTENSIONS,
+    iter_sheet_frames,
+    sheet_names,
+    workbook_source,
+)
 from app.services.ingestion.tabular_ingestion import ingest_dataframe
 
+# Rows per chunk when streaming the first sheet of an .xlsx upload
+EXCEL_CHUNK_SIZE = 50000
+
 
 async def ingest_excel(file: UploadFile, db: Session, table_name: Optional[str] = None) -> Dict[str, Any]:
     """Ingest an Excel file into the appropriate logical table.
 
-    Reads the uploaded Excel file into a pandas DataFrame and delegates to the
+    Reads the first sheet of the uploaded Excel file into a pandas DataFrame
+    (streamed in openpyxl read-only mode for .xlsx) and delegates to the
     generic tabular ingestion pipeline.
     """
     fname = file.filename.lower()
@@ -18,8 +28,13 @@ async def ingest_excel(file: UploadFile, db: Session, table_name: Optional[str]
         raise DataValidationError("Only Excel files (.xlsx/.xls) are supported")
 
     try:
-        contents = await file.read()
-        df = pd.read_excel(pd.io.common.BytesIO(contents))
+        if fname.endswith(STREAMING_EXCEL_EXTENSIONS):
+            source = workbook_source(file.file)
+            chunks = list(iter_sheet_frames(source, sheet_names(source)[0], EXCEL_CHUNK_SIZE))
+            df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+        else:
+            contents = await file.read()
+            df = pd.read_excel(pd.io.common.BytesIO(contents))
     except Exception as e:
         raise DataValidationError(f"Failed to read Excel: {e}")
 
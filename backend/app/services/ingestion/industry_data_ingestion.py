@@ -1,5 +1,8 @@
+import os
+from urllib.parse import urlparse
+
 import httpx
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from sqlalchemy.orm import Session
 
 from app.utils.exceptions import ExternalAPIError
@@ -23,19 +26,25 @@ async def fetch_iea_cement_data() -> List[Dict[str, Any]]:
     return []
 
 
-async def ingest_company_reports(file_urls: List[str]) -> List[Dict[str, Any]]:
+async def ingest_company_reports(file_urls: List[str], download_dir: Optional[str] = None) -> List[Dict[str, Any]]:
     """
-    Ingest company annual/quarterly reports from provided URLs.
-    For now, returns stubs; later would download and parse PDFs.
+    Download company annual/quarterly reports from provided URLs.
+    With ``download_dir`` each report is saved there and its ``path`` returned,
+    ready for ``pdf_ingestion.stage_pdf_tables``.
     """
     results = []
     async with httpx.AsyncClient() as client:
-        for url in file_urls:
+        for index, url in enumerate(file_urls):
             try:
                 resp = await client.get(url)
                 resp.raise_for_status()
-                # TODO: parse PDF/HTML and extract capacity/demand data
-                results.append({"url": url, "status": "downloaded"})
+                result = {"url": url, "status": "downloaded"}
+                if download_dir:
+                    name = os.path.basename(urlparse(url).path) or "report"
+                    result["path"] = os.path.join(download_dir, f"{index}-{name}")
+                    with open(result["path"], "wb") as f:
+                        f.write(resp.content)
+                results.append(result)
             except httpx.HTTPError as e:
                 results.append({"url": url, "status": "failed", "error": str(e)})
     return results
@@ -1,35 +1,315 @@
-import pdfplumber
+"""
+Page-parallel PDF table extraction into the staging pipeline.
+
+Company reports run to hundreds of pages and ``pdfplumber`` table extraction
+is CPU-bound pure Python, so pages are split into small ranges that a process
+pool extracts concurrently, across pages and across files. Results come back
+as ranges complete, and every table that matches a staging table (by its
+required columns) is written as its own staging batch right away rather than
+after the whole document.
+
+Extracted tables are cached on disk per (file SHA-256, page):
+
+    <PDF_PAGE_CACHE_DIR>/<sha[:2]>/<sha>/pages.json          page count
+    <PDF_PAGE_CACHE_DIR>/<sha[:2]>/<sha>/page-<n>.json       tables of page n
+
+so re-ingesting the same report reads no PDF at all. ``pdfplumber`` is only
+imported to extract pages that are not cached.
+"""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
 import pandas as pd
-from typing import List, Dict, Any
 from fastapi import UploadFile
 from sqlalchemy.orm import Session
 
+from app.core.config import get_settings
+from app.services.ingestion.staging_ingestion import (
+    TABLE_DETECTION_CONFIG,
+    normalize_column_names,
+    stage_frames,
+)
+from app.services.ingestion.upload_fingerprint import file_sha256
 from app.utils.exceptions import DataValidationError
 
+logger = logging.getLogger(__name__)
+
+# One extracted table: rows of cell strings (None for empty cells)
+RawTable = List[List[Optional[str]]]
+
+
+class PdfPageCache:
+    """Extracted tables per (file hash, page) as JSON files under ``root``."""
+
+    def __init__(self, root: Optional[str] = None):
+        self._root = root
+
+    @property
+    def root(self) -> str:
+        return self._root or get_settings().PDF_PAGE_CACHE_DIR
+
+    def _dir(self, file_hash: str) -> str:
+        return os.path.join(self.root, file_hash[:2], file_hash)
+
+    def _read(self, path: str) -> Any:
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, path: str, value: Any) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write-then-rename so concurrent readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
+
+    def page_count(self, file_hash: str) -> Optional[int]:
+        meta = self._read(os.path.join(self._dir(file_hash), "pages.json"))
+        return meta.get("page_count") if isinstance(meta, dict) else None
+
+    def store_page_count(self, file_hash: str, page_count: int) -> None:
+        self._write(os.path.join(self._dir(file_hash), "pages.json"), {"page_count": page_count})
+
+    def get(self, file_hash: str, page: int) -> Optional[List[RawTable]]:
+        return self._read(os.path.join(self._dir(file_hash), f"page-{page}.json"))
+
+    def put(self, file_hash: str, page: int, tables: List[RawTable]) -> None:
+        self._write(os.path.join(self._dir(file_hash), f"page-{page}.json"), tables)
+
+    def clear(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+pdf_page_cache = PdfPageCache()
+
+
+@dataclass
+class PdfPage:
+    """Tables extracted from one page (1-based) of one file."""
+
+    path: str
+    file_hash: str
+    page: int
+    tables: List[RawTable] = field(default_factory=list)
+    cached: bool = False
+    error: Optional[str] = None
+
+
+def is_pdf_file(path: str) -> bool:
+    """True if the file at ``path`` starts with the PDF signature, whatever its name."""
+    try:
+        with open(path, "rb") as f:
+            # The signature may follow a little leading junk (allowed within the first 1 KiB)
+            return b"%PDF-" in f.read(1024)
+    except OSError:
+        return False
+
+
+def _page_count(path: str) -> int:
+    import pdfplumber
+
+    with pdfplumber.open(path) as pdf:
+        return len(pdf.pages)
+
+
+def _extract_page_range(path: str, pages: Sequence[int]) -> List[Tuple[int, List[RawTable]]]:
+    """Worker: tables of ``pages`` (1-based) of the PDF at ``path``."""
+    import pdfplumber
+
+    with pdfplumber.open(path) as pdf:
+        return [(page, pdf.pages[page - 1].extract_tables() or []) for page in pages]
+
+
+def iter_pdf_pages(
+    paths: Sequence[str],
+    max_workers: Optional[int] = None,
+    pages_per_task: Optional[int] = None,
+    cache: Optional[PdfPageCache] = None,
+) -> Iterator[PdfPage]:
+    """Pages of every PDF in ``paths``, in completion order.
+
+    Cached pages are yielded first; the others are extracted in ranges of
+    ``pages_per_task`` by a pool of ``max_workers`` processes (both from the
+    settings by default, one worker or less extracts in-process) and cached.
+    A range that fails yields one page with ``error`` set and no tables.
+    """
+    settings = get_settings()
+    cache = cache or pdf_page_cache
+    workers = max_workers if max_workers is not None else settings.PDF_EXTRACT_WORKERS
+    pages_per_task = max(1, pages_per_task or settings.PDF_PAGES_PER_TASK)
+
+    tasks: List[Tuple[str, str, List[int]]] = []
+    for path in paths:
+        with open(path, "rb") as f:
+            file_hash = file_sha256(f)
+        page_count = cache.page_count(file_hash)
+        if page_count is None:
+            try:
+                page_count = _page_count(path)
+            except Exception as e:
+                yield PdfPage(path, file_hash, 0, error=f"Failed to read PDF: {e}")
+                continue
+            cache.store_page_count(file_hash, page_count)
+
+        missing = []
+        for page in range(1, page_count + 1):
+            tables = cache.get(file_hash, page)
+            if tables is None:
+                missing.append(page)
+            else:
+                yield PdfPage(path, file_hash, page, tables, cached=True)
+        tasks += [(path, file_hash, missing[i:i + pages_per_task]) for i in range(0, len(missing), pages_per_task)]
+
+    def completed(path: str, file_hash: str, pages: List[int], extract) -> Iterator[PdfPage]:
+        try:
+            extracted = extract()
+        except Exception as e:
+            logger.error(f"Extracting pages {pages[0]}-{pages[-1]} of {path} failed: {e}")
+            yield PdfPage(path, file_hash, pages[0], error=f"Failed to read pages {pages[0]}-{pages[-1]}: {e}")
+            return
+        for page, tables in extracted:
+            cache.put(file_hash, page, tables)
+            yield PdfPage(path, file_hash, page, tables)
+
+    if workers <= 1 or len(tasks) <= 1:
+        for path, file_hash, pages in tasks:
+            yield from completed(path, file_hash, pages, lambda: _extract_page_range(path, pages))
+        return
+
+    # Spawned workers: forking a process that runs server threads is unsafe
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=get_context("spawn")) as pool:
+        futures = {pool.submit(_extract_page_range, path, pages): (path, file_hash, pages)
+                   for path, file_hash, pages in tasks}
+        for future in as_completed(futures):
+            path, file_hash, pages = futures[future]
+            yield from completed(path, file_hash, pages, future.result)
+
+
+def _table_frame(table: RawTable) -> Optional[pd.DataFrame]:
+    """An extracted table as a DataFrame with its first row as header."""
+    if len(table) < 2 or not any(table[0]):
+        return None
+    columns = [str(name).strip() if name else f"column_{i}" for i, name in enumerate(table[0])]
+    rows = [row + [None] * (len(columns) - len(row)) if len(row) < len(columns) else row[:len(columns)]
+            for row in table[1:]]
+    return pd.DataFrame(rows, columns=columns)
+
+
+def _staging_table_for(df: pd.DataFrame, table_name: Optional[str]) -> Optional[str]:
+    """Staging table whose required columns ``df`` has (only ``table_name`` if given)."""
+    columns = set(normalize_column_names(df.head(0)).columns)
+    candidates = [table_name] if table_name else list(TABLE_DETECTION_CONFIG)
+    for candidate in candidates:
+        if set(TABLE_DETECTION_CONFIG.get(candidate, [])) <= columns:
+            return candidate
+    return None
+
+
+def stage_pdf_tables(
+    db: Session,
+    paths: Sequence[str],
+    table_name: Optional[str] = None,
+    user: str = "ingestion-api",
+    display_names: Optional[Dict[str, str]] = None,
+    max_workers: Optional[int] = None,
+    cache: Optional[PdfPageCache] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Extract the tables of every PDF in ``paths`` and stage those matching a table.
+
+    Each matching table becomes a staging batch as soon as its page has been
+    extracted (see :func:`iter_pdf_pages`).
+
+    Args:
+        db: Database session
+        paths: PDF files on disk
+        table_name: Only stage tables for this staging table
+        user: User performing the operation
+        display_names: Name recorded as source file per path (default: basename)
+        max_workers: Extraction processes (``PDF_EXTRACT_WORKERS`` by default)
+        cache: Page cache (the ``PDF_PAGE_CACHE_DIR`` one by default)
+
+    Returns:
+        One summary per file, in ``paths`` order
+    """
+    display_names = display_names or {}
+    summaries = {
+        path: {
+            "filename": display_names.get(path, os.path.basename(path)),
+            "pages": 0,
+            "cached_pages": 0,
+            "tables_found": 0,
+            "rows_staged": 0,
+            "batches": [],
+            "errors": [],
+        }
+        for path in paths
+    }
+
+    for page in iter_pdf_pages(paths, max_workers=max_workers, cache=cache):
+        summary = summaries[page.path]
+        if page.error:
+            summary["errors"].append(page.error)
+            continue
+        summary["pages"] += 1
+        summary["cached_pages"] += page.cached
+        for raw_table in page.tables:
+            df = _table_frame(raw_table)
+            if df is None:
+                continue
+            summary["tables_found"] += 1
+            target = _staging_table_for(df, table_name)
+            if target is None:
+                continue
+            result = stage_frames(
+                db, [df], f"{summary['filename']} (page {page.page})", table_name=target, user=user,
+            )
+            summary["rows_staged"] += result["rows_staged"]
+            summary["batches"].append({
+                "page": page.page, "table": target, "batch_id": result["batch_id"], "rows_staged": result["rows_staged"],
+            })
+
+    for summary in summaries.values():
+        summary["batches"].sort(key=lambda batch: batch["page"])
+        logger.info(
+            f"PDF {summary['filename']}: {summary['pages']} pages ({summary['cached_pages']} cached), "
+            f"{summary['tables_found']} tables, {len(summary['batches'])} staged"
+        )
+    return list(summaries.values())
+
 
 async def ingest_pdf(file: UploadFile, table_name: str, db: Session) -> Dict[str, Any]:
     """
     Best-effort PDF ingestion using pdfplumber.
-    Extract tables and attempt to map to known schemas.
+    Extract tables page-parallel and stage those matching ``table_name``.
     """
     if not file.filename.lower().endswith(".pdf"):
         raise DataValidationError("Only PDF files are supported")
 
+    # Worker processes open the PDF by path
+    fd, path = tempfile.mkstemp(suffix=".pdf")
     try:
-        contents = await file.read()
-        with pdfplumber.open(pd.io.common.BytesIO(contents)) as pdf:
-            tables = []
-            for page in pdf.pages:
-                page_tables = page.extract_tables()
-                if page_tables:
-                    tables.extend(page_tables)
-    except Exception as e:
-        raise DataValidationError(f"Failed to read PDF: {e}")
-
-    if not tables:
+        with os.fdopen(fd, "wb") as f:
+            file.file.seek(0)
+            shutil.copyfileobj(file.file, f)
+        summary = stage_pdf_tables(db, [path], table_name=table_name, display_names={path: file.filename})[0]
+    finally:
+        os.remove(path)
+
+    if summary["errors"] and not summary["pages"]:
+        raise DataValidationError(summary["errors"][0])
+    if not summary["tables_found"]:
         raise DataValidationError("No tables found in PDF")
 
-    # For now, return first table as DataFrame placeholder
-    df = pd.DataFrame(tables[0][1:], columns=tables[0][0])
-    # TODO: smarter schema detection and mapping
-    return {"filename": file.filename, "rows_loaded": len(df), "table": table_name}
+    return {**summary, "rows_loaded": summary["rows_staged"], "table": table_name}
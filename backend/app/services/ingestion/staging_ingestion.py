@@ -10,12 +10,16 @@ This module implements the safe data ingestion pipeline:
 CRITICAL: NO production code should read from staging tables.
 """
 
+import itertools
+import time
+import numpy as np
 import pandas as pd
 import uuid
 import json
-from typing import Dict, Any, Optional, List, Type
+from typing import BinaryIO, Callable, Dict, Any, Iterable, Iterator, Optional, List, Type
 from datetime import datetime
 from fastapi import UploadFile
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
@@ -30,6 +34,19 @@ from app.db.models.staging_tables import (
 )
 from app.utils.exceptions import DataValidationError
 from app.services.audit_service import log_event
+from app.services.ingestion.excel_streaming import (
+    STREAMING_EXCEL_EXTENSIONS,
+    iter_workbook_frames,
+    workbook_source,
+)
+from app.services.ingestion.upload_fingerprint import (
+    contains,
+    file_sha256,
+    find_identical_upload,
+    hash_columns,
+    production_row_hashes,
+    row_hashes,
+)
 import logging
 
 logger = logging.getLogger(__name__)
@@ -44,6 +61,14 @@ STAGING_TABLE_MAP = {
     "safety_stock_policy": StagingSafetyStock,
 }
 
+# Staging bookkeeping columns that are never taken from the uploaded file
+STAGING_METADATA_COLUMNS = {
+    "id", "batch_id", "source_file", "source_row", "validation_status", "validation_errors", "created_at",
+}
+
+# Rows parsed and inserted per chunk by ingest_to_staging
+STAGING_CHUNK_SIZE = 50000
+
 # Required columns for table detection
 TABLE_DETECTION_CONFIG = {
     "plant_master": ["plant_id", "plant_name", "plant_type"],
@@ -132,121 +157,421 @@ def normalize_column_names(df: pd.DataFrame) -> pd.DataFrame:
     return df_normalized
 
 
-async def ingest_to_staging(
-    file: UploadFile,
+def _upload_frames(file: UploadFile, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Parse an upload into DataFrames of at most ``chunk_size`` rows.
+    
+    CSV is parsed incrementally from the upload's spooled file, so only one
+    chunk is in memory at a time. Legacy .xls files are read whole; .xlsx
+    workbooks go through :func:`stage_workbook` instead.
+    """
+    filename_lower = file.filename.lower()
+    file.file.seek(0)
+    if filename_lower.endswith('.csv'):
+        try:
+            yield from pd.read_csv(file.file, chunksize=chunk_size, encoding='utf-8')
+        except pd.errors.EmptyDataError:
+            return
+    elif filename_lower.endswith('.xls'):
+        df = pd.read_excel(file.file)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+    else:
+        raise DataValidationError("Unsupported file type. Only CSV and Excel files are supported.")
+
+
+def stage_frames(
     db: Session,
+    frames: Iterable[pd.DataFrame],
+    source_file: str,
     table_name: Optional[str] = None,
-    user: str = "staging-api"
+    user: str = "staging-api",
+    progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+    content_hash: Optional[str] = None,
+    skip_unchanged_rows: bool = False,
 ) -> Dict[str, Any]:
     """
-    Ingest uploaded file data into staging tables with full transaction safety.
+    Write a stream of DataFrame chunks into a new staging batch.
     
-    This is the new SAFE entry point that replaces direct production table writes.
+    Column names are normalized and the target table detected once, on the
+    first chunk. Each chunk is written with one executemany INSERT; the batch
+    record and all chunks commit in a single transaction.
     
     Args:
-        file: Uploaded file
         db: Database session
+        frames: DataFrame chunks in file order
+        source_file: Name of the source file (also used for table detection)
         table_name: Optional explicit table name
         user: User performing the operation
+        progress_callback: Called after every chunk with the running totals
+        content_hash: SHA-256 of the uploaded file, recorded on the batch
+        skip_unchanged_rows: Leave out rows identical to a production row
+            (see ``upload_fingerprint``); ``source_row`` keeps the file position
         
     Returns:
-        Dictionary with ingestion results
+        Dictionary with ingestion results; without any differing row no
+        batch is created and ``status`` is ``unchanged``
         
     Raises:
-        DataValidationError: If file cannot be processed
+        DataValidationError: If the data is empty or cannot be staged
     """
-    if not file.filename:
-        raise DataValidationError("File must have a filename")
+    frames = iter(frames)
+    first = next(frames, None)
+    if first is None or first.empty:
+        raise DataValidationError("File is empty")
+    
+    # Normalize column names and detect the target table once
+    columns = list(normalize_column_names(first.head(0)).columns)
+    first.columns = columns
+    detected_table = detect_table_name(first, source_file, table_name)
+    staging_model = STAGING_TABLE_MAP[detected_table]
+    staging_columns = [c for c in columns if c in staging_model.__table__.c and c not in STAGING_METADATA_COLUMNS]
     
-    # Generate unique batch ID for this upload
     batch_id = str(uuid.uuid4())
+    batch_record = ValidationBatch(
+        batch_id=batch_id,
+        source_file=source_file,
+        table_name=detected_table,
+        total_rows=0,
+        status="pending",
+        content_hash=content_hash,
+    )
     
+    start = time.monotonic()
+    rows_read = 0
+    rows_staged = 0
+    chunk_count = 0
     try:
-        # Read file content
-        contents = await file.read()
-        
-        # Parse based on file type
-        filename_lower = file.filename.lower()
-        if filename_lower.endswith('.csv'):
-            df = pd.read_csv(pd.io.common.StringIO(contents.decode('utf-8')))
-        elif filename_lower.endswith(('.xlsx', '.xls')):
-            df = pd.read_excel(pd.io.common.BytesIO(contents))
-        else:
-            raise DataValidationError("Unsupported file type. Only CSV and Excel files are supported.")
+        production_hashes = None
+        if skip_unchanged_rows:
+            compared = hash_columns(detected_table, staging_columns)
+            production_hashes = production_row_hashes(db, detected_table, **compared)
         
-        if df.empty:
-            raise DataValidationError("File is empty")
+        db.add(batch_record)
+        db.flush()
         
-        # Normalize column names
-        df = normalize_column_names(df)
-        
-        # Detect target table
-        detected_table = detect_table_name(df, file.filename, table_name)
-        staging_model = STAGING_TABLE_MAP[detected_table]
-        
-        # Create validation batch record
-        batch_record = ValidationBatch(
-            batch_id=batch_id,
-            source_file=file.filename,
-            table_name=detected_table,
-            total_rows=len(df),
-            status="pending"
-        )
-        
-        # Begin transaction
-        try:
-            db.add(batch_record)
-            
-            # Insert all rows into staging table
-            staging_records = []
-            for idx, row in df.iterrows():
-                # Convert row to dict and add staging metadata
-                row_dict = row.to_dict()
-                row_dict.update({
+        for chunk in itertools.chain([first], frames):
+            if chunk.empty:
+                continue
+            chunk.columns = columns
+            values = chunk[staging_columns]
+            source_rows = np.arange(rows_read + 1, rows_read + len(values) + 1)  # 1-based row numbering
+            rows_read += len(values)
+            if production_hashes is not None:
+                changed = ~contains(production_hashes, row_hashes(values, **compared))
+                values, source_rows = values[changed], source_rows[changed]
+            records = values.astype(object).where(values.notna(), None).to_dict("records")
+            for source_row, record in zip(source_rows.tolist(), records):
+                record.update({
                     'batch_id': batch_id,
-                    'source_file': file.filename,
-                    'source_row': idx + 1,  # 1-based row numbering
+                    'source_file': source_file,
+                    'source_row': source_row,
                     'validation_status': 'pending'
                 })
-                
-                # Create staging record (let SQLAlchemy handle missing columns)
-                staging_record = staging_model(**{k: v for k, v in row_dict.items() 
-                                                if hasattr(staging_model, k)})
-                staging_records.append(staging_record)
             
-            # Bulk insert staging records
-            db.add_all(staging_records)
-            db.commit()
+            if records:
+                db.execute(insert(staging_model), records)
+            rows_staged += len(records)
+            chunk_count += 1
             
-            logger.info(f"Successfully ingested {len(staging_records)} rows to staging table {detected_table} with batch_id {batch_id}")
-            
-            # Log successful staging
-            log_event(
-                user=user,
-                action="staging_ingestion",
-                resource=detected_table,
-                details={
-                    "batch_id": batch_id,
-                    "filename": file.filename,
-                    "table": detected_table,
-                    "rows_staged": len(staging_records),
-                    "status": "success"
-                }
-            )
-            
-            return {
+            elapsed = time.monotonic() - start
+            progress = {
                 "batch_id": batch_id,
-                "filename": file.filename,
                 "table": detected_table,
-                "rows_staged": len(staging_records),
-                "status": "staged",
-                "message": f"Data successfully staged. Use batch_id '{batch_id}' to validate and promote to production."
+                "chunks": chunk_count,
+                "rows_staged": rows_staged,
+                "rows_unchanged": rows_read - rows_staged,
+                "rows_per_second": round(rows_read / elapsed, 1) if elapsed > 0 else None,
             }
-            
-        except SQLAlchemyError as e:
+            logger.info(f"Staging batch {batch_id}: chunk {chunk_count}, {rows_staged} rows staged")
+            if progress_callback:
+                progress_callback(progress)
+        
+        rows_unchanged = rows_read - rows_staged
+        if rows_read and not rows_staged:
+            # Nothing differs from production: no batch to validate or promote
             db.rollback()
-            logger.error(f"Database error during staging ingestion: {e}")
-            raise DataValidationError(f"Database error during staging: {str(e)}")
+        else:
+            batch_record.total_rows = rows_staged
+            batch_record.unchanged_rows = rows_unchanged
+            db.commit()
+        
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Database error during staging ingestion: {e}")
+        raise DataValidationError(f"Database error during staging: {str(e)}")
+    
+    elapsed = time.monotonic() - start
+    if rows_read and not rows_staged:
+        logger.info(f"All {rows_read} rows of {source_file} match production table {detected_table}; nothing staged")
+        log_event(
+            user=user,
+            action="staging_ingestion",
+            resource=detected_table,
+            details={"filename": source_file, "table": detected_table, "rows_unchanged": rows_read, "status": "unchanged"}
+        )
+        return {
+            "batch_id": None,
+            "filename": source_file,
+            "table": detected_table,
+            "rows_staged": 0,
+            "rows_unchanged": rows_read,
+            "chunks": chunk_count,
+            "elapsed_seconds": round(elapsed, 3),
+            "status": "unchanged",
+            "message": f"All {rows_read} rows are identical to production table {detected_table}; nothing to validate or promote."
+        }
+    
+    logger.info(f"Successfully ingested {rows_staged} rows to staging table {detected_table} with batch_id {batch_id} "
+                f"in {chunk_count} chunks ({elapsed:.2f}s)"
+                + (f", {rows_unchanged} unchanged rows skipped" if rows_unchanged else ""))
+    
+    # Log successful staging
+    log_event(
+        user=user,
+        action="staging_ingestion",
+        resource=detected_table,
+        details={
+            "batch_id": batch_id,
+            "filename": source_file,
+            "table": detected_table,
+            "rows_staged": rows_staged,
+            "rows_unchanged": rows_unchanged,
+            "chunks": chunk_count,
+            "status": "success"
+        }
+    )
+    
+    return {
+        "batch_id": batch_id,
+        "filename": source_file,
+        "table": detected_table,
+        "rows_staged": rows_staged,
+        "rows_unchanged": rows_unchanged,
+        "chunks": chunk_count,
+        "elapsed_seconds": round(elapsed, 3),
+        "status": "staged",
+        "message": f"Data successfully staged. Use batch_id '{batch_id}' to validate and promote to production."
+    }
+
+
+def _sheet_table(first: pd.DataFrame, sheet: str, source_file: str, first_sheet: bool) -> str:
+    """Staging table for a sheet: by sheet name, for the first sheet also by file name.
+    
+    Raises:
+        DataValidationError: If neither name maps to a table with matching columns
+    """
+    normalized = normalize_column_names(first.head(0))
+    try:
+        return detect_table_name(normalized, sheet, None)
+    except DataValidationError:
+        if not first_sheet:
+            raise
+        return detect_table_name(normalized, source_file, None)
+
+
+def _fail_batches(db: Session, batch_ids: List[str], reason: str) -> None:
+    """Mark batches of an upload that did not stage completely as ``ingestion_failed``."""
+    if not batch_ids:
+        return
+    try:
+        db.rollback()
+        db.query(ValidationBatch).filter(ValidationBatch.batch_id.in_(batch_ids)).update(
+            {"status": "ingestion_failed", "validation_errors": json.dumps([reason])}, synchronize_session=False
+        )
+        db.commit()
+        logger.warning(f"Marked {len(batch_ids)} batches of an incomplete upload as failed: {reason}")
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Failed to mark batches {batch_ids} as failed: {e}")
+
+
+def stage_workbook(
+    db: Session,
+    file: BinaryIO,
+    source_file: str,
+    table_name: Optional[str] = None,
+    user: str = "staging-api",
+    chunk_size: int = STAGING_CHUNK_SIZE,
+    max_workers: Optional[int] = None,
+    progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+    content_hash: Optional[str] = None,
+    skip_unchanged_rows: bool = False,
+) -> Dict[str, Any]:
+    """
+    Stage every sheet of an .xlsx workbook as its own batch.
+    
+    Sheets are streamed in read-only mode and parsed in parallel
+    (``excel_streaming``); each is mapped to a staging table with
+    :func:`detect_table_name` on its sheet name (the first sheet falls back
+    to the file name, as when only the first sheet was read) and written through :func:`stage_frames`.
+    Sheets that are empty or match no table are skipped. With an explicit
+    ``table_name`` only the first sheet is staged, as ``pd.read_excel`` did.
+    
+    ``content_hash`` and ``skip_unchanged_rows`` are passed on to
+    :func:`stage_frames` for every sheet.
+    
+    If a sheet fails to stage, the batches of the sheets before it are
+    marked ``ingestion_failed`` and the error is raised, so that retrying the
+    same file stages the whole workbook again.
+    
+    Returns:
+        Result of the first sheet that got a batch, with ``rows_staged`` and
+        ``rows_unchanged`` totalled over all sheets, plus ``sheets`` (one
+        result per staged sheet) and ``skipped_sheets``
+        
+    Raises:
+        DataValidationError: If no sheet could be staged
+    """
+    source = workbook_source(file)
+    staged: List[Dict[str, Any]] = []
+    skipped: List[Dict[str, str]] = []
+    
+    sheet = None
+    try:
+        for index, (sheet, frames) in enumerate(iter_workbook_frames(source, chunk_size, max_workers)):
+            if table_name and index > 0:
+                skipped.append({"sheet": sheet, "reason": "explicit table_name applies to the first sheet only"})
+                continue
+            first = next(frames, None)
+            if first is None or first.empty:
+                skipped.append({"sheet": sheet, "reason": "empty"})
+                continue
+            try:
+                target = table_name or _sheet_table(first, sheet, source_file, first_sheet=index == 0)
+            except DataValidationError as e:
+                skipped.append({"sheet": sheet, "reason": str(e)})
+                continue
+            result = stage_frames(
+                db, itertools.chain([first], frames), source_file, table_name=target, user=user,
+                progress_callback=progress_callback, content_hash=content_hash, skip_unchanged_rows=skip_unchanged_rows,
+            )
+            staged.append({**result, "sheet": sheet})
+    except Exception as e:
+        # The sheets staged so far are committed; fail them so that neither
+        # they nor their content hash stand in for the whole workbook
+        _fail_batches(db, [r["batch_id"] for r in staged if r["batch_id"]], f"Sheet '{sheet}' failed to stage: {e}")
+        raise
+    
+    if not staged:
+        reasons = "; ".join(f"{s['sheet']}: {s['reason']}" for s in skipped)
+        raise DataValidationError(f"No sheet of '{source_file}' could be staged ({reasons or 'workbook is empty'})")
+    
+    totals = {
+        "rows_staged": sum(r["rows_staged"] for r in staged),
+        "rows_unchanged": sum(r["rows_unchanged"] for r in staged),
+        "sheets": staged,
+        "skipped_sheets": skipped,
+    }
+    batches = [r for r in staged if r["batch_id"]]
+    if not batches:
+        return {**staged[0], **totals, "message": "All sheets are identical to production; nothing to validate or promote."}
+    
+    batch_ids = ", ".join(f"'{r['batch_id']}' ({r['sheet']} -> {r['table']})" for r in batches)
+    return {
+        **batches[0],
+        **totals,
+        "message": f"Data successfully staged. Use batch_id {batch_ids} to validate and promote to production.",
+    }
+
+
+def _identical_upload_result(batches: List[ValidationBatch], filename: str, user: str) -> Dict[str, Any]:
+    """Result for an upload identical to the one that created ``batches``."""
+    results = [
+        {
+            "batch_id": batch.batch_id,
+            "table": batch.table_name,
+            "total_rows": batch.total_rows,
+            "batch_status": batch.status,
+        }
+        for batch in batches
+    ]
+    batch_ids = ", ".join(f"'{r['batch_id']}' ({r['table']}, {r['batch_status']})" for r in results)
+    logger.info(f"Upload {filename} is identical to batch {batch_ids}; nothing staged")
+    log_event(
+        user=user,
+        action="staging_ingestion",
+        resource=batches[0].table_name,
+        details={"filename": filename, "batch_ids": [r["batch_id"] for r in results], "status": "duplicate"}
+    )
+    return {
+        **results[0],
+        "filename": filename,
+        "rows_staged": 0,
+        "batches": results,
+        "status": "duplicate",
+        "message": f"Identical file already staged as batch {batch_ids}; nothing was staged again."
+    }
+
+
+async def ingest_to_staging(
+    file: UploadFile,
+    db: Session,
+    table_name: Optional[str] = None,
+    user: str = "staging-api",
+    chunk_size: int = STAGING_CHUNK_SIZE,
+    progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+    skip_unchanged_rows: bool = False,
+    force: bool = False,
+) -> Dict[str, Any]:
+    """
+    Ingest uploaded file data into staging tables with full transaction safety.
+    
+    This is the new SAFE entry point that replaces direct production table writes.
+    CSV uploads and .xlsx sheets are parsed and inserted ``chunk_size`` rows
+    at a time, so memory stays flat regardless of file size; every sheet of a
+    workbook becomes its own batch (see :func:`stage_workbook`).
+    
+    The upload's SHA-256 is computed first: an identical file whose batches
+    are still live is not staged again, its batches are returned with
+    ``status`` ``duplicate`` (see ``upload_fingerprint``).
+    
+    Args:
+        file: Uploaded file
+        db: Database session
+        table_name: Optional explicit table name
+        user: User performing the operation
+        chunk_size: Rows parsed and inserted per chunk
+        progress_callback: Called after every chunk with the running totals
+        skip_unchanged_rows: Only stage rows that differ from production
+        force: Stage the file even if an identical upload is still live
+        
+    Returns:
+        Dictionary with ingestion results
+        
+    Raises:
+        DataValidationError: If file cannot be processed
+    """
+    if not file.filename:
+        raise DataValidationError("File must have a filename")
+    
+    try:
+        content_hash = file_sha256(file.file)
+        identical = [] if force else find_identical_upload(db, content_hash, table_name)
+        if identical:
+            return _identical_upload_result(identical, file.filename, user)
+        
+        if file.filename.lower().endswith(STREAMING_EXCEL_EXTENSIONS):
+            return stage_workbook(
+                db,
+                file.file,
+                file.filename,
+                table_name=table_name,
+                user=user,
+                chunk_size=chunk_size,
+                progress_callback=progress_callback,
+                content_hash=content_hash,
+                skip_unchanged_rows=skip_unchanged_rows,
+            )
+        return stage_frames(
+            db,
+            _upload_frames(file, chunk_size),
+            file.filename,
+            table_name=table_name,
+            user=user,
+            progress_callback=progress_callback,
+            content_hash=content_hash,
+            skip_unchanged_rows=skip_unchanged_rows,
+        )
         
     except Exception as e:
         # Log failed staging attempt
@@ -291,6 +616,7 @@ def get_staging_summary(db: Session, batch_id: Optional[str] = None) -> Dict[str
                 "source_file": batch.source_file,
                 "table_name": batch.table_name,
                 "total_rows": batch.total_rows,
+                "unchanged_rows": batch.unchanged_rows,
                 "valid_rows": batch.valid_rows,
                 "invalid_rows": batch.invalid_rows,
                 "status": batch.status,
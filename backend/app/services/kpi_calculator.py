@@ -1,9 +1,13 @@
 
-from typing import Dict, Tuple, Any
+from typing import Dict, Tuple, Any, Optional, Sequence
+
+import numpy as np
 
 Number = float
 LocationPeriod = Tuple[Any, Any]
 
+COST_COMPONENTS = ("production_cost", "transport_cost", "fixed_trip_cost", "holding_cost")
+
 
 def compute_kpis(
     *,
@@ -80,6 +84,177 @@ def compute_kpis(
         "capacity_utilization": utilization,
     }
 
+
+def stack_kpi_inputs(scenarios: Sequence[Dict[str, Dict[Any, Number]]]) -> Dict[str, Any]:
+    """Stack per-scenario :func:`compute_kpis` keyword dicts into arrays.
+
+    Customers, periods and plants are the union over all scenarios; missing
+    keys become zero. Returns the keyword arguments of
+    :func:`compute_kpis_batch` plus the ``customers``, ``periods`` and
+    ``plants`` labels of each axis.
+    """
+    customers = list(dict.fromkeys(c for s in scenarios for (c, _) in (s.get("demand") or {})))
+    periods = list(dict.fromkeys(t for s in scenarios for (_, t) in (s.get("demand") or {})))
+    plants = list(dict.fromkeys(
+        p for s in scenarios for p in list(s.get("plant_production") or {}) + list(s.get("plant_capacity") or {})
+    ))
+    c_pos = {c: n for n, c in enumerate(customers)}
+    t_pos = {t: n for n, t in enumerate(periods)}
+    p_pos = {p: n for n, p in enumerate(plants)}
+
+    n = len(scenarios)
+    demand = np.zeros((n, len(customers), len(periods)))
+    fulfilled = np.zeros_like(demand)
+    production = np.zeros((n, len(plants)))
+    capacity = np.zeros_like(production)
+    costs = {k: np.zeros(n) for k in COST_COMPONENTS}
+    for i, s in enumerate(scenarios):
+        for k in COST_COMPONENTS:
+            costs[k][i] = float((s.get("costs") or {}).get(k, 0.0) or 0.0)
+        for (c, t), v in (s.get("demand") or {}).items():
+            demand[i, c_pos[c], t_pos[t]] = float(v or 0.0)
+        for (c, t), v in (s.get("fulfilled") or {}).items():
+            # Fulfilment without matching demand never counts towards service
+            if c in c_pos and t in t_pos:
+                fulfilled[i, c_pos[c], t_pos[t]] = float(v or 0.0)
+        for p, v in (s.get("plant_production") or {}).items():
+            production[i, p_pos[p]] = float(v or 0.0)
+        for p, v in (s.get("plant_capacity") or {}).items():
+            capacity[i, p_pos[p]] = float(v or 0.0)
+
+    return {
+        "costs": costs,
+        "demand": demand,
+        "fulfilled": fulfilled,
+        "plant_production": production,
+        "plant_capacity": capacity,
+        "customers": customers,
+        "periods": periods,
+        "plants": plants,
+    }
+
+
+def compute_kpis_batch(
+    *,
+    costs: Dict[str, np.ndarray],
+    demand: np.ndarray,
+    fulfilled: np.ndarray,
+    plant_production: np.ndarray,
+    plant_capacity: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """Vectorized :func:`compute_kpis` over a stack of scenarios.
+
+    ``demand`` and ``fulfilled`` have shape (scenario, customer, period),
+    ``plant_production`` shape (scenario, plant) and ``plant_capacity`` shape
+    (scenario, plant) or (plant,) if shared. Missing cost components are zero.
+    Returns the KPIs of :func:`compute_kpis` as arrays over scenarios;
+    ``capacity_utilization`` has shape (scenario, plant).
+    """
+    demand = np.nan_to_num(np.asarray(demand, dtype=float))
+    fulfilled = np.nan_to_num(np.asarray(fulfilled, dtype=float))
+    n = demand.shape[0]
+    demand = demand.reshape(n, -1)
+    fulfilled = fulfilled.reshape(n, -1)
+
+    components = {
+        k: np.nan_to_num(np.asarray(costs.get(k, np.zeros(n)), dtype=float)) for k in COST_COMPONENTS
+    }
+    total_cost = sum(components.values())
+
+    # --- Service level ---
+    total_demand = demand.sum(axis=1)
+    total_fulfilled = np.minimum(fulfilled, demand).sum(axis=1)
+    service_level = np.divide(total_fulfilled, total_demand, out=np.ones(n), where=total_demand != 0.0)
+
+    # --- Stockout risk ---
+    has_demand = demand > 0.0
+    periods_with_demand = has_demand.sum(axis=1)
+    stockout_periods = (has_demand & (fulfilled < demand)).sum(axis=1)
+    stockout_risk = np.divide(
+        stockout_periods, periods_with_demand, out=np.zeros(n), where=periods_with_demand > 0
+    )
+
+    # --- Capacity utilization per plant ---
+    production = np.nan_to_num(np.asarray(plant_production, dtype=float))
+    capacity = np.broadcast_to(np.nan_to_num(np.asarray(plant_capacity, dtype=float)), production.shape)
+    utilization = np.divide(production, capacity, out=np.zeros_like(production), where=capacity > 0.0)
+
+    return {
+        "total_cost": total_cost,
+        **components,
+        "service_level": service_level,
+        "stockout_risk": stockout_risk,
+        "capacity_utilization": utilization,
+    }
+
+
+def _weighted_quantiles(values: np.ndarray, weights: np.ndarray, levels: np.ndarray) -> np.ndarray:
+    """Quantiles of a discrete distribution (inverse CDF, no interpolation)."""
+    order = np.argsort(values, kind="stable")
+    cumulative = np.cumsum(weights[order])
+    cumulative /= cumulative[-1]
+    idx = np.searchsorted(cumulative, levels - 1e-12, side="left")
+    return values[order][np.minimum(idx, len(values) - 1)]
+
+
+def _scenario_weights(n: int, probabilities: Optional[Sequence[float]]) -> np.ndarray:
+    weights = np.full(n, 1.0 / n) if probabilities is None else np.asarray(probabilities, dtype=float)
+    return weights / weights.sum()
+
+
+def cost_risk_metrics(
+    total_cost: np.ndarray,
+    confidence_levels: Sequence[float] = (0.90, 0.95, 0.99),
+    probabilities: Optional[Sequence[float]] = None,
+    percentiles: Sequence[float] = (5, 25, 50, 75, 95),
+) -> Dict[str, Any]:
+    """Distribution statistics, VaR and CVaR of scenario costs.
+
+    Costs are losses: VaR at level a is the a-quantile of cost and CVaR the
+    expected cost in the tail beyond it, ``VaR + E[max(cost - VaR, 0)] / (1 - a)``.
+    Scenarios are equally likely unless ``probabilities`` is given.
+    """
+    costs = np.asarray(total_cost, dtype=float)
+    if costs.size == 0:
+        return {}
+    weights = _scenario_weights(costs.size, probabilities)
+
+    mean = float(weights @ costs)
+    levels = np.asarray(confidence_levels, dtype=float)
+    var = _weighted_quantiles(costs, weights, levels)
+    excess = np.maximum(costs[None, :] - var[:, None], 0.0) @ weights
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cvar = np.where(levels < 1.0, var + excess / (1.0 - levels), var)
+    pct = _weighted_quantiles(costs, weights, np.asarray(percentiles, dtype=float) / 100.0)
+
+    return {
+        "cost_distribution": {
+            "mean": mean,
+            "median": float(_weighted_quantiles(costs, weights, np.array([0.5]))[0]),
+            "std_dev": float(np.sqrt(weights @ (costs - mean) ** 2)),
+            "min": float(costs.min()),
+            "max": float(costs.max()),
+            "percentiles": {f"p{p:g}": float(v) for p, v in zip(percentiles, pct)},
+        },
+        "value_at_risk": {f"{a * 100:g}%": float(v) for a, v in zip(levels, var)},
+        "conditional_var": {f"{a * 100:g}%": float(v) for a, v in zip(levels, cvar)},
+    }
+
+
+def service_level_risk(
+    service_level: np.ndarray,
+    targets: Sequence[float] = (0.95, 0.90),
+    probabilities: Optional[Sequence[float]] = None,
+) -> Dict[str, float]:
+    """Probability of reaching each service-level target, and the expected level."""
+    levels = np.asarray(service_level, dtype=float)
+    if levels.size == 0:
+        return {}
+    weights = _scenario_weights(levels.size, probabilities)
+    risk = {f"target_{t * 100:g}%": float(weights @ (levels >= t - 1e-12)) for t in targets}
+    risk["expected_service"] = float(weights @ levels)
+    return risk
+
 """
 KPI Calculator Service
 
@@ -96,10 +271,10 @@ from datetime import datetime
 from app.db.models.optimization_run import OptimizationRun
 from app.db.models.optimization_results import OptimizationResults
 from app.db.models.kpi_snapshot import KPISnapshot
-from app.db.models.plant_master import PlantMaster
 from app.db.models.production_capacity_cost import ProductionCapacityCost
 from app.db.models.demand_forecast import DemandForecast
-from app.db.models.transport_routes_modes import TransportRoutesModes
+from app.services.reference_data_cache import get_plant_names, get_route_lookup
+from app.services.result_store import load_plan
 
 logger = logging.getLogger(__name__)
 
@@ -234,15 +409,7 @@ class KPICalculator:
         holding_cost = inventory_cost
         
         # Calculate total production for cost per tonne
-        production_plan = results.production_plan or {}
-        total_production = 0
-        
-        if isinstance(production_plan, dict):
-            for plant_data in production_plan.values():
-                if isinstance(plant_data, dict):
-                    total_production += sum(plant_data.values())
-                else:
-                    total_production += plant_data
+        total_production = float(load_plan(results, "production", columns=["tonnes"])["tonnes"].sum())
         
         # If no production data, estimate based on scenario
         if total_production == 0:
@@ -273,10 +440,11 @@ class KPICalculator:
     def _calculate_production_kpis(self, results: OptimizationResults) -> Dict[str, Any]:
         """Calculate production-related KPIs with scenario-specific variations."""
         
-        production_plan = results.production_plan or {}
+        production = load_plan(results, "production", columns=["plant_id", "tonnes"])
+        production_by_plant = production.groupby("plant_id")["tonnes"].sum()
         
         # Get plant master data for names and capacity
-        plants = {p.plant_id: p.plant_name for p in self.db.query(PlantMaster).all()}
+        plants = get_plant_names(self.db)
         capacity_data = {c.plant_id: c for c in self.db.query(ProductionCapacityCost).all()}
         
         # Calculate total production and utilization data
@@ -300,11 +468,8 @@ class KPICalculator:
         
         for plant_id, plant_name in plants.items():
             # Get production from plan or calculate based on scenario
-            if isinstance(production_plan, dict) and plant_id in production_plan:
-                if isinstance(production_plan[plant_id], dict):
-                    production_used = sum(production_plan[plant_id].values())
-                else:
-                    production_used = production_plan[plant_id]
+            if plant_id in production_by_plant.index:
+                production_used = float(production_by_plant[plant_id])
             else:
                 # Calculate based on capacity and scenario
                 capacity_info = capacity_data.get(plant_id)
@@ -354,65 +519,32 @@ class KPICalculator:
         Now generates dynamic data based on actual scenario and optimization results.
         """
         
-        shipment_plan = results.shipment_plan or {}
+        shipments = load_plan(results, "shipments", columns=["origin", "destination", "mode", "tonnes"])
+        shipments = shipments[shipments["tonnes"] > 0]
         
-        # Get real transport routes from database
-        transport_routes = self.db.query(TransportRoutesModes).all()
-        route_lookup = {f"{r.origin_plant_id}-{r.destination_node_id}-{r.transport_mode}": r for r in transport_routes}
-        
-        # Get plant names for display
-        plants = {p.plant_id: p.plant_name for p in self.db.query(PlantMaster).all()}
+        # Route and plant master data from the shared reference cache
+        route_lookup = get_route_lookup(self.db)
+        plants = get_plant_names(self.db)
         
         # Calculate transport metrics based on actual shipment plan
         transport_data = []
         total_shipments = 0
         
-        # Process shipment plan to create transport utilization data
-        for route_key, shipment_quantity in shipment_plan.items():
-            if route_key == "_metadata":  # Skip metadata
-                continue
-                
-            # Handle different shipment plan formats
-            if isinstance(shipment_quantity, dict):
-                quantity = shipment_quantity.get("shipment_tonnes", 0)
-            else:
-                quantity = shipment_quantity or 0
-            
-            if quantity <= 0:
-                continue
-                
+        # One utilization entry per shipped route and period
+        for origin, destination, mode, quantity in shipments.itertuples(index=False):
             total_shipments += quantity
             
-            # Parse route key to get origin, destination, mode
-            if isinstance(route_key, str):
-                if "-" in route_key:
-                    parts = route_key.split("-")
-                    if len(parts) >= 2:
-                        origin, destination = parts[0], parts[1]
-                        mode = parts[2] if len(parts) > 2 else "truck"
-                    else:
-                        continue
-                else:
-                    continue
-            else:
-                # Assume tuple format (origin, destination, mode, period)
-                if len(route_key) >= 3:
-                    origin, destination, mode = route_key[0], route_key[1], route_key[2]
-                else:
-                    continue
-            
-            # Get route details from database
-            route_lookup_key = f"{origin}-{destination}-{mode}"
-            route_info = route_lookup.get(route_lookup_key)
+            # Get route details from the reference cache
+            route_info = route_lookup.get((origin, destination, mode))
             
             if route_info:
                 # Calculate trips based on vehicle capacity
-                vehicle_capacity = route_info.vehicle_capacity_tonnes or 25
+                vehicle_capacity = route_info["vehicle_capacity_tonnes"] or 25
                 trips = max(1, int(quantity / vehicle_capacity))
                 capacity_used_pct = min(1.0, quantity / (trips * vehicle_capacity))
                 
                 # Check SBQ compliance
-                min_batch = route_info.min_batch_quantity_tonnes or 0
+                min_batch = route_info["min_batch_quantity_tonnes"] or 0
                 sbq_compliant = quantity >= min_batch if min_batch > 0 else True
                 
                 transport_data.append({
@@ -537,7 +669,7 @@ class KPICalculator:
         Now handles Phase 4 advanced model results including safety stock compliance tracking.
         """
         
-        inventory_profile = results.inventory_profile or {}
+        inventory = load_plan(results, "inventory", columns=["plant_id", "period", "tonnes"])
         
         # PHASE 5: Extract safety stock compliance from advanced model results
         safety_stock_compliance_data = {}
@@ -561,16 +693,14 @@ class KPICalculator:
         safety_violations = 0
         total_locations = 0
         
-        for location, location_data in inventory_profile.items():
+        # Opening and closing inventory per location
+        by_location = inventory.sort_values(["plant_id", "period"]).groupby("plant_id", sort=False)["tonnes"]
+        opening_by_location = by_location.first()
+        closing_by_location = by_location.last()
+        for location in opening_by_location.index:
             total_locations += 1
-            
-            if isinstance(location_data, dict):
-                # Get opening and closing inventory
-                periods = sorted(location_data.keys())
-                opening_inventory = location_data.get(periods[0], 0) if periods else 0
-                closing_inventory = location_data.get(periods[-1], 0) if periods else 0
-            else:
-                opening_inventory = closing_inventory = location_data
+            opening_inventory = float(opening_by_location[location])
+            closing_inventory = float(closing_by_location[location])
             
             total_inventory += closing_inventory
             
@@ -613,11 +743,7 @@ class KPICalculator:
         safety_stock_compliance = 1.0 - (safety_violations / total_locations) if total_locations > 0 else 1.0
         
         # Calculate inventory turns (estimate based on total shipments vs average inventory)
-        total_shipments = sum(
-            shipment_info.get("shipment_tonnes", shipment_info) if isinstance(shipment_info, dict) else shipment_info
-            for shipment_info in (results.shipment_plan or {}).values()
-            if isinstance(shipment_info, (int, float, dict))
-        )
+        total_shipments = float(load_plan(results, "shipments", columns=["tonnes"])["tonnes"].sum())
         avg_inventory = total_inventory / total_locations if total_locations > 0 else 1
         inventory_turns = (total_shipments / avg_inventory) if avg_inventory > 0 else 0
         
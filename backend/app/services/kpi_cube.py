@@ -0,0 +1,522 @@
+"""
+KPI Cube Service
+
+Maintains a scenario x run x period x plant/route x metric cube of KPI cells.
+Cells of a run are written once, when the run completes, so the dashboard,
+compare, history and summary endpoints read a bounded set of precomputed
+rows instead of re-deriving KPIs from every stored plan. Each scenario also
+keeps one row with its latest totals and deltas against the base scenario,
+refreshed whenever that scenario (or the base scenario) gets a new run.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy import case, delete, func, insert
+from sqlalchemy.orm import Session
+
+from app.db.models.kpi_cube import KPICubeCell, KPICubeScenario
+from app.db.models.optimization_results import OptimizationResults
+from app.db.models.optimization_run import OptimizationRun
+from app.db.models.production_capacity_cost import ProductionCapacityCost
+from app.services.reference_data_cache import get_plant_names
+from app.services.result_store import load_plan
+
+logger = logging.getLogger(__name__)
+
+BASE_SCENARIO = "base"
+
+# Run-level metrics tracked per run in history and compared between scenarios
+HISTORY_METRICS = (
+    "total_cost",
+    "production_cost",
+    "transport_cost",
+    "inventory_cost",
+    "penalty_cost",
+    "service_level",
+    "demand_fulfillment_rate",
+)
+
+ROUTE_SEPARATOR = "|"
+
+
+def _delta(value: Optional[float], reference: Optional[float]) -> Dict[str, Optional[float]]:
+    if value is None or reference is None:
+        return {"absolute": None, "percent": None}
+    absolute = value - reference
+    return {"absolute": absolute, "percent": (absolute / reference * 100.0) if reference else None}
+
+
+def _deltas(totals: Dict[str, float], reference: Dict[str, float]) -> Dict[str, Dict[str, Optional[float]]]:
+    return {metric: _delta(totals.get(metric), reference.get(metric)) for metric in totals}
+
+
+def _demand_frame(demand_fulfillment: Optional[Dict[str, Any]]) -> pd.DataFrame:
+    """``{customer: {period: {demand, fulfilled, ...}}}`` -> customer/period rows."""
+    rows = [
+        {
+            "customer": customer,
+            "period": str(period),
+            "demand": float(entry.get("demand") or 0.0),
+            "fulfilled": float(entry.get("fulfilled") or 0.0),
+        }
+        for customer, periods in (demand_fulfillment or {}).items()
+        if isinstance(periods, dict)
+        for period, entry in periods.items()
+        if isinstance(entry, dict)
+    ]
+    return pd.DataFrame(rows, columns=["customer", "period", "demand", "fulfilled"])
+
+
+class KPICubeService:
+    """Service for maintaining and reading the KPI cube."""
+
+    @staticmethod
+    def build_cells(db: Session, results: OptimizationResults) -> List[Dict[str, Any]]:
+        """Compute every cube cell of one stored run.
+
+        Returns ``period``/``dimension``/``member``/``metric``/``value`` dicts;
+        run-level cells have ``period=""``.
+        """
+        production = load_plan(results, "production")
+        inventory = load_plan(results, "inventory")
+        shipments = load_plan(
+            results, "shipments",
+            columns=["origin", "destination", "mode", "period", "tonnes", "trips", "vehicle_capacity", "sbq_requirement"],
+        )
+        demand = _demand_frame(results.demand_fulfillment)
+
+        cells: List[Dict[str, Any]] = []
+
+        def add(dimension: str, member: str, period: str, values: Dict[str, float]) -> None:
+            cells.extend(
+                {"period": period, "dimension": dimension, "member": member, "metric": metric, "value": float(value)}
+                for metric, value in values.items()
+            )
+
+        # Plant capacity over the planned periods, one grouped query
+        capacity = pd.Series(dtype=float)
+        plants = production["plant_id"].unique().tolist()
+        if plants:
+            rows = (
+                db.query(ProductionCapacityCost.plant_id, func.sum(ProductionCapacityCost.max_capacity_tonnes))
+                .filter(
+                    ProductionCapacityCost.plant_id.in_(plants),
+                    ProductionCapacityCost.period.in_(production["period"].unique().tolist()),
+                )
+                .group_by(ProductionCapacityCost.plant_id)
+                .all()
+            )
+            capacity = pd.Series({plant_id: float(total or 0.0) for plant_id, total in rows}, dtype=float)
+
+        # Network totals, run level
+        metadata = (results.shipment_plan or {}).get("_metadata", {}) if isinstance(results.shipment_plan, dict) else {}
+        metadata = getattr(results, "additional_metrics", None) or metadata
+        total_demand = float(demand["demand"].sum())
+        total_fulfilled = float(demand["fulfilled"].sum())
+        met = demand[demand["demand"] > 0]
+        production_tonnes = float(production["tonnes"].sum())
+        capacity_tonnes = float(capacity.sum())
+        shipment_tonnes = float(shipments["tonnes"].sum())
+        average_inventory = float(inventory["tonnes"].mean()) if not inventory.empty else 0.0
+        add("total", "", "", {
+            "total_cost": results.total_cost or 0.0,
+            "production_cost": results.production_cost or 0.0,
+            "transport_cost": results.transport_cost or 0.0,
+            "fixed_trip_cost": metadata.get("fixed_trip_cost", 0.0) or 0.0,
+            "inventory_cost": results.inventory_cost or 0.0,
+            "penalty_cost": results.penalty_cost or 0.0,
+            "service_level": results.service_level or 0.0,
+            "stockout_events": results.stockout_events or 0,
+            "demand_tonnes": total_demand,
+            "fulfilled_tonnes": total_fulfilled,
+            "demand_fulfillment_rate": (total_fulfilled / total_demand) if total_demand > 0 else 1.0,
+            "on_time_rate": float((met["fulfilled"] >= met["demand"] * 0.999).mean()) if not met.empty else 1.0,
+            "production_tonnes": production_tonnes,
+            "capacity_tonnes": capacity_tonnes,
+            "production_utilization": (production_tonnes / capacity_tonnes) if capacity_tonnes > 0 else 0.0,
+            "shipment_tonnes": shipment_tonnes,
+            "trips": float(shipments["trips"].sum()),
+            "average_inventory_tonnes": average_inventory,
+            "inventory_turns": (shipment_tonnes / average_inventory) if average_inventory > 0 else 0.0,
+        })
+
+        # Network totals per period
+        per_period = pd.DataFrame({
+            "production_tonnes": production.groupby("period")["tonnes"].sum(),
+            "shipment_tonnes": shipments.groupby("period")["tonnes"].sum(),
+            "trips": shipments.groupby("period")["trips"].sum().astype(float),
+            "average_inventory_tonnes": inventory.groupby("period")["tonnes"].mean(),
+            "demand_tonnes": demand.groupby("period")["demand"].sum(),
+            "fulfilled_tonnes": demand.groupby("period")["fulfilled"].sum(),
+        }).fillna(0.0)
+        for period, values in per_period.iterrows():
+            add("total", "", str(period), values.to_dict())
+
+        # Plants, run level and per period
+        if not production.empty:
+            inventory_sorted = inventory.sort_values("period", kind="stable")
+            per_plant = pd.DataFrame({
+                "production_tonnes": production.groupby("plant_id")["tonnes"].sum(),
+                "average_inventory_tonnes": inventory.groupby("plant_id")["tonnes"].mean(),
+                "opening_inventory_tonnes": inventory_sorted.groupby("plant_id")["tonnes"].first(),
+                "closing_inventory_tonnes": inventory_sorted.groupby("plant_id")["tonnes"].last(),
+            })
+            per_plant["capacity_tonnes"] = capacity.reindex(per_plant.index)
+            per_plant = per_plant.fillna(0.0)
+            per_plant["utilization"] = (
+                per_plant["production_tonnes"] / per_plant["capacity_tonnes"].where(per_plant["capacity_tonnes"] > 0)
+            ).fillna(0.0)
+            for plant_id, values in per_plant.iterrows():
+                add("plant", str(plant_id), "", values.to_dict())
+            for (plant_id, period), tonnes in production.groupby(["plant_id", "period"])["tonnes"].sum().items():
+                add("plant", str(plant_id), str(period), {"production_tonnes": tonnes})
+
+        # Routes, run level
+        if not shipments.empty:
+            shipped = shipments[shipments["tonnes"] > 1e-6]
+            loaded = shipped["trips"] * shipped["vehicle_capacity"]
+            routes = shipped.assign(
+                _capacity=loaded,
+                _sbq_violation=(shipped["sbq_requirement"] > 0) & (shipped["tonnes"] < shipped["sbq_requirement"] - 1e-6),
+            ).groupby(["origin", "destination", "mode"]).agg(
+                shipment_tonnes=("tonnes", "sum"),
+                trips=("trips", "sum"),
+                _capacity=("_capacity", "sum"),
+                sbq_violations=("_sbq_violation", "sum"),
+            )
+            routes["capacity_used"] = (
+                routes["shipment_tonnes"] / routes["_capacity"].where(routes["_capacity"] > 0)
+            ).fillna(0.0)
+            routes = routes.drop(columns="_capacity").astype(float)
+            for (origin, destination, mode), values in routes.iterrows():
+                add("route", ROUTE_SEPARATOR.join((str(origin), str(destination), str(mode))), "", values.to_dict())
+
+        return cells
+
+    @staticmethod
+    def update_for_run(db: Session, opt_run: OptimizationRun) -> int:
+        """Add (or replace) the cells of a completed run and refresh its scenario.
+
+        Only this run's cells and at most one row per scenario are written, so
+        the cost does not grow with the number of stored runs. Returns the
+        number of cells written.
+        """
+        results = db.query(OptimizationResults).filter(OptimizationResults.run_id == opt_run.run_id).first()
+        if results is None:
+            logger.warning(f"No stored results for run {opt_run.run_id}; KPI cube not updated")
+            return 0
+
+        cells = KPICubeService.build_cells(db, results)
+        for cell in cells:
+            cell.update(scenario_name=opt_run.scenario_name, run_id=opt_run.run_id, completed_at=opt_run.completed_at)
+
+        replaced = db.execute(delete(KPICubeCell).where(KPICubeCell.run_id == opt_run.run_id)).rowcount
+        if cells:
+            db.execute(insert(KPICubeCell), cells)
+
+        totals = {c["metric"]: c["value"] for c in cells if c["dimension"] == "total" and c["period"] == ""}
+        scenario = db.query(KPICubeScenario).filter(KPICubeScenario.scenario_name == opt_run.scenario_name).first()
+        if scenario is None:
+            scenario = KPICubeScenario(scenario_name=opt_run.scenario_name, run_count=0)
+            db.add(scenario)
+        if not replaced:
+            scenario.run_count = (scenario.run_count or 0) + 1
+        is_latest = (
+            scenario.completed_at is None
+            or opt_run.completed_at is None
+            or opt_run.completed_at >= scenario.completed_at
+            or scenario.latest_run_id == opt_run.run_id
+        )
+        if is_latest:
+            scenario.latest_run_id = opt_run.run_id
+            scenario.completed_at = opt_run.completed_at
+            scenario.totals = totals
+            db.flush()
+            KPICubeService._refresh_deltas(db, scenario)
+
+        db.commit()
+        logger.info(f"KPI cube updated for run {opt_run.run_id}: {len(cells)} cells")
+        return len(cells)
+
+    @staticmethod
+    def _refresh_deltas(db: Session, changed: KPICubeScenario) -> None:
+        """Recompute deltas vs the base scenario for the rows affected by ``changed``."""
+        if changed.scenario_name == BASE_SCENARIO:
+            affected = db.query(KPICubeScenario).all()
+            base_totals = changed.totals
+        else:
+            affected = [changed]
+            base = db.query(KPICubeScenario).filter(KPICubeScenario.scenario_name == BASE_SCENARIO).first()
+            base_totals = base.totals if base is not None else None
+        for row in affected:
+            row.delta_vs_base = _deltas(row.totals or {}, base_totals) if base_totals is not None else None
+
+    @staticmethod
+    def get_dashboard(
+        db: Session, scenario_name: str, run_id: Optional[str] = None, max_routes: int = 50
+    ) -> Optional[Dict[str, Any]]:
+        """Dashboard payload of the latest (or given) run of a scenario, or None
+        if the run is not in the cube."""
+        scenario = db.query(KPICubeScenario).filter(KPICubeScenario.scenario_name == scenario_name).first()
+        if run_id is None:
+            if scenario is None:
+                return None
+            run_id = scenario.latest_run_id
+
+        cells = (
+            db.query(KPICubeCell.dimension, KPICubeCell.member, KPICubeCell.metric, KPICubeCell.value)
+            .filter(KPICubeCell.run_id == run_id, KPICubeCell.period == "")
+            .all()
+        )
+        if not cells:
+            return None
+        frame = pd.DataFrame(cells, columns=["dimension", "member", "metric", "value"])
+        totals = frame[frame["dimension"] == "total"].set_index("metric")["value"].to_dict()
+        plants = frame[frame["dimension"] == "plant"].pivot(index="member", columns="metric", values="value")
+        routes = frame[frame["dimension"] == "route"].pivot(index="member", columns="metric", values="value")
+
+        opt_run = db.query(OptimizationRun).filter(OptimizationRun.run_id == run_id).first()
+        plant_names = get_plant_names(db)
+
+        production_utilization = [
+            {
+                "plant_name": plant_names.get(plant_id, plant_id),
+                "plant_id": plant_id,
+                "production_used": row.get("production_tonnes", 0.0),
+                "production_capacity": row.get("capacity_tonnes", 0.0),
+                "utilization_pct": row.get("utilization", 0.0),
+            }
+            for plant_id, row in plants.iterrows()
+        ]
+        if not routes.empty:
+            routes = routes.sort_values("shipment_tonnes", ascending=False).head(max_routes)
+        transport_utilization = []
+        for member, row in routes.iterrows():
+            origin, destination, mode = member.split(ROUTE_SEPARATOR)
+            violations = int(row.get("sbq_violations", 0.0))
+            transport_utilization.append({
+                "from": plant_names.get(origin, origin),
+                "to": destination,
+                "mode": mode,
+                "tonnes": row.get("shipment_tonnes", 0.0),
+                "trips": int(row.get("trips", 0.0)),
+                "capacity_used_pct": row.get("capacity_used", 0.0),
+                "sbq_compliance": "Yes" if violations == 0 else "Partial",
+                "violations": violations,
+            })
+
+        completed_at = opt_run.completed_at if opt_run is not None else None
+        return {
+            "scenario_name": scenario_name,
+            "run_id": run_id,
+            "timestamp": completed_at.isoformat() if completed_at else None,
+            "status": "completed",
+            "solver_used": opt_run.solver_name if opt_run is not None else None,
+            "solve_time_seconds": opt_run.solve_time_seconds if opt_run is not None else None,
+            "total_cost": totals.get("total_cost", 0.0),
+            "cost_breakdown": {
+                "production_cost": totals.get("production_cost", 0.0),
+                "transport_cost": totals.get("transport_cost", 0.0),
+                "fixed_trip_cost": totals.get("fixed_trip_cost", 0.0),
+                "holding_cost": totals.get("inventory_cost", 0.0),
+                "penalty_cost": totals.get("penalty_cost", 0.0),
+            },
+            "production_utilization": production_utilization,
+            "transport_utilization": transport_utilization,
+            "service_performance": {
+                "demand_fulfillment_rate": totals.get("demand_fulfillment_rate", 0.0),
+                "on_time_delivery": totals.get("on_time_rate", 0.0),
+                "service_level": totals.get("service_level", 0.0),
+                "stockout_triggered": totals.get("stockout_events", 0.0) > 0,
+            },
+            "inventory_metrics": {
+                "stockout_events": int(totals.get("stockout_events", 0.0)),
+                "inventory_turns": totals.get("inventory_turns", 0.0),
+                "average_inventory_tonnes": totals.get("average_inventory_tonnes", 0.0),
+                "inventory_status": [
+                    {
+                        "location": plant_names.get(plant_id, plant_id),
+                        "opening_inventory": row.get("opening_inventory_tonnes", 0.0),
+                        "closing_inventory": row.get("closing_inventory_tonnes", 0.0),
+                    }
+                    for plant_id, row in plants.iterrows()
+                ],
+            },
+            "delta_vs_base": scenario.delta_vs_base if scenario is not None and scenario.latest_run_id == run_id else None,
+            "data_sources": {
+                "primary": "kpi_cube",
+                "external_used": False,
+                "quarantine_count": 0,
+                "last_refresh": completed_at.isoformat() if completed_at else None,
+                "optimization_run_id": run_id,
+            },
+        }
+
+    @staticmethod
+    def compare(
+        db: Session, scenario_names: List[str], baseline: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Latest totals of each scenario with deltas against ``baseline``
+        (default: the first requested scenario) and the stored deltas vs base.
+
+        Scenarios without cube rows are left out of the result.
+        """
+        rows = {
+            row.scenario_name: row
+            for row in db.query(KPICubeScenario).filter(KPICubeScenario.scenario_name.in_(scenario_names)).all()
+        }
+        baseline = baseline or (scenario_names[0] if scenario_names else None)
+        reference = rows[baseline].totals if baseline in rows else None
+
+        comparison = {}
+        for name in scenario_names:
+            row = rows.get(name)
+            if row is None:
+                continue
+            totals = row.totals or {}
+            comparison[name] = {
+                "scenario_name": name,
+                "run_id": row.latest_run_id,
+                "run_count": row.run_count,
+                "completed_at": row.completed_at.isoformat() if row.completed_at else None,
+                "total_cost": totals.get("total_cost", 0.0),
+                "cost_breakdown": {
+                    "production_cost": totals.get("production_cost", 0.0),
+                    "transport_cost": totals.get("transport_cost", 0.0),
+                    "fixed_trip_cost": totals.get("fixed_trip_cost", 0.0),
+                    "holding_cost": totals.get("inventory_cost", 0.0),
+                    "penalty_cost": totals.get("penalty_cost", 0.0),
+                },
+                "service_level": totals.get("service_level", 0.0),
+                "utilization": totals.get("production_utilization", 0.0),
+                "delta_vs_baseline": _deltas(
+                    {m: totals.get(m) for m in HISTORY_METRICS}, reference
+                ) if reference is not None else None,
+                "delta_vs_base": row.delta_vs_base,
+            }
+        return comparison
+
+    @staticmethod
+    def history(db: Session, scenario_name: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Run-level metrics of the last ``limit`` runs of a scenario, newest
+        first, each with its delta to the previous run."""
+        cells = (
+            db.query(KPICubeCell.run_id, KPICubeCell.completed_at, KPICubeCell.metric, KPICubeCell.value)
+            .filter(
+                KPICubeCell.scenario_name == scenario_name,
+                KPICubeCell.dimension == "total",
+                KPICubeCell.metric.in_(HISTORY_METRICS),
+                KPICubeCell.period == "",
+            )
+            .order_by(KPICubeCell.completed_at.desc(), KPICubeCell.id.desc())
+            .limit((limit + 1) * len(HISTORY_METRICS))
+            .all()
+        )
+        runs: Dict[str, Dict[str, Any]] = {}
+        for run_id, completed_at, metric, value in cells:
+            entry = runs.setdefault(run_id, {
+                "run_id": run_id,
+                "completed_at": completed_at.isoformat() if completed_at else None,
+                "metrics": {},
+            })
+            entry["metrics"][metric] = value
+        ordered = list(runs.values())
+        for current, previous in zip(ordered, ordered[1:] + [None]):
+            current["delta_vs_previous"] = (
+                _deltas(current["metrics"], previous["metrics"]) if previous is not None else None
+            )
+        return ordered[:limit]
+
+    @staticmethod
+    def run_totals(
+        db: Session, metrics: List[str], scenario_names: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """Run-level network totals, one row per run and one column per metric."""
+        query = db.query(KPICubeCell.run_id, KPICubeCell.metric, KPICubeCell.value).filter(
+            KPICubeCell.dimension == "total",
+            KPICubeCell.metric.in_(metrics),
+            KPICubeCell.period == "",
+        )
+        if scenario_names:
+            query = query.filter(KPICubeCell.scenario_name.in_(scenario_names))
+        frame = pd.DataFrame(query.all(), columns=["run_id", "metric", "value"])
+        return frame.pivot(index="run_id", columns="metric", values="value").reindex(columns=metrics)
+
+    @staticmethod
+    def summary(db: Session, period_hours: int = 24) -> Dict[str, Any]:
+        """Run counts, averages and trends over the last ``period_hours``."""
+        now = datetime.utcnow()
+        cutoff = now - timedelta(hours=period_hours)
+        midpoint = now - timedelta(hours=period_hours / 2.0)
+
+        status_counts = dict(
+            db.query(OptimizationRun.status, func.count(OptimizationRun.id))
+            .filter(OptimizationRun.completed_at >= cutoff)
+            .group_by(OptimizationRun.status)
+            .all()
+        )
+        failures = (
+            db.query(OptimizationRun.scenario_name, func.count(OptimizationRun.id))
+            .filter(OptimizationRun.completed_at >= cutoff, OptimizationRun.status == "failed")
+            .group_by(OptimizationRun.scenario_name)
+            .all()
+        )
+
+        later = case((KPICubeCell.completed_at >= midpoint, 1), else_=0)
+        averages = (
+            db.query(KPICubeCell.metric, later, func.avg(KPICubeCell.value), func.count(KPICubeCell.id))
+            .filter(
+                KPICubeCell.dimension == "total",
+                KPICubeCell.metric.in_(("total_cost", "service_level")),
+                KPICubeCell.period == "",
+                KPICubeCell.completed_at >= cutoff,
+            )
+            .group_by(KPICubeCell.metric, later)
+            .all()
+        )
+        halves: Dict[str, Dict[int, tuple]] = {}
+        for metric, half, avg, count in averages:
+            halves.setdefault(metric, {})[int(half)] = (float(avg), int(count))
+
+        def overall(metric: str) -> float:
+            parts = halves.get(metric, {}).values()
+            count = sum(c for _, c in parts)
+            return sum(a * c for a, c in parts) / count if count else 0.0
+
+        def trend(metric: str, up: str, down: str) -> str:
+            parts = halves.get(metric, {})
+            if 0 not in parts or 1 not in parts or not parts[0][0]:
+                return "stable"
+            change = (parts[1][0] - parts[0][0]) / abs(parts[0][0])
+            return up if change > 0.02 else down if change < -0.02 else "stable"
+
+        scenarios = db.query(KPICubeScenario).all()
+        lowest = min(scenarios, key=lambda s: (s.totals or {}).get("total_cost", float("inf")), default=None)
+        highest = max(scenarios, key=lambda s: (s.totals or {}).get("service_level", 0.0), default=None)
+
+        return {
+            "period_hours": period_hours,
+            "summary_timestamp": now.isoformat(),
+            "total_runs": sum(status_counts.values()),
+            "successful_runs": status_counts.get("completed", 0),
+            "failed_runs": status_counts.get("failed", 0),
+            "average_total_cost": overall("total_cost"),
+            "average_service_level": overall("service_level"),
+            "cost_trend": trend("total_cost", "increasing", "decreasing"),
+            "service_trend": trend("service_level", "improving", "declining"),
+            "top_performers": {
+                "lowest_cost": (
+                    {"scenario": lowest.scenario_name, "cost": lowest.totals.get("total_cost")} if lowest else None
+                ),
+                "highest_service": (
+                    {"scenario": highest.scenario_name, "service_level": highest.totals.get("service_level")}
+                    if highest else None
+                ),
+            },
+            "issues": [
+                {"type": "failed_run", "count": count, "scenario": name} for name, count in failures
+            ],
+        }
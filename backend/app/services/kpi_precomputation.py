@@ -6,8 +6,11 @@ Avoids expensive calculations on every dashboard request.
 """
 
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union
 from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from app.db.models.kpi_precomputed import KPIPrecomputed, KPIAggregated
@@ -17,6 +20,21 @@ from app.utils.currency import format_rupees
 logger = logging.getLogger(__name__)
 
 
+def _plan_frame(plan: Union[pd.DataFrame, List[Dict[str, Any]], None], value_column: str) -> pd.DataFrame:
+    """``period``/``value_column`` columns of a plan given as records or a DataFrame.
+
+    Missing periods stay missing and missing values count as zero, as in the
+    record-by-record ``.get()`` lookups this replaces.
+    """
+    df = plan if isinstance(plan, pd.DataFrame) else pd.DataFrame.from_records(list(plan or []))
+    period = df["period"] if "period" in df.columns else pd.Series(None, index=df.index, dtype=object)
+    if value_column in df.columns:
+        values = pd.to_numeric(df[value_column], errors="coerce").fillna(0.0)
+    else:
+        values = pd.Series(0.0, index=df.index)
+    return pd.DataFrame({"period": period.astype(object), value_column: values})
+
+
 class KPIPrecomputationService:
     """Service for precomputing and caching KPIs."""
     
@@ -34,93 +52,82 @@ class KPIPrecomputationService:
             db: Database session
             optimization_run_id: ID of optimization run
             scenario_name: Scenario name
-            optimization_results: Results from optimizer
+            optimization_results: Results from optimizer; plans may be lists
+                of records or DataFrames
         """
         try:
             logger.info(f"Precomputing KPIs for run {optimization_run_id}, scenario {scenario_name}")
             
             # Extract data from results
             cost_breakdown = optimization_results.get("cost_breakdown", {})
-            production_plan = optimization_results.get("production_plan", [])
-            shipment_plan = optimization_results.get("shipment_plan", [])
-            trip_plan = optimization_results.get("trip_plan", [])
-            inventory_profile = optimization_results.get("inventory_profile", [])
             service_metrics = optimization_results.get("service_metrics", {})
             utilization_metrics = optimization_results.get("utilization_metrics", {})
             
-            # Aggregate by period
-            periods = set()
-            for plan in production_plan:
-                periods.add(plan.get("period"))
-            for plan in shipment_plan:
-                periods.add(plan.get("period"))
+            production = _plan_frame(optimization_results.get("production_plan", []), "production_tonnes")
+            shipments = _plan_frame(optimization_results.get("shipment_plan", []), "shipment_tonnes")
+            trips = _plan_frame(optimization_results.get("trip_plan", []), "trips")
+            inventory = _plan_frame(optimization_results.get("inventory_profile", []), "inventory_tonnes")
+            
+            # One groupby per plan; periods are those with production or shipments
+            production_by_period = production.groupby("period", dropna=False)["production_tonnes"].sum()
+            shipments_by_period = shipments.groupby("period", dropna=False)["shipment_tonnes"].sum()
+            periods = production_by_period.index.union(shipments_by_period.index)
+            per_period = pd.DataFrame({
+                "total_production_tonnes": production_by_period.reindex(periods, fill_value=0.0),
+                "total_shipment_tonnes": shipments_by_period.reindex(periods, fill_value=0.0),
+                "total_trips": trips.groupby("period", dropna=False)["trips"].sum().reindex(periods, fill_value=0),
+                "average_inventory_tonnes": (
+                    inventory.groupby("period", dropna=False)["inventory_tonnes"].mean().reindex(periods, fill_value=0.0)
+                ),
+            }, index=periods)
+            
+            computed_at = datetime.now()
+            run_values = {
+                "optimization_run_id": optimization_run_id,
+                "scenario_name": scenario_name,
+                "total_cost": optimization_results.get("objective_value", 0),
+                "production_cost": cost_breakdown.get("production_cost", 0),
+                "transport_cost": cost_breakdown.get("transport_cost", 0),
+                "fixed_trip_cost": cost_breakdown.get("fixed_trip_cost", 0),
+                "holding_cost": cost_breakdown.get("holding_cost", 0),
+                "penalty_cost": cost_breakdown.get("penalty_cost", 0),
+                "production_utilization": utilization_metrics.get("production_utilization", 0),
+                "transport_utilization": utilization_metrics.get("transport_utilization", 0),
+                "sbq_compliance_rate": 1.0,  # Calculate from actual data
+                "inventory_turns": utilization_metrics.get("inventory_turns", 12.0),
+                "total_demand_tonnes": 0,  # Would need to load from demand data
+                "total_unmet_demand_tonnes": 0,  # Would need to calculate
+                "demand_fulfillment_rate": service_metrics.get("demand_fulfillment_rate", 1.0),
+                "service_level": service_metrics.get("service_level", 1.0),
+                "stockout_events": service_metrics.get("stockout_events", 0),
+                "computed_at": computed_at,
+            }
+            kpi_rows = [
+                {
+                    **run_values,
+                    "period": None if pd.isna(period) else period,
+                    "total_production_tonnes": float(row.total_production_tonnes),
+                    "total_shipment_tonnes": float(row.total_shipment_tonnes),
+                    "total_trips": int(row.total_trips),
+                    "average_inventory_tonnes": float(row.average_inventory_tonnes),
+                }
+                for period, row in zip(per_period.index, per_period.itertuples(index=False))
+            ]
             
-            # Create KPI records for each period
-            for period in periods:
-                # Calculate period-specific KPIs
-                period_production = sum(
-                    p.get("production_tonnes", 0)
-                    for p in production_plan
-                    if p.get("period") == period
-                )
-                
-                period_shipment = sum(
-                    s.get("shipment_tonnes", 0)
-                    for s in shipment_plan
-                    if s.get("period") == period
-                )
-                
-                period_trips = sum(
-                    t.get("trips", 0)
-                    for t in trip_plan
-                    if t.get("period") == period
-                )
-                
-                period_inventory = sum(
-                    inv.get("inventory_tonnes", 0)
-                    for inv in inventory_profile
-                    if inv.get("period") == period
-                ) / max(len([inv for inv in inventory_profile if inv.get("period") == period]), 1)
-                
-                # Create KPI record
-                kpi = KPIPrecomputed(
-                    optimization_run_id=optimization_run_id,
-                    scenario_name=scenario_name,
-                    period=period,
-                    total_cost=optimization_results.get("objective_value", 0),
-                    production_cost=cost_breakdown.get("production_cost", 0),
-                    transport_cost=cost_breakdown.get("transport_cost", 0),
-                    fixed_trip_cost=cost_breakdown.get("fixed_trip_cost", 0),
-                    holding_cost=cost_breakdown.get("holding_cost", 0),
-                    penalty_cost=cost_breakdown.get("penalty_cost", 0),
-                    total_production_tonnes=period_production,
-                    production_utilization=utilization_metrics.get("production_utilization", 0),
-                    total_shipment_tonnes=period_shipment,
-                    total_trips=period_trips,
-                    transport_utilization=utilization_metrics.get("transport_utilization", 0),
-                    sbq_compliance_rate=1.0,  # Calculate from actual data
-                    average_inventory_tonnes=period_inventory,
-                    inventory_turns=utilization_metrics.get("inventory_turns", 12.0),
-                    total_demand_tonnes=0,  # Would need to load from demand data
-                    total_unmet_demand_tonnes=0,  # Would need to calculate
-                    demand_fulfillment_rate=service_metrics.get("demand_fulfillment_rate", 1.0),
-                    service_level=service_metrics.get("service_level", 1.0),
-                    stockout_events=service_metrics.get("stockout_events", 0),
-                    computed_at=datetime.now()
-                )
-                
-                db.add(kpi)
+            # All per-period rows in one executemany INSERT
+            if kpi_rows:
+                db.execute(insert(KPIPrecomputed), kpi_rows)
             
             # Create aggregated KPI record
             aggregated = KPIAggregated(
                 scenario_name=scenario_name,
                 total_cost=optimization_results.get("objective_value", 0),
                 cost_breakdown=cost_breakdown,
-                total_production=sum(p.get("production_tonnes", 0) for p in production_plan),
-                total_shipment=sum(s.get("shipment_tonnes", 0) for s in shipment_plan),
-                total_trips=sum(t.get("trips", 0) for t in trip_plan),
+                total_production=float(production["production_tonnes"].sum()),
+                total_shipment=float(shipments["shipment_tonnes"].sum()),
+                total_trips=int(trips["trips"].sum()),
                 average_service_level=service_metrics.get("service_level", 1.0),
-                last_updated=datetime.now()
+                last_updated=computed_at
             )
             
             # Update or insert aggregated
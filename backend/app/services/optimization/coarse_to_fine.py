@@ -0,0 +1,250 @@
+"""Coarse-to-fine solve through customer aggregation and lane refinement.
+
+Grinding units and other demand nodes are clustered into super-nodes by
+geography and demand profile. Geography is taken from the route table: each
+customer is described by its distance from every plant, which is what the
+model actually sees of its location. The reduced model over super-nodes is
+solved first; its active (plant, cluster, mode) lanes then restrict the
+candidate routes of the full-resolution model to
+
+- the member routes of every active coarse lane, and
+- the ``k_cheapest`` alternative routes into every customer, ranked by
+  effective transport cost per tonne,
+
+after which :func:`build_clinker_model` runs on the restricted route set. If
+the restricted model cannot be solved the full network is solved instead.
+"""
+
+import math
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pyomo.environ import TransformationFactory, value
+
+from app.services.optimization.model_builder import build_clinker_model
+from app.services.optimization.solvers import solve_model
+from app.utils.exceptions import OptimizationError
+
+DEFAULT_K_CHEAPEST = 2
+_KMEANS_ITERATIONS = 50
+_ACTIVE_TOL = 1e-6
+
+
+def _numeric(df: pd.DataFrame, column: str) -> pd.Series:
+    if column not in df.columns:
+        return pd.Series(np.nan, index=df.index)
+    return pd.to_numeric(df[column], errors="coerce")
+
+
+def _effective_cost_per_tonne(routes_df: pd.DataFrame) -> pd.Series:
+    """Per-tonne transport cost with the same precedence as the model builder."""
+
+    cost = _numeric(routes_df, "cost_per_tonne")
+    per_km = _numeric(routes_df, "cost_per_tonne_km")
+    distance = _numeric(routes_df, "distance_km").fillna(0.0)
+    from_km = (per_km * distance).where(distance > 0.0)
+    return cost.fillna(from_km).fillna(0.0)
+
+
+def _customer_features(data: Dict[str, Any], customers: List[Any]) -> np.ndarray:
+    """Standardised [distance to each plant, normalised demand profile] rows."""
+
+    routes_df = data["transport_routes_modes"]
+    demand_df = data["demand_forecast"]
+
+    distance = _numeric(routes_df, "distance_km")
+    dist = (
+        routes_df.assign(_d=distance)
+        .groupby(["destination_node_id", "origin_plant_id"])["_d"]
+        .min()
+        .unstack()
+        .reindex(customers)
+    )
+    # Unreachable plants count as twice the longest observed lane
+    far = np.nanmax(dist.to_numpy()) * 2.0 if dist.notna().to_numpy().any() else 1.0
+    dist = dist.fillna(far)
+
+    profile = demand_df.pivot_table(
+        index="customer_node_id", columns="period", values="demand_tonnes", aggfunc="sum", fill_value=0.0
+    ).reindex(customers, fill_value=0.0)
+    totals = profile.sum(axis=1).replace(0.0, 1.0)
+    shape = profile.div(totals, axis=0)
+
+    features = np.hstack([dist.to_numpy(), shape.to_numpy(), np.log1p(totals.to_numpy())[:, None]])
+    std = features.std(axis=0)
+    std[std == 0.0] = 1.0
+    return (features - features.mean(axis=0)) / std
+
+
+def _kmeans(features: np.ndarray, n_clusters: int, seed: int = 42) -> np.ndarray:
+    """Plain Lloyd's k-means with k-means++ seeding; returns cluster labels."""
+
+    rng = np.random.default_rng(seed)
+    n = features.shape[0]
+    centers = [features[rng.integers(n)]]
+    for _ in range(1, n_clusters):
+        d2 = np.min(((features[:, None, :] - np.array(centers)[None, :, :]) ** 2).sum(axis=2), axis=1)
+        probs = d2 / d2.sum() if d2.sum() > 0 else np.full(n, 1.0 / n)
+        centers.append(features[rng.choice(n, p=probs)])
+    centers = np.array(centers)
+
+    labels = np.zeros(n, dtype=int)
+    for iteration in range(_KMEANS_ITERATIONS):
+        d2 = ((features[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        new_labels = d2.argmin(axis=1)
+        if np.array_equal(new_labels, labels) and iteration > 0:
+            break
+        labels = new_labels
+        for c in range(n_clusters):
+            members = features[labels == c]
+            if len(members):
+                centers[c] = members.mean(axis=0)
+    return labels
+
+
+def cluster_customers(data: Dict[str, Any], n_clusters: Optional[int] = None) -> Dict[Any, str]:
+    """Assign every demand node to a super-node label ``CLUSTER_nnn``.
+
+    ``n_clusters`` defaults to roughly the square root of the customer count.
+    """
+
+    customers = list(dict.fromkeys(data["demand_forecast"]["customer_node_id"].tolist()))
+    if not customers:
+        return {}
+    if n_clusters is None:
+        n_clusters = max(1, int(round(math.sqrt(len(customers)))))
+    n_clusters = min(n_clusters, len(customers))
+
+    labels = _kmeans(_customer_features(data, customers), n_clusters)
+    return {c: f"CLUSTER_{label:03d}" for c, label in zip(customers, labels)}
+
+
+def build_coarse_model_data(data: Dict[str, Any], assignment: Dict[Any, str]) -> Dict[str, Any]:
+    """Collapse customers into their super-nodes.
+
+    Demand is summed per cluster and period. Each (plant, cluster, mode) lane
+    takes the demand-weighted average per-tonne cost, distance, fixed trip
+    cost and vehicle capacity of its member routes, and the smallest member
+    SBQ so the coarse model never over-constrains a lane.
+    """
+
+    demand_df = data["demand_forecast"].copy()
+    demand_df["customer_node_id"] = demand_df["customer_node_id"].map(assignment)
+    coarse_demand = (
+        demand_df.groupby(["customer_node_id", "period"], sort=False)["demand_tonnes"].sum().reset_index()
+    )
+
+    weight = data["demand_forecast"].groupby("customer_node_id")["demand_tonnes"].sum()
+    routes_df = data["transport_routes_modes"]
+    routes_df = routes_df[routes_df["destination_node_id"].isin(assignment)].copy()
+    routes_df["cost_per_tonne"] = _effective_cost_per_tonne(routes_df)
+    routes_df["_w"] = routes_df["destination_node_id"].map(weight).fillna(0.0) + 1e-9
+    routes_df["destination_node_id"] = routes_df["destination_node_id"].map(assignment)
+
+    averaged = ["cost_per_tonne", "distance_km", "fixed_cost_per_trip", "vehicle_capacity_tonnes"]
+    for col in averaged:
+        routes_df[col] = _numeric(routes_df, col).fillna(0.0) * routes_df["_w"]
+    routes_df["min_batch_quantity_tonnes"] = _numeric(routes_df, "min_batch_quantity_tonnes").fillna(0.0)
+    keys = ["origin_plant_id", "destination_node_id", "transport_mode"]
+    grouped = routes_df.groupby(keys, sort=False)
+    coarse_routes = grouped[averaged + ["_w"]].sum()
+    for col in averaged:
+        coarse_routes[col] = coarse_routes[col] / coarse_routes["_w"]
+    coarse_routes["min_batch_quantity_tonnes"] = grouped["min_batch_quantity_tonnes"].min()
+    coarse_routes["cost_per_tonne_km"] = None
+    coarse_routes = coarse_routes.drop(columns="_w").reset_index()
+
+    coarse = dict(data)
+    coarse["demand_forecast"] = coarse_demand
+    coarse["transport_routes_modes"] = coarse_routes
+    return coarse
+
+
+def restrict_routes(
+    data: Dict[str, Any],
+    coarse_model,
+    assignment: Dict[Any, str],
+    k_cheapest: int = DEFAULT_K_CHEAPEST,
+) -> pd.DataFrame:
+    """Routes of the full network kept for the fine solve."""
+
+    active = set()
+    for (i, c, mode) in coarse_model.R:
+        if any(float(value(coarse_model.ship[i, c, mode, t])) > _ACTIVE_TOL for t in coarse_model.T):
+            active.add((i, c, mode))
+
+    routes_df = data["transport_routes_modes"]
+    cluster = routes_df["destination_node_id"].map(assignment)
+    keep = pd.Series(
+        [(o, c, m) in active for o, c, m in zip(routes_df["origin_plant_id"], cluster, routes_df["transport_mode"])],
+        index=routes_df.index,
+    )
+
+    if k_cheapest > 0:
+        cost = _effective_cost_per_tonne(routes_df)
+        cost_rank = cost.groupby(routes_df["destination_node_id"]).rank(method="first")
+        keep |= cost_rank <= k_cheapest
+
+    return routes_df[keep]
+
+
+def solve_coarse_to_fine(
+    data: Dict[str, Any],
+    n_clusters: Optional[int] = None,
+    k_cheapest: int = DEFAULT_K_CHEAPEST,
+    solver_name: Optional[str] = None,
+    time_limit_seconds: Optional[int] = None,
+    mip_gap: Optional[float] = None,
+    penalty_config: Optional[Dict[str, float]] = None,
+    relax_coarse: bool = True,
+    **model_options: Any,
+) -> Tuple[Any, Dict[str, Any]]:
+    """Two-level solve: clustered model first, then the restricted full model.
+
+    Returns
+    -------
+    tuple
+        ``(model, solver_meta)`` for the full-resolution model, where
+        ``solver_meta["coarse_to_fine"]`` reports cluster count, route counts
+        and stage runtimes.
+    """
+
+    start = time.perf_counter()
+    assignment = cluster_customers(data, n_clusters)
+    coarse_data = build_coarse_model_data(data, assignment)
+    coarse_model = build_clinker_model(coarse_data, penalty_config, **model_options)
+    if relax_coarse:
+        TransformationFactory("core.relax_integer_vars").apply_to(coarse_model)
+    coarse_meta = solve_model(coarse_model, solver_name, time_limit_seconds, mip_gap)
+    coarse_seconds = time.perf_counter() - start
+
+    fine_start = time.perf_counter()
+    restricted = restrict_routes(data, coarse_model, assignment, k_cheapest)
+    fine_data = dict(data)
+    fine_data["transport_routes_modes"] = restricted
+    restricted_solved = True
+    try:
+        model = build_clinker_model(fine_data, penalty_config, **model_options)
+        meta = solve_model(model, solver_name, time_limit_seconds, mip_gap)
+    except OptimizationError:
+        # The restricted lane set can cut off every feasible plan
+        restricted_solved = False
+        model = build_clinker_model(data, penalty_config, **model_options)
+        meta = solve_model(model, solver_name, time_limit_seconds, mip_gap)
+    fine_seconds = time.perf_counter() - fine_start
+
+    meta = dict(meta)
+    meta["coarse_to_fine"] = {
+        "clusters": len(set(assignment.values())),
+        "customers": len(assignment),
+        "coarse_objective": coarse_meta.get("objective"),
+        "routes_total": len(data["transport_routes_modes"]),
+        "routes_kept": len(restricted) if restricted_solved else len(data["transport_routes_modes"]),
+        "restricted_solved": restricted_solved,
+        "coarse_seconds": coarse_seconds,
+        "fine_seconds": fine_seconds,
+    }
+    meta["runtime_seconds"] = coarse_seconds + fine_seconds
+    return model, meta
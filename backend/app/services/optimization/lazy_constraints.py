@@ -0,0 +1,249 @@
+"""Cutting-plane solve for the SBQ and trip linking constraints.
+
+``sbq_lower``, ``sbq_upper`` and ``trip_capacity`` are indexed by every
+(route, period) and dominate the row count of the clinker model, yet only a
+small fraction of them bind at the optimum. A model built with
+``build_clinker_model(..., lazy_linking=True)`` omits them and exposes an
+empty ``ConstraintList`` named ``lazy_linking`` instead.
+
+:func:`solve_with_lazy_linking` solves that relaxed model, checks all linking
+rows against the solution in one vectorized pass, adds only the violated
+rows and re-solves until the solution satisfies every linking constraint.
+With HiGHS the re-solves go through the APPSI persistent interface so only
+the new rows are sent to the solver and each solve is warm-started; rows are
+first separated against LP relaxations and the MIP is only solved once the
+relaxation is free of violations.
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from pyomo.environ import value
+
+from app.utils.exceptions import OptimizationError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ITERATIONS = 50
+VIOLATION_TOL = 1e-6
+
+_ROW_KINDS = ("trip_capacity", "sbq_upper", "sbq_lower")
+
+
+class _LinkingIndex:
+    """Flat arrays over all (route, period) pairs of a lazily linked model."""
+
+    def __init__(self, model):
+        self.keys: List[Tuple[Any, Any, Any, Any]] = [
+            (i, j, mode, t) for (i, j, mode) in model.R for t in model.T
+        ]
+        self.vehicle_cap = np.array(
+            [float(value(model.vehicle_cap[i, j, mode])) for (i, j, mode, _) in self.keys]
+        )
+        self.sbq = np.array([float(value(model.sbq[i, j, mode])) for (i, j, mode, _) in self.keys])
+        self.big_m = float(model._big_m)
+        route_ids = {r: n for n, r in enumerate(model.R)}
+        self.route_pos = np.array([route_ids[(i, j, mode)] for (i, j, mode, _) in self.keys], dtype=int)
+        dest_ids = {j: n for n, j in enumerate(model.J)}
+        self.dest_pos = np.array([dest_ids[j] for (_, j, _, _) in self.keys], dtype=int)
+
+    def values(self, var) -> np.ndarray:
+        return np.fromiter(
+            (var[k].value or 0.0 for k in self.keys), dtype=float, count=len(self.keys)
+        )
+
+
+def _violated_rows(
+    model, index: _LinkingIndex, added: Set[Tuple[str, int]], group: np.ndarray
+) -> List[Tuple[str, int]]:
+    """Return (row kind, position) of the linking rows to add for the current solution.
+
+    Every row of a (route, period) whose group (route or destination) has a
+    violation is returned; ``sbq_lower`` rows are skipped where SBQ is zero
+    since they can never bind.
+    """
+
+    ship = index.values(model.ship)
+    trips = index.values(model.trips)
+    use_mode = index.values(model.use_mode)
+
+    checks = {
+        "trip_capacity": ship - index.vehicle_cap * trips > VIOLATION_TOL,
+        "sbq_upper": ship - index.big_m * use_mode > VIOLATION_TOL,
+        "sbq_lower": index.sbq * use_mode - ship > VIOLATION_TOL,
+    }
+    # A lane that is attractive without its linking rows in one period is
+    # attractive in every period, so rows are added for whole groups at once.
+    lane_violated = checks["trip_capacity"] | checks["sbq_upper"] | checks["sbq_lower"]
+    lanes = np.flatnonzero(np.isin(group, np.unique(group[lane_violated])))
+    return [
+        (kind, int(pos))
+        for pos in lanes
+        for kind in _ROW_KINDS
+        if (kind, int(pos)) not in added and not (kind == "sbq_lower" and index.sbq[pos] <= 0.0)
+    ]
+
+
+def _add_rows(model, index: _LinkingIndex, rows: List[Tuple[str, int]]) -> list:
+    """Append linking rows to ``model.lazy_linking`` and return the new ConstraintData."""
+
+    new_constraints = []
+    for kind, pos in rows:
+        key = index.keys[pos]
+        i, j, mode, _ = key
+        if kind == "trip_capacity":
+            expr = model.ship[key] <= model.vehicle_cap[i, j, mode] * model.trips[key]
+        elif kind == "sbq_upper":
+            expr = model.ship[key] <= index.big_m * model.use_mode[key]
+        else:
+            expr = model.ship[key] >= model.sbq[i, j, mode] * model.use_mode[key]
+        new_constraints.append(model.lazy_linking.add(expr))
+    return new_constraints
+
+
+def _persistent_highs(time_limit: int, mip_gap: float):
+    """Return a configured APPSI HiGHS instance, or None if unavailable."""
+
+    try:
+        from pyomo.contrib.appsi.solvers import Highs
+    except ImportError:
+        return None
+    opt = Highs()
+    if not opt.available():
+        return None
+    opt.config.time_limit = time_limit
+    opt.config.mip_gap = mip_gap
+    opt.config.warmstart = True
+    # APPSI raises on load when no feasible solution exists; run() checks the
+    # termination first and loads the solution itself.
+    opt.config.load_solution = False
+    # Rows are pushed explicitly with add_constraints(); skip model diffing.
+    opt.update_config.check_for_new_or_removed_constraints = False
+    opt.update_config.check_for_new_or_removed_vars = False
+    opt.update_config.check_for_new_or_removed_params = False
+    opt.update_config.update_constraints = False
+    opt.update_config.update_vars = False
+    opt.update_config.update_params = False
+    opt.update_config.update_named_expressions = False
+    return opt
+
+
+def solve_with_lazy_linking(
+    model,
+    solver_name: str,
+    time_limit: int,
+    mip_gap: float,
+    solve_once: Callable[[Any], Dict[str, Any]],
+    max_iterations: int = DEFAULT_MAX_ITERATIONS,
+) -> Dict[str, Any]:
+    """Solve a ``lazy_linking`` model by iteratively adding violated rows.
+
+    Parameters
+    ----------
+    model:
+        Model built with ``build_clinker_model(..., lazy_linking=True)``.
+    solver_name:
+        Requested solver; "highs" and "auto" use the persistent interface.
+    time_limit, mip_gap:
+        Per-iteration solver limits.
+    solve_once:
+        Fallback single-solve callable (the regular solver chain) used when
+        no persistent solver is available.
+    max_iterations:
+        After this many rounds all remaining linking rows are added and the
+        model is solved one final time.
+
+    Returns
+    -------
+    Dict[str, Any]
+        Solver metadata as returned by :func:`solve_model`, plus
+        ``lazy_iterations``, ``lazy_rows_added`` and ``lazy_rows_total``.
+    """
+
+    if not hasattr(model, "lazy_linking"):
+        raise OptimizationError("Model was not built with lazy_linking=True")
+
+    start = time.perf_counter()
+    index = _LinkingIndex(model)
+    added: Set[Tuple[str, int]] = set()
+    persistent: Optional[Any] = None
+    if solver_name in ("highs", "auto"):
+        persistent = _persistent_highs(time_limit, mip_gap)
+
+    def run() -> Dict[str, Any]:
+        if persistent is None:
+            return solve_once(model)
+        results = persistent.solve(model)
+        termination = str(results.termination_condition)
+        if results.best_feasible_objective is None:
+            raise OptimizationError(f"Solver highs failed: termination={termination}")
+        results.solution_loader.load_vars()
+        return {
+            "status": "optimal" if termination.endswith("optimal") else "feasible",
+            "solver": "highs",
+            "objective": float(results.best_feasible_objective),
+            "runtime_seconds": None,
+            "gap": None,
+            "nodes_explored": None,
+            "termination": termination,
+        }
+
+    if persistent is not None:
+        persistent.set_instance(model)
+
+    # With a persistent solver the loop first separates against cheap, warm-
+    # started LP relaxations and only switches to MIP solves once the LP
+    # solution satisfies every linking row.
+    lp_phase = persistent is not None
+    if lp_phase:
+        persistent.highs_options["solve_relaxation"] = True
+
+    iterations = 0
+    solver_meta = run()
+    while True:
+        iterations += 1
+        # LP rounds are cheap, so they separate per route; MIP rounds are
+        # expensive and pull in every lane into a violated destination.
+        group = index.route_pos if lp_phase else index.dest_pos
+        violated = _violated_rows(model, index, added, group)
+        if not violated:
+            if not lp_phase:
+                break
+            lp_phase = False
+            persistent.highs_options["solve_relaxation"] = False
+            solver_meta = run()
+            continue
+        if iterations >= max_iterations:
+            logger.warning(
+                f"Lazy linking did not converge in {max_iterations} iterations; adding all remaining rows"
+            )
+            violated = [
+                (kind, pos)
+                for kind in _ROW_KINDS
+                for pos in range(len(index.keys))
+                if (kind, pos) not in added and not (kind == "sbq_lower" and index.sbq[pos] <= 0.0)
+            ]
+            if lp_phase:
+                lp_phase = False
+                persistent.highs_options["solve_relaxation"] = False
+        new_constraints = _add_rows(model, index, violated)
+        added.update(violated)
+        if persistent is not None:
+            persistent.add_constraints(new_constraints)
+        logger.info(f"Lazy linking iteration {iterations}: added {len(violated)} rows")
+        solver_meta = run()
+        if iterations >= max_iterations:
+            break
+
+    solver_meta.update(
+        {
+            "runtime_seconds": time.perf_counter() - start,
+            "solve_path": "lazy_constraints",
+            "lazy_iterations": iterations,
+            "lazy_rows_added": len(added),
+            "lazy_rows_total": 3 * len(index.keys),
+        }
+    )
+    return solver_meta
@@ -5,6 +5,7 @@ from pyomo.environ import (
     Binary,
     ConcreteModel,
     Constraint,
+    ConstraintList,
     NonNegativeIntegers,
     NonNegativeReals,
     Objective,
@@ -14,6 +15,8 @@ from pyomo.environ import (
     minimize,
 )
 
+from app.services.optimization.valid_inequalities import add_valid_inequalities
+
 
 def _safe_float(value: Any, default: float = 0.0) -> float:
     """Best-effort conversion to float with a default fallback."""
@@ -38,7 +41,12 @@ def _ordered_unique(values: Iterable[Any]) -> List[Any]:
     return ordered
 
 
-def build_clinker_model(data: Dict[str, Any], penalty_config: Optional[Dict[str, float]] = None) -> ConcreteModel:
+def build_clinker_model(
+    data: Dict[str, Any],
+    penalty_config: Optional[Dict[str, float]] = None,
+    strengthen: bool = False,
+    lazy_linking: bool = False,
+) -> ConcreteModel:
     """Build the MILP model for clinker supply chain optimization.
 
     Parameters
@@ -63,6 +71,17 @@ def build_clinker_model(data: Dict[str, Any], penalty_config: Optional[Dict[str,
         - ``initial_inventory`` (optional): columns
             ``node_id, period, inventory_tonnes``.
         - ``time_periods`` (optional): ordered list of period identifiers.
+    penalty_config:
+        Optional penalty rates enabling the soft-constraint variables.
+    strengthen:
+        If True, add the valid inequalities from
+        :mod:`app.services.optimization.valid_inequalities` to tighten the
+        LP relaxation of the SBQ/trip linking.
+    lazy_linking:
+        If True, omit the ``trip_capacity``, ``sbq_lower`` and ``sbq_upper``
+        blocks and declare an empty ``lazy_linking`` ConstraintList instead;
+        :func:`solve_model` then adds only the violated rows iteratively
+        (see :mod:`app.services.optimization.lazy_constraints`).
 
     Returns
     -------
@@ -78,6 +97,9 @@ def build_clinker_model(data: Dict[str, Any], penalty_config: Optional[Dict[str,
     - SBQ is implemented with a binary activation variable per
       (origin, destination, mode, period).
     - Trips are integer and linked to shipment via per-trip capacity.
+    - When no route has SBQ or a fixed trip cost the model is flagged as a
+      pure network flow (``model._pure_network_flow``) so that
+      :func:`solve_model` can bypass the MILP solver.
     """
 
     # --- Extract input dataframes -------------------------------------------------
@@ -199,6 +221,15 @@ def build_clinker_model(data: Dict[str, Any], penalty_config: Optional[Dict[str,
     m._trans_cost = trans_cost_dict
     m._fixed_trip_cost = fixed_trip_cost_dict
     m._hold_cost = hold_cost_dict
+    m._penalty_config = dict(penalty_config or {})
+    m._big_m = big_m
+
+    # Without SBQ and fixed trip costs, trips/use_mode are free and the model
+    # is a pure min-cost flow; solve_model dispatches it to network simplex.
+    m._pure_network_flow = all(
+        sbq_dict.get(r, 0.0) <= 0.0 and fixed_trip_cost_dict.get(r, 0.0) == 0.0
+        for r in routes
+    )
 
     # Pyomo Params ---------------------------------------------------------------
     m.cap = Param(
@@ -309,23 +340,28 @@ def build_clinker_model(data: Dict[str, Any], penalty_config: Optional[Dict[str,
 
     m.demand_satisfaction = Constraint(m.J, m.T, rule=demand_satisfaction_rule)
 
-    # Per-trip transport capacity per route & period
-    def trip_capacity_rule(_m, i, j, mode, t):
-        return _m.ship[i, j, mode, t] <= _m.vehicle_cap[i, j, mode] * _m.trips[i, j, mode, t]
+    # SBQ/trip linking rows; generated on demand in lazy mode
+    m._lazy_linking = lazy_linking
+    if lazy_linking:
+        m.lazy_linking = ConstraintList()
+    else:
+        # Per-trip transport capacity per route & period
+        def trip_capacity_rule(_m, i, j, mode, t):
+            return _m.ship[i, j, mode, t] <= _m.vehicle_cap[i, j, mode] * _m.trips[i, j, mode, t]
 
-    m.trip_capacity = Constraint(m.R, m.T, rule=trip_capacity_rule)
+        m.trip_capacity = Constraint(m.R, m.T, rule=trip_capacity_rule)
 
-    # Minimum batch quantity (SBQ) with activation binary
-    def sbq_lower_rule(_m, i, j, mode, t):
-        return _m.ship[i, j, mode, t] >= _m.sbq[i, j, mode] * _m.use_mode[i, j, mode, t]
+        # Minimum batch quantity (SBQ) with activation binary
+        def sbq_lower_rule(_m, i, j, mode, t):
+            return _m.ship[i, j, mode, t] >= _m.sbq[i, j, mode] * _m.use_mode[i, j, mode, t]
 
-    m.sbq_lower = Constraint(m.R, m.T, rule=sbq_lower_rule)
+        m.sbq_lower = Constraint(m.R, m.T, rule=sbq_lower_rule)
 
-    def sbq_upper_rule(_m, i, j, mode, t):
-        # Big-M upper bound to link activation to positive shipments
-        return _m.ship[i, j, mode, t] <= big_m * _m.use_mode[i, j, mode, t]
+        def sbq_upper_rule(_m, i, j, mode, t):
+            # Big-M upper bound to link activation to positive shipments
+            return _m.ship[i, j, mode, t] <= big_m * _m.use_mode[i, j, mode, t]
 
-    m.sbq_upper = Constraint(m.R, m.T, rule=sbq_upper_rule)
+        m.sbq_upper = Constraint(m.R, m.T, rule=sbq_upper_rule)
 
     # --- Penalty constraints (if penalty_config provided) ----------------------
     if penalty_config:
@@ -401,4 +437,8 @@ def build_clinker_model(data: Dict[str, Any], penalty_config: Optional[Dict[str,
 
     m.total_cost = Objective(rule=total_cost_rule, sense=minimize)
 
+    m._strengthened = strengthen
+    if strengthen:
+        add_valid_inequalities(m)
+
     return m
@@ -0,0 +1,213 @@
+"""Min-cost-flow fast path for clinker models without integer features.
+
+When every route has ``sbq == 0`` and ``fixed_trip_cost == 0`` the
+``trips`` integers and ``use_mode`` binaries in :func:`build_clinker_model`
+carry no cost and no restriction beyond ``vehicle_cap > 0``. The model then
+collapses to a time-expanded min-cost flow problem which network simplex
+solves far faster than a MILP branch-and-bound.
+
+The solution is written back into the Pyomo model's variables so that
+:func:`extract_solution` and every other consumer of a solved model keep
+working unchanged. Trips are derived afterwards by ceiling division.
+"""
+
+import math
+import time
+from typing import Any, Dict, Optional
+
+from pyomo.environ import value
+
+from app.utils.exceptions import OptimizationError
+
+# Network simplex is only exact on integer data, so tonnages are solved in
+# kilograms and per-tonne costs are scaled to milli-units before rounding.
+QUANTITY_SCALE = 1000
+COST_SCALE = 1000
+
+_EPS = 1e-9
+
+_SOURCE = ("source",)
+_SINK = ("sink",)
+
+
+def is_pure_network_flow(model) -> bool:
+    """Return True if ``model`` has no active integer features.
+
+    The flag is computed by :func:`build_clinker_model`; models built
+    elsewhere are conservatively treated as MILPs.
+    """
+
+    return bool(getattr(model, "_pure_network_flow", False))
+
+
+def network_simplex_available() -> bool:
+    """Return True if the optional ``networkx`` dependency is importable."""
+
+    try:
+        import networkx  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _to_qty(tonnes: float) -> int:
+    return int(round(tonnes * QUANTITY_SCALE))
+
+
+def _to_weight(cost: float) -> int:
+    return int(round(cost * COST_SCALE))
+
+
+def solve_network_flow(model) -> Dict[str, Any]:
+    """Solve a pure-flow clinker model with network simplex.
+
+    Parameters
+    ----------
+    model:
+        Model built by :func:`build_clinker_model` for which
+        :func:`is_pure_network_flow` is True.
+
+    Returns
+    -------
+    Dict[str, Any]
+        Solver metadata with the same keys as :func:`solve_model`.
+
+    Raises
+    ------
+    OptimizationError
+        If ``networkx`` is unavailable or the flow problem is infeasible.
+    """
+
+    try:
+        import networkx as nx
+    except ImportError:
+        raise OptimizationError("networkx not installed. Install with: pip install networkx")
+
+    start = time.perf_counter()
+
+    periods = list(model.T)
+    if not periods:
+        raise OptimizationError("Network flow model has no time periods")
+    plants = list(model.I)
+    penalty_config = getattr(model, "_penalty_config", {}) or {}
+    has_unmet = hasattr(model, "unmet_demand")
+
+    total_demand = sum(float(value(model.demand[j, t])) for j in model.J for t in periods)
+    total_ss = sum(float(value(model.ss[i])) for i in plants)
+    total_inv0 = sum(float(value(model.inv0[i])) for i in plants)
+    # No period ever needs to produce more than this, so infinite capacities
+    # can safely be clipped to it.
+    flow_bound = total_demand + total_ss + total_inv0
+
+    graph = nx.MultiDiGraph()
+    node_demand: Dict[Any, int] = {}
+
+    def add_demand(node, qty: int) -> None:
+        node_demand[node] = node_demand.get(node, 0) + qty
+
+    def add_arc(u, v, key, cost: float, lower: float = 0.0, upper: Optional[float] = None) -> None:
+        # Lower bounds are removed by pre-routing ``lower`` units along the arc.
+        lower_q = _to_qty(lower)
+        attrs: Dict[str, Any] = {"weight": _to_weight(cost)}
+        if upper is not None and math.isfinite(upper):
+            attrs["capacity"] = max(_to_qty(upper) - lower_q, 0)
+        if lower_q:
+            add_demand(u, lower_q)
+            add_demand(v, -lower_q)
+        graph.add_edge(u, v, key=key, **attrs)
+
+    for t in periods:
+        for j in model.J:
+            add_demand(("cust", j, t), _to_qty(float(value(model.demand[j, t]))))
+
+    for i in plants:
+        ss = float(value(model.ss[i]))
+        max_inv = float(value(model.max_inv[i]))
+        hold = float(value(model.hold_cost[i]))
+        add_demand(("plant", i, periods[0]), -_to_qty(float(value(model.inv0[i]))))
+
+        for idx, t in enumerate(periods):
+            cap = min(float(value(model.cap[i, t])), flow_bound)
+            add_arc(_SOURCE, ("plant", i, t), "prod", float(value(model.prod_cost[i, t])), upper=cap)
+
+            nxt = ("plant", i, periods[idx + 1]) if idx + 1 < len(periods) else _SINK
+            add_arc(("plant", i, t), nxt, "inv", hold, lower=ss, upper=max_inv)
+
+    for (i, j, mode) in model.R:
+        if float(value(model.vehicle_cap[i, j, mode])) <= 0.0:
+            # ship <= 0 * trips forces the lane shut in the MILP as well
+            continue
+        cost = float(value(model.trans_cost[i, j, mode]))
+        for t in periods:
+            add_arc(("plant", i, t), ("cust", j, t), mode, cost)
+
+    if has_unmet:
+        unmet_cost = float(penalty_config.get("unmet_demand", 0) or 0.0)
+        for j in model.J:
+            for t in periods:
+                add_arc(_SOURCE, ("cust", j, t), "unmet", max(unmet_cost, 0.0))
+
+    # The source offers enough supply to cover every production arc and all
+    # unmet demand; whatever is not used bypasses the network at zero cost.
+    source_supply = sum(
+        attrs.get("capacity", 0) for _, _, attrs in graph.out_edges(_SOURCE, data=True)
+    ) + _to_qty(total_demand)
+    add_arc(_SOURCE, _SINK, "bypass", 0.0)
+    add_demand(_SOURCE, -source_supply)
+    add_demand(_SINK, -sum(node_demand.values()))
+
+    for node, qty in node_demand.items():
+        graph.add_node(node, demand=qty)
+
+    try:
+        _, flow = nx.network_simplex(graph)
+    except nx.NetworkXUnfeasible as e:
+        raise OptimizationError(f"Network flow problem is infeasible: {e}")
+    except nx.NetworkXUnbounded as e:
+        raise OptimizationError(f"Network flow problem is unbounded: {e}")
+
+    _load_flow_into_model(model, flow, periods)
+    runtime = time.perf_counter() - start
+
+    return {
+        "status": "optimal",
+        "solver": "network_simplex",
+        "objective": float(value(model.total_cost)),
+        "runtime_seconds": runtime,
+        "gap": 0.0,
+        "nodes_explored": 0,
+        "termination": "optimal",
+        "solve_path": "network_simplex",
+    }
+
+
+def _load_flow_into_model(model, flow: Dict[Any, Dict[Any, Dict[Any, int]]], periods) -> None:
+    """Write network flows back into the Pyomo variables of ``model``."""
+
+    def arc_flow(u, v, key) -> float:
+        return flow.get(u, {}).get(v, {}).get(key, 0) / QUANTITY_SCALE
+
+    for i in model.I:
+        ss = float(value(model.ss[i]))
+        for idx, t in enumerate(periods):
+            nxt = ("plant", i, periods[idx + 1]) if idx + 1 < len(periods) else _SINK
+            model.prod[i, t].set_value(arc_flow(_SOURCE, ("plant", i, t), "prod"))
+            model.inv[i, t].set_value(arc_flow(("plant", i, t), nxt, "inv") + ss)
+            if hasattr(model, "ss_violation"):
+                model.ss_violation[i, t].set_value(0.0)
+            if hasattr(model, "cap_violation"):
+                model.cap_violation[i, t].set_value(0.0)
+
+    for (i, j, mode) in model.R:
+        vehicle_cap = float(value(model.vehicle_cap[i, j, mode]))
+        for t in periods:
+            shipped = arc_flow(("plant", i, t), ("cust", j, t), mode)
+            trips = math.ceil(shipped / vehicle_cap - _EPS) if shipped > 0.0 else 0
+            model.ship[i, j, mode, t].set_value(shipped)
+            model.trips[i, j, mode, t].set_value(max(trips, 0))
+            model.use_mode[i, j, mode, t].set_value(1 if shipped > 0.0 else 0)
+
+    if hasattr(model, "unmet_demand"):
+        for j in model.J:
+            for t in periods:
+                model.unmet_demand[j, t].set_value(arc_flow(_SOURCE, ("cust", j, t), "unmet"))
@@ -1,116 +1,151 @@
-from typing import Any, Dict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 from pyomo.environ import value
 
 from app.utils.exceptions import OptimizationError
 
+# Penalty variable -> (cost breakdown key, reported rate, penalty_config key).
+# The reported rates are fixed; the objective uses the model's penalty_config.
+_PENALTY_RATES = {
+	"unmet_demand": ("unmet_demand_penalty", 1000.0, "unmet_demand"),
+	"ss_violation": ("safety_stock_violation_penalty", 100.0, "safety_stock_violation"),
+	"cap_violation": ("capacity_violation_penalty", 200.0, "capacity_violation"),
+}
 
-def extract_solution(model) -> Dict[str, Any]:
-	"""Extract decision variables and cost breakdown from a solved model.
 
-	Returns a structured dict with:
-	- production plan
-	- shipments
-	- inventory profile
-	- trips
-	- objective value and cost components
+@dataclass
+class ColumnarSolution:
+	"""Solved model values as NumPy arrays plus index tables.
+
+	``plant_index`` holds the ``plant``/``period`` columns that label
+	``production`` and ``inventory``; ``route_index`` holds the
+	``origin``/``destination``/``mode``/``period`` columns that label
+	``shipments`` and ``trips``. :meth:`to_records` builds the list-of-dicts
+	layout returned by :func:`extract_solution` on first use.
+	"""
+
+	plant_index: Dict[str, np.ndarray]
+	route_index: Dict[str, np.ndarray]
+	production: np.ndarray
+	inventory: np.ndarray
+	shipments: np.ndarray
+	trips: np.ndarray
+	objective: Optional[float]
+	costs: Dict[str, float]
+	total_cost: float
+	_records: Optional[Dict[str, Any]] = field(default=None, repr=False)
+
+	def active_routes(self) -> np.ndarray:
+		"""Positions of (route, period) rows with a shipment or a trip."""
+		return np.flatnonzero((self.shipments > 0) | (self.trips > 0))
+
+	def to_records(self) -> Dict[str, Any]:
+		if self._records is None:
+			plants = self.plant_index["plant"].tolist()
+			periods = self.plant_index["period"].tolist()
+			active = self.active_routes()
+			route_cols = [self.route_index[c][active].tolist() for c in ("origin", "destination", "mode", "period")]
+			self._records = {
+				"production": [
+					{"plant": i, "period": t, "tonnes": q}
+					for i, t, q in zip(plants, periods, self.production.tolist())
+				],
+				"shipments": [
+					{"origin": i, "destination": j, "mode": mode, "period": t, "tonnes": q}
+					for i, j, mode, t, q in zip(*route_cols, self.shipments[active].tolist())
+				],
+				"inventory": [
+					{"plant": i, "period": t, "tonnes": q}
+					for i, t, q in zip(plants, periods, self.inventory.tolist())
+				],
+				"trips": [
+					{"origin": i, "destination": j, "mode": mode, "period": t, "trips": n}
+					for i, j, mode, t, n in zip(*route_cols, np.rint(self.trips[active]).astype(int).tolist())
+				],
+				"objective": self.objective,
+				"costs": self.costs,
+				"total_cost": self.total_cost,
+			}
+		return self._records
+
+
+def _var_values(var) -> np.ndarray:
+	"""Values of an indexed variable in index order, unset values as 0."""
+	return np.fromiter(
+		(v.value if v.value is not None else 0.0 for v in var.values()), dtype=float, count=len(var)
+	)
+
+
+def _param_values(param, keys) -> np.ndarray:
+	return np.fromiter((value(param[k]) for k in keys), dtype=float, count=len(keys))
+
+
+def _index_columns(keys: List[Any], names: Tuple[str, ...]) -> Dict[str, np.ndarray]:
+	columns = list(zip(*keys)) if keys else [()] * len(names)
+	out = {}
+	for name, col in zip(names, columns):
+		arr = np.empty(len(col), dtype=object)
+		arr[:] = col
+		out[name] = arr
+	return out
+
+
+def extract_solution_columnar(model) -> ColumnarSolution:
+	"""Extract decision variables and cost breakdown as NumPy arrays.
+
+	Every variable and parameter component is read once; cost components are
+	dot products over the aligned arrays.
 	"""
 	try:
-		production = [
-			{"plant": i, "period": t, "tonnes": float(value(model.prod[i, t]))}
-			for i in model.I
-			for t in model.T
-		]
-
-		shipments = []
-		trips = []
-		for (i, j, mode) in model.R:
-			for t in model.T:
-				ship_val = float(value(model.ship[i, j, mode, t]))
-				trip_val = float(value(model.trips[i, j, mode, t]))
-				if ship_val > 0 or trip_val > 0:
-					shipments.append(
-						{
-							"origin": i,
-							"destination": j,
-							"mode": mode,
-							"period": t,
-							"tonnes": ship_val,
-						}
-					)
-					trips.append(
-						{
-							"origin": i,
-							"destination": j,
-							"mode": mode,
-							"period": t,
-							"trips": int(round(trip_val)),
-						}
-					)
-
-		inventory = [
-			{"plant": i, "period": t, "tonnes": float(value(model.inv[i, t]))}
-			for i in model.I
-			for t in model.T
-		]
-
-		# Cost breakdown using model parameters
-		prod_cost = sum(
-			float(value(model.prod_cost[i, t])) * float(value(model.prod[i, t]))
-			for i in model.I
-			for t in model.T
-		)
-		trans_cost = sum(
-			float(value(model.trans_cost[i, j, mode]))
-			* float(value(model.ship[i, j, mode, t]))
-			for (i, j, mode) in model.R
-			for t in model.T
+		# prod/inv share the (I, T) index and ship/trips the (R, T) index
+		plant_keys = list(model.prod.keys())
+		route_keys = list(model.ship.keys())
+		production = _var_values(model.prod)
+		inventory = _var_values(model.inv)
+		shipments = _var_values(model.ship)
+		trips = _var_values(model.trips)
+
+		n_routes, n_periods = len(model.R), len(model.T)
+		routes = list(model.R)
+		plants = list(model.I)
+
+		prod_cost = float(_param_values(model.prod_cost, plant_keys) @ production)
+		trans_cost = float(
+			_param_values(model.trans_cost, routes) @ shipments.reshape(n_routes, n_periods).sum(axis=1)
 		)
-		fixed_trip_cost = sum(
-			float(value(model.fixed_trip_cost[i, j, mode]))
-			* float(value(model.trips[i, j, mode, t]))
-			for (i, j, mode) in model.R
-			for t in model.T
+		fixed_trip_cost = float(
+			_param_values(model.fixed_trip_cost, routes) @ trips.reshape(n_routes, n_periods).sum(axis=1)
 		)
-		holding_cost = sum(
-			float(value(model.hold_cost[i])) * float(value(model.inv[i, t]))
-			for i in model.I
-			for t in model.T
+		holding_cost = float(
+			_param_values(model.hold_cost, plants) @ inventory.reshape(len(plants), n_periods).sum(axis=1)
 		)
-		
+
 		# Penalty costs (if penalty variables exist)
 		penalty_costs = {}
 		total_penalty_cost = 0.0
-		
-		if hasattr(model, 'unmet_demand'):
-			unmet_demand_cost = sum(
-				float(value(model.unmet_demand[j, t])) * 1000.0  # Default penalty rate
-				for j in model.J
-				for t in model.T
-			)
-			penalty_costs["unmet_demand_penalty"] = unmet_demand_cost
-			total_penalty_cost += unmet_demand_cost
-		
-		if hasattr(model, 'ss_violation'):
-			ss_violation_cost = sum(
-				float(value(model.ss_violation[i, t])) * 100.0  # Default penalty rate
-				for i in model.I
-				for t in model.T
-			)
-			penalty_costs["safety_stock_violation_penalty"] = ss_violation_cost
-			total_penalty_cost += ss_violation_cost
-		
-		if hasattr(model, 'cap_violation'):
-			cap_violation_cost = sum(
-				float(value(model.cap_violation[i, t])) * 200.0  # Default penalty rate
-				for i in model.I
-				for t in model.T
-			)
-			penalty_costs["capacity_violation_penalty"] = cap_violation_cost
-			total_penalty_cost += cap_violation_cost
-
-		objective_val = float(value(model.total_cost)) if hasattr(model, "total_cost") else None
-		total_cost = prod_cost + trans_cost + fixed_trip_cost + holding_cost + total_penalty_cost
+		violation_totals = {}
+		for var_name, (cost_name, rate, _) in _PENALTY_RATES.items():
+			if hasattr(model, var_name):
+				violation_totals[var_name] = float(_var_values(getattr(model, var_name)).sum())
+				penalty_costs[cost_name] = violation_totals[var_name] * rate
+				total_penalty_cost += penalty_costs[cost_name]
+
+		base_cost = prod_cost + trans_cost + fixed_trip_cost + holding_cost
+		total_cost = base_cost + total_penalty_cost
+		if not hasattr(model, "total_cost"):
+			objective_val = None
+		elif hasattr(model, "_penalty_config"):
+			# Same terms as build_clinker_model's objective, without walking
+			# the expression tree.
+			objective_val = base_cost
+			for var_name, (_, _, config_key) in _PENALTY_RATES.items():
+				rate = float(model._penalty_config.get(config_key, 0) or 0.0)
+				if rate > 0:
+					objective_val += violation_totals.get(var_name, 0.0) * rate
+		else:
+			objective_val = float(value(model.total_cost))
 
 		costs = {
 			"production_cost": prod_cost,
@@ -118,20 +153,37 @@ def extract_solution(model) -> Dict[str, Any]:
 			"fixed_trip_cost": fixed_trip_cost,
 			"holding_cost": holding_cost,
 		}
-		
+
 		# Add penalty costs if they exist
 		if penalty_costs:
 			costs.update(penalty_costs)
 			costs["total_penalty_cost"] = total_penalty_cost
 
-		return {
-			"production": production,
-			"shipments": shipments,
-			"inventory": inventory,
-			"trips": trips,
-			"objective": objective_val,
-			"costs": costs,
-			"total_cost": total_cost,
-		}
+		return ColumnarSolution(
+			plant_index=_index_columns(plant_keys, ("plant", "period")),
+			route_index=_index_columns(route_keys, ("origin", "destination", "mode", "period")),
+			production=production,
+			inventory=inventory,
+			shipments=shipments,
+			trips=trips,
+			objective=objective_val,
+			costs=costs,
+			total_cost=total_cost,
+		)
 	except Exception as e:
 		raise OptimizationError(f"Failed to extract solution: {e}")
+
+
+def extract_solution(model) -> Dict[str, Any]:
+	"""Extract decision variables and cost breakdown from a solved model.
+
+	Returns a structured dict with:
+	- production plan
+	- shipments
+	- inventory profile
+	- trips
+	- objective value and cost components
+
+	This is the record view of :func:`extract_solution_columnar`.
+	"""
+	return extract_solution_columnar(model).to_records()
@@ -1,22 +1,75 @@
+import logging
 from typing import Dict, Any, Optional
 from pyomo.environ import SolverFactory, TerminationCondition, value
 from pyomo.opt import SolverStatus
 
 from app.core.config import get_settings
+from app.services.optimization.lazy_constraints import solve_with_lazy_linking
+from app.services.optimization.network_flow import (
+    is_pure_network_flow,
+    network_simplex_available,
+    solve_network_flow,
+)
 from app.utils.exceptions import OptimizationError
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 
-def solve_model(model, solver_name: Optional[str] = None, time_limit_seconds: Optional[int] = None, mip_gap: Optional[float] = None) -> Dict[str, Any]:
+def _node_count(opt) -> Optional[int]:
+    """Best-effort branch-and-bound node count from the underlying solver."""
+    solver_model = getattr(opt, "_solver_model", None)
+    get_info = getattr(solver_model, "getInfo", None)
+    if get_info is None:
+        return None
+    try:
+        return int(get_info().mip_node_count)
+    except Exception:
+        return None
+
+
+def solve_model(
+    model,
+    solver_name: Optional[str] = None,
+    time_limit_seconds: Optional[int] = None,
+    mip_gap: Optional[float] = None,
+    use_network_fast_path: bool = True,
+) -> Dict[str, Any]:
     """
     Solve a Pyomo model using a robust solver fallback chain.
-    Returns a dict with status, objective, runtime, gap, and solver used.
+    Returns a dict with status, objective, runtime, gap, solver used and
+    ``solve_path`` ("network_simplex", "lazy_constraints" or "milp").
+
+    Models flagged by build_clinker_model as pure min-cost flow (no SBQ and
+    no fixed trip costs) are solved with network simplex unless
+    ``use_network_fast_path`` is False; the MILP chain is used as fallback.
+    Models built with ``lazy_linking=True`` are solved by the cutting-plane
+    loop in lazy_constraints.
     """
+    if use_network_fast_path and is_pure_network_flow(model) and network_simplex_available():
+        try:
+            return solve_network_flow(model)
+        except OptimizationError as e:
+            logger.warning(f"Network simplex fast path failed, falling back to MILP: {e}")
+
     solver_name = solver_name or settings.DEFAULT_SOLVER
     time_limit = time_limit_seconds or settings.SOLVER_TIME_LIMIT_SECONDS
     gap = mip_gap or settings.SOLVER_MIP_GAP
 
+    if getattr(model, "_lazy_linking", False):
+        return solve_with_lazy_linking(
+            model,
+            solver_name,
+            time_limit,
+            gap,
+            solve_once=lambda m: _solve_with_fallback_chain(m, solver_name, time_limit, gap),
+        )
+
+    return _solve_with_fallback_chain(model, solver_name, time_limit, gap)
+
+
+def _solve_with_fallback_chain(model, solver_name: str, time_limit: int, gap: float) -> Dict[str, Any]:
+    """Solve ``model`` with the first solver in the chain that succeeds."""
     # Define solver fallback chain: Gurobi (commercial) -> HiGHS (modern open source) -> CBC (fallback)
     solver_chain = [solver_name] if solver_name != "auto" else ["gurobi", "highs", "cbc"]
     
@@ -53,7 +106,7 @@ def solve_model(model, solver_name: Optional[str] = None, time_limit_seconds: Op
                 TerminationCondition.optimal,
                 TerminationCondition.feasible,
                 TerminationCondition.maxIterations,
-                TerminationCondition.timeLimit,
+                TerminationCondition.maxTimeLimit,
             }:
                 raise OptimizationError(f"Solver {attempt_solver} failed: status={status}, termination={termination}")
 
@@ -62,6 +115,7 @@ def solve_model(model, solver_name: Optional[str] = None, time_limit_seconds: Op
             obj_val = float(value(objective_value)) if objective_value is not None else None
             solver_time = results.solver.time if hasattr(results.solver, "time") else None
             solver_gap = results.solver.gap if hasattr(results.solver, "gap") else None
+            nodes_explored = _node_count(opt)
 
             return {
                 "status": "optimal" if termination == TerminationCondition.optimal else "feasible",
@@ -69,13 +123,13 @@ def solve_model(model, solver_name: Optional[str] = None, time_limit_seconds: Op
                 "objective": obj_val,
                 "runtime_seconds": solver_time,
                 "gap": solver_gap,
+                "nodes_explored": nodes_explored,
                 "termination": str(termination),
+                "solve_path": "milp",
             }
 
         except Exception as e:
             # Log the attempt and continue to next solver
-            import logging
-            logger = logging.getLogger(__name__)
             logger.warning(f"Solver {attempt_solver} failed: {e}")
             continue
 
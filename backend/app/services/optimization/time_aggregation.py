@@ -0,0 +1,239 @@
+"""Time aggregation with daily disaggregation for the clinker model.
+
+Demand and inventory data are daily, which makes the full model 7 or 30
+times larger than a weekly or monthly one. :func:`solve_time_aggregated`
+
+1. buckets daily periods into weeks or months (demand and capacity summed,
+   holding cost scaled by the nominal bucket length, inventory balance kept
+   at bucket boundaries),
+2. solves the smaller bucketed model with the regular MILP path, and
+3. disaggregates the bucketed plan back to daily shipments with an LP over
+   the daily model in which every lane's daily shipments must add up to its
+   bucket total, daily capacity and inventory bounds stay hard, and trips are
+   rounded up afterwards.
+
+The disaggregated daily model is returned solved, so :func:`extract_solution`
+works on it exactly as on a directly solved daily model. SBQ is enforced at
+bucket level only; daily splits of a lane can fall below it.
+"""
+
+import logging
+import math
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+from pyomo.environ import Constraint, TransformationFactory, value
+
+from app.services.optimization.model_builder import build_clinker_model
+from app.services.optimization.solvers import solve_model
+from app.utils.exceptions import OptimizationError
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_BUCKETS = ("week", "month")
+
+# Days of holding one bucket stands for. Holding cost is a plant-level
+# parameter of the model, so partial first/last buckets and months of
+# different lengths all use the same nominal length.
+NOMINAL_BUCKET_DAYS = {"week": 7.0, "month": 365.25 / 12}
+
+
+def _model_periods(data: Dict[str, Any]) -> List[Any]:
+    if data.get("time_periods"):
+        return list(data["time_periods"])
+    return list(dict.fromkeys(data["demand_forecast"]["period"].tolist()))
+
+
+def bucket_periods(periods: List[Any], bucket: str) -> Dict[Any, str]:
+    """Map each daily period identifier to its week or month bucket label.
+
+    Weeks are labelled ``YYYY-Www`` (ISO week) and months ``YYYY-MM``.
+
+    Raises
+    ------
+    OptimizationError
+        If ``bucket`` is unsupported or a period is not a parseable date.
+    """
+
+    if bucket not in SUPPORTED_BUCKETS:
+        raise OptimizationError(f"Unsupported time aggregation '{bucket}'. Use one of {SUPPORTED_BUCKETS}")
+
+    dates = pd.to_datetime(pd.Series(periods, dtype=object).astype(str), errors="coerce")
+    if dates.isna().any():
+        bad = [p for p, d in zip(periods, dates) if pd.isna(d)][:5]
+        raise OptimizationError(f"Time aggregation requires daily date periods; could not parse {bad}")
+
+    if bucket == "week":
+        iso = dates.dt.isocalendar()
+        labels = [f"{y}-W{w:02d}" for y, w in zip(iso["year"], iso["week"])]
+    else:
+        labels = dates.dt.strftime("%Y-%m").tolist()
+    return dict(zip(periods, labels))
+
+
+def aggregate_model_data(data: Dict[str, Any], bucket: str) -> Tuple[Dict[str, Any], Dict[Any, str]]:
+    """Bucket daily model input into weekly or monthly periods.
+
+    Returns the aggregated model input (same keys as ``data``) and the
+    ``{daily period: bucket}`` mapping.
+    """
+
+    periods = _model_periods(data)
+    period_map = bucket_periods(periods, bucket)
+    buckets = list(dict.fromkeys(period_map[p] for p in periods))
+
+    prod_df = data["production_capacity_cost"].copy()
+    prod_df = prod_df[prod_df["period"].isin(period_map)]
+    prod_df["period"] = prod_df["period"].map(period_map)
+    prod_df["_weighted_cost"] = prod_df["variable_cost_per_tonne"] * prod_df["max_capacity_tonnes"]
+    agg_spec = {"max_capacity_tonnes": "sum", "variable_cost_per_tonne": "mean", "_weighted_cost": "sum"}
+    if "holding_cost_per_tonne" in prod_df.columns:
+        agg_spec["holding_cost_per_tonne"] = "first"
+    agg_prod = prod_df.groupby(["plant_id", "period"], sort=False).agg(agg_spec).reset_index()
+    # Capacity-weighted variable cost, falling back to the plain mean for zero capacity
+    has_cap = agg_prod["max_capacity_tonnes"] > 0
+    agg_prod.loc[has_cap, "variable_cost_per_tonne"] = (
+        agg_prod.loc[has_cap, "_weighted_cost"] / agg_prod.loc[has_cap, "max_capacity_tonnes"]
+    )
+    agg_prod = agg_prod.drop(columns="_weighted_cost")
+    if "holding_cost_per_tonne" in agg_prod.columns:
+        # Daily holding cost accrues once per day, bucketed inventory once per bucket
+        agg_prod["holding_cost_per_tonne"] = agg_prod["holding_cost_per_tonne"] * NOMINAL_BUCKET_DAYS[bucket]
+
+    demand_df = data["demand_forecast"].copy()
+    demand_df = demand_df[demand_df["period"].isin(period_map)]
+    demand_df["period"] = demand_df["period"].map(period_map)
+    agg_demand = demand_df.groupby(["customer_node_id", "period"], sort=False)["demand_tonnes"].sum().reset_index()
+
+    agg_data = dict(data)
+    agg_data["production_capacity_cost"] = agg_prod
+    agg_data["demand_forecast"] = agg_demand
+    agg_data["time_periods"] = buckets
+    return agg_data, period_map
+
+
+def disaggregate_to_daily(
+    agg_model,
+    data: Dict[str, Any],
+    period_map: Dict[Any, str],
+    solver_name: Optional[str] = None,
+    time_limit_seconds: Optional[int] = None,
+    penalty_config: Optional[Dict[str, float]] = None,
+):
+    """Turn a solved bucketed model into a solved daily model.
+
+    Returns ``(daily_model, solver_meta)``; ``solver_meta["lane_totals_kept"]``
+    is False if the bucket lane totals had to be dropped to reach a feasible
+    daily plan. That daily plan is then not bound by SBQ at all, and a
+    warning is logged.
+    """
+
+    daily = build_clinker_model(data, penalty_config)
+    TransformationFactory("core.relax_integer_vars").apply_to(daily)
+    # SBQ is honoured by the bucket plan; the daily split is a pure LP.
+    daily.sbq_lower.deactivate()
+    daily.sbq_upper.deactivate()
+
+    periods_by_bucket: Dict[str, List[Any]] = {}
+    for t in daily.T:
+        periods_by_bucket.setdefault(period_map[t], []).append(t)
+
+    lane_total = {
+        (i, j, mode, b): float(value(agg_model.ship[i, j, mode, b]))
+        for (i, j, mode) in agg_model.R
+        for b in agg_model.T
+    }
+
+    def lane_total_rule(_m, i, j, mode, b):
+        days = periods_by_bucket.get(b, [])
+        if not days:
+            return Constraint.Skip
+        return sum(_m.ship[i, j, mode, t] for t in days) == lane_total.get((i, j, mode, b), 0.0)
+
+    daily.bucket_lane_total = Constraint(daily.R, list(periods_by_bucket), rule=lane_total_rule)
+
+    lane_totals_kept = True
+    try:
+        meta = solve_model(daily, solver_name, time_limit_seconds, use_network_fast_path=False)
+    except OptimizationError:
+        # Intra-bucket capacity or safety stock can make the exact split
+        # infeasible; re-plan the days freely as an LP instead.
+        logger.warning(
+            "Bucket lane totals are infeasible at daily resolution; re-planning days "
+            "freely without SBQ (minimum shipment quantity) constraints"
+        )
+        daily.bucket_lane_total.deactivate()
+        lane_totals_kept = False
+        meta = solve_model(daily, solver_name, time_limit_seconds, use_network_fast_path=False)
+
+    for (i, j, mode) in daily.R:
+        vehicle_cap = float(value(daily.vehicle_cap[i, j, mode]))
+        for t in daily.T:
+            shipped = float(daily.ship[i, j, mode, t].value or 0.0)
+            trips = math.ceil(shipped / vehicle_cap - 1e-9) if shipped > 1e-9 and vehicle_cap > 0 else 0
+            daily.trips[i, j, mode, t].set_value(trips)
+            daily.use_mode[i, j, mode, t].set_value(1 if shipped > 1e-9 else 0)
+
+    meta["objective"] = float(value(daily.total_cost))
+    meta["lane_totals_kept"] = lane_totals_kept
+    return daily, meta
+
+
+def solve_time_aggregated(
+    data: Dict[str, Any],
+    bucket: str,
+    solver_name: Optional[str] = None,
+    time_limit_seconds: Optional[int] = None,
+    mip_gap: Optional[float] = None,
+    penalty_config: Optional[Dict[str, float]] = None,
+    **model_options: Any,
+):
+    """Solve ``data`` at week/month granularity and return a daily plan.
+
+    Parameters
+    ----------
+    data:
+        Daily model input as accepted by :func:`build_clinker_model`.
+    bucket:
+        "week" or "month".
+    model_options:
+        Extra keyword arguments for the bucketed :func:`build_clinker_model`
+        call (e.g. ``strengthen=True``).
+
+    Returns
+    -------
+    tuple
+        ``(daily_model, solver_meta)`` where ``solver_meta["time_aggregation"]``
+        reports bucket counts, bucketed and daily objectives and the runtime
+        of each stage.
+    """
+
+    start = time.perf_counter()
+    agg_data, period_map = aggregate_model_data(data, bucket)
+    agg_model = build_clinker_model(agg_data, penalty_config, **model_options)
+    agg_meta = solve_model(agg_model, solver_name, time_limit_seconds, mip_gap)
+    aggregate_seconds = time.perf_counter() - start
+
+    disagg_start = time.perf_counter()
+    daily_model, daily_meta = disaggregate_to_daily(
+        agg_model, data, period_map, solver_name, time_limit_seconds, penalty_config
+    )
+    disaggregate_seconds = time.perf_counter() - disagg_start
+
+    meta = dict(agg_meta)
+    meta["objective"] = daily_meta["objective"]
+    meta["runtime_seconds"] = aggregate_seconds + disaggregate_seconds
+    meta["solve_path"] = f"time_aggregated_{bucket}"
+    meta["time_aggregation"] = {
+        "bucket": bucket,
+        "daily_periods": len(period_map),
+        "aggregated_periods": len(agg_data["time_periods"]),
+        "aggregate_objective": agg_meta.get("objective"),
+        "daily_objective": daily_meta["objective"],
+        "aggregate_solve_path": agg_meta.get("solve_path"),
+        "aggregate_seconds": aggregate_seconds,
+        "disaggregate_seconds": disaggregate_seconds,
+        "lane_totals_kept": daily_meta["lane_totals_kept"],
+    }
+    return daily_model, meta
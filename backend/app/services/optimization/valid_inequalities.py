@@ -0,0 +1,110 @@
+"""Valid inequalities that tighten the SBQ/trip formulation.
+
+The base model in :func:`build_clinker_model` links shipments, trips and the
+SBQ activation binary only through ``ship <= vehicle_cap * trips``,
+``ship >= sbq * use_mode`` and ``ship <= M * use_mode`` with a single global
+``M`` equal to total demand. Its LP relaxation is therefore weak: a route
+can carry its full shipment with ``use_mode`` close to zero.
+
+:func:`add_valid_inequalities` adds the following blocks, none of which cut
+off an optimal solution when trip costs are non-negative:
+
+- ``cut_ship_activation``: ``ship <= M[r, t] * use_mode`` with a per-route
+  ``M`` bounded by destination demand and cumulative origin supply.
+- ``cut_trips_activation``: ``trips <= ceil(M[r, t] / vehicle_cap) * use_mode``.
+- ``cut_mode_requires_trip``: ``use_mode <= trips``.
+- ``cut_destination_cover`` / ``cut_destination_trips``: at least one lane
+  and at least ``ceil(demand / max vehicle_cap)`` trips into every
+  customer-period with positive demand (skipped when unmet demand is allowed).
+- ``cut_origin_cumulative``: cumulative shipments out of a plant cannot exceed
+  initial inventory plus cumulative capacity minus safety stock.
+"""
+
+import math
+from typing import Any, Dict, List, Tuple
+
+from pyomo.environ import Constraint, value
+
+
+def _origin_supply_bounds(m) -> Dict[Tuple[Any, Any], float]:
+    """Upper bound on what plant ``i`` can ship out in period ``t``."""
+
+    bounds: Dict[Tuple[Any, Any], float] = {}
+    for i in m.I:
+        inv0 = float(value(m.inv0[i]))
+        ss = float(value(m.ss[i]))
+        max_inv = float(value(m.max_inv[i]))
+        prev_inv_bound = inv0
+        cum_cap = 0.0
+        for t in m.T:
+            cap = float(value(m.cap[i, t]))
+            bounds[(i, t)] = max(prev_inv_bound + cap - ss, 0.0)
+            cum_cap += cap
+            prev_inv_bound = min(max_inv, inv0 + cum_cap)
+    return bounds
+
+
+def add_valid_inequalities(m) -> None:
+    """Attach formulation-strengthening cuts to a built clinker model."""
+
+    periods = list(m.T)
+    origin_bound = _origin_supply_bounds(m)
+
+    routes_into: Dict[Any, List[Tuple[Any, Any, Any]]] = {j: [] for j in m.J}
+    routes_out: Dict[Any, List[Tuple[Any, Any, Any]]] = {i: [] for i in m.I}
+    for r in m.R:
+        routes_into.setdefault(r[1], []).append(r)
+        routes_out.setdefault(r[0], []).append(r)
+
+    route_bound: Dict[Tuple[Any, Any, Any, Any], float] = {}
+    for (i, j, mode) in m.R:
+        for t in periods:
+            route_bound[(i, j, mode, t)] = min(float(value(m.demand[j, t])), origin_bound[(i, t)])
+
+    def ship_activation_rule(_m, i, j, mode, t):
+        return _m.ship[i, j, mode, t] <= route_bound[(i, j, mode, t)] * _m.use_mode[i, j, mode, t]
+
+    m.cut_ship_activation = Constraint(m.R, m.T, rule=ship_activation_rule)
+
+    def trips_activation_rule(_m, i, j, mode, t):
+        vehicle_cap = float(value(_m.vehicle_cap[i, j, mode]))
+        max_trips = math.ceil(route_bound[(i, j, mode, t)] / vehicle_cap) if vehicle_cap > 0.0 else 0
+        return _m.trips[i, j, mode, t] <= max_trips * _m.use_mode[i, j, mode, t]
+
+    m.cut_trips_activation = Constraint(m.R, m.T, rule=trips_activation_rule)
+
+    def mode_requires_trip_rule(_m, i, j, mode, t):
+        return _m.use_mode[i, j, mode, t] <= _m.trips[i, j, mode, t]
+
+    m.cut_mode_requires_trip = Constraint(m.R, m.T, rule=mode_requires_trip_rule)
+
+    # Destination covers only hold when demand must be met in full.
+    if not hasattr(m, "unmet_demand"):
+
+        def destination_cover_rule(_m, j, t):
+            lanes = routes_into.get(j, [])
+            if float(value(_m.demand[j, t])) <= 0.0 or not lanes:
+                return Constraint.Skip
+            return sum(_m.use_mode[i, jj, mode, t] for (i, jj, mode) in lanes) >= 1
+
+        m.cut_destination_cover = Constraint(m.J, m.T, rule=destination_cover_rule)
+
+        def destination_trips_rule(_m, j, t):
+            demand = float(value(_m.demand[j, t]))
+            lanes = routes_into.get(j, [])
+            max_cap = max((float(value(_m.vehicle_cap[r])) for r in lanes), default=0.0)
+            if demand <= 0.0 or max_cap <= 0.0:
+                return Constraint.Skip
+            return sum(_m.trips[i, jj, mode, t] for (i, jj, mode) in lanes) >= math.ceil(demand / max_cap - 1e-9)
+
+        m.cut_destination_trips = Constraint(m.J, m.T, rule=destination_trips_rule)
+
+    def origin_cumulative_rule(_m, i, t):
+        lanes = routes_out.get(i, [])
+        if not lanes:
+            return Constraint.Skip
+        upto = periods[: periods.index(t) + 1]
+        supply = float(value(_m.inv0[i])) + sum(float(value(_m.cap[i, tau])) for tau in upto) - float(value(_m.ss[i]))
+        return sum(_m.ship[i, j, mode, tau] for (_, j, mode) in lanes for tau in upto) <= max(supply, 0.0)
+
+    m.cut_origin_cumulative = Constraint(m.I, m.T, rule=origin_cumulative_rule)
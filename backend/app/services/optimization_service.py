@@ -32,8 +32,11 @@ from app.db.models.transport_routes_modes import TransportRoutesModes
 from app.db.models.demand_forecast import DemandForecast
 from app.db.models.initial_inventory import InitialInventory
 from app.db.models.safety_stock_policy import SafetyStockPolicy
+from app.services.data_snapshot import DataSnapshot, latest_snapshot
 from app.services.data_validation_service import run_comprehensive_validation
 from app.services.kpi_calculator import KPICalculator
+from app.services.kpi_cube import KPICubeService
+from app.services.result_store import ResultStore, parquet_storage_enabled, plan_frames
 from app.services.optimization.model_builder import build_clinker_model
 from app.utils.exceptions import OptimizationError, DataValidationError
 
@@ -53,9 +56,15 @@ class OptimizationService:
         solver_name: str = "HiGHS",
         time_limit: int = 600,
         mip_gap: float = 0.01,
-        scenario_parameters: Optional[Dict[str, Any]] = None
+        scenario_parameters: Optional[Dict[str, Any]] = None,
+        snapshot: Optional[DataSnapshot] = None
     ) -> str:
-        """Run complete optimization and return run_id."""
+        """Run complete optimization and return run_id.
+        
+        ``snapshot`` is the data a caller has already validated (the run
+        validates and solves exactly that data); without one the latest
+        snapshot is taken now.
+        """
         
         run_id = f"{scenario_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}"
         
@@ -76,7 +85,9 @@ class OptimizationService:
         try:
             # Step 1: Validate data
             logger.info(f"Starting optimization run {run_id} - validating data")
-            validation_result = run_comprehensive_validation(self.db)
+            if snapshot is None:
+                snapshot = latest_snapshot(self.db)
+            validation_result = run_comprehensive_validation(self.db, snapshot)
             
             if validation_result["overall_status"] != "PASS":
                 opt_run.status = "failed"
@@ -92,7 +103,7 @@ class OptimizationService:
             
             # Step 2: Load and prepare data
             logger.info(f"Run {run_id} - loading optimization data")
-            model_data = self._load_optimization_data(scenario_parameters)
+            model_data = self._load_optimization_data(scenario_parameters, snapshot)
             
             # Step 3: Build and solve optimization model
             logger.info(f"Run {run_id} - building optimization model")
@@ -116,6 +127,13 @@ class OptimizationService:
             opt_run.completed_at = datetime.utcnow()
             self.db.commit()
             
+            # Step 7: Add the run to the KPI cube; the run itself has succeeded
+            try:
+                KPICubeService.update_for_run(self.db, opt_run)
+            except Exception as e:
+                self.db.rollback()
+                logger.warning(f"KPI cube update failed for run {run_id}: {e}")
+            
             logger.info(f"Optimization run {run_id} completed successfully")
             return run_id
             
@@ -127,22 +145,27 @@ class OptimizationService:
             self.db.commit()
             raise OptimizationError(f"Optimization failed: {e}")
     
-    def _load_optimization_data(self, scenario_parameters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Load all data needed for optimization using the SAFE data access guard."""
+    def _load_optimization_data(
+        self, scenario_parameters: Optional[Dict[str, Any]] = None, snapshot: Optional[DataSnapshot] = None
+    ) -> Dict[str, Any]:
+        """Load all data needed for optimization using the SAFE data access guard.
+        
+        ``snapshot`` is the data the run was validated against; without one
+        the tables are read now.
+        """
         
         # PHASE 1 DATA SAFETY: Use data access guard to prevent staging table access
-        from app.services.data_access_guard import get_safe_optimization_data
+        from app.services.data_access_guard import get_safe_optimization_frames
         
         logger.info("Loading optimization data through data access guard (production tables only)")
-        dataset = get_safe_optimization_data(self.db)
+        dataset = get_safe_optimization_frames(self.db, snapshot)
         
-        # Convert to pandas DataFrames for compatibility with existing code
-        plants_df = pd.DataFrame(dataset["plants"])
-        production_df = pd.DataFrame(dataset["production_capacity"])
-        routes_df = pd.DataFrame(dataset["transport_routes"])
-        demand_df = pd.DataFrame(dataset["demand_forecast"])
-        inventory_df = pd.DataFrame(dataset["initial_inventory"])
-        safety_stock_df = pd.DataFrame(dataset["safety_stock_policies"])
+        plants_df = dataset["plants"]
+        production_df = dataset["production_capacity"]
+        routes_df = dataset["transport_routes"]
+        demand_df = dataset["demand_forecast"]
+        inventory_df = dataset["initial_inventory"]
+        safety_stock_df = dataset["safety_stock_policies"]
         
         # Apply scenario parameters
         if scenario_parameters:
@@ -444,6 +467,15 @@ class OptimizationService:
         SBQ compliance, and safety stock tracking.
         """
         
+        metadata = {
+            "fixed_trip_cost": results.get("fixed_trip_cost", 0.0),
+            "trip_plan": results.get("trip_plan", {}),
+            "safety_stock_compliance": results.get("safety_stock_compliance", {}),
+            "sbq_compliance": results.get("sbq_compliance", {}),
+            "unmet_demand_total": results.get("unmet_demand_total", 0.0),
+            "safety_violations_total": results.get("safety_violations_total", 0.0)
+        }
+        
         opt_results = OptimizationResults(
             run_id=run_id,
             total_cost=results["total_cost"],
@@ -451,39 +483,50 @@ class OptimizationService:
             transport_cost=results["transport_cost"],
             inventory_cost=results["inventory_cost"],
             penalty_cost=results["penalty_cost"],
-            production_plan=results["production_plan"],
-            shipment_plan=results["shipment_plan"],
-            inventory_profile=results["inventory_profile"],
             demand_fulfillment=results["demand_fulfillment"],
             service_level=results["service_level"],
-            stockout_events=results["stockout_events"]
+            stockout_events=results["stockout_events"],
+            plan_storage="json"
         )
         
-        # PHASE 4: Add new result components to the JSON fields
-        if hasattr(opt_results, 'additional_metrics'):
-            opt_results.additional_metrics = {
-                "fixed_trip_cost": results.get("fixed_trip_cost", 0.0),
-                "trip_plan": results.get("trip_plan", {}),
-                "safety_stock_compliance": results.get("safety_stock_compliance", {}),
-                "sbq_compliance": results.get("sbq_compliance", {}),
-                "unmet_demand_total": results.get("unmet_demand_total", 0.0),
-                "safety_violations_total": results.get("safety_violations_total", 0.0)
-            }
-        else:
-            # Store in shipment_plan as extended data if additional_metrics field doesn't exist
-            extended_shipment_plan = results["shipment_plan"].copy()
-            extended_shipment_plan["_metadata"] = {
-                "fixed_trip_cost": results.get("fixed_trip_cost", 0.0),
-                "trip_plan": results.get("trip_plan", {}),
-                "safety_stock_compliance": results.get("safety_stock_compliance", {}),
-                "sbq_compliance": results.get("sbq_compliance", {}),
-                "unmet_demand_total": results.get("unmet_demand_total", 0.0),
-                "safety_violations_total": results.get("safety_violations_total", 0.0)
-            }
-            opt_results.shipment_plan = extended_shipment_plan
-        
-        self.db.add(opt_results)
-        self.db.commit()
+        store = ResultStore() if parquet_storage_enabled() else None
+        try:
+            if store is not None:
+                # Plans go to the columnar result store; the row keeps scalars and
+                # the compliance metadata. Trips and SBQ compliance are recoverable
+                # from the trips and shipments tables.
+                store.write_run(run_id, plan_frames(
+                    production_plan=results["production_plan"],
+                    shipment_plan=results["shipment_plan"],
+                    inventory_profile=results["inventory_profile"],
+                    trip_plan=results.get("trip_plan", {})
+                ))
+                metadata.pop("trip_plan")
+                metadata.pop("sbq_compliance")
+                opt_results.plan_storage = "parquet"
+                opt_results.shipment_plan = {"_metadata": metadata}
+            else:
+                opt_results.production_plan = results["production_plan"]
+                opt_results.shipment_plan = results["shipment_plan"]
+                opt_results.inventory_profile = results["inventory_profile"]
+            
+                # PHASE 4: Add new result components to the JSON fields
+                if hasattr(opt_results, 'additional_metrics'):
+                    opt_results.additional_metrics = metadata
+                else:
+                    # Store in shipment_plan as extended data if additional_metrics field doesn't exist
+                    extended_shipment_plan = results["shipment_plan"].copy()
+                    extended_shipment_plan["_metadata"] = metadata
+                    opt_results.shipment_plan = extended_shipment_plan
+        
+            self.db.add(opt_results)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            if store is not None:
+                # Partitions no results row points at would never be read or cleaned up
+                store.delete_run(run_id)
+            raise
         
         logger.info(f"Saved advanced optimization results for run {run_id}")
         logger.info(f"- Total cost: {results['total_cost']:,.2f}")
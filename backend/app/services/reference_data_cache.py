@@ -0,0 +1,216 @@
+"""
+Process-wide cache of reference (master) data.
+
+Plant master, transport routes, transport modes and customer nodes are read by
+the KPI calculator, the coordinate resolver, the data access guard, the clean
+data service and the KPI routes, usually several times per request. They
+change rarely, so each dataset is loaded once per process and kept until a
+source table's data version is bumped.
+
+Writers call :func:`invalidate_reference_data` with the table names they
+changed (batch promotion and the CRUD service do). Entries are additionally
+reloaded after ``REFERENCE_CACHE_MAX_AGE_SECONDS`` so writes made by other
+worker processes become visible.
+
+Cached values are shared between callers and must be treated as read-only;
+copy a DataFrame before modifying it.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.models.demand_forecast import DemandForecast
+from app.db.models.plant_master import PlantMaster
+from app.db.models.transport_routes_modes import TransportRoutesModes
+
+logger = logging.getLogger(__name__)
+
+PLANT_COLUMNS = ["plant_id", "plant_name", "plant_type", "latitude", "longitude", "region", "country"]
+ROUTE_COLUMNS = [
+    "origin_plant_id", "destination_node_id", "transport_mode", "distance_km", "cost_per_tonne",
+    "cost_per_tonne_km", "fixed_cost_per_trip", "vehicle_capacity_tonnes", "min_batch_quantity_tonnes",
+    "lead_time_days", "is_active",
+]
+
+
+def _load_plants(db: Session) -> pd.DataFrame:
+    table = PlantMaster.__table__
+    rows = db.execute(select(*[table.c[c] for c in PLANT_COLUMNS])).all()
+    return pd.DataFrame(rows, columns=PLANT_COLUMNS).set_index("plant_id", drop=False)
+
+
+def _load_routes(db: Session) -> pd.DataFrame:
+    table = TransportRoutesModes.__table__
+    rows = db.execute(select(*[table.c[c] for c in ROUTE_COLUMNS]).order_by(table.c.id)).all()
+    return pd.DataFrame(rows, columns=ROUTE_COLUMNS)
+
+
+def _load_route_lookup(db: Session) -> Dict[Tuple[str, str, str], Dict[str, Any]]:
+    routes = reference_cache.get(db, "routes")
+    records = routes.to_dict("records")
+    lookup: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+    for record in records:
+        # First row wins, as with the dict comprehensions this replaces
+        lookup.setdefault((record["origin_plant_id"], record["destination_node_id"], record["transport_mode"]), record)
+    return lookup
+
+
+def _load_modes(db: Session) -> List[str]:
+    routes = reference_cache.get(db, "routes")
+    active = routes[routes["is_active"] == "Y"]
+    return sorted(active["transport_mode"].dropna().unique().tolist())
+
+
+def _load_customers(db: Session) -> List[str]:
+    demand_nodes = db.execute(select(DemandForecast.customer_node_id).distinct()).scalars().all()
+    plants = reference_cache.get(db, "plants")
+    routes = reference_cache.get(db, "routes")
+    route_nodes = routes.loc[~routes["destination_node_id"].isin(plants.index), "destination_node_id"]
+    return sorted(set(demand_nodes) | set(route_nodes.dropna()))
+
+
+class ReferenceDataCache:
+    """Versioned in-process cache of reference datasets.
+
+    Each dataset has a loader and the tables it is built from. An entry
+    remembers the table versions it was loaded at and is reloaded once any of
+    them has been bumped or it is older than ``max_age_seconds``.
+    """
+
+    def __init__(self, max_age_seconds: Optional[float] = None):
+        self._max_age_seconds = max_age_seconds
+        self._loaders: Dict[str, Tuple[Callable[[Session], Any], Tuple[str, ...]]] = {}
+        self._versions: Dict[str, int] = {}
+        # Writes reported per table, including tables no dataset is built from
+        self._writes: Dict[str, int] = {}
+        self._entries: Dict[str, Tuple[Any, Tuple[int, ...], float]] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def max_age_seconds(self) -> float:
+        if self._max_age_seconds is not None:
+            return self._max_age_seconds
+        return get_settings().REFERENCE_CACHE_MAX_AGE_SECONDS
+
+    def register(self, name: str, loader: Callable[[Session], Any], tables: Iterable[str]) -> None:
+        """Register a dataset ``name`` built by ``loader(db)`` from ``tables``."""
+        with self._lock:
+            self._loaders[name] = (loader, tuple(tables))
+            self._stats.setdefault(name, {"hits": 0, "misses": 0, "load_seconds": 0.0})
+            for table in tables:
+                self._versions.setdefault(table, 0)
+
+    def _current_versions(self, tables: Tuple[str, ...]) -> Tuple[int, ...]:
+        return tuple(self._versions[t] for t in tables)
+
+    def get(self, db: Session, name: str) -> Any:
+        """Return dataset ``name``, loading it with ``db`` on a miss."""
+        if name not in self._loaders:
+            raise KeyError(f"Unknown reference dataset '{name}'")
+        loader, tables = self._loaders[name]
+        with self._lock:
+            entry = self._entries.get(name)
+            versions = self._current_versions(tables)
+            max_age = self.max_age_seconds
+            if entry is not None and entry[1] == versions and (not max_age or time.monotonic() - entry[2] < max_age):
+                self._stats[name]["hits"] += 1
+                return entry[0]
+
+            self._stats[name]["misses"] += 1
+            start = time.monotonic()
+            value = loader(db)
+            self._stats[name]["load_seconds"] += time.monotonic() - start
+            # Versions are taken before loading: a bump during the load makes
+            # the entry stale on the next read instead of hiding the write.
+            self._entries[name] = (value, versions, time.monotonic())
+            logger.debug(f"Loaded reference dataset '{name}' at versions {dict(zip(tables, versions))}")
+            return value
+
+    def invalidate(self, *tables: str) -> None:
+        """Bump the data version of ``tables``; unknown tables are ignored."""
+        with self._lock:
+            for table in tables:
+                self._writes[table] = self._writes.get(table, 0) + 1
+                if table in self._versions:
+                    self._versions[table] += 1
+                    logger.info(f"Reference data version of {table} bumped to {self._versions[table]}")
+
+    def write_version(self, table: str) -> int:
+        """Number of writes to ``table`` reported in this process."""
+        with self._lock:
+            return self._writes.get(table, 0)
+
+    def clear(self) -> None:
+        """Drop every entry (tests, or after bulk loads outside the app)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per dataset and current table versions."""
+        with self._lock:
+            datasets = {}
+            for name, counters in self._stats.items():
+                requests = counters["hits"] + counters["misses"]
+                datasets[name] = {
+                    "hits": int(counters["hits"]),
+                    "misses": int(counters["misses"]),
+                    "hit_rate": counters["hits"] / requests if requests else 0.0,
+                    "load_seconds": round(counters["load_seconds"], 6),
+                    "cached": name in self._entries,
+                }
+            return {
+                "datasets": datasets,
+                "table_versions": dict(self._versions),
+                "max_age_seconds": self.max_age_seconds,
+            }
+
+
+reference_cache = ReferenceDataCache()
+reference_cache.register("plants", _load_plants, ["plant_master"])
+reference_cache.register("routes", _load_routes, ["transport_routes_modes"])
+reference_cache.register("route_lookup", _load_route_lookup, ["transport_routes_modes"])
+reference_cache.register("modes", _load_modes, ["transport_routes_modes"])
+reference_cache.register("customers", _load_customers, ["demand_forecast", "transport_routes_modes", "plant_master"])
+
+
+def get_plants(db: Session) -> pd.DataFrame:
+    """Plant master indexed by ``plant_id``."""
+    return reference_cache.get(db, "plants")
+
+
+def get_plant_names(db: Session) -> Dict[str, str]:
+    """``{plant_id: plant_name}``."""
+    return get_plants(db)["plant_name"].to_dict()
+
+
+def get_routes(db: Session) -> pd.DataFrame:
+    """All transport routes (active and inactive) in table order."""
+    return reference_cache.get(db, "routes")
+
+
+def get_route_lookup(db: Session) -> Dict[Tuple[str, str, str], Dict[str, Any]]:
+    """``{(origin, destination, mode): route record}``."""
+    return reference_cache.get(db, "route_lookup")
+
+
+def get_transport_modes(db: Session) -> List[str]:
+    """Distinct modes of the active routes."""
+    return reference_cache.get(db, "modes")
+
+
+def get_customer_nodes(db: Session) -> List[str]:
+    """Demand nodes plus route destinations that are not plants."""
+    return reference_cache.get(db, "customers")
+
+
+def invalidate_reference_data(*tables: str) -> None:
+    """Bump the data version of the given tables after writing to them."""
+    reference_cache.invalidate(*tables)
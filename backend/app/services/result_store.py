@@ -0,0 +1,254 @@
+"""
+Columnar storage for optimization result plans.
+
+Shipments, production, inventory and trips of a run are written as Parquet
+datasets partitioned by ``run_id`` and ``period``:
+
+    <RESULTS_STORE_DIR>/<table>/run_id=<run_id>/period=<period>/part-0.parquet
+
+The ``OptimizationResults`` row then keeps only the summary scalars and
+``plan_storage="parquet"``. Reads go through :func:`load_plan`, which applies
+column projection and partition/row filters in the Arrow scanner, so a
+dashboard asking for one plant or period never loads the whole plan. Rows
+written before this store existed (``plan_storage="json"``) are converted
+from their JSON columns into the same DataFrame layout.
+
+``pyarrow`` is optional; without it results stay in the JSON columns.
+"""
+
+import os
+import shutil
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from app.core.config import get_settings
+
+PLAN_TABLES = ("shipments", "production", "inventory", "trips")
+
+PLAN_COLUMNS = {
+    "production": ["plant_id", "period", "tonnes"],
+    "inventory": ["plant_id", "period", "tonnes"],
+    "shipments": [
+        "origin", "destination", "mode", "period", "tonnes", "trips",
+        "mode_activated", "vehicle_capacity", "sbq_requirement",
+    ],
+    "trips": ["origin", "destination", "mode", "period", "trips", "shipment_tonnes", "utilization"],
+}
+
+
+def arrow_available() -> bool:
+    """Return True if the optional ``pyarrow`` dependency is importable."""
+    try:
+        import pyarrow.dataset  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _split_route_key(key: str) -> Optional[List[str]]:
+    """Split ``origin-destination[-mode[-period]]`` keys; periods may contain dashes.
+
+    Older plans without a mode default to "truck", as the KPI calculator did.
+    """
+    parts = str(key).split("-", 3)
+    if len(parts) < 2:
+        return None
+    if len(parts) == 2:
+        parts.append("truck")
+    if len(parts) == 3:
+        parts.append("")
+    return parts
+
+
+def _nested_to_frame(plan: Optional[Dict[str, Any]]) -> pd.DataFrame:
+    """``{plant: {period: tonnes}}`` -> plant_id/period/tonnes rows."""
+    rows = [
+        {"plant_id": plant, "period": str(period), "tonnes": float(qty or 0.0)}
+        for plant, periods in (plan or {}).items()
+        if isinstance(periods, dict)
+        for period, qty in periods.items()
+    ]
+    return pd.DataFrame(rows, columns=PLAN_COLUMNS["production"])
+
+
+def _route_plan_to_frame(plan: Optional[Dict[str, Any]], table: str) -> pd.DataFrame:
+    """``{"i-j-mode-t": {...}}`` -> one row per route and period."""
+    rows = []
+    for key, entry in (plan or {}).items():
+        parts = _split_route_key(key) if key != "_metadata" else None
+        if parts is None:
+            continue
+        origin, destination, mode, period = parts
+        entry = entry if isinstance(entry, dict) else {"shipment_tonnes": entry}
+        if table == "shipments":
+            rows.append({
+                "origin": origin,
+                "destination": destination,
+                "mode": mode,
+                "period": period,
+                "tonnes": float(entry.get("shipment_tonnes") or 0.0),
+                "trips": int(entry.get("trips") or 0),
+                "mode_activated": bool(entry.get("mode_activated", False)),
+                "vehicle_capacity": float(entry.get("vehicle_capacity") or 0.0),
+                "sbq_requirement": float(entry.get("sbq_requirement") or 0.0),
+            })
+        else:
+            rows.append({
+                "origin": origin,
+                "destination": destination,
+                "mode": mode,
+                "period": period,
+                "trips": int(entry.get("trips") or 0),
+                "shipment_tonnes": float(entry.get("shipment_tonnes") or 0.0),
+                "utilization": float(entry.get("utilization") or 0.0),
+            })
+    return pd.DataFrame(rows, columns=PLAN_COLUMNS[table])
+
+
+def plan_frames(
+    production_plan: Optional[Dict[str, Any]] = None,
+    shipment_plan: Optional[Dict[str, Any]] = None,
+    inventory_profile: Optional[Dict[str, Any]] = None,
+    trip_plan: Optional[Dict[str, Any]] = None,
+) -> Dict[str, pd.DataFrame]:
+    """Convert the JSON-shaped plans of ``OptimizationService`` into frames."""
+    return {
+        "production": _nested_to_frame(production_plan),
+        "inventory": _nested_to_frame(inventory_profile),
+        "shipments": _route_plan_to_frame(shipment_plan, "shipments"),
+        "trips": _route_plan_to_frame(trip_plan, "trips"),
+    }
+
+
+def _apply_filters(df: pd.DataFrame, filters: Optional[Dict[str, Any]]) -> pd.DataFrame:
+    for column, wanted in (filters or {}).items():
+        if isinstance(wanted, (list, tuple, set)):
+            df = df[df[column].isin([str(w) if column == "period" else w for w in wanted])]
+        else:
+            df = df[df[column] == (str(wanted) if column == "period" else wanted)]
+    return df
+
+
+class ResultStore:
+    """Parquet datasets of result plans, one directory tree per plan table."""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or get_settings().RESULTS_STORE_DIR
+
+    def _table_dir(self, table: str) -> str:
+        if table not in PLAN_TABLES:
+            raise ValueError(f"Unknown result table '{table}'. Use one of {PLAN_TABLES}")
+        return os.path.join(self.root, table)
+
+    def _run_dir(self, table: str, run_id: str) -> str:
+        return os.path.join(self._table_dir(table), f"run_id={run_id}")
+
+    @staticmethod
+    def _partitioning():
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        return ds.partitioning(
+            pa.schema([("run_id", pa.string()), ("period", pa.string())]), flavor="hive"
+        )
+
+    def write_run(self, run_id: str, frames: Dict[str, pd.DataFrame]) -> str:
+        """Write (or overwrite) every plan table of ``run_id``; returns the store root."""
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        for table, df in frames.items():
+            run_dir = self._run_dir(table, run_id)
+            if os.path.isdir(run_dir):
+                shutil.rmtree(run_dir)
+            if df is None or df.empty:
+                continue
+            df = df.assign(run_id=run_id, period=df["period"].astype(str))
+            ds.write_dataset(
+                pa.Table.from_pandas(df, preserve_index=False),
+                base_dir=self._table_dir(table),
+                format="parquet",
+                partitioning=self._partitioning(),
+                basename_template="part-{i}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+            )
+        return self.root
+
+    def read(
+        self,
+        run_id: str,
+        table: str,
+        columns: Optional[Iterable[str]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> pd.DataFrame:
+        """Read a slice of one plan table.
+
+        ``columns`` is pushed down as a projection and ``filters`` (column ->
+        value or list of values) as a scanner predicate; ``period`` filters
+        prune whole partitions.
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        columns = list(columns) if columns else list(PLAN_COLUMNS[table])
+        if not os.path.isdir(self._run_dir(table, run_id)):
+            return pd.DataFrame(columns=columns)
+
+        # Only this run's directory is listed; period partitions are pruned
+        # by the scanner.
+        dataset = ds.dataset(
+            self._run_dir(table, run_id),
+            format="parquet",
+            partitioning=ds.partitioning(pa.schema([("period", pa.string())]), flavor="hive"),
+        )
+        expr = None
+        for column, wanted in (filters or {}).items():
+            if isinstance(wanted, (list, tuple, set)):
+                values = [str(w) if column == "period" else w for w in wanted]
+                term = ds.field(column).isin(values)
+            else:
+                term = ds.field(column) == (str(wanted) if column == "period" else wanted)
+            expr = term if expr is None else expr & term
+        return dataset.to_table(columns=columns, filter=expr).to_pandas()
+
+    def delete_run(self, run_id: str) -> None:
+        for table in PLAN_TABLES:
+            run_dir = self._run_dir(table, run_id)
+            if os.path.isdir(run_dir):
+                shutil.rmtree(run_dir)
+
+
+def parquet_storage_enabled() -> bool:
+    """True if results should be written to the Parquet store."""
+    return get_settings().RESULTS_STORAGE == "parquet" and arrow_available()
+
+
+def load_plan(
+    results,
+    table: str,
+    columns: Optional[Iterable[str]] = None,
+    filters: Optional[Dict[str, Any]] = None,
+    store: Optional[ResultStore] = None,
+) -> pd.DataFrame:
+    """Return a plan table of an ``OptimizationResults`` row as a DataFrame.
+
+    Parquet-backed rows are read with projection and predicate pushdown;
+    JSON-backed rows are converted and filtered in memory.
+    """
+    columns = list(columns) if columns else list(PLAN_COLUMNS[table])
+
+    if getattr(results, "plan_storage", None) == "parquet" and arrow_available():
+        return (store or ResultStore()).read(results.run_id, table, columns=columns, filters=filters)
+
+    shipment_plan = results.shipment_plan if isinstance(results.shipment_plan, dict) else {}
+    metadata = getattr(results, "additional_metrics", None) or shipment_plan.get("_metadata", {})
+    if table == "production":
+        df = _nested_to_frame(results.production_plan)
+    elif table == "inventory":
+        df = _nested_to_frame(results.inventory_profile)
+    elif table == "shipments":
+        df = _route_plan_to_frame(shipment_plan, "shipments")
+    else:
+        df = _route_plan_to_frame(metadata.get("trip_plan", {}), "trips")
+    return _apply_filters(df, filters)[columns].reset_index(drop=True)
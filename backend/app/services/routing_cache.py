@@ -7,6 +7,9 @@ This service provides intelligent routing with:
 3. Intelligent fallback between OSRM and ORS
 4. Comprehensive caching with last-known-good values
 5. Structured error logging instead of silent failures
+6. One routing cache: a bounded in-memory LRU (``route_cache``) in front of
+   transport_lookup, preloaded at startup, with single-flight fetches and
+   stale-while-revalidate
 
 CRITICAL IMPROVEMENTS:
 - Plant lat/lng comes from plant_master table
@@ -18,24 +21,265 @@ CRITICAL IMPROVEMENTS:
 - Structured error logs instead of silent None returns
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Awaitable, Callable, Iterable, List, Optional, Sequence, Tuple, TypeVar
+import asyncio
 import logging
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 
-from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from app.db.models.transport_lookup import TransportLookup
 from app.db.models.plant_master import PlantMaster
 from app.services.external.osrm_client import get_route_osrm
 from app.services.external.ors_client import get_route_ors
-from app.services.coordinate_resolver import get_route_coordinates
+from app.services.external.matrix_client import RouteMatrix, get_matrix_ors, get_matrix_osrm
+from app.services.coordinate_resolver import CoordinateResolver, get_route_coordinates
+from app.services.validation.staging_validator import UPSERT_DIALECTS
 from app.core.config import get_settings
 from app.utils.exceptions import DataValidationError, ExternalAPIError
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Cached routes younger than this are used without asking a provider
+ROUTE_CACHE_MAX_AGE_DAYS = 30
+
+# Columns that identify a cached route
+ROUTE_KEY_COLUMNS = ("origin_plant_id", "destination_node_id", "transport_mode")
+
+# transport_lookup rows read per round trip by RouteCache.preload
+ROUTE_PRELOAD_CHUNK_SIZE = 10000
+
+# (origin_plant_id, destination_node_id, transport_mode)
+RouteKey = Tuple[str, str, str]
+T = TypeVar("T")
+
+
+@dataclass
+class CachedRoute:
+    """A transport_lookup route as kept in memory."""
+
+    distance_km: float
+    duration_minutes: float
+    source: str
+    created_at: Optional[datetime]
+
+    @property
+    def age_days(self) -> int:
+        return (datetime.utcnow() - self.created_at).days if self.created_at else 0
+
+    @property
+    def is_fresh(self) -> bool:
+        return self.created_at is not None and self.age_days < ROUTE_CACHE_MAX_AGE_DAYS
+
+
+class RouteCache:
+    """Bounded in-memory LRU of transport_lookup routes, with single-flight fetches.
+
+    Reads go to memory first and to transport_lookup on a miss; routes read,
+    preloaded or stored are kept until ``max_entries`` more recently used ones
+    push them out. A fetch started through :meth:`single_flight` or
+    :meth:`refresh` runs once per route at a time: callers asking for a route
+    already being fetched await that fetch instead of starting another.
+    In-flight fetches belong to the event loop that started them.
+
+    Cached routes are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[RouteKey, CachedRoute]" = OrderedDict()
+        self._stats = {"hits": 0, "db_hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._in_flight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[RouteKey, asyncio.Task]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @property
+    def max_entries(self) -> int:
+        if self._max_entries is not None:
+            return self._max_entries
+        return settings.ROUTE_CACHE_MAX_ENTRIES
+
+    def _put(self, key: RouteKey, route: CachedRoute) -> None:
+        # Caller holds the lock
+        self._entries[key] = route
+        self._entries.move_to_end(key)
+        while len(self._entries) > max(0, self.max_entries):
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def put(self, key: RouteKey, route: CachedRoute) -> None:
+        with self._lock:
+            self._put(key, route)
+
+    def peek(self, key: RouteKey) -> Optional[CachedRoute]:
+        """Route ``key`` if it is in memory (it then counts as recently used)."""
+        with self._lock:
+            route = self._entries.get(key)
+            if route is not None:
+                self._entries.move_to_end(key)
+            return route
+
+    def get(self, db: Session, key: RouteKey) -> Optional[CachedRoute]:
+        """Route ``key`` from memory, else from transport_lookup; None if not cached."""
+        route = self.peek(key)
+        if route is not None:
+            with self._lock:
+                self._stats["hits"] += 1
+            return route
+
+        origin_plant_id, destination_node_id, transport_mode = key
+        row = (
+            db.query(TransportLookup)
+            .filter(
+                TransportLookup.origin_plant_id == origin_plant_id,
+                TransportLookup.destination_node_id == destination_node_id,
+                TransportLookup.transport_mode == transport_mode,
+            )
+            .first()
+        )
+        with self._lock:
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["db_hits"] += 1
+            route = _cached_route(row)
+            self._put(key, route)
+        return route
+
+    def get_many(
+        self, db: Session, origins: Sequence[str], destinations: Sequence[str], transport_mode: str,
+    ) -> Dict[Tuple[str, str], CachedRoute]:
+        """Cached routes of origins x destinations by pair: memory first, the rest in one query."""
+        found = {}
+        for origin in origins:
+            for destination in destinations:
+                route = self.peek((origin, destination, transport_mode))
+                if route is not None:
+                    found[(origin, destination)] = route
+        hits = len(found)
+
+        if hits < len(origins) * len(destinations):
+            rows = (
+                db.query(TransportLookup)
+                .filter(
+                    TransportLookup.origin_plant_id.in_(origins),
+                    TransportLookup.destination_node_id.in_(destinations),
+                    TransportLookup.transport_mode == transport_mode,
+                )
+                .all()
+            )
+            with self._lock:
+                for row in rows:
+                    pair = (row.origin_plant_id, row.destination_node_id)
+                    if pair not in found:
+                        found[pair] = _cached_route(row)
+                        self._put((*pair, transport_mode), found[pair])
+
+        with self._lock:
+            self._stats["hits"] += hits
+            self._stats["db_hits"] += len(found) - hits
+            self._stats["misses"] += len(origins) * len(destinations) - len(found)
+        return found
+
+    def preload(self, db: Session) -> int:
+        """Load transport_lookup into memory, newest routes as most recently used.
+
+        Returns:
+            Number of routes kept (at most ``max_entries``)
+        """
+        stmt = (
+            select(
+                TransportLookup.origin_plant_id,
+                TransportLookup.destination_node_id,
+                TransportLookup.transport_mode,
+                TransportLookup.distance_km,
+                TransportLookup.duration_minutes,
+                TransportLookup.source,
+                TransportLookup.created_at,
+            )
+            .order_by(TransportLookup.created_at, TransportLookup.id)
+            .execution_options(yield_per=ROUTE_PRELOAD_CHUNK_SIZE)
+        )
+        loaded = 0
+        for partition in db.execute(stmt).partitions():
+            with self._lock:
+                for row in partition:
+                    self._put(
+                        (row.origin_plant_id, row.destination_node_id, row.transport_mode),
+                        CachedRoute(row.distance_km, row.duration_minutes, row.source, row.created_at),
+                    )
+            loaded += len(partition)
+        kept = min(loaded, max(0, self.max_entries))
+        logger.info(f"Preloaded {kept} of {loaded} cached routes into memory")
+        return kept
+
+    def _start(self, key: RouteKey, fetch: Callable[[], Awaitable[T]]) -> "asyncio.Task[T]":
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            in_flight = self._in_flight.setdefault(loop, {})
+            task = in_flight.get(key)
+            if task is not None:
+                self._stats["coalesced"] += 1
+                return task
+            task = loop.create_task(fetch())
+            in_flight[key] = task
+
+        def done(_):
+            with self._lock:
+                if in_flight.get(key) is task:
+                    del in_flight[key]
+
+        task.add_done_callback(done)
+        return task
+
+    async def single_flight(self, key: RouteKey, fetch: Callable[[], Awaitable[T]]) -> T:
+        """Result of ``fetch()``, or of the fetch of ``key`` already in flight."""
+        # A cancelled caller does not cancel the fetch others are waiting for
+        return await asyncio.shield(self._start(key, fetch))
+
+    def refresh(self, key: RouteKey, fetch: Callable[[], Awaitable[Any]]) -> "asyncio.Task[Any]":
+        """Run ``fetch()`` in the background, unless a fetch of ``key`` is in flight."""
+        return self._start(key, fetch)
+
+    async def wait_in_flight(self) -> None:
+        """Wait for the fetches in flight on the running loop (before ``asyncio.run`` returns)."""
+        with self._lock:
+            tasks = list(self._in_flight.get(asyncio.get_running_loop(), {}).values())
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def clear(self) -> None:
+        """Drop every route from memory (transport_lookup is untouched)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and the number of routes in memory."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["db_hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+def _cached_route(row: TransportLookup) -> CachedRoute:
+    return CachedRoute(row.distance_km, row.duration_minutes, row.source, row.created_at)
+
+
+route_cache = RouteCache()
+
 
 async def get_route_with_cache(
     db: Session,
@@ -52,6 +296,14 @@ async def get_route_with_cache(
     3. Intelligent fallback between OSRM and ORS
     4. Uses last-known-good cached values if APIs fail
     5. Comprehensive error logging
+    6. Routes are read from memory before transport_lookup (``route_cache``);
+       a stale route is returned at once and refreshed in the background, and
+       concurrent lookups of an uncached route share a single fetch
+    
+    The background refresh is a task on the caller's event loop. Callers that
+    run their own loop (``asyncio.run`` in scripts, tests or worker threads)
+    must ``await route_cache.wait_in_flight()`` before it ends; a loop that
+    closes first cancels the refresh and the route stays stale.
     
     Args:
         db: Database session
@@ -63,33 +315,45 @@ async def get_route_with_cache(
         Dict with distance_km, duration_minutes, source, or None if all methods fail
     """
     logger.info(f"Getting route: {origin_plant_id} -> {destination_node_id} ({transport_mode})")
+    key = (origin_plant_id, destination_node_id, transport_mode)
     
-    # 1) Check cache first
-    cached = (
-        db.query(TransportLookup)
-        .filter(
-            TransportLookup.origin_plant_id == origin_plant_id,
-            TransportLookup.destination_node_id == destination_node_id,
-            TransportLookup.transport_mode == transport_mode,
-        )
-        .first()
-    )
+    # 1) Check cache first: memory, then transport_lookup
+    cached = route_cache.get(db, key)
+    
+    if cached and cached.is_fresh:
+        logger.info(f"Using fresh cached route: {cached.distance_km:.1f}km, {cached.duration_minutes:.1f}min ({cached.source})")
+        return {
+            "distance_km": cached.distance_km,
+            "duration_minutes": cached.duration_minutes,
+            "source": cached.source,
+            "cached": True,
+            "cache_age_days": cached.age_days
+        }
     
+    # 2) Stale: serve the last known value while it is refreshed in the background
     if cached:
-        # Check if cache is recent (within 30 days) - use it directly
-        if cached.created_at and (datetime.utcnow() - cached.created_at).days < 30:
-            logger.info(f"Using fresh cached route: {cached.distance_km:.1f}km, {cached.duration_minutes:.1f}min ({cached.source})")
-            return {
-                "distance_km": cached.distance_km,
-                "duration_minutes": cached.duration_minutes,
-                "source": cached.source,
-                "cached": True,
-                "cache_age_days": (datetime.utcnow() - cached.created_at).days
-            }
-        else:
-            logger.info(f"Found stale cached route ({(datetime.utcnow() - cached.created_at).days} days old), will try to refresh")
+        logger.info(f"Found stale cached route ({cached.age_days} days old), refreshing in background")
+        route_cache.refresh(key, lambda: _refresh_route(db.get_bind(), key))
+        return {
+            "distance_km": cached.distance_km,
+            "duration_minutes": cached.duration_minutes,
+            "source": f"{cached.source}_stale",
+            "cached": True,
+            "cache_age_days": cached.age_days,
+            "warning": "Using stale cache while the route is refreshed"
+        }
     
-    # 2) Not cached or stale: resolve coordinates and fetch from external APIs
+    # 3) Not cached: fetch once, however many requests are waiting for this route.
+    # The fetch outlives a cancelled caller, so it must not use the caller's session.
+    result = await route_cache.single_flight(key, lambda: _fetch_route_in_own_session(db.get_bind(), key))
+    return dict(result) if result else None
+
+
+async def _fetch_route(db: Session, key: RouteKey) -> Optional[Dict[str, Any]]:
+    """Fetch a route from the providers and cache it; None if that fails."""
+    origin_plant_id, destination_node_id, transport_mode = key
+    
+    # 1) Resolve coordinates
     try:
         # PHASE 2 FIX: Get REAL coordinates from plant_master table
         origin_coords, dest_coords = get_route_coordinates(db, origin_plant_id, destination_node_id)
@@ -97,22 +361,9 @@ async def get_route_with_cache(
         
     except DataValidationError as e:
         logger.error(f"Failed to resolve coordinates for route {origin_plant_id} -> {destination_node_id}: {e}")
-        
-        # If we have stale cached data, use it as fallback
-        if cached:
-            logger.warning(f"Using stale cached route due to coordinate resolution failure: {cached.distance_km:.1f}km")
-            return {
-                "distance_km": cached.distance_km,
-                "duration_minutes": cached.duration_minutes,
-                "source": f"{cached.source}_stale",
-                "cached": True,
-                "cache_age_days": (datetime.utcnow() - cached.created_at).days,
-                "warning": "Using stale cache due to coordinate resolution failure"
-            }
-        
         return None
     
-    # 3) Try external APIs with intelligent fallback
+    # 2) Try external APIs with intelligent fallback
     result = None
     provider = None
     api_errors = []
@@ -141,62 +392,24 @@ async def get_route_with_cache(
             api_errors.append(f"OSRM failed: {e}")
             logger.warning(f"OSRM API failed: {e}")
     
-    # 4) Handle API failures
+    # 3) Handle API failures
     if not result:
         logger.error(f"All routing APIs failed for {origin_plant_id} -> {destination_node_id}: {'; '.join(api_errors)}")
-        
-        # PHASE 2 FIX: Use last known cached value if available
-        if cached:
-            logger.warning(f"Using last known cached route due to API failures: {cached.distance_km:.1f}km ({cached.source})")
-            return {
-                "distance_km": cached.distance_km,
-                "duration_minutes": cached.duration_minutes,
-                "source": f"{cached.source}_fallback",
-                "cached": True,
-                "cache_age_days": (datetime.utcnow() - cached.created_at).days,
-                "warning": f"Using cached fallback due to API failures: {'; '.join(api_errors)}"
-            }
-        
-        # No cached data available - complete failure
-        logger.error(f"No cached fallback available for route {origin_plant_id} -> {destination_node_id}")
         return None
     
-    # 5) Store successful result in cache
+    # 4) Store successful result in cache (a failed write is logged, not raised)
     distance_km = result.get("distance_m", 0) / 1000.0
     duration_minutes = result.get("duration_s", 0) / 60.0
+    store_routes(db, [{
+        "origin_plant_id": origin_plant_id,
+        "destination_node_id": destination_node_id,
+        "transport_mode": transport_mode,
+        "distance_km": distance_km,
+        "duration_minutes": duration_minutes,
+        "source": provider,
+    }])
     
-    try:
-        # Update existing cache entry or create new one
-        if cached:
-            cached.distance_km = distance_km
-            cached.duration_minutes = duration_minutes
-            cached.source = provider
-            cached.updated_at = datetime.utcnow()
-            logger.info(f"Updated cached route: {distance_km:.1f}km, {duration_minutes:.1f}min ({provider})")
-        else:
-            cache_entry = TransportLookup(
-                origin_plant_id=origin_plant_id,
-                destination_node_id=destination_node_id,
-                transport_mode=transport_mode,
-                distance_km=distance_km,
-                duration_minutes=duration_minutes,
-                source=provider,
-            )
-            db.add(cache_entry)
-            logger.info(f"Cached new route: {distance_km:.1f}km, {duration_minutes:.1f}min ({provider})")
-        
-        db.commit()
-        
-    except IntegrityError:
-        # Duplicate entry - safe to ignore for idempotency
-        db.rollback()
-        logger.debug("Duplicate cache entry - ignoring")
-    except SQLAlchemyError as e:
-        # Database error - log but don't fail the request
-        db.rollback()
-        logger.error(f"Failed to cache route result: {e}")
-    
-    # 6) Return successful result
+    # 5) Return successful result
     return {
         "distance_km": distance_km,
         "duration_minutes": duration_minutes,
@@ -207,6 +420,242 @@ async def get_route_with_cache(
     }
 
 
+async def _fetch_route_in_own_session(bind, key: RouteKey) -> Optional[Dict[str, Any]]:
+    """:func:`_fetch_route` in a session of its own, which no request closes under it."""
+    db = Session(bind=bind)
+    try:
+        return await _fetch_route(db, key)
+    finally:
+        db.close()
+
+
+async def _refresh_route(bind, key: RouteKey) -> None:
+    """Background refresh of a stale route."""
+    try:
+        if await _fetch_route_in_own_session(bind, key) is None:
+            logger.warning(f"Refreshing stale route {key} failed; keeping the cached route")
+    except asyncio.CancelledError:
+        logger.warning(f"Refreshing stale route {key} was cancelled (event loop closed?); the route stays stale")
+        raise
+    except Exception as e:
+        logger.error(f"Refreshing stale route {key} failed: {e}")
+
+
+def store_routes(db: Session, routes: Sequence[Dict[str, Any]]) -> int:
+    """
+    Upsert routes into transport_lookup in bulk.
+    
+    Each route has the ROUTE_KEY_COLUMNS plus distance_km, duration_minutes
+    and source. Existing entries are overwritten and count as fresh again,
+    in transport_lookup and in memory.
+    
+    Returns:
+        Number of routes written (0 if the write failed; the error is logged)
+    """
+    if not routes:
+        return 0
+    
+    try:
+        dialect = db.get_bind().dialect.name
+        if dialect in UPSERT_DIALECTS:
+            stmt = UPSERT_DIALECTS[dialect](TransportLookup.__table__)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(ROUTE_KEY_COLUMNS),
+                set_={
+                    "distance_km": stmt.excluded.distance_km,
+                    "duration_minutes": stmt.excluded.duration_minutes,
+                    "source": stmt.excluded.source,
+                    "created_at": func.now(),
+                },
+            )
+            db.execute(stmt, list(routes))
+        else:
+            for route in routes:
+                key = {column: route[column] for column in ROUTE_KEY_COLUMNS}
+                entry = db.query(TransportLookup).filter_by(**key).first() or TransportLookup(**key)
+                entry.distance_km = route["distance_km"]
+                entry.duration_minutes = route["duration_minutes"]
+                entry.source = route["source"]
+                entry.created_at = datetime.utcnow()
+                db.add(entry)
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Failed to cache {len(routes)} routes: {e}")
+        return 0
+    
+    now = datetime.utcnow()
+    for route in routes:
+        route_cache.put(
+            tuple(route[column] for column in ROUTE_KEY_COLUMNS),
+            CachedRoute(route["distance_km"], route["duration_minutes"], route["source"], now),
+        )
+    logger.info(f"Cached {len(routes)} routes in bulk")
+    return len(routes)
+
+
+def _matrix_providers(provider: Optional[str]) -> List[Tuple[str, Any]]:
+    """Matrix fetchers in fallback order: ORS first if configured, as for single routes."""
+    provider = (provider or settings.ROUTING_PROVIDER or "auto").lower()
+    providers = []
+    if provider in ("auto", "ors") and settings.ORS_API_KEY and settings.ORS_BASE_URL:
+        providers.append(("ORS", get_matrix_ors))
+    if provider in ("auto", "osrm"):
+        providers.append(("OSRM", get_matrix_osrm))
+    return providers
+
+
+async def _fetch_matrix(sources: List[Tuple[float, float]], destinations: List[Tuple[float, float]], provider: Optional[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, int]:
+    """Distance and duration matrices, source per cell ('' if not fetched), failed mask, request count.
+    
+    Cells whose block failed with one provider are retried with the next,
+    over the rows and columns that still have failed cells.
+    """
+    shape = (len(sources), len(destinations))
+    distance_m, duration_s = np.full(shape, np.nan), np.full(shape, np.nan)
+    source = np.full(shape, "", dtype=object)
+    failed = np.ones(shape, dtype=bool)
+    requests = 0
+    
+    for name, get_matrix in _matrix_providers(provider):
+        rows, columns = np.flatnonzero(failed.any(axis=1)), np.flatnonzero(failed.any(axis=0))
+        if not len(rows):
+            break
+        try:
+            matrix: RouteMatrix = await get_matrix([sources[i] for i in rows], [destinations[j] for j in columns])
+        except ExternalAPIError as e:
+            logger.warning(f"{name} matrix failed: {e}")
+            continue
+        requests += matrix.requests
+        grid = np.ix_(rows, columns)
+        fetched = failed[grid] & ~matrix.failed
+        for target, values in ((distance_m, matrix.distance_m), (duration_s, matrix.duration_s)):
+            target[grid] = np.where(fetched, values, target[grid])
+        source[grid] = np.where(fetched, name, source[grid])
+        failed[grid] &= matrix.failed
+    
+    return distance_m, duration_s, source, failed, requests
+
+
+async def get_route_matrix_with_cache(
+    db: Session,
+    origin_plant_ids: Iterable[str],
+    destination_node_ids: Iterable[str],
+    transport_mode: str = "driving",
+    provider: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Routes for every origin x destination pair, fetching the missing ones as distance matrices.
+    
+    Fresh cached routes are read from memory and transport_lookup (one
+    query for the pairs not in memory). The pairs without one are
+    fetched with the OSRM /table or ORS /matrix endpoints (see
+    ``matrix_client``) over the origins and destinations involved, many
+    pairs per request, and written back to transport_lookup in bulk. Pairs
+    whose fetch failed fall back to their stale cached route, as in
+    :func:`get_route_with_cache`.
+    
+    Args:
+        db: Database session
+        origin_plant_ids: Origin plant IDs
+        destination_node_ids: Destination node IDs
+        transport_mode: Transport mode (default: driving)
+        provider: "osrm", "ors" or "auto" (default: ROUTING_PROVIDER)
+        
+    Returns:
+        Dict with ``routes`` ((origin, destination) -> distance_km,
+        duration_minutes, source, cached), the ``cached`` and ``fetched``
+        counts, ``requests`` made, and the ``unroutable`` and ``failed``
+        pairs and ``unresolved`` IDs
+    """
+    origins = list(dict.fromkeys(origin_plant_ids))
+    destinations = list(dict.fromkeys(destination_node_ids))
+    routes: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    stale: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    
+    # 1) Cached routes for all pairs: memory, the rest in one query
+    cached_routes = route_cache.get_many(db, origins, destinations, transport_mode) if origins and destinations else {}
+    for pair, cached in cached_routes.items():
+        entry = {
+            "distance_km": cached.distance_km,
+            "duration_minutes": cached.duration_minutes,
+            "source": cached.source,
+            "cached": True,
+        }
+        (routes if cached.is_fresh else stale)[pair] = entry
+    cached_count = len(routes)
+    
+    # 2) Coordinates of the origins and destinations with missing pairs
+    missing = [(o, d) for o in origins for d in destinations if (o, d) not in routes]
+    resolver = CoordinateResolver(db)
+    unresolved = []
+    sources, source_ids, targets, target_ids = [], [], [], []
+    for ids, resolve, points, resolved in (
+        (dict.fromkeys(o for o, _ in missing), resolver.get_plant_coordinates, sources, source_ids),
+        (dict.fromkeys(d for _, d in missing), resolver.get_node_coordinates, targets, target_ids),
+    ):
+        for node_id in ids:
+            try:
+                points.append(resolve(node_id))
+                resolved.append(node_id)
+            except DataValidationError as e:
+                logger.error(f"Failed to resolve coordinates for {node_id}: {e}")
+                unresolved.append(node_id)
+    
+    # 3) Fetch the matrix and keep the cells of missing pairs
+    requests = 0
+    new_routes, unroutable, failed_pairs = [], [], []
+    if sources and targets:
+        distance_m, duration_s, source, failed, requests = await _fetch_matrix(sources, targets, provider)
+        wanted = set(missing)
+        for i, origin in enumerate(source_ids):
+            for j, destination in enumerate(target_ids):
+                key = (origin, destination)
+                if key not in wanted:
+                    continue
+                if failed[i, j]:
+                    failed_pairs.append(key)
+                elif np.isnan(distance_m[i, j]) or np.isnan(duration_s[i, j]):
+                    unroutable.append(key)
+                else:
+                    new_routes.append({
+                        "origin_plant_id": origin,
+                        "destination_node_id": destination,
+                        "transport_mode": transport_mode,
+                        "distance_km": float(distance_m[i, j]) / 1000.0,
+                        "duration_minutes": float(duration_s[i, j]) / 60.0,
+                        "source": source[i, j],
+                    })
+    
+    # 4) Store fetched routes in bulk; failed pairs fall back to stale cache
+    store_routes(db, new_routes)
+    for route in new_routes:
+        routes[(route["origin_plant_id"], route["destination_node_id"])] = {
+            "distance_km": route["distance_km"],
+            "duration_minutes": route["duration_minutes"],
+            "source": route["source"],
+            "cached": False,
+        }
+    for key in failed_pairs + unroutable:
+        if key in stale:
+            routes[key] = {**stale[key], "source": f"{stale[key]['source']}_fallback"}
+    
+    if failed_pairs:
+        logger.error(f"Routing matrix failed for {len(failed_pairs)} pairs")
+    logger.info(f"Route matrix {len(origins)}x{len(destinations)}: {cached_count} cached, "
+                f"{len(new_routes)} fetched in {requests} requests, {len(unroutable)} unroutable")
+    
+    return {
+        "routes": routes,
+        "cached": cached_count,
+        "fetched": len(new_routes),
+        "requests": requests,
+        "unroutable": unroutable,
+        "failed": failed_pairs,
+        "unresolved": unresolved,
+    }
+
+
 async def test_routing_connectivity(db: Session) -> Dict[str, Any]:
     """
     Test routing connectivity and coordinate resolution.
@@ -279,7 +728,8 @@ async def test_routing_connectivity(db: Session) -> Dict[str, Any]:
         cache_count = db.query(TransportLookup).count()
         test_results["cache_test"] = {
             "status": "success",
-            "cached_routes": cache_count
+            "cached_routes": cache_count,
+            "memory": route_cache.stats()
         }
     except Exception as e:
         test_results["cache_test"] = {
@@ -309,6 +759,8 @@ def clear_routing_cache(db: Session, older_than_days: int = 30) -> Dict[str, Any
         ).delete()
         
         db.commit()
+        # Routes in memory are read again from what is left
+        route_cache.clear()
         
         logger.info(f"Cleared {deleted_count} routing cache entries older than {older_than_days} days")
         
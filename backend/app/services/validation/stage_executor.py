@@ -0,0 +1,100 @@
+"""
+Concurrent execution of independent validation stages.
+
+The validation stages only read the same (immutable) snapshot frames, so they
+can run side by side. Stages run in a thread pool: the frames are shared
+without copying, and the vectorized pandas work inside each stage releases
+the GIL. Results come back in stage order together with each stage's
+duration, so callers assemble their reports exactly as in a sequential run.
+
+A stage that raises short-circuits the run: stages not yet started are
+cancelled and the exception of the first failing stage (in stage order) is
+re-raised, as the sequential loop would have done.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StageRun:
+    """Stage results in stage order, with per-stage and total wall time."""
+
+    results: Dict[str, Any] = field(default_factory=dict)
+    seconds: Dict[str, float] = field(default_factory=dict)
+    wall_seconds: float = 0.0
+
+    def timing(self) -> Dict[str, Any]:
+        return {
+            "stages": {name: round(seconds, 6) for name, seconds in self.seconds.items()},
+            "wall_seconds": round(self.wall_seconds, 6),
+        }
+
+
+class _Skipped(Exception):
+    """A stage not started because an earlier one failed."""
+
+
+def _timed(check: Callable[[], Any], failed: threading.Event) -> Tuple[Any, float]:
+    # Checked in the worker as well: a freed worker may pick up the next
+    # stage before the caller gets to cancel it
+    if failed.is_set():
+        raise _Skipped()
+    start = time.perf_counter()
+    try:
+        result = check()
+    except Exception:
+        failed.set()
+        raise
+    return result, time.perf_counter() - start
+
+
+def run_stages(stages: Mapping[str, Callable[[], Any]], max_workers: Optional[int] = None) -> StageRun:
+    """Run the independent ``stages`` (name -> zero-argument check) concurrently.
+
+    Args:
+        stages: Checks in report order; they must not share mutable state
+            (in particular not a database session)
+        max_workers: Pool size; ``VALIDATION_MAX_WORKERS`` if omitted, and
+            1 or less runs the stages one after another in the caller's thread
+
+    Returns:
+        StageRun with results and durations keyed like ``stages``
+    """
+    workers = max_workers if max_workers is not None else get_settings().VALIDATION_MAX_WORKERS
+    run = StageRun()
+    failed = threading.Event()
+    start = time.perf_counter()
+
+    if workers <= 1 or len(stages) <= 1:
+        for name, check in stages.items():
+            run.results[name], run.seconds[name] = _timed(check, failed)
+        run.wall_seconds = time.perf_counter() - start
+        return run
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(stages)), thread_name_prefix="validation") as pool:
+        futures = {name: pool.submit(_timed, check, failed) for name, check in stages.items()}
+        done, pending = wait(futures.values(), return_when=FIRST_EXCEPTION)
+        if pending and any(future.exception() is not None for future in done):
+            for future in pending:
+                future.cancel()
+            wait(pending)
+
+    for name, future in futures.items():
+        if future.cancelled() or isinstance(future.exception(), _Skipped):
+            continue
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Validation stage {name} failed; remaining stages cancelled")
+            raise error
+        run.results[name], run.seconds[name] = future.result()
+    run.wall_seconds = time.perf_counter() - start
+    return run
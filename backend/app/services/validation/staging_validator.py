@@ -16,7 +16,12 @@ Only data that passes ALL validation steps is promoted to production tables.
 import json
 import logging
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Callable, Dict, Any, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from sqlalchemy import Float, UniqueConstraint, and_, exists, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
@@ -37,6 +42,7 @@ from app.db.models.initial_inventory import InitialInventory
 from app.db.models.safety_stock_policy import SafetyStockPolicy
 from app.utils.exceptions import DataValidationError
 from app.services.audit_service import log_event
+from app.services.reference_data_cache import invalidate_reference_data
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +56,30 @@ STAGING_TO_PRODUCTION_MAP = {
     "safety_stock_policy": (StagingSafetyStock, SafetyStockPolicy),
 }
 
+# Business keys a staged row is matched on when promoted (upsert semantics)
+PROMOTION_KEYS = {
+    "plant_master": ("plant_id",),
+    "demand_forecast": ("customer_node_id", "period"),
+    "transport_routes_modes": ("origin_plant_id", "destination_node_id", "transport_mode"),
+    "production_capacity_cost": ("plant_id", "period"),
+    "initial_inventory": ("node_id", "period"),
+    "safety_stock_policy": ("node_id",),
+}
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+UPSERT_DIALECTS = {
+    "postgresql": postgresql_insert,
+    "sqlite": sqlite_insert,
+}
+
+VALID_TRANSPORT_MODES = ["road", "rail", "sea", "barge", "pipeline"]
+VALID_PLANT_TYPES = ["clinker", "grinding", "terminal", "warehouse"]
+
+# Staging rows read, checked and written back per round trip by validate_batch
+VALIDATION_CHUNK_SIZE = 20000
+# Row error messages kept on the batch record
+MAX_BATCH_ERRORS = 100
+
 
 def validate_schema_constraints(staging_record: Any, table_name: str) -> List[str]:
     """
@@ -187,27 +217,174 @@ def validate_business_rules(staging_record: Any, table_name: str) -> List[str]:
             errors.append("min_batch_quantity_tonnes cannot exceed vehicle_capacity_tonnes")
             
         # Transport mode validation
-        valid_modes = ["road", "rail", "sea", "barge", "pipeline"]
-        if staging_record.transport_mode and staging_record.transport_mode.lower() not in valid_modes:
-            errors.append(f"transport_mode must be one of: {valid_modes}")
+        if staging_record.transport_mode and staging_record.transport_mode.lower() not in VALID_TRANSPORT_MODES:
+            errors.append(f"transport_mode must be one of: {VALID_TRANSPORT_MODES}")
             
     elif table_name == "plant_master":
         # Plant type validation
-        valid_types = ["clinker", "grinding", "terminal", "warehouse"]
-        if staging_record.plant_type and staging_record.plant_type.lower() not in valid_types:
-            errors.append(f"plant_type must be one of: {valid_types}")
+        if staging_record.plant_type and staging_record.plant_type.lower() not in VALID_PLANT_TYPES:
+            errors.append(f"plant_type must be one of: {VALID_PLANT_TYPES}")
+    
+    return errors
+
+
+# Set-based equivalents of the per-record checks above, used by
+# validate_batch. Each rule is (mask over a DataFrame of staging rows,
+# message); rules are applied in the same order as the per-record functions
+# so every row gets the same error list.
+
+def _blank(column: str) -> Callable[[pd.DataFrame], pd.Series]:
+    return lambda df: df[column].fillna("").astype(str).str.strip().eq("")
+
+
+def _missing_or_below(column: str, bound: float, inclusive: bool = False) -> Callable[[pd.DataFrame], pd.Series]:
+    return lambda df: df[column].isna() | (df[column] <= bound if inclusive else df[column] < bound)
+
+
+def _outside(column: str, low: float, high: float) -> Callable[[pd.DataFrame], pd.Series]:
+    return lambda df: df[column].notna() & ((df[column] < low) | (df[column] > high))
+
+
+def _not_in(column: str, allowed: List[str]) -> Callable[[pd.DataFrame], pd.Series]:
+    return lambda df: df[column].notna() & df[column].ne("") & ~df[column].astype(str).str.lower().isin(allowed)
+
+
+SCHEMA_RULES: Dict[str, List[Tuple[Callable[[pd.DataFrame], pd.Series], str]]] = {
+    "plant_master": [
+        (_blank("plant_id"), "plant_id is required"),
+        (_blank("plant_name"), "plant_name is required"),
+        (_blank("plant_type"), "plant_type is required"),
+        (_outside("latitude", -90, 90), "latitude must be between -90 and 90"),
+        (_outside("longitude", -180, 180), "longitude must be between -180 and 180"),
+    ],
+    "demand_forecast": [
+        (_blank("customer_node_id"), "customer_node_id is required"),
+        (_blank("period"), "period is required"),
+        (_missing_or_below("demand_tonnes", 0), "demand_tonnes must be non-negative"),
+        (_outside("confidence_level", 0, 1), "confidence_level must be between 0 and 1"),
+    ],
+    "transport_routes_modes": [
+        (_blank("origin_plant_id"), "origin_plant_id is required"),
+        (_blank("destination_node_id"), "destination_node_id is required"),
+        (_blank("transport_mode"), "transport_mode is required"),
+        (_missing_or_below("vehicle_capacity_tonnes", 0, inclusive=True), "vehicle_capacity_tonnes must be positive"),
+        (lambda df: df["distance_km"] < 0, "distance_km must be non-negative"),
+        (lambda df: df["cost_per_tonne"] < 0, "cost_per_tonne must be non-negative"),
+    ],
+    "production_capacity_cost": [
+        (_blank("plant_id"), "plant_id is required"),
+        (_blank("period"), "period is required"),
+        (_missing_or_below("max_capacity_tonnes", 0, inclusive=True), "max_capacity_tonnes must be positive"),
+        (_missing_or_below("variable_cost_per_tonne", 0), "variable_cost_per_tonne must be non-negative"),
+        (_outside("min_run_level", 0, 1), "min_run_level must be between 0 and 1"),
+    ],
+    "initial_inventory": [
+        (_blank("node_id"), "node_id is required"),
+        (_blank("period"), "period is required"),
+        (_missing_or_below("inventory_tonnes", 0), "inventory_tonnes must be non-negative"),
+    ],
+    "safety_stock_policy": [
+        (_blank("node_id"), "node_id is required"),
+        (_blank("policy_type"), "policy_type is required"),
+        (_missing_or_below("policy_value", 0), "policy_value must be non-negative"),
+    ],
+}
+
+# Staging column that must reference an existing plant_master.plant_id
+PLANT_REFERENCES = {
+    "transport_routes_modes": "origin_plant_id",
+    "production_capacity_cost": "plant_id",
+}
+
+BUSINESS_RULES: Dict[str, List[Tuple[Callable[[pd.DataFrame], pd.Series], str]]] = {
+    "transport_routes_modes": [
+        (
+            lambda df: df["min_batch_quantity_tonnes"] > df["vehicle_capacity_tonnes"],
+            "min_batch_quantity_tonnes cannot exceed vehicle_capacity_tonnes",
+        ),
+        (_not_in("transport_mode", VALID_TRANSPORT_MODES), f"transport_mode must be one of: {VALID_TRANSPORT_MODES}"),
+    ],
+    "plant_master": [
+        (_not_in("plant_type", VALID_PLANT_TYPES), f"plant_type must be one of: {VALID_PLANT_TYPES}"),
+    ],
+}
+
+
+def _missing_plant_references(db: Session, staging_model: Any, table_name: str, batch_id: str) -> Dict[int, str]:
+    """``{staging id: value}`` of pending rows whose plant reference does not
+    exist, found with one anti-join instead of a lookup per row."""
+    column_name = PLANT_REFERENCES.get(table_name)
+    if column_name is None:
+        return {}
+    column = getattr(staging_model, column_name)
+    rows = db.execute(
+        select(staging_model.id, column)
+        .outerjoin(PlantMaster, PlantMaster.plant_id == column)
+        .where(
+            staging_model.batch_id == batch_id,
+            staging_model.validation_status == "pending",
+            column.is_not(None),
+            column != "",
+            PlantMaster.plant_id.is_(None),
+        )
+    ).all()
+    return {row_id: value for row_id, value in rows}
+
+
+def _row_errors(df: pd.DataFrame, table_name: str, missing_references: Dict[int, str]) -> List[List[str]]:
+    """Error list per row of ``df``, in row order."""
+    errors: List[List[str]] = [[] for _ in range(len(df))]
+    
+    def _apply(mask: pd.Series, message) -> None:
+        for position in np.flatnonzero(mask.fillna(False).to_numpy(dtype=bool)):
+            errors[position].append(message(position) if callable(message) else message)
+    
+    for rule, message in SCHEMA_RULES.get(table_name, []):
+        _apply(rule(df), message)
+    
+    if missing_references:
+        column_name = PLANT_REFERENCES[table_name]
+        values = df[column_name].to_numpy()
+        _apply(
+            df["id"].isin(missing_references),
+            lambda position: f"{column_name} '{values[position]}' does not exist in plant_master",
+        )
+    
+    for rule, message in BUSINESS_RULES.get(table_name, []):
+        _apply(rule(df), message)
     
     return errors
 
 
-def validate_batch(db: Session, batch_id: str, user: str = "validation-service") -> Dict[str, Any]:
+def _read_pending_chunk(db: Session, staging_model: Any, batch_id: str, after_id: int, chunk_size: int) -> pd.DataFrame:
+    table = staging_model.__table__
+    columns = [c for c in table.columns if c.name not in ("validation_errors", "created_at")]
+    rows = db.execute(
+        select(*columns)
+        .where(table.c.batch_id == batch_id, table.c.validation_status == "pending", table.c.id > after_id)
+        .order_by(table.c.id)
+        .limit(chunk_size)
+    ).all()
+    df = pd.DataFrame(rows, columns=[c.name for c in columns])
+    return df.astype({c.name: "float64" for c in columns if isinstance(c.type, Float)})
+
+
+def validate_batch(
+    db: Session, batch_id: str, user: str = "validation-service", chunk_size: int = VALIDATION_CHUNK_SIZE
+) -> Dict[str, Any]:
     """
     Validate all records in a staging batch.
     
+    Rows are read in chunks of ``chunk_size`` and checked with vectorized
+    rules plus one anti-join for plant references. Invalid rows are written
+    back per chunk with a bulk UPDATE; the remaining rows are marked valid
+    with a single statement at the end. Everything commits together.
+    
     Args:
         db: Database session
         batch_id: Batch ID to validate
         user: User performing validation
+        chunk_size: Staging rows processed per round trip
         
     Returns:
         Validation results dictionary
@@ -230,42 +407,54 @@ def validate_batch(db: Session, batch_id: str, user: str = "validation-service")
     staging_model, _ = STAGING_TO_PRODUCTION_MAP[table_name]
     
     try:
-        # Get all pending records for this batch
-        staging_records = db.query(staging_model).filter(
-            staging_model.batch_id == batch_id,
-            staging_model.validation_status == "pending"
-        ).all()
-        
-        if not staging_records:
-            raise DataValidationError(f"No pending records found for batch {batch_id}")
+        missing_references = _missing_plant_references(db, staging_model, table_name, batch_id)
         
-        valid_count = 0
+        total_rows = 0
         invalid_count = 0
         validation_errors = []
-        
-        # Validate each record
-        for record in staging_records:
-            record_errors = []
-            
-            # Schema validation
-            record_errors.extend(validate_schema_constraints(record, table_name))
+        last_id = 0
+        
+        # Validate pending records chunk by chunk (keyset pagination on id)
+        while True:
+            chunk = _read_pending_chunk(db, staging_model, batch_id, last_id, chunk_size)
+            if chunk.empty:
+                break
+            last_id = int(chunk["id"].iloc[-1])
+            total_rows += len(chunk)
             
-            # Referential integrity validation
-            record_errors.extend(validate_referential_integrity(db, record, table_name))
+            row_errors = _row_errors(chunk, table_name, missing_references)
+            invalid_updates = []
+            for record_id, source_row, record_errors in zip(chunk["id"], chunk["source_row"], row_errors):
+                if not record_errors:
+                    continue
+                invalid_updates.append({
+                    "id": int(record_id),
+                    "validation_status": "invalid",
+                    "validation_errors": json.dumps(record_errors),
+                })
+                if len(validation_errors) < MAX_BATCH_ERRORS:
+                    source_row = None if pd.isna(source_row) else int(source_row)
+                    validation_errors.extend([f"Row {source_row}: {error}" for error in record_errors])
             
-            # Business rules validation
-            record_errors.extend(validate_business_rules(record, table_name))
-            
-            # Update record validation status
-            if record_errors:
-                record.validation_status = "invalid"
-                record.validation_errors = json.dumps(record_errors)
-                invalid_count += 1
-                validation_errors.extend([f"Row {record.source_row}: {error}" for error in record_errors])
-            else:
-                record.validation_status = "valid"
-                record.validation_errors = None
-                valid_count += 1
+            if invalid_updates:
+                db.execute(update(staging_model), invalid_updates)
+                invalid_count += len(invalid_updates)
+        
+        if total_rows == 0:
+            raise DataValidationError(f"No pending records found for batch {batch_id}")
+        
+        # Every row still pending up to the last one read passed all checks
+        db.execute(
+            update(staging_model)
+            .where(
+                staging_model.batch_id == batch_id,
+                staging_model.validation_status == "pending",
+                staging_model.id <= last_id,
+            )
+            .values(validation_status="valid", validation_errors=None)
+            .execution_options(synchronize_session=False)
+        )
+        valid_count = total_rows - invalid_count
         
         # Update batch status
         batch.valid_rows = valid_count
@@ -274,7 +463,7 @@ def validate_batch(db: Session, batch_id: str, user: str = "validation-service")
         
         if invalid_count > 0:
             batch.status = "validation_failed"
-            batch.validation_errors = json.dumps(validation_errors[:100])  # Limit error size
+            batch.validation_errors = json.dumps(validation_errors[:MAX_BATCH_ERRORS])  # Limit error size
         else:
             batch.status = "validated"
         
@@ -288,7 +477,7 @@ def validate_batch(db: Session, batch_id: str, user: str = "validation-service")
             details={
                 "batch_id": batch_id,
                 "table": table_name,
-                "total_rows": len(staging_records),
+                "total_rows": total_rows,
                 "valid_rows": valid_count,
                 "invalid_rows": invalid_count,
                 "status": batch.status
@@ -298,7 +487,7 @@ def validate_batch(db: Session, batch_id: str, user: str = "validation-service")
         return {
             "batch_id": batch_id,
             "table": table_name,
-            "total_rows": len(staging_records),
+            "total_rows": total_rows,
             "valid_rows": valid_count,
             "invalid_rows": invalid_count,
             "status": batch.status,
@@ -318,11 +507,99 @@ def validate_batch(db: Session, batch_id: str, user: str = "validation-service")
         raise DataValidationError(f"Validation failed for batch {batch_id}: {str(e)}")
 
 
+def _promotion_columns(staging_model, production_model) -> List[str]:
+    """Production columns filled from staging (staging metadata and timestamps excluded)."""
+    staging_columns = staging_model.__table__.c
+    return [
+        column.name for column in production_model.__table__.columns
+        if column.name in staging_columns and column.name not in ("id", "created_at", "updated_at")
+    ]
+
+
+def _has_unique_key(production_model, keys: Tuple[str, ...]) -> bool:
+    """Whether ``keys`` is backed by a primary key or unique constraint (needed for ON CONFLICT)."""
+    table = production_model.__table__
+    candidates = [{c.name for c in table.primary_key.columns}]
+    candidates += [
+        {c.name for c in constraint.columns}
+        for constraint in table.constraints if isinstance(constraint, UniqueConstraint)
+    ]
+    return set(keys) in candidates
+
+
+def _upsert_batch(db: Session, batch_id: str, table_name: str) -> Dict[str, int]:
+    """
+    Copy a batch's valid staging rows into production with set-based statements.
+    
+    Rows are matched on PROMOTION_KEYS; the last staged row wins when a batch
+    repeats a key. Matched production rows are updated (NULL staging values
+    keep the current value), the rest are inserted with INSERT ... SELECT, so
+    no rows pass through Python. Where the key is a real unique constraint on
+    SQLite/PostgreSQL this is one INSERT ... ON CONFLICT DO UPDATE; otherwise
+    an UPDATE ... FROM followed by an anti-joined INSERT ... SELECT.
+    """
+    staging_model, production_model = STAGING_TO_PRODUCTION_MAP[table_name]
+    keys = PROMOTION_KEYS[table_name]
+    staging = staging_model.__table__
+    production = production_model.__table__
+    columns = _promotion_columns(staging_model, production_model)
+    
+    picked = [staging.c.batch_id == batch_id, staging.c.validation_status == "valid"]
+    if not db.scalar(select(exists().where(*picked))):
+        raise DataValidationError(f"No valid records found for batch {batch_id}")
+    
+    # A batch that repeats a key keeps only its last row for that key
+    batch_rows = staging.alias("batch_rows")
+    key_groups = (
+        select(func.max(batch_rows.c.id).label("id"))
+        .where(batch_rows.c.batch_id == batch_id, batch_rows.c.validation_status == "valid")
+        .group_by(*(batch_rows.c[k] for k in keys))
+    )
+    if db.scalar(key_groups.having(func.count() > 1).limit(1)) is not None:
+        latest = key_groups.subquery("latest")
+        picked.append(staging.c.id == latest.c.id)
+    
+    key_match = and_(*(production.c[k] == staging.c[k] for k in keys))
+    
+    # Staging NULLs fall back to the production column default on insert
+    values = []
+    for name in columns:
+        default = production.c[name].default
+        if default is not None and default.is_scalar:
+            values.append(func.coalesce(staging.c[name], default.arg).label(name))
+        else:
+            values.append(staging.c[name])
+    source = select(*values).where(*picked)
+    
+    updatable = [name for name in columns if name not in keys]
+    has_updated_at = "updated_at" in production.c
+    dialect = db.get_bind().dialect.name
+    
+    if dialect in UPSERT_DIALECTS and _has_unique_key(production_model, keys):
+        stmt = UPSERT_DIALECTS[dialect](production).from_select(columns, source)
+        changes = {name: func.coalesce(stmt.excluded[name], production.c[name]) for name in updatable}
+        if has_updated_at:
+            changes["updated_at"] = func.current_timestamp()
+        stmt = stmt.on_conflict_do_update(index_elements=list(keys), set_=changes)
+        matched = db.scalar(select(func.count()).select_from(staging).where(*picked, exists().where(key_match)))
+        affected = db.execute(stmt).rowcount
+        return {"inserted_rows": affected - matched, "updated_rows": matched}
+    
+    changes = {name: func.coalesce(staging.c[name], production.c[name]) for name in updatable}
+    updated = db.execute(update(production).where(key_match, *picked).values(**changes)).rowcount
+    inserted = db.execute(
+        insert(production).from_select(columns, source.where(~exists().where(key_match)))
+    ).rowcount
+    return {"inserted_rows": inserted, "updated_rows": updated}
+
+
 def promote_batch_to_production(db: Session, batch_id: str, user: str = "promotion-service") -> Dict[str, Any]:
     """
     Promote validated staging data to production tables.
     
     This operation is ATOMIC - either all records are promoted or none are.
+    Rows are upserted on the table's business keys (PROMOTION_KEYS) with
+    set-based SQL inside the database; see ``_upsert_batch``.
     
     Args:
         db: Database session
@@ -350,36 +627,12 @@ def promote_batch_to_production(db: Session, batch_id: str, user: str = "promoti
     if table_name not in STAGING_TO_PRODUCTION_MAP:
         raise DataValidationError(f"Unknown table name: {table_name}")
     
-    staging_model, production_model = STAGING_TO_PRODUCTION_MAP[table_name]
+    production_model = STAGING_TO_PRODUCTION_MAP[table_name][1]
     
     try:
-        # Begin transaction for atomic promotion
-        # Get all valid records for this batch
-        valid_records = db.query(staging_model).filter(
-            staging_model.batch_id == batch_id,
-            staging_model.validation_status == "valid"
-        ).all()
-        
-        if not valid_records:
-            raise DataValidationError(f"No valid records found for batch {batch_id}")
-        
-        promoted_count = 0
-        
-        # Convert staging records to production records
-        for staging_record in valid_records:
-            # Extract production fields (exclude staging metadata)
-            production_data = {}
-            for column in production_model.__table__.columns:
-                column_name = column.name
-                if hasattr(staging_record, column_name) and column_name not in ['created_at', 'updated_at']:
-                    value = getattr(staging_record, column_name)
-                    if value is not None:  # Only include non-null values
-                        production_data[column_name] = value
-            
-            # Create production record
-            production_record = production_model(**production_data)
-            db.add(production_record)
-            promoted_count += 1
+        # Both statements and the status change commit together
+        counts = _upsert_batch(db, batch_id, table_name)
+        promoted_count = counts["inserted_rows"] + counts["updated_rows"]
         
         # Update batch status
         batch.status = "promoted"
@@ -387,8 +640,10 @@ def promote_batch_to_production(db: Session, batch_id: str, user: str = "promoti
         
         # Commit all changes atomically
         db.commit()
+        invalidate_reference_data(production_model.__tablename__)
         
-        logger.info(f"Successfully promoted {promoted_count} records from batch {batch_id} to {table_name}")
+        logger.info(f"Successfully promoted {promoted_count} records from batch {batch_id} to {table_name} "
+                    f"({counts['inserted_rows']} inserted, {counts['updated_rows']} updated)")
         
         # Log promotion success
         log_event(
@@ -399,6 +654,7 @@ def promote_batch_to_production(db: Session, batch_id: str, user: str = "promoti
                 "batch_id": batch_id,
                 "table": table_name,
                 "promoted_rows": promoted_count,
+                **counts,
                 "status": "success"
             }
         )
@@ -407,6 +663,7 @@ def promote_batch_to_production(db: Session, batch_id: str, user: str = "promoti
             "batch_id": batch_id,
             "table": table_name,
             "promoted_rows": promoted_count,
+            **counts,
             "status": "promoted",
             "message": f"Successfully promoted {promoted_count} records to production table {table_name}"
         }
@@ -0,0 +1,102 @@
+"""
+Cache of validation results keyed by data version.
+
+The five-stage validation pipeline runs before every optimization and on
+every load of the validation report, although the input tables rarely change
+in between. Results are kept at two levels:
+
+* stage results, keyed by the content hashes (``DataSnapshot.table_versions``)
+  of the tables the stage reads, so after a change to one table only the
+  stages touching it run again;
+* the last full report, keyed by ``table_fingerprints`` of all input tables,
+  so an unchanged database answers without reading the rows at all.
+
+Reports are additionally recomputed after ``VALIDATION_CACHE_MAX_AGE_SECONDS``
+as a bound on writes the fingerprints cannot see. Cached results are shared
+and must be treated as read-only.
+
+A stale stage result is still useful: when it was built at the base versions
+of an incrementally refreshed snapshot, ``last_stage`` hands it back so the
+stage can update it from the changed rows only.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class ValidationCache:
+    """Stage results by table versions and the latest report by fingerprints."""
+
+    def __init__(self, max_age_seconds: Optional[float] = None):
+        self._max_age_seconds = max_age_seconds
+        self._stages: Dict[str, Tuple[Tuple[str, ...], Any]] = {}
+        self._report: Optional[Tuple[Dict[str, str], Dict[str, Any], float]] = None
+        self._stats = {"report_hits": 0, "report_misses": 0, "stage_hits": 0, "stage_misses": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def max_age_seconds(self) -> float:
+        if self._max_age_seconds is not None:
+            return self._max_age_seconds
+        return get_settings().VALIDATION_CACHE_MAX_AGE_SECONDS
+
+    def get_report(self, fingerprints: Mapping[str, str]) -> Optional[Dict[str, Any]]:
+        """The cached report if it was built at ``fingerprints``."""
+        with self._lock:
+            max_age = self.max_age_seconds
+            if (
+                self._report is not None
+                and self._report[0] == dict(fingerprints)
+                and (not max_age or time.monotonic() - self._report[2] < max_age)
+            ):
+                self._stats["report_hits"] += 1
+                return self._report[1]
+            self._stats["report_misses"] += 1
+            return None
+
+    def store_report(self, fingerprints: Mapping[str, str], report: Dict[str, Any]) -> None:
+        with self._lock:
+            self._report = (dict(fingerprints), report, time.monotonic())
+
+    def get_stage(self, stage: str, versions: Tuple[str, ...]) -> Optional[Any]:
+        """Cached result of ``stage`` if its tables are still at ``versions``."""
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is not None and entry[0] == versions:
+                self._stats["stage_hits"] += 1
+                return entry[1]
+            self._stats["stage_misses"] += 1
+            return None
+
+    def last_stage(self, stage: str) -> Optional[Tuple[Tuple[str, ...], Any]]:
+        """The last ``(versions, result)`` stored for ``stage``, current or not."""
+        with self._lock:
+            return self._stages.get(stage)
+
+    def store_stage(self, stage: str, versions: Tuple[str, ...], result: Any) -> None:
+        with self._lock:
+            self._stages[stage] = (versions, result)
+
+    def clear(self) -> None:
+        """Drop all cached results (tests, or after writes outside the app)."""
+        with self._lock:
+            self._stages.clear()
+            self._report = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "cached_stages": sorted(self._stages),
+                "report_cached": self._report is not None,
+                "max_age_seconds": self.max_age_seconds,
+            }
+
+
+validation_cache = ValidationCache()
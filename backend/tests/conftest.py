@@ -6,6 +6,7 @@ from sqlalchemy.orm import sessionmaker
 from app.main import app
 from app.db.base import Base, get_db
 from app.db import models  # ensure all models (including transport_lookup) are registered before create_all
+from app.services.routing_cache import route_cache
 
 # Test in-memory SQLite
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -26,6 +27,8 @@ def db_session(db):
     connection = engine.connect()
     transaction = connection.begin()
     session = TestingSessionLocal(bind=connection)
+    # Routes kept in memory would outlive the rolled-back transaction
+    route_cache.clear()
     yield session
     session.close()
     transaction.rollback()
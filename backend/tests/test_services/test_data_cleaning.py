@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from app.services.data_cleaning_service import DataCleaner, normalize_period
+
+
+def test_periods_normalized_once_per_value_match_single_value_rules():
+    periods = pd.Series(
+        ["2025-01", "2025/02", " 202503 ", "Apr 2025", "JanMar 2024", "2025-W06", "dec", None, 202507, ""] * 3,
+        dtype=object,
+    )
+
+    normalized = DataCleaner()._standardize_period_format(periods)
+
+    assert normalized.tolist()[:7] == ["2025-01", "2025-02", "2025-03", "2025-04", "2024-01", "2025-W06", "dec"]
+    assert normalized[periods.notna()].tolist() == [normalize_period(p) for p in periods if p is not None]
+    assert normalized.isna().sum() == 3
+
+
+def test_demand_cleaning_with_categorical_ids():
+    raw = pd.DataFrame({
+        "customer_node_id": [" cust-01 ", "CUST01", "c 2", "C2"],
+        "period": ["Jan 2025", "2025-01", "2025/02", "202502"],
+        "demand_tonnes": [100.0, 120.0, -5.0, np.nan],
+        "source": ["  manual   upload ", "api", "", None],
+    })
+
+    cleaner = DataCleaner()
+    clean = cleaner.clean_all_data({"demand_df": raw})["demand_df"]
+
+    assert isinstance(clean["customer_node_id"].dtype, pd.CategoricalDtype)
+    assert clean["customer_node_id"].tolist() == ["CUST01", "C2"]
+    assert clean["period"].tolist() == ["2025-01", "2025-02"]
+    assert clean["demand_tonnes"].tolist() == [100.0, 0.0]
+    assert clean["source"].iloc[0] == "manual upload"
+    assert pd.isna(clean["source"].iloc[1])
+    assert {entry["transformation"] for entry in cleaner.cleaning_log} >= {
+        "negative_values_set_to_zero", "duplicates_removed",
+    }
+
+    plain = DataCleaner(categorical_ids=False).clean_all_data({"demand_df": raw})["demand_df"]
+    pd.testing.assert_frame_equal(clean.astype({"customer_node_id": object}), plain, check_dtype=False)
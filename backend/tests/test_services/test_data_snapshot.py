@@ -0,0 +1,122 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.db.models.user  # noqa: F401  - target of the AuditLog relationship
+from app.db.base import Base
+from app.db.models.demand_forecast import DemandForecast
+from app.db.models.plant_master import PlantMaster
+from app.db.models.production_capacity_cost import ProductionCapacityCost
+from app.db.models.transport_routes_modes import TransportRoutesModes
+from app.services.clean_data_service import get_clean_data_for_optimization
+from app.services.data_access_guard import DataAccessGuard
+from app.services.data_snapshot import SNAPSHOT_TABLES, load_snapshot
+from app.services.data_validation_service import run_comprehensive_validation
+from app.services.reference_data_cache import reference_cache
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine, tables=[model.__table__ for model, _ in SNAPSHOT_TABLES.values()])
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        PlantMaster(plant_id="P1", plant_name="Plant One", plant_type="clinker", latitude=20.0, longitude=75.0),
+        ProductionCapacityCost(plant_id="P1", period="2025-01", max_capacity_tonnes=1000.0,
+                               variable_cost_per_tonne=50.0),
+        TransportRoutesModes(origin_plant_id="P1", destination_node_id="C1", transport_mode="road",
+                             distance_km=100.0, cost_per_tonne=5.0, vehicle_capacity_tonnes=25.0, is_active="Y"),
+        DemandForecast(customer_node_id="C1", period="2025-01", demand_tonnes=400.0),
+    ])
+    session.commit()
+    reference_cache.clear()
+    yield session
+    session.close()
+
+
+def test_projected_typed_frames_and_versions(db):
+    snapshot = load_snapshot(db, chunk_size=1)
+
+    assert list(snapshot["plants"].columns) == SNAPSHOT_TABLES["plants"][1]
+    assert snapshot["demand_forecast"]["demand_low_tonnes"].dtype == "float64"
+    # Empty tables still carry their columns and dtypes
+    assert snapshot["initial_inventory"].empty
+    assert snapshot["initial_inventory"]["inventory_tonnes"].dtype == "float64"
+    assert load_snapshot(db).version == snapshot.version
+
+    db.add(DemandForecast(customer_node_id="C1", period="2025-02", demand_tonnes=300.0))
+    db.commit()
+    changed = load_snapshot(db)
+    assert changed.version != snapshot.version
+    assert changed.changed_tables(snapshot) == ["demand_forecast"]
+
+    with pytest.raises(ValueError):
+        load_snapshot(db, ["stg_plant_master"])
+
+
+def test_validation_cleaning_and_guard_share_one_snapshot(db):
+    snapshot = load_snapshot(db)
+    # Written after the snapshot was taken: must not reach this run
+    db.add(DemandForecast(customer_node_id="C2", period="2025-01", demand_tonnes=-5.0))
+    db.commit()
+
+    report = run_comprehensive_validation(db, snapshot)
+    assert report["data_version"] == snapshot.version
+    assert report["optimization_ready"]
+
+    clean = get_clean_data_for_optimization(db, snapshot=snapshot)
+    assert clean["demand_forecast"]["customer_node_id"].tolist() == ["C1"]
+    assert clean["metadata"]["data_version"] == snapshot.version
+
+    frames = DataAccessGuard(db, snapshot).get_optimization_frames()
+    assert frames["demand_forecast"]["demand_tonnes"].tolist() == [400.0]
+    frames["demand_forecast"]["demand_tonnes"] *= 2
+    assert snapshot["demand_forecast"]["demand_tonnes"].tolist() == [400.0]
+
+
+def test_optimization_run_solves_the_snapshot_the_route_validated(db, monkeypatch):
+    import asyncio
+
+    from fastapi import BackgroundTasks
+
+    from app.api.v1 import routes_optimization
+    from app.db.models.optimization_run import OptimizationRun
+    from app.services import data_validation_gateway, optimization_service
+    from app.services.optimization_service import OptimizationService
+    from app.utils.exceptions import OptimizationError
+
+    Base.metadata.create_all(bind=db.get_bind(), tables=[OptimizationRun.__table__])
+    seen = {}
+
+    def readiness(db, snapshot):
+        seen["route"] = snapshot
+        return {"optimization_ready": True}
+
+    def validation(db, snapshot):
+        seen["validated"] = snapshot
+        return {"overall_status": "PASS"}
+
+    def load_data(self, scenario_parameters=None, snapshot=None):
+        seen["solved"] = snapshot
+        raise OptimizationError("stop before building the model")
+
+    monkeypatch.setattr(data_validation_gateway, "check_optimization_readiness", readiness)
+    monkeypatch.setattr(data_validation_gateway.DataValidationGateway, "validate_and_prepare_optimization_data",
+                        lambda self: (True, {}, []))
+    monkeypatch.setattr(optimization_service, "run_comprehensive_validation", validation)
+    monkeypatch.setattr(OptimizationService, "_load_optimization_data", load_data)
+
+    background = BackgroundTasks()
+    request = routes_optimization.OptimizationRequest(solver="highs")
+    asyncio.run(routes_optimization.run_optimization(request, background, db))
+
+    # An upload lands between the route and the background solve
+    db.add(DemandForecast(customer_node_id="C1", period="2025-02", demand_tonnes=300.0))
+    db.commit()
+    monkeypatch.setattr(optimization_service, "latest_snapshot", lambda db: load_snapshot(db))
+    asyncio.run(background())
+
+    assert seen["validated"] is seen["route"]
+    assert seen["solved"] is seen["route"]
+    assert len(seen["solved"]["demand_forecast"]) == 1
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.db.models.user  # noqa: F401  - target of the AuditLog relationship
+from app.db.base import Base
+from app.db.models.plant_master import PlantMaster
+from app.db.models.transport_lookup import TransportLookup
+from app.services import routing_cache
+from app.services.external import http_pool, matrix_client
+from app.services.external.matrix_client import get_matrix_osrm, matrix_blocks
+from app.services.reference_data_cache import reference_cache
+
+
+def _stub_distance(origin, destination):
+    """Stub metres between two (lng, lat) points; no route into latitude 0."""
+    if destination[1] == 0:
+        return None
+    return round((abs(origin[0] - destination[0]) + abs(origin[1] - destination[1])) * 1000, 3)
+
+
+class _OsrmTableStub(BaseHTTPRequestHandler):
+    """Local stand-in for OSRM's /table/v1/driving endpoint."""
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        points = [tuple(map(float, p.split(","))) for p in url.path.rsplit("/", 1)[-1].split(";")]
+        query = parse_qs(url.query)
+        sources = [points[int(i)] for i in query["sources"][0].split(";")]
+        destinations = [points[int(i)] for i in query["destinations"][0].split(";")]
+        self.server.calls.append(len(points))
+        distances = [[_stub_distance(s, d) for d in destinations] for s in sources]
+        durations = [[None if m is None else m / 10 for m in row] for row in distances]
+        body = json.dumps({"code": "Ok", "distances": distances, "durations": durations}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def osrm_stub(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _OsrmTableStub)
+    server.calls = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(matrix_client.settings, "OSRM_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setattr(matrix_client.settings, "ROUTING_MAX_RETRIES", 1)
+    monkeypatch.setattr(http_pool.settings, "OSRM_REQUESTS_PER_SECOND", 0)
+    monkeypatch.setattr(routing_cache.settings, "ORS_API_KEY", None)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_blocks_respect_provider_limits():
+    blocks = matrix_blocks(46, 46, max_locations=100)
+    assert blocks == [(slice(0, 46), slice(0, 46))]
+
+    blocks = matrix_blocks(7, 5, max_locations=6)
+    assert all((b[0].stop - b[0].start) + (b[1].stop - b[1].start) <= 6 for b in blocks)
+    covered = np.zeros((7, 5), dtype=int)
+    for rows, columns in blocks:
+        covered[rows, columns] += 1
+    assert (covered == 1).all()
+
+    assert all((b[0].stop - b[0].start) * (b[1].stop - b[1].start) <= 3500 for b in matrix_blocks(120, 90, max_routes=3500))
+
+
+def test_osrm_matrix_is_fetched_in_blocks(osrm_stub, monkeypatch):
+    monkeypatch.setattr(matrix_client.settings, "OSRM_TABLE_MAX_LOCATIONS", 6)
+    sources = [(20.0 + i, 70.0 + i) for i in range(7)]
+    destinations = [(21.5 + j, 72.0 - j) for j in range(4)] + [(0.0, 75.0)]
+
+    matrix = asyncio.run(get_matrix_osrm(sources, destinations))
+
+    assert matrix.requests == len(osrm_stub.calls) == len(matrix_blocks(7, 5, max_locations=6))
+    assert max(osrm_stub.calls) <= 6
+    assert not matrix.failed.any()
+    expected = [[_stub_distance(s[::-1], d[::-1]) for d in destinations] for s in sources]
+    np.testing.assert_allclose(matrix.distance_m[:, :4], np.array(expected, dtype=float)[:, :4])
+    np.testing.assert_allclose(matrix.duration_s[:, :4], matrix.distance_m[:, :4] / 10)
+    assert np.isnan(matrix.distance_m[:, 4]).all()
+
+
+def test_route_matrix_fills_transport_lookup_in_bulk(osrm_stub):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine, tables=[PlantMaster.__table__, TransportLookup.__table__])
+    db = sessionmaker(bind=engine)()
+    reference_cache.clear()
+    routing_cache.route_cache.clear()
+    db.add_all([
+        PlantMaster(plant_id=f"P{i}", plant_name=f"Plant {i}", plant_type="clinker", latitude=20.0 + i, longitude=70.0 + i)
+        for i in range(1, 4)
+    ])
+    db.add(TransportLookup(origin_plant_id="P1", destination_node_id="P2", transport_mode="driving",
+                           distance_km=1.0, duration_minutes=2.0, source="ORS"))
+    db.add(TransportLookup(origin_plant_id="P3", destination_node_id="P1", transport_mode="driving",
+                           distance_km=5.0, duration_minutes=6.0, source="ORS",
+                           created_at=datetime.utcnow() - timedelta(days=60)))
+    db.commit()
+
+    result = asyncio.run(routing_cache.get_route_matrix_with_cache(
+        db, ["P1", "P2", "P3"], ["P1", "P2", "P3", "CUST_001", "NOPE"],
+    ))
+
+    assert (result["cached"], result["fetched"], result["requests"]) == (1, 11, 1)
+    assert result["unresolved"] == ["NOPE"]
+    assert result["routes"][("P1", "P2")] == {"distance_km": 1.0, "duration_minutes": 2.0, "source": "ORS", "cached": True}
+    assert result["routes"][("P3", "P1")]["distance_km"] == pytest.approx(4.0)
+    assert result["routes"][("P2", "CUST_001")]["source"] == "OSRM"
+    assert db.query(TransportLookup).count() == 12
+    refreshed = db.query(TransportLookup).filter_by(origin_plant_id="P3", destination_node_id="P1").one()
+    assert (refreshed.distance_km, refreshed.source) == (pytest.approx(4.0), "OSRM")
+    assert refreshed.created_at > datetime.utcnow() - timedelta(days=1)
+    db.close()
@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+import httpx
+
+from app.services.external import osrm_client
+from app.services.external.http_pool import ProviderLimits, RoutingHttpPool, TokenBucket
+
+
+def test_token_bucket_paces_after_the_burst():
+    async def acquire_all():
+        bucket = TokenBucket(rate=20, burst=2)
+        start = time.perf_counter()
+        for _ in range(6):
+            await bucket.acquire()
+        return time.perf_counter() - start
+
+    assert asyncio.run(acquire_all()) >= 4 / 20 * 0.9
+
+
+def test_gathered_requests_share_a_client_within_the_concurrency_limit():
+    in_flight, peak = 0, 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json={"path": request.url.path})
+
+    pool = RoutingHttpPool(
+        limits={"osrm": ProviderLimits(max_concurrency=3, requests_per_second=0)},
+        transport=httpx.MockTransport(handler),
+    )
+
+    async def lookups():
+        client = pool.client("osrm")
+        responses = await asyncio.gather(*(pool.request("osrm", "GET", f"http://osrm/{i}") for i in range(40)))
+        same_client = pool.client("osrm") is client
+        await pool.aclose()
+        return responses, same_client, client
+
+    responses, same_client, first_client = asyncio.run(lookups())
+    assert [r.json()["path"] for r in responses] == [f"/{i}" for i in range(40)]
+    assert same_client and first_client.is_closed
+    assert peak == 3
+
+    # A new event loop gets its own client
+    async def other_loop():
+        return pool.client("osrm")
+
+    assert asyncio.run(other_loop()) is not first_client
+
+
+def test_route_lookup_uses_the_shared_pool(monkeypatch):
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(200, json={"code": "Ok", "routes": [{"distance": 12000.0, "duration": 900.0}]})
+
+    monkeypatch.setattr(osrm_client, "routing_http", RoutingHttpPool(
+        limits={"osrm": ProviderLimits(max_concurrency=4, requests_per_second=0)},
+        transport=httpx.MockTransport(handler),
+    ))
+
+    async def gather_routes():
+        return await asyncio.gather(*(osrm_client.get_route_osrm((20.0, 70.0 + i / 100), (21.0, 72.0)) for i in range(25)))
+
+    results = asyncio.run(gather_routes())
+    assert len(calls) == 25
+    assert {(r["distance_m"], r["duration_s"], r["attempt"]) for r in results} == {(12000.0, 900.0, 1)}
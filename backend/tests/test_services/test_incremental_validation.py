@@ -0,0 +1,105 @@
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.db.models.user  # noqa: F401  - target of the AuditLog relationship
+from app.db.base import Base
+from app.db.models.demand_forecast import DemandForecast
+from app.db.models.initial_inventory import InitialInventory
+from app.db.models.plant_master import PlantMaster
+from app.db.models.production_capacity_cost import ProductionCapacityCost
+from app.db.models.transport_routes_modes import TransportRoutesModes
+from app.services.clean_data_service import get_clean_data_for_optimization, normalized_rows_cache
+from app.services.data_snapshot import SNAPSHOT_TABLES, snapshot_store
+from app.services.data_validation_service import run_comprehensive_validation
+from app.services.reference_data_cache import invalidate_reference_data, reference_cache
+from app.services.validation_cache import validation_cache
+
+
+def _clear_caches():
+    reference_cache.clear()
+    validation_cache.clear()
+    snapshot_store.clear()
+    normalized_rows_cache.clear()
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine, tables=[model.__table__ for model, _ in SNAPSHOT_TABLES.values()])
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        PlantMaster(plant_id="P1", plant_name="Plant One", plant_type="clinker"),
+        PlantMaster(plant_id="P2", plant_name="Plant Two", plant_type="grinding"),
+        *[ProductionCapacityCost(plant_id=p, period=f"2025-0{m}", max_capacity_tonnes=1000.0,
+                                 variable_cost_per_tonne=50.0) for p in ("P1", "P2") for m in (1, 2)],
+        *[DemandForecast(customer_node_id=f"C{i}", period=f"2025-0{m}", demand_tonnes=100.0 + i)
+          for i in range(20) for m in (1, 2)],
+        *[TransportRoutesModes(origin_plant_id="P1", destination_node_id=f"C{i}", transport_mode="road",
+                               vehicle_capacity_tonnes=25.0, cost_per_tonne=10.0) for i in range(20)],
+        InitialInventory(node_id="P1", location_id="P1", period="2025-01", inventory_tonnes=100.0,
+                         initial_stock_tonnes=100.0),
+    ])
+    session.commit()
+    _clear_caches()
+    yield session
+    session.close()
+
+
+def _full_recompute(db):
+    _clear_caches()
+    return run_comprehensive_validation(db, use_cache=False)
+
+
+def test_incremental_validation_matches_full_recompute(db):
+    run_comprehensive_validation(db)
+
+    # Break demand and a route, add a duplicate key and a dangling inventory node
+    db.execute(update(DemandForecast).where(DemandForecast.id == 3).values(demand_tonnes=-5.0))
+    db.execute(update(TransportRoutesModes).where(TransportRoutesModes.id == 7).values(origin_plant_id="P9"))
+    db.add_all([
+        DemandForecast(customer_node_id="C1", period="2025-01", demand_tonnes=1.0),
+        InitialInventory(node_id="X1", location_id="X1", period="2025-01", inventory_tonnes=5.0,
+                         initial_stock_tonnes=5.0),
+    ])
+    db.commit()
+    invalidate_reference_data("transport_routes_modes")
+    report = run_comprehensive_validation(db)
+
+    assert report["cache"]["stages_incremental"] == ["business_rules", "referential_integrity"]
+    assert report["cache"]["changed_rows"]["demand_forecast"] == 2
+    full = _full_recompute(db)
+    assert report["stages"] == full["stages"]
+    assert report["data_version"] == full["data_version"]
+    assert {e["type"] for s in report["stages"] for e in s["errors"]} >= {"duplicate_keys", "foreign_key_violation"}
+
+    # Fixing the rows clears the findings again
+    run_comprehensive_validation(db)
+    db.execute(update(DemandForecast).where(DemandForecast.id == 3).values(demand_tonnes=5.0))
+    db.execute(update(TransportRoutesModes).where(TransportRoutesModes.id == 7).values(origin_plant_id="P2"))
+    db.commit()
+    invalidate_reference_data("demand_forecast", "transport_routes_modes")
+    fixed = run_comprehensive_validation(db)
+    assert fixed["stages"] == _full_recompute(db)["stages"]
+    assert "foreign_key_violation" not in {e["type"] for s in fixed["stages"] for e in s["errors"]}
+
+
+def test_incremental_cleaning_normalizes_only_changed_rows(db):
+    get_clean_data_for_optimization(db)
+
+    db.execute(update(DemandForecast).where(DemandForecast.id == 4).values(demand_tonnes=0.0, source=" erp "))
+    db.add(DemandForecast(customer_node_id=" c30 ", period="2025-01", demand_tonnes=3.0))
+    db.commit()
+    invalidate_reference_data("demand_forecast")
+    clean = get_clean_data_for_optimization(db)
+
+    assert clean["metadata"]["rows_normalized"]["demand_forecast"] == 2
+    assert clean["metadata"]["rows_normalized"]["plants"] == 0
+    _clear_caches()
+    full = get_clean_data_for_optimization(db)
+    assert full["metadata"]["rows_normalized"]["demand_forecast"] is None
+    for name in SNAPSHOT_TABLES:
+        pd.testing.assert_frame_equal(clean[name], full[name])
+    assert "C30" in set(clean["demand_forecast"]["customer_node_id"])
@@ -1,6 +1,14 @@
 import math
 
-from app.services.kpi_calculator import compute_kpis
+import numpy as np
+
+from app.services.kpi_calculator import (
+    compute_kpis,
+    compute_kpis_batch,
+    cost_risk_metrics,
+    service_level_risk,
+    stack_kpi_inputs,
+)
 
 
 def test_kpi_happy_path():
@@ -141,3 +149,51 @@ def test_kpi_floating_point_stability():
 
     # No stockouts
     assert math.isclose(kpis["stockout_risk"], 0.0, rel_tol=1e-9)
+
+
+def test_kpi_batch_matches_per_scenario():
+    rng = np.random.default_rng(0)
+    scenarios = []
+    for _ in range(50):
+        demand = {(f"C{c}", f"t{t}"): float(rng.integers(0, 100)) for c in range(6) for t in range(4)}
+        scenarios.append({
+            "costs": {"production_cost": float(rng.random() * 100), "holding_cost": float(rng.random())},
+            "demand": demand,
+            "fulfilled": {k: v * float(rng.choice([0.8, 1.0, 1.2])) for k, v in demand.items()},
+            "plant_production": {"P1": float(rng.random() * 50), "P2": 10.0},
+            "plant_capacity": {"P1": 60.0, "P2": 0.0},
+        })
+
+    stacked = stack_kpi_inputs(scenarios)
+    plants = stacked.pop("plants")
+    stacked.pop("customers"), stacked.pop("periods")
+    batch = compute_kpis_batch(**stacked)
+
+    for i, scenario in enumerate(scenarios):
+        kpis = compute_kpis(**scenario)
+        for key in ("total_cost", "production_cost", "holding_cost", "service_level", "stockout_risk"):
+            assert math.isclose(batch[key][i], kpis[key], rel_tol=1e-9, abs_tol=1e-12)
+        for j, plant in enumerate(plants):
+            assert math.isclose(batch["capacity_utilization"][i, j], kpis["capacity_utilization"][plant])
+
+
+def test_cost_risk_metrics_var_and_cvar():
+    costs = np.arange(1.0, 101.0)  # 100 equally likely outcomes
+
+    metrics = cost_risk_metrics(costs, confidence_levels=[0.9, 0.95])
+
+    assert metrics["value_at_risk"]["90%"] == 90.0
+    assert metrics["value_at_risk"]["95%"] == 95.0
+    # Mean of the worst 10% / 5% outcomes
+    assert math.isclose(metrics["conditional_var"]["90%"], np.mean(costs[90:]))
+    assert math.isclose(metrics["conditional_var"]["95%"], np.mean(costs[95:]))
+    assert math.isclose(metrics["cost_distribution"]["mean"], 50.5)
+    assert metrics["cost_distribution"]["percentiles"]["p50"] == 50.0
+
+    weighted = cost_risk_metrics(np.array([100.0, 200.0]), confidence_levels=[0.5], probabilities=[0.75, 0.25])
+    assert weighted["value_at_risk"]["50%"] == 100.0
+    assert math.isclose(weighted["conditional_var"]["50%"], 150.0)
+
+    risk = service_level_risk(np.array([0.99, 0.93, 0.85, 0.96]))
+    assert risk["target_95%"] == 0.5
+    assert risk["target_90%"] == 0.75
@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.db.models.kpi_cube import KPICubeCell, KPICubeScenario
+from app.db.models.optimization_results import OptimizationResults
+from app.db.models.optimization_run import OptimizationRun
+from app.db.models.plant_master import PlantMaster
+from app.db.models.production_capacity_cost import ProductionCapacityCost
+from app.services.kpi_cube import KPICubeService
+from app.services.reference_data_cache import reference_cache
+
+TABLES = [
+    OptimizationRun, OptimizationResults, PlantMaster, ProductionCapacityCost, KPICubeCell, KPICubeScenario,
+]
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine, tables=[t.__table__ for t in TABLES])
+    session = sessionmaker(bind=engine)()
+    reference_cache.clear()
+    yield session
+    session.close()
+
+
+def _complete_run(db, run_id, scenario, total_cost, completed_at, production=100.0):
+    opt_run = OptimizationRun(
+        run_id=run_id, scenario_name=scenario, status="completed", solver_name="HiGHS",
+        objective_value=total_cost, completed_at=completed_at,
+    )
+    db.add(opt_run)
+    db.add(OptimizationResults(
+        run_id=run_id,
+        total_cost=total_cost,
+        production_cost=total_cost * 0.6,
+        transport_cost=total_cost * 0.4,
+        inventory_cost=0.0,
+        penalty_cost=0.0,
+        service_level=1.0,
+        stockout_events=0,
+        plan_storage="json",
+        production_plan={"P1": {"2025-01": production, "2025-02": 50.0}},
+        inventory_profile={"P1": {"2025-01": 10.0, "2025-02": 20.0}},
+        shipment_plan={
+            "P1-C1-road-2025-01": {"shipment_tonnes": production, "trips": 5, "vehicle_capacity": 25.0},
+            "P1-C1-rail-2025-02": {"shipment_tonnes": 50.0, "trips": 1, "vehicle_capacity": 60.0,
+                                   "sbq_requirement": 55.0},
+        },
+        demand_fulfillment={"C1": {
+            "2025-01": {"demand": production, "fulfilled": production},
+            "2025-02": {"demand": 60.0, "fulfilled": 50.0},
+        }},
+    ))
+    db.commit()
+    return KPICubeService.update_for_run(db, opt_run)
+
+
+def test_run_cells_and_dashboard(db):
+    db.add(PlantMaster(plant_id="P1", plant_name="Plant One", plant_type="clinker"))
+    db.add_all([
+        ProductionCapacityCost(plant_id="P1", period=p, max_capacity_tonnes=200.0, variable_cost_per_tonne=1.0)
+        for p in ("2025-01", "2025-02", "2025-03")
+    ])
+    db.commit()
+    _complete_run(db, "R1", "base", 1000.0, datetime(2025, 1, 1))
+
+    dashboard = KPICubeService.get_dashboard(db, "base")
+    assert dashboard["run_id"] == "R1"
+    assert dashboard["total_cost"] == 1000.0
+    assert dashboard["cost_breakdown"]["production_cost"] == pytest.approx(600.0)
+    plant = dashboard["production_utilization"][0]
+    assert plant["plant_name"] == "Plant One"
+    # Capacity only counts the planned periods
+    assert plant["production_capacity"] == 400.0
+    assert plant["utilization_pct"] == pytest.approx(150.0 / 400.0)
+    routes = {r["mode"]: r for r in dashboard["transport_utilization"]}
+    assert routes["road"]["capacity_used_pct"] == pytest.approx(100.0 / 125.0)
+    assert routes["rail"]["violations"] == 1
+    assert dashboard["service_performance"]["demand_fulfillment_rate"] == pytest.approx(150.0 / 160.0)
+    assert dashboard["service_performance"]["on_time_delivery"] == pytest.approx(0.5)
+
+    period_cells = db.query(KPICubeCell).filter(
+        KPICubeCell.run_id == "R1", KPICubeCell.dimension == "total", KPICubeCell.period == "2025-02"
+    ).all()
+    assert {c.metric: c.value for c in period_cells}["demand_tonnes"] == 60.0
+
+    # Re-running the update replaces the run's cells instead of adding to them
+    cells = db.query(KPICubeCell).count()
+    KPICubeService.update_for_run(db, db.query(OptimizationRun).filter_by(run_id="R1").one())
+    assert db.query(KPICubeCell).count() == cells
+    assert db.query(KPICubeScenario).one().run_count == 1
+
+
+def test_deltas_history_and_compare(db):
+    start = datetime(2025, 1, 1)
+    _complete_run(db, "H1", "high_demand", 1500.0, start)
+    _complete_run(db, "B1", "base", 1000.0, start + timedelta(hours=1))
+    _complete_run(db, "H2", "high_demand", 1200.0, start + timedelta(hours=2))
+
+    high = db.query(KPICubeScenario).filter_by(scenario_name="high_demand").one()
+    assert high.latest_run_id == "H2"
+    assert high.run_count == 2
+    assert high.delta_vs_base["total_cost"]["absolute"] == pytest.approx(200.0)
+    assert high.delta_vs_base["total_cost"]["percent"] == pytest.approx(20.0)
+
+    # A new base run refreshes the deltas of every scenario
+    _complete_run(db, "B2", "base", 800.0, start + timedelta(hours=3))
+    db.refresh(high)
+    assert high.delta_vs_base["total_cost"]["absolute"] == pytest.approx(400.0)
+
+    history = KPICubeService.history(db, "high_demand", limit=5)
+    assert [h["run_id"] for h in history] == ["H2", "H1"]
+    assert history[0]["delta_vs_previous"]["total_cost"]["absolute"] == pytest.approx(-300.0)
+    assert history[1]["delta_vs_previous"] is None
+    assert len(KPICubeService.history(db, "high_demand", limit=1)) == 1
+
+    comparison = KPICubeService.compare(db, ["base", "high_demand", "missing"])
+    assert set(comparison) == {"base", "high_demand"}
+    assert comparison["high_demand"]["delta_vs_baseline"]["total_cost"]["absolute"] == pytest.approx(400.0)
+    assert comparison["base"]["delta_vs_baseline"]["total_cost"]["absolute"] == 0.0
+
+    summary = KPICubeService.summary(db, period_hours=24 * 365 * 20)
+    assert summary["successful_runs"] == 4
+    assert summary["average_total_cost"] == pytest.approx(1125.0)
+    assert summary["top_performers"]["lowest_cost"] == {"scenario": "base", "cost": 800.0}
+
+    totals = KPICubeService.run_totals(db, ["total_cost", "service_level"], ["base"])
+    assert totals["total_cost"].to_dict() == {"B1": 1000.0, "B2": 800.0}
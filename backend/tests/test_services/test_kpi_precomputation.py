@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.db.models.kpi_precomputed import KPIAggregated, KPIPrecomputed
+from app.services.kpi_precomputation import KPIPrecomputationService
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine, tables=[KPIPrecomputed.__table__, KPIAggregated.__table__])
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _results() -> dict:
+    return {
+        "objective_value": 1000.0,
+        "cost_breakdown": {"production_cost": 600.0, "transport_cost": 400.0},
+        "production_plan": [
+            {"plant_id": "P1", "period": "2025-01", "production_tonnes": 100.0},
+            {"plant_id": "P2", "period": "2025-01", "production_tonnes": 50.0},
+            {"plant_id": "P1", "period": "2025-02", "production_tonnes": 70.0},
+        ],
+        "shipment_plan": [
+            {"period": "2025-01", "shipment_tonnes": 120.0},
+            {"period": "2025-03", "shipment_tonnes": 30.0},
+        ],
+        "trip_plan": [{"period": "2025-01", "trips": 5}, {"period": "2025-03", "trips": 2}],
+        "inventory_profile": [
+            {"plant_id": "P1", "period": "2025-01", "inventory_tonnes": 10.0},
+            {"plant_id": "P2", "period": "2025-01", "inventory_tonnes": 30.0},
+        ],
+        "service_metrics": {"service_level": 0.97},
+    }
+
+
+def test_precompute_kpis_groups_by_period_and_aggregates(db):
+    KPIPrecomputationService.precompute_kpis(db, 1, "base", _results())
+
+    rows = {r.period: r for r in db.query(KPIPrecomputed).all()}
+    assert set(rows) == {"2025-01", "2025-02", "2025-03"}
+    assert rows["2025-01"].total_production_tonnes == 150.0
+    assert rows["2025-01"].total_shipment_tonnes == 120.0
+    assert rows["2025-01"].total_trips == 5
+    assert rows["2025-01"].average_inventory_tonnes == 20.0
+    assert rows["2025-02"].total_shipment_tonnes == 0.0
+    assert rows["2025-03"].total_production_tonnes == 0.0
+    assert rows["2025-03"].total_trips == 2
+
+    aggregated = db.query(KPIAggregated).filter(KPIAggregated.scenario_name == "base").one()
+    assert aggregated.total_production == 220.0
+    assert aggregated.total_shipment == 150.0
+    assert aggregated.total_trips == 7
+    assert aggregated.average_service_level == 0.97
+
+
+def test_precompute_kpis_handles_empty_plans(db):
+    KPIPrecomputationService.precompute_kpis(db, 2, "empty", {"objective_value": 0.0})
+
+    assert db.query(KPIPrecomputed).count() == 0
+    assert db.query(KPIAggregated).filter(KPIAggregated.scenario_name == "empty").one().total_trips == 0
@@ -50,3 +50,274 @@ def test_build_clinker_model():
     assert len(list(model.J)) == 1
     assert len(list(model.M)) == 1
     assert len(list(model.T)) == 1
+
+
+def test_pure_flow_model_uses_network_simplex_fast_path():
+    """Without SBQ and fixed trip costs the model is solved as a min-cost flow."""
+
+    from app.services.optimization.result_parser import extract_solution
+    from app.services.optimization.solvers import solve_model
+
+    def build():
+        data = {
+            "plants": pd.DataFrame([{"plant_id": "P1"}, {"plant_id": "P2"}]),
+            "production_capacity_cost": pd.DataFrame([
+                {"plant_id": p, "period": t, "max_capacity_tonnes": 80.0,
+                 "variable_cost_per_tonne": 10.0 if p == "P1" else 12.0, "holding_cost_per_tonne": 1.0}
+                for p in ("P1", "P2") for t in ("t1", "t2")
+            ]),
+            "transport_routes_modes": pd.DataFrame([
+                {"origin_plant_id": p, "destination_node_id": "C1", "transport_mode": "road",
+                 "distance_km": 10.0, "cost_per_tonne": 5.0, "cost_per_tonne_km": None,
+                 "fixed_cost_per_trip": 0.0, "vehicle_capacity_tonnes": 30.0,
+                 "min_batch_quantity_tonnes": 0.0}
+                for p in ("P1", "P2")
+            ]),
+            "demand_forecast": pd.DataFrame([
+                {"customer_node_id": "C1", "period": "t1", "demand_tonnes": 50.0},
+                {"customer_node_id": "C1", "period": "t2", "demand_tonnes": 120.0},
+            ]),
+            "safety_stock_policy": pd.DataFrame(),
+            "initial_inventory": pd.DataFrame(),
+            "time_periods": ["t1", "t2"],
+        }
+        return build_clinker_model(data)
+
+    fast_model = build()
+    assert fast_model._pure_network_flow
+    fast_meta = solve_model(fast_model, solver_name="highs")
+    assert fast_meta["solve_path"] == "network_simplex"
+
+    milp_model = build()
+    milp_meta = solve_model(milp_model, solver_name="highs", use_network_fast_path=False)
+    assert milp_meta["solve_path"] == "milp"
+    assert abs(fast_meta["objective"] - milp_meta["objective"]) < 1e-6
+
+    solution = extract_solution(fast_model)
+    for trip in solution["trips"]:
+        shipped = float(fast_model.ship[trip["origin"], trip["destination"], trip["mode"], trip["period"]].value)
+        assert trip["trips"] == -(-shipped // 30.0)
+
+
+def test_strengthened_formulation_keeps_optimum():
+    """Valid inequalities tighten the model without changing its optimum."""
+
+    from app.services.optimization.solvers import solve_model
+    from app.tests.test_optimization_sanity import _build_basic_data
+
+    data = _build_basic_data(no_sbq=False)
+
+    base_model = build_clinker_model(data)
+    base_meta = solve_model(base_model, solver_name="highs", mip_gap=1e-9)
+
+    strong_model = build_clinker_model(data, strengthen=True)
+    assert hasattr(strong_model, "cut_ship_activation")
+    assert hasattr(strong_model, "cut_destination_trips")
+    strong_meta = solve_model(strong_model, solver_name="highs", mip_gap=1e-9)
+
+    assert abs(base_meta["objective"] - strong_meta["objective"]) < 1e-6
+
+
+def test_lazy_linking_matches_full_model():
+    """The cutting-plane loop converges to the optimum of the full model."""
+
+    from app.services.optimization.solvers import solve_model
+    from app.tests.test_optimization_sanity import _build_basic_data
+
+    data = _build_basic_data(no_sbq=False)
+
+    full_model = build_clinker_model(data)
+    full_meta = solve_model(full_model, solver_name="highs", mip_gap=1e-9)
+
+    lazy_model = build_clinker_model(data, lazy_linking=True)
+    assert not hasattr(lazy_model, "trip_capacity")
+    lazy_meta = solve_model(lazy_model, solver_name="highs", mip_gap=1e-9)
+
+    assert lazy_meta["solve_path"] == "lazy_constraints"
+    assert lazy_meta["lazy_rows_added"] <= lazy_meta["lazy_rows_total"]
+    assert abs(full_meta["objective"] - lazy_meta["objective"]) < 1e-6
+    for (i, j, mode) in lazy_model.R:
+        for t in lazy_model.T:
+            ship = lazy_model.ship[i, j, mode, t].value
+            assert ship <= lazy_model.vehicle_cap[i, j, mode] * lazy_model.trips[i, j, mode, t].value + 1e-6
+
+
+
+def test_lazy_linking_reports_infeasible_model():
+    """An infeasible lazy model fails like the plain solve path instead of crashing on load."""
+
+    import pytest
+    from pyomo.environ import Constraint
+
+    from app.services.optimization.solvers import solve_model
+    from app.tests.test_optimization_sanity import _build_basic_data
+    from app.utils.exceptions import OptimizationError
+
+    model = build_clinker_model(_build_basic_data(no_sbq=False), lazy_linking=True)
+    model.no_production = Constraint(expr=sum(model.prod[k] for k in model.prod) <= -1)
+
+    with pytest.raises(OptimizationError, match="infeasible"):
+        solve_model(model, solver_name="highs")
+
+def test_time_aggregation_buckets_and_disaggregates_daily_plan():
+    """Weekly buckets sum demand/capacity and the daily plan meets daily demand."""
+
+    from app.services.benchmarking.performance_benchmark import SyntheticDataGenerator
+    from app.services.optimization.result_parser import extract_solution
+    from app.services.optimization.time_aggregation import aggregate_model_data, solve_time_aggregated
+
+    data = SyntheticDataGenerator().generate_model_data(
+        num_plants=2, num_customers=3, num_periods=14, num_modes=1, route_density=1.0, start_date="2025-01-06"
+    )
+
+    agg_data, period_map = aggregate_model_data(data, "week")
+    assert agg_data["time_periods"] == ["2025-W02", "2025-W03"]
+    assert period_map["2025-01-12"] == "2025-W02"
+    assert abs(agg_data["demand_forecast"]["demand_tonnes"].sum() - data["demand_forecast"]["demand_tonnes"].sum()) < 1e-6
+    assert abs(
+        agg_data["production_capacity_cost"]["max_capacity_tonnes"].sum()
+        - data["production_capacity_cost"]["max_capacity_tonnes"].sum()
+    ) < 1e-6
+
+    model, meta = solve_time_aggregated(data, "week", solver_name="highs")
+    assert meta["time_aggregation"]["aggregated_periods"] == 2
+    assert len(list(model.T)) == 14
+
+    solution = extract_solution(model)
+    shipped = {}
+    for s in solution["shipments"]:
+        key = (s["destination"], s["period"])
+        shipped[key] = shipped.get(key, 0.0) + s["tonnes"]
+    for _, row in data["demand_forecast"].iterrows():
+        assert abs(shipped.get((row["customer_node_id"], row["period"]), 0.0) - row["demand_tonnes"]) < 1e-6
+    for p in solution["production"]:
+        assert p["tonnes"] <= float(model.cap[p["plant"], p["period"]]) + 1e-6
+
+
+def test_time_aggregation_holding_cost_uses_nominal_bucket_length():
+    """A horizon starting mid-week charges a full week of holding per weekly bucket."""
+
+    from app.services.benchmarking.performance_benchmark import SyntheticDataGenerator
+    from app.services.optimization.model_builder import build_clinker_model
+    from app.services.optimization.time_aggregation import aggregate_model_data
+
+    # Saturday: the first ISO week has two days, the next two have seven
+    data = SyntheticDataGenerator().generate_model_data(
+        num_plants=2, num_customers=2, num_periods=16, num_modes=1, route_density=1.0, start_date="2025-01-04"
+    )
+    agg_data, _ = aggregate_model_data(data, "week")
+    assert agg_data["time_periods"] == ["2025-W01", "2025-W02", "2025-W03"]
+
+    prod_df = data["production_capacity_cost"]
+    agg_model = build_clinker_model(agg_data)
+    for plant in agg_model.I:
+        daily = prod_df.loc[prod_df["plant_id"] == plant, "holding_cost_per_tonne"].iloc[0]
+        assert abs(float(agg_model.hold_cost[plant]) - 7.0 * daily) < 1e-9
+
+    month_data, _ = aggregate_model_data(data, "month")
+    daily = prod_df["holding_cost_per_tonne"].iloc[0]
+    assert abs(month_data["production_capacity_cost"]["holding_cost_per_tonne"].iloc[0] - 365.25 / 12 * daily) < 1e-9
+
+
+
+def test_time_aggregation_fallback_warns_that_sbq_is_dropped(monkeypatch, caplog):
+    """Re-planning the days without bucket lane totals is logged, since SBQ no longer applies."""
+
+    from app.services.benchmarking.performance_benchmark import SyntheticDataGenerator
+    from app.services.optimization import time_aggregation
+    from app.utils.exceptions import OptimizationError
+
+    solve_model = time_aggregation.solve_model
+
+    def exact_split_infeasible(model, *args, **kwargs):
+        if hasattr(model, "bucket_lane_total") and model.bucket_lane_total.active:
+            raise OptimizationError("All solvers in fallback chain failed")
+        return solve_model(model, *args, **kwargs)
+
+    monkeypatch.setattr(time_aggregation, "solve_model", exact_split_infeasible)
+    data = SyntheticDataGenerator().generate_model_data(
+        num_plants=2, num_customers=2, num_periods=14, num_modes=1, route_density=1.0, start_date="2025-01-06"
+    )
+
+    with caplog.at_level("WARNING", logger=time_aggregation.__name__):
+        _, meta = time_aggregation.solve_time_aggregated(data, "week", solver_name="highs")
+
+    assert meta["time_aggregation"]["lane_totals_kept"] is False
+    assert "without SBQ" in caplog.text
+
+def test_coarse_to_fine_restricts_routes_and_meets_demand():
+    """Clusters conserve demand and the restricted full model still serves every customer."""
+
+    from app.services.benchmarking.performance_benchmark import SyntheticDataGenerator
+    from app.services.optimization.coarse_to_fine import build_coarse_model_data, cluster_customers, solve_coarse_to_fine
+    from app.services.optimization.result_parser import extract_solution
+
+    data = SyntheticDataGenerator().generate_model_data(
+        num_plants=3, num_customers=9, num_periods=3, num_modes=2, route_density=1.0
+    )
+
+    assignment = cluster_customers(data, n_clusters=3)
+    assert len(assignment) == 9
+    assert len(set(assignment.values())) == 3
+    coarse = build_coarse_model_data(data, assignment)
+    assert abs(coarse["demand_forecast"]["demand_tonnes"].sum() - data["demand_forecast"]["demand_tonnes"].sum()) < 1e-6
+    assert set(coarse["transport_routes_modes"]["destination_node_id"]) <= set(assignment.values())
+
+    model, meta = solve_coarse_to_fine(data, n_clusters=3, k_cheapest=1, solver_name="highs")
+    report = meta["coarse_to_fine"]
+    assert report["restricted_solved"]
+    assert report["routes_kept"] < report["routes_total"]
+    assert len(list(model.R)) == report["routes_kept"]
+
+    shipped = {}
+    for s in extract_solution(model)["shipments"]:
+        key = (s["destination"], s["period"])
+        shipped[key] = shipped.get(key, 0.0) + s["tonnes"]
+    for _, row in data["demand_forecast"].iterrows():
+        assert abs(shipped.get((row["customer_node_id"], row["period"]), 0.0) - row["demand_tonnes"]) < 1e-4
+
+
+def test_columnar_extraction_matches_model_values():
+    """The columnar records and costs match values read from the Pyomo variables and cost terms."""
+
+    from pyomo.environ import value
+
+    from app.services.benchmarking.performance_benchmark import SyntheticDataGenerator
+    from app.services.optimization.model_builder import build_clinker_model
+    from app.services.optimization.result_parser import extract_solution_columnar
+    from app.services.optimization.solvers import solve_model
+
+    data = SyntheticDataGenerator().generate_model_data(
+        num_plants=2, num_customers=4, num_periods=3, num_modes=2, route_density=1.0
+    )
+    model = build_clinker_model(data, penalty_config={"unmet_demand": 5000.0})
+    solve_model(model, solver_name="highs")
+
+    columnar = extract_solution_columnar(model)
+    assert columnar.shipments.shape == (len(model.R) * len(model.T),)
+    assert set(columnar.route_index) == {"origin", "destination", "mode", "period"}
+    assert abs(columnar.objective - float(value(model.total_cost))) < 1e-6 * max(1.0, abs(columnar.objective))
+
+    records = columnar.to_records()
+    assert columnar.to_records() is records
+    assert len(records["production"]) == len(model.I) * len(model.T)
+
+    # Reference: every value read straight from the Pyomo components
+    def close(a, b):
+        return abs(a - b) <= 1e-6 * max(1.0, abs(b))
+
+    route_keys = [(i, j, mode, t) for (i, j, mode) in model.R for t in model.T]
+    active = [k for k in route_keys if value(model.ship[k]) > 0 or value(model.trips[k]) > 0]
+    assert [(s["origin"], s["destination"], s["mode"], s["period"]) for s in records["shipments"]] == active
+    assert all(close(s["tonnes"], value(model.ship[k])) for s, k in zip(records["shipments"], active))
+    assert [tr["trips"] for tr in records["trips"]] == [round(value(model.trips[k])) for k in active]
+    assert all(close(p["tonnes"], value(model.prod[p["plant"], p["period"]])) for p in records["production"])
+    assert all(close(v["tonnes"], value(model.inv[v["plant"], v["period"]])) for v in records["inventory"])
+
+    plant_keys = [(i, t) for i in model.I for t in model.T]
+    costs = records["costs"]
+    assert close(costs["production_cost"], sum(value(model.prod_cost[k]) * value(model.prod[k]) for k in plant_keys))
+    assert close(costs["transport_cost"], sum(value(model.trans_cost[k[:3]]) * value(model.ship[k]) for k in route_keys))
+    assert close(costs["fixed_trip_cost"], sum(value(model.fixed_trip_cost[k[:3]]) * value(model.trips[k]) for k in route_keys))
+    assert close(costs["holding_cost"], sum(value(model.hold_cost[i]) * value(model.inv[i, t]) for i, t in plant_keys))
+    assert close(costs["unmet_demand_penalty"], 1000.0 * sum(value(v) for v in model.unmet_demand.values()))
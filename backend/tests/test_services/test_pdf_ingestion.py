@@ -0,0 +1,77 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.db.models.user  # noqa: F401  - target of the AuditLog relationship
+from app.db.base import Base
+from app.db.models.staging_tables import StagingDemandForecast, StagingPlantMaster, ValidationBatch
+from app.services.ingestion.pdf_ingestion import PdfPageCache, file_sha256, is_pdf_file, stage_pdf_tables
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine, tables=[
+        StagingDemandForecast.__table__, StagingPlantMaster.__table__, ValidationBatch.__table__,
+    ])
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _cached_report(tmp_path, name, pages):
+    """A report whose extracted pages are all in the cache, so no PDF is parsed."""
+    path = tmp_path / name
+    path.write_bytes(f"%PDF-1.4 {name}".encode())
+    cache = PdfPageCache(str(tmp_path / "cache"))
+    with open(path, "rb") as f:
+        file_hash = file_sha256(f)
+    cache.store_page_count(file_hash, len(pages))
+    for page, tables in enumerate(pages, start=1):
+        cache.put(file_hash, page, tables)
+    return str(path), cache
+
+
+def test_cached_pages_stage_matching_tables(tmp_path, db):
+    demand = [["Customer Node ID", "Period", "Demand Tonnes"], ["C1", "2025-01", "120"], ["C2", "2025-01", "80"]]
+    plants = [["Plant ID", "Plant Name", "Plant Type"], ["P1", "Kutch", "clinker"]]
+    narrative = [["Year", "Revenue"], ["2024", "1000"]]
+    path, cache = _cached_report(tmp_path, "annual.pdf", [[narrative], [], [demand, plants]])
+
+    summary, = stage_pdf_tables(db, [path], user="test", display_names={path: "Annual Report.pdf"}, cache=cache)
+
+    assert summary["filename"] == "Annual Report.pdf"
+    assert (summary["pages"], summary["cached_pages"], summary["tables_found"]) == (3, 3, 3)
+    assert summary["rows_staged"] == 3
+    assert summary["errors"] == []
+    assert [(b["page"], b["table"], b["rows_staged"]) for b in summary["batches"]] == [
+        (3, "demand_forecast", 2), (3, "plant_master", 1),
+    ]
+    assert {r.source_file for r in db.query(StagingDemandForecast)} == {"Annual Report.pdf (page 3)"}
+    assert [r.customer_node_id for r in db.query(StagingDemandForecast).order_by(StagingDemandForecast.source_row)] == ["C1", "C2"]
+    assert db.query(StagingPlantMaster).one().plant_name == "Kutch"
+    assert db.query(ValidationBatch).count() == 2
+
+
+def test_table_name_restricts_staged_tables(tmp_path, db):
+    demand = [["customer_node_id", "period", "demand_tonnes"], ["C1", "2025-01", "5"]]
+    plants = [["plant_id", "plant_name", "plant_type"], ["P1", "Kutch", "clinker"]]
+    path, cache = _cached_report(tmp_path, "q1.pdf", [[plants, demand]])
+
+    summary, = stage_pdf_tables(db, [path], table_name="plant_master", cache=cache)
+
+    assert summary["tables_found"] == 2
+    assert [b["table"] for b in summary["batches"]] == ["plant_master"]
+    assert db.query(StagingDemandForecast).count() == 0
+
+
+def test_pdf_files_are_recognised_by_content(tmp_path):
+    report = tmp_path / "0-download"
+    report.write_bytes(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+    page = tmp_path / "1-report.pdf"
+    page.write_bytes(b"<html>Not found</html>")
+
+    assert is_pdf_file(str(report))
+    assert not is_pdf_file(str(page))
+    assert not is_pdf_file(str(tmp_path / "missing.pdf"))
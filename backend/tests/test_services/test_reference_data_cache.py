@@ -0,0 +1,80 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.db.models.demand_forecast import DemandForecast
+from app.db.models.plant_master import PlantMaster
+from app.db.models.transport_routes_modes import TransportRoutesModes
+from app.schemas.plant import PlantMasterCreate, PlantMasterUpdate
+from app.services.coordinate_resolver import CoordinateResolver
+from app.services.crud_service import PlantCRUDService
+from app.services.reference_data_cache import (
+    ReferenceDataCache,
+    get_customer_nodes,
+    get_route_lookup,
+    get_transport_modes,
+    reference_cache,
+)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(
+        bind=engine, tables=[PlantMaster.__table__, TransportRoutesModes.__table__, DemandForecast.__table__]
+    )
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        PlantMaster(plant_id="P1", plant_name="Plant One", plant_type="clinker", latitude=20.0, longitude=75.0),
+        TransportRoutesModes(origin_plant_id="P1", destination_node_id="C1", transport_mode="road",
+                             vehicle_capacity_tonnes=25.0),
+        TransportRoutesModes(origin_plant_id="P1", destination_node_id="C2", transport_mode="rail",
+                             vehicle_capacity_tonnes=60.0, is_active="N"),
+        DemandForecast(customer_node_id="C3", period="2025-01", demand_tonnes=10.0),
+    ])
+    session.commit()
+    reference_cache.clear()
+    yield session
+    session.close()
+
+
+def test_hits_misses_and_version_bump():
+    loads = []
+    cache = ReferenceDataCache(max_age_seconds=0)
+    cache.register("numbers", lambda db: loads.append(1) or len(loads), ["numbers_table"])
+
+    assert cache.get(None, "numbers") == 1
+    assert cache.get(None, "numbers") == 1
+    cache.invalidate("numbers_table", "unrelated_table")
+    assert cache.get(None, "numbers") == 2
+
+    stats = cache.stats()
+    assert stats["datasets"]["numbers"]["hits"] == 1
+    assert stats["datasets"]["numbers"]["misses"] == 2
+    assert stats["table_versions"] == {"numbers_table": 1}
+
+
+def test_crud_writes_invalidate_plant_lookups(db):
+    resolver = CoordinateResolver(db)
+    assert resolver.get_plant_coordinates("P1") == (20.0, 75.0)
+
+    crud = PlantCRUDService(PlantMaster)
+    crud.update(db, crud.get_by_id(db, "P1"), PlantMasterUpdate(latitude=21.0))
+    assert resolver.get_plant_coordinates("P1") == (21.0, 75.0)
+
+    crud.create(db, PlantMasterCreate(plant_id="P2", plant_name="Plant Two", plant_type="grinding",
+                                      latitude=10.0, longitude=70.0))
+    assert resolver.get_node_coordinates("P2") == (10.0, 70.0)
+
+
+def test_route_lookup_modes_and_customers(db):
+    lookup = get_route_lookup(db)
+    assert lookup[("P1", "C1", "road")]["vehicle_capacity_tonnes"] == 25.0
+    assert get_transport_modes(db) == ["road"]
+    assert get_customer_nodes(db) == ["C1", "C2", "C3"]
+
+    hits = reference_cache.stats()["datasets"]["route_lookup"]["hits"]
+    get_route_lookup(db)
+    assert reference_cache.stats()["datasets"]["route_lookup"]["hits"] == hits + 1
@@ -0,0 +1,102 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.result_store import PLAN_TABLES, ResultStore, arrow_available, load_plan, plan_frames
+
+
+def _plans() -> dict:
+    return {
+        "production_plan": {"P1": {"2025-01-01": 100.0, "2025-01-02": 80.0}, "P2": {"2025-01-01": 50.0, "2025-01-02": 0.0}},
+        "shipment_plan": {
+            "P1-C1-road-2025-01-01": {"shipment_tonnes": 60.0, "trips": 3, "mode_activated": True, "vehicle_capacity": 25.0, "sbq_requirement": 0.0},
+            "P2-C1-rail-2025-01-02": {"shipment_tonnes": 40.0, "trips": 1, "mode_activated": True, "vehicle_capacity": 40.0, "sbq_requirement": 10.0},
+            "_metadata": {"unmet_demand_total": 0.0},
+        },
+        "inventory_profile": {"P1": {"2025-01-01": 10.0, "2025-01-02": 20.0}},
+        "trip_plan": {"P1-C1-road-2025-01-01": {"trips": 3, "shipment_tonnes": 60.0, "utilization": 0.8}},
+    }
+
+
+def test_plan_frames_split_route_keys_with_dashed_periods():
+    frames = plan_frames(**_plans())
+
+    shipments = frames["shipments"]
+    assert len(shipments) == 2
+    assert shipments.iloc[0][["origin", "destination", "mode", "period"]].tolist() == ["P1", "C1", "road", "2025-01-01"]
+    assert len(frames["production"]) == 4
+    assert frames["trips"]["trips"].tolist() == [3]
+
+
+def test_load_plan_from_json_row_filters_and_projects():
+    plans = _plans()
+    row = SimpleNamespace(
+        run_id="RUN_JSON",
+        plan_storage="json",
+        production_plan=plans["production_plan"],
+        shipment_plan=plans["shipment_plan"],
+        inventory_profile=plans["inventory_profile"],
+    )
+
+    df = load_plan(row, "production", columns=["plant_id", "tonnes"], filters={"period": "2025-01-01"})
+    assert list(df.columns) == ["plant_id", "tonnes"]
+    assert sorted(df["tonnes"].tolist()) == [50.0, 100.0]
+
+
+@pytest.mark.skipif(not arrow_available(), reason="pyarrow not installed")
+def test_parquet_store_round_trip_with_pushdown(tmp_path):
+    store = ResultStore(root=str(tmp_path))
+    store.write_run("RUN_1", plan_frames(**_plans()))
+    store.write_run("RUN_2", plan_frames(production_plan={"P9": {"2025-01-01": 1.0}}))
+
+    assert (tmp_path / "production" / "run_id=RUN_1" / "period=2025-01-02").is_dir()
+
+    row = SimpleNamespace(run_id="RUN_1", plan_storage="parquet")
+    production = load_plan(row, "production", store=store)
+    assert production["tonnes"].sum() == pytest.approx(230.0)
+    assert "P9" not in production["plant_id"].tolist()
+
+    sliced = store.read("RUN_1", "shipments", columns=["origin", "tonnes"], filters={"period": ["2025-01-02"]})
+    assert list(sliced.columns) == ["origin", "tonnes"]
+    assert sliced.to_dict(orient="records") == [{"origin": "P2", "tonnes": 40.0}]
+
+    # Rewriting a run replaces its partitions instead of appending
+    store.write_run("RUN_1", plan_frames(production_plan={"P1": {"2025-01-01": 5.0}}))
+    assert store.read("RUN_1", "production")["tonnes"].tolist() == [5.0]
+    assert store.read("RUN_1", "shipments").empty
+
+
+@pytest.mark.skipif(not arrow_available(), reason="pyarrow not installed")
+def test_failed_results_commit_removes_written_partitions(tmp_path, monkeypatch):
+    import app.db.models.user  # noqa: F401  - target of the AuditLog relationship
+    from sqlalchemy.exc import OperationalError
+
+    from app.services.optimization_service import OptimizationService
+
+    class FailingCommitSession:
+        rolled_back = False
+
+        def add(self, row):
+            pass
+
+        def commit(self):
+            raise OperationalError("INSERT INTO optimization_results", {}, Exception("database is locked"))
+
+        def rollback(self):
+            self.rolled_back = True
+
+    monkeypatch.setenv("RESULTS_STORAGE", "parquet")
+    monkeypatch.setenv("RESULTS_STORE_DIR", str(tmp_path))
+    db = FailingCommitSession()
+    service = OptimizationService.__new__(OptimizationService)
+    service.db = db
+    results = {
+        **_plans(), "total_cost": 1.0, "production_cost": 1.0, "transport_cost": 0.0, "inventory_cost": 0.0,
+        "penalty_cost": 0.0, "demand_fulfillment": {}, "service_level": 1.0, "stockout_events": 0,
+    }
+
+    with pytest.raises(OperationalError):
+        service._save_results("RUN_FAILED", results, None)
+
+    assert db.rolled_back
+    assert not any((tmp_path / table / "run_id=RUN_FAILED").exists() for table in PLAN_TABLES)
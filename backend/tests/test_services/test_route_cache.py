@@ -0,0 +1,126 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.db.models.user  # noqa: F401  - target of the AuditLog relationship
+from app.db.base import Base
+from app.db.models.plant_master import PlantMaster
+from app.db.models.transport_lookup import TransportLookup
+from app.services import routing_cache
+from app.services.reference_data_cache import reference_cache
+from app.services.routing_cache import RouteCache, route_cache
+
+
+@pytest.fixture
+def db(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine, tables=[PlantMaster.__table__, TransportLookup.__table__])
+    session = sessionmaker(bind=engine)()
+    reference_cache.clear()
+    route_cache.clear()
+    monkeypatch.setattr(routing_cache.settings, "ORS_API_KEY", None)
+    session.add_all([
+        PlantMaster(plant_id=f"P{i}", plant_name=f"Plant {i}", plant_type="clinker", latitude=20.0 + i, longitude=70.0 + i)
+        for i in range(1, 4)
+    ])
+    session.commit()
+    yield session
+    session.close()
+    route_cache.clear()
+
+
+def _osrm_stub(monkeypatch, distance_m=4000.0):
+    calls = []
+
+    async def get_route_osrm(origin, destination):
+        calls.append((origin, destination))
+        await asyncio.sleep(0.01)
+        return {"distance_m": distance_m, "duration_s": 600.0}
+
+    monkeypatch.setattr(routing_cache, "get_route_osrm", get_route_osrm)
+    return calls
+
+
+def test_preload_keeps_the_newest_routes_within_bound(db):
+    now = datetime.utcnow()
+    db.add_all([
+        TransportLookup(origin_plant_id="P1", destination_node_id=f"P{i}", transport_mode="driving",
+                        distance_km=float(i), duration_minutes=1.0, source="OSRM", created_at=now - timedelta(days=10 - i))
+        for i in range(1, 4)
+    ])
+    db.commit()
+    cache = RouteCache(max_entries=2)
+
+    assert cache.preload(db) == 2
+    assert cache.peek(("P1", "P1", "driving")) is None
+    assert cache.peek(("P1", "P3", "driving")).distance_km == 3.0
+
+    # The evicted route is read from transport_lookup and pushes out the least recently used one
+    assert cache.get(db, ("P1", "P1", "driving")).distance_km == 1.0
+    assert cache.peek(("P1", "P2", "driving")) is None
+    assert cache.get(db, ("P1", "NOPE", "driving")) is None
+    stats = cache.stats()
+    assert (stats["entries"], stats["db_hits"], stats["misses"], stats["evictions"]) == (2, 1, 1, 2)
+
+
+def test_concurrent_misses_share_one_fetch(db, monkeypatch):
+    calls = _osrm_stub(monkeypatch)
+
+    async def lookups():
+        return await asyncio.gather(*(routing_cache.get_route_with_cache(db, "P1", "P2") for _ in range(5)))
+
+    results = asyncio.run(lookups())
+
+    assert len(calls) == 1
+    assert all(r["distance_km"] == 4.0 and r["source"] == "OSRM" and not r["cached"] for r in results)
+    assert db.query(TransportLookup).count() == 1
+    assert route_cache.stats()["coalesced"] == 4
+
+    # Later lookups are served from memory
+    assert asyncio.run(routing_cache.get_route_with_cache(db, "P1", "P2"))["cached"] is True
+    assert len(calls) == 1
+
+
+def test_stale_route_is_served_and_refreshed_in_background(db, monkeypatch):
+    calls = _osrm_stub(monkeypatch, distance_m=7000.0)
+    db.add(TransportLookup(origin_plant_id="P2", destination_node_id="P3", transport_mode="driving",
+                           distance_km=5.0, duration_minutes=6.0, source="OSRM",
+                           created_at=datetime.utcnow() - timedelta(days=60)))
+    db.commit()
+
+    async def lookup_then_wait():
+        result = await routing_cache.get_route_with_cache(db, "P2", "P3")
+        assert not calls
+        await route_cache.wait_in_flight()
+        return result
+
+    stale = asyncio.run(lookup_then_wait())
+
+    assert (stale["distance_km"], stale["source"], stale["cached"]) == (5.0, "OSRM_stale", True)
+    assert len(calls) == 1
+    db.expire_all()
+    refreshed = db.query(TransportLookup).filter_by(origin_plant_id="P2", destination_node_id="P3").one()
+    assert refreshed.distance_km == pytest.approx(7.0)
+    assert refreshed.created_at > datetime.utcnow() - timedelta(days=1)
+    fresh = asyncio.run(routing_cache.get_route_with_cache(db, "P2", "P3"))
+    assert (fresh["distance_km"], fresh["source"], fresh["cached"]) == (pytest.approx(7.0), "OSRM", True)
+
+
+def test_refresh_cancelled_with_its_loop_is_logged(db, monkeypatch, caplog):
+    _osrm_stub(monkeypatch)
+    db.add(TransportLookup(origin_plant_id="P1", destination_node_id="P3", transport_mode="driving",
+                           distance_km=5.0, duration_minutes=6.0, source="OSRM",
+                           created_at=datetime.utcnow() - timedelta(days=60)))
+    db.commit()
+
+    # asyncio.run cancels the refresh nobody waited for
+    with caplog.at_level("WARNING", logger=routing_cache.__name__):
+        stale = asyncio.run(routing_cache.get_route_with_cache(db, "P1", "P3"))
+
+    assert stale["source"] == "OSRM_stale"
+    assert "was cancelled" in caplog.text
+    assert db.query(TransportLookup).filter_by(origin_plant_id="P1", destination_node_id="P3").one().distance_km == 5.0
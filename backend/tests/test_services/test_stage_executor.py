@@ -0,0 +1,48 @@
+import threading
+import time
+
+import pytest
+
+from app.services.validation.stage_executor import run_stages
+
+
+def test_stages_run_concurrently_and_report_in_order():
+    barrier = threading.Barrier(3, timeout=5)
+
+    def stage(value):
+        # Only completes when all three stages are running at once
+        barrier.wait()
+        return value
+
+    run = run_stages({"c": lambda: stage(3), "a": lambda: stage(1), "b": lambda: stage(2)}, max_workers=3)
+
+    assert list(run.results.items()) == [("c", 3), ("a", 1), ("b", 2)]
+    assert set(run.timing()["stages"]) == {"a", "b", "c"}
+    assert run.wall_seconds >= max(run.seconds.values())
+
+
+def test_failing_stage_cancels_stages_not_yet_started():
+    started = []
+
+    def failing():
+        started.append("failing")
+        raise ValueError("broken input")
+
+    def slow():
+        started.append("slow")
+        time.sleep(0.2)
+        return "slow"
+
+    def queued():
+        started.append("queued")
+        return "queued"
+
+    with pytest.raises(ValueError, match="broken input"):
+        run_stages({"failing": failing, "slow": slow, "queued": queued}, max_workers=2)
+    assert "queued" not in started
+
+    # Sequential runs stop at the failing stage too
+    started.clear()
+    with pytest.raises(ValueError):
+        run_stages({"failing": failing, "queued": queued}, max_workers=1)
+    assert started == ["failing"]
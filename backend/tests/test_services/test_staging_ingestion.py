@@ -0,0 +1,188 @@
+import asyncio
+import io
+
+import pandas as pd
+import pytest
+from fastapi import UploadFile
+from openpyxl import Workbook
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.db.models.user  # noqa: F401  - target of the AuditLog relationship
+from app.db.base import Base
+from app.db.models.demand_forecast import DemandForecast
+from app.db.models.staging_tables import StagingDemandForecast, StagingPlantMaster, ValidationBatch
+from app.services.ingestion.excel_streaming import iter_sheet_frames
+from app.services.ingestion import staging_ingestion
+from app.services.ingestion.staging_ingestion import ingest_to_staging
+from app.utils.exceptions import DataValidationError
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine, tables=[
+        StagingDemandForecast.__table__, StagingPlantMaster.__table__, ValidationBatch.__table__,
+        DemandForecast.__table__,
+    ])
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _upload(filename, text):
+    return UploadFile(file=io.BytesIO(text.encode("utf-8")), filename=filename)
+
+
+def test_csv_is_staged_in_chunks(db):
+    lines = ["Customer Node ID,Period,Demand Tonnes,Unknown Column"]
+    lines += [f"C{i},2025-01,{'' if i == 3 else i * 10.0},x" for i in range(1, 8)]
+    progress = []
+
+    result = asyncio.run(ingest_to_staging(
+        _upload("demand.csv", "\n".join(lines)), db, chunk_size=3, progress_callback=progress.append,
+    ))
+
+    assert result["table"] == "demand_forecast"
+    assert result["rows_staged"] == 7
+    assert result["chunks"] == 3
+    assert [p["rows_staged"] for p in progress] == [3, 6, 7]
+    assert db.query(ValidationBatch).one().total_rows == 7
+
+    staged = db.query(StagingDemandForecast).order_by(StagingDemandForecast.source_row).all()
+    assert [r.source_row for r in staged] == list(range(1, 8))
+    assert [r.customer_node_id for r in staged] == [f"C{i}" for i in range(1, 8)]
+    assert staged[2].demand_tonnes is None
+    assert staged[6].demand_tonnes == 70.0
+    assert {(r.batch_id, r.source_file, r.validation_status) for r in staged} == {
+        (result["batch_id"], "demand.csv", "pending")
+    }
+
+
+def test_failed_upload_stages_nothing(db):
+    with pytest.raises(DataValidationError, match="empty"):
+        asyncio.run(ingest_to_staging(_upload("demand.csv", ""), db))
+
+    with pytest.raises(DataValidationError, match="missing required columns"):
+        asyncio.run(ingest_to_staging(_upload("demand.csv", "period,demand_tonnes\n2025-01,5\n"), db))
+
+    assert db.query(ValidationBatch).count() == 0
+    assert db.query(StagingDemandForecast).count() == 0
+
+
+def _workbook(sheets):
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for title, rows in sheets.items():
+        sheet = workbook.create_sheet(title)
+        for row in rows:
+            sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def test_workbook_sheets_are_streamed_into_one_batch_each(db):
+    contents = _workbook({
+        "Plants": [["Plant ID", "Plant Name", "Plant Type"], ["P1", "One", "clinker"], ["P2", "Two", "grinding"]],
+        "Notes": [["exported from ERP"]],
+        "Demand": [["customer_node_id", "period", "demand_tonnes"], *[[f"C{i}", "2025-01", i * 1.5] for i in range(5)],
+                   [None, None, None], ["C9", "2025-02", None]],
+    })
+
+    result = asyncio.run(ingest_to_staging(
+        UploadFile(file=io.BytesIO(contents), filename="erp_export.xlsx"), db, chunk_size=2,
+    ))
+
+    assert [(s["sheet"], s["table"], s["rows_staged"], s["chunks"]) for s in result["sheets"]] == [
+        ("Plants", "plant_master", 2, 1), ("Demand", "demand_forecast", 6, 3),
+    ]
+    assert [s["sheet"] for s in result["skipped_sheets"]] == ["Notes"]
+    assert result["rows_staged"] == 8
+    assert db.query(ValidationBatch).count() == 2
+    demand = db.query(StagingDemandForecast).order_by(StagingDemandForecast.source_row).all()
+    assert [r.customer_node_id for r in demand] == [f"C{i}" for i in range(5)] + ["C9"]
+    assert demand[-1].demand_tonnes is None
+    assert {p.plant_id for p in db.query(StagingPlantMaster)} == {"P1", "P2"}
+
+
+def test_streamed_sheet_matches_read_excel():
+    rows = [["plant_id", "period", "max_capacity_tonnes", "note"], ["P1", "2025-01", 100, None],
+            ["P2", "2025-02", 250.5, "x"], ["P3", "2025-03", 0, "y"]]
+    contents = _workbook({"Sheet1": rows})
+
+    streamed = pd.concat(iter_sheet_frames(contents, "Sheet1", chunk_size=2), ignore_index=True)
+
+    pd.testing.assert_frame_equal(streamed, pd.read_excel(io.BytesIO(contents)), check_dtype=False)
+
+
+def test_identical_upload_returns_the_live_batch(db):
+    text = "customer_node_id,period,demand_tonnes\nC1,2025-01,10\nC2,2025-01,20\n"
+    first = asyncio.run(ingest_to_staging(_upload("demand.csv", text), db))
+
+    again = asyncio.run(ingest_to_staging(_upload("demand_copy.csv", text), db))
+
+    assert again["status"] == "duplicate"
+    assert (again["batch_id"], again["batch_status"], again["rows_staged"]) == (first["batch_id"], "pending", 0)
+    assert db.query(StagingDemandForecast).count() == 2
+
+    forced = asyncio.run(ingest_to_staging(_upload("demand.csv", text), db, force=True))
+    assert forced["status"] == "staged"
+    db.query(ValidationBatch).update({ValidationBatch.status: "validation_failed"})
+    db.commit()
+
+    restaged = asyncio.run(ingest_to_staging(_upload("demand.csv", text), db))
+    assert restaged["status"] == "staged"
+    assert db.query(ValidationBatch).count() == 3
+
+
+def test_workbook_failing_on_a_later_sheet_is_staged_again_on_retry(db, monkeypatch):
+    contents = _workbook({
+        "Plants": [["plant_id", "plant_name", "plant_type"], ["P1", "One", "clinker"]],
+        "Demand": [["customer_node_id", "period", "demand_tonnes"], ["C1", "2025-01", 10.0]],
+    })
+    stage_frames = staging_ingestion.stage_frames
+
+    def failing_on_demand(db, frames, source_file, table_name=None, **kwargs):
+        if table_name == "demand_forecast":
+            raise DataValidationError("Database error during staging: disk full")
+        return stage_frames(db, frames, source_file, table_name=table_name, **kwargs)
+
+    monkeypatch.setattr(staging_ingestion, "stage_frames", failing_on_demand)
+    with pytest.raises(DataValidationError, match="disk full"):
+        asyncio.run(ingest_to_staging(UploadFile(file=io.BytesIO(contents), filename="erp_export.xlsx"), db))
+    assert db.query(ValidationBatch).one().status == "ingestion_failed"
+
+    monkeypatch.setattr(staging_ingestion, "stage_frames", stage_frames)
+    retried = asyncio.run(ingest_to_staging(UploadFile(file=io.BytesIO(contents), filename="erp_export.xlsx"), db))
+
+    assert retried["status"] == "staged"
+    assert [(s["sheet"], s["rows_staged"]) for s in retried["sheets"]] == [("Plants", 1), ("Demand", 1)]
+    assert db.query(ValidationBatch).filter(ValidationBatch.status == "pending").count() == 2
+
+
+def test_only_rows_that_differ_from_production_are_staged(db):
+    db.add_all([
+        DemandForecast(customer_node_id="C1", period="2025-01", demand_tonnes=10.0, source="erp"),
+        DemandForecast(customer_node_id="C2", period="2025-01", demand_tonnes=20.0, source="erp"),
+        DemandForecast(customer_node_id="C3", period="2025-01", demand_tonnes=30.0, source="erp"),
+    ])
+    db.commit()
+    lines = ["Customer Node ID,Period,Demand Tonnes,Source",
+             "C1,2025-01,10,erp", "C2,2025-01,25,erp", "C3,2025-01,30.0, erp ", "C4,2025-01,40,erp"]
+
+    result = asyncio.run(ingest_to_staging(
+        _upload("demand.csv", "\n".join(lines)), db, chunk_size=2, skip_unchanged_rows=True,
+    ))
+
+    assert (result["rows_staged"], result["rows_unchanged"]) == (2, 2)
+    staged = db.query(StagingDemandForecast).order_by(StagingDemandForecast.source_row).all()
+    assert [(r.source_row, r.customer_node_id) for r in staged] == [(2, "C2"), (4, "C4")]
+    assert db.query(ValidationBatch).one().unchanged_rows == 2
+
+    unchanged = asyncio.run(ingest_to_staging(
+        _upload("demand.csv", "\n".join(lines[:2] + lines[3:4])), db, skip_unchanged_rows=True,
+    ))
+    assert (unchanged["status"], unchanged["batch_id"], unchanged["rows_unchanged"]) == ("unchanged", None, 2)
+    assert db.query(ValidationBatch).count() == 1
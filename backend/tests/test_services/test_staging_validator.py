@@ -0,0 +1,137 @@
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.db.models.user  # noqa: F401  - target of the AuditLog relationship
+from app.db.base import Base
+from app.db.models.demand_forecast import DemandForecast
+from app.db.models.plant_master import PlantMaster
+from app.db.models.staging_tables import (
+    StagingDemandForecast,
+    StagingPlantMaster,
+    StagingTransportRoutes,
+    ValidationBatch,
+)
+from app.services.validation.staging_validator import (
+    promote_batch_to_production,
+    validate_batch,
+    validate_business_rules,
+    validate_referential_integrity,
+    validate_schema_constraints,
+)
+from app.utils.exceptions import DataValidationError
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine, tables=[
+        PlantMaster.__table__, DemandForecast.__table__, StagingPlantMaster.__table__,
+        StagingDemandForecast.__table__, StagingTransportRoutes.__table__, ValidationBatch.__table__,
+    ])
+    session = sessionmaker(bind=engine)()
+    session.add(PlantMaster(plant_id="P1", plant_name="Plant One", plant_type="clinker"))
+    session.commit()
+    yield session
+    session.close()
+
+
+def _per_record_errors(db, record, table_name):
+    return (
+        validate_schema_constraints(record, table_name)
+        + validate_referential_integrity(db, record, table_name)
+        + validate_business_rules(record, table_name)
+    )
+
+
+def test_route_batch_matches_per_record_checks(db):
+    rows = [
+        dict(origin_plant_id="P1", destination_node_id="C1", transport_mode="road", vehicle_capacity_tonnes=25.0),
+        dict(origin_plant_id="P9", destination_node_id="C1", transport_mode="truck", vehicle_capacity_tonnes=0.0,
+             distance_km=-1.0, min_batch_quantity_tonnes=30.0),
+        dict(origin_plant_id="  ", destination_node_id=None, transport_mode="", vehicle_capacity_tonnes=None,
+             cost_per_tonne=-2.0),
+        dict(origin_plant_id="P1", destination_node_id="C2", transport_mode="Rail", vehicle_capacity_tonnes=10.0,
+             min_batch_quantity_tonnes=20.0),
+    ] * 3
+    db.add(ValidationBatch(batch_id="B1", source_file="routes.csv", table_name="transport_routes_modes",
+                           total_rows=len(rows)))
+    db.add_all([StagingTransportRoutes(batch_id="B1", source_row=i + 1, **row) for i, row in enumerate(rows)])
+    db.commit()
+
+    result = validate_batch(db, "B1", chunk_size=5)
+
+    assert result["total_rows"] == 12
+    assert result["valid_rows"] == 3
+    assert result["status"] == "validation_failed"
+    staged = db.query(StagingTransportRoutes).order_by(StagingTransportRoutes.id).all()
+    for record in staged:
+        expected = _per_record_errors(db, record, "transport_routes_modes")
+        assert record.validation_status == ("invalid" if expected else "valid")
+        assert (json.loads(record.validation_errors) if record.validation_errors else []) == expected
+    assert result["validation_errors"][0] == "Row 2: vehicle_capacity_tonnes must be positive"
+
+
+def test_plant_batch_validates_and_rejects_reprocessing(db):
+    db.add(ValidationBatch(batch_id="B2", source_file="plants.csv", table_name="plant_master", total_rows=2))
+    db.add_all([
+        StagingPlantMaster(batch_id="B2", source_row=1, plant_id="P2", plant_name="Two", plant_type="grinding",
+                           latitude=21.0),
+        StagingPlantMaster(batch_id="B2", source_row=2, plant_id="P3", plant_name="Three", plant_type="Terminal"),
+    ])
+    db.commit()
+
+    result = validate_batch(db, "B2")
+    assert result["can_promote"]
+    assert {r.validation_status for r in db.query(StagingPlantMaster)} == {"valid"}
+
+    with pytest.raises(DataValidationError):
+        validate_batch(db, "B2")
+
+
+def _validated_batch(db, batch_id, table_name, rows):
+    db.add(ValidationBatch(batch_id=batch_id, source_file="upload.csv", table_name=table_name, total_rows=len(rows),
+                           valid_rows=len(rows), status="validated"))
+    db.add_all(rows)
+    db.commit()
+
+
+def test_plant_promotion_upserts_on_plant_id(db):
+    _validated_batch(db, "B3", "plant_master", [
+        StagingPlantMaster(batch_id="B3", source_row=1, plant_id="P1", plant_name="Renamed", plant_type="clinker",
+                           validation_status="valid"),
+        StagingPlantMaster(batch_id="B3", source_row=2, plant_id="P4", plant_name="Old", plant_type="grinding",
+                           validation_status="valid"),
+        StagingPlantMaster(batch_id="B3", source_row=3, plant_id="P4", plant_name="Four", plant_type="grinding",
+                           region="West", validation_status="valid"),
+    ])
+
+    result = promote_batch_to_production(db, "B3")
+
+    assert (result["inserted_rows"], result["updated_rows"], result["promoted_rows"]) == (1, 1, 2)
+    plants = {p.plant_id: p for p in db.query(PlantMaster)}
+    assert plants["P1"].plant_name == "Renamed"
+    assert (plants["P4"].plant_name, plants["P4"].region) == ("Four", "West")
+
+
+def test_demand_promotion_updates_matching_keys_and_keeps_values_for_nulls(db):
+    db.add(DemandForecast(customer_node_id="C1", period="2025-01", demand_tonnes=100.0, source="manual"))
+    db.commit()
+    _validated_batch(db, "B4", "demand_forecast", [
+        StagingDemandForecast(batch_id="B4", source_row=1, customer_node_id="C1", period="2025-01",
+                              demand_tonnes=150.0, validation_status="valid"),
+        StagingDemandForecast(batch_id="B4", source_row=2, customer_node_id="C1", period="2025-02",
+                              demand_tonnes=90.0, validation_status="valid"),
+    ])
+
+    result = promote_batch_to_production(db, "B4")
+
+    assert (result["inserted_rows"], result["updated_rows"]) == (1, 1)
+    rows = {(r.customer_node_id, r.period): r for r in db.query(DemandForecast)}
+    assert len(rows) == 2
+    assert (rows[("C1", "2025-01")].demand_tonnes, rows[("C1", "2025-01")].source) == (150.0, "manual")
+    assert rows[("C1", "2025-02")].demand_tonnes == 90.0
+    assert db.get(ValidationBatch, "B4").status == "promoted"
@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.db.models.user  # noqa: F401  - target of the AuditLog relationship
+from app.db.base import Base
+from app.db.models.demand_forecast import DemandForecast
+from app.db.models.plant_master import PlantMaster
+from app.db.models.production_capacity_cost import ProductionCapacityCost
+from app.db.models.safety_stock_policy import SafetyStockPolicy
+from app.services.data_snapshot import SNAPSHOT_TABLES, load_snapshot
+from app.services.data_validation_service import VALIDATION_STAGES, run_comprehensive_validation
+from app.services.reference_data_cache import invalidate_reference_data, reference_cache
+from app.services.validation_cache import validation_cache
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine, tables=[model.__table__ for model, _ in SNAPSHOT_TABLES.values()])
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        PlantMaster(plant_id="P1", plant_name="Plant One", plant_type="clinker"),
+        ProductionCapacityCost(plant_id="P1", period="2025-01", max_capacity_tonnes=1000.0,
+                               variable_cost_per_tonne=50.0),
+        DemandForecast(customer_node_id="C1", period="2025-01", demand_tonnes=400.0),
+    ])
+    session.commit()
+    reference_cache.clear()
+    validation_cache.clear()
+    yield session
+    session.close()
+
+
+def test_unchanged_data_returns_cached_report(db):
+    first = run_comprehensive_validation(db)
+    assert first["cache"]["stages_run"] == list(VALIDATION_STAGES)
+
+    second = run_comprehensive_validation(db)
+    assert second["cache"]["report_hit"]
+    assert second["data_version"] == first["data_version"]
+
+    # Writes reported by the app always invalidate the report
+    db.execute(update(PlantMaster).values(region="West"))
+    db.commit()
+    invalidate_reference_data("plant_master")
+    third = run_comprehensive_validation(db)
+    assert not third["cache"]["report_hit"]
+    assert third["data_version"] != first["data_version"]
+
+    assert not run_comprehensive_validation(db, use_cache=False)["cache"]["stages_reused"]
+
+
+def test_only_stages_reading_changed_tables_rerun(db):
+    run_comprehensive_validation(db)
+
+    db.add(SafetyStockPolicy(node_id="C9", location_id="C9", policy_type="absolute", policy_value=10.0,
+                             safety_stock_tonnes=10.0))
+    db.commit()
+    report = run_comprehensive_validation(db)
+    assert report["cache"]["stages_run"] == ["schema_validation", "referential_integrity"]
+    assert "unknown_node" in {w.get("type") for s in report["stages"] for w in s["warnings"]}
+
+    # A run's own snapshot skips the report level but still reuses stages
+    reused = run_comprehensive_validation(db, load_snapshot(db))
+    assert reused["cache"]["stages_reused"] == list(VALIDATION_STAGES)
@@ -2,20 +2,22 @@
 """
 Backfill transport route distances using OSRM.
 Iterates over transport_routes_modes and fills missing distance_km.
+
+Distances come from OSRM /table distance matrices over all origins and
+destinations with missing routes (many pairs per request) and are cached in
+transport_lookup in bulk; routes already cached are not requested again.
 """
 
 import asyncio
 import sys
-import os
 from pathlib import Path
 
 # Add backend to path
 sys.path.append(str(Path(__file__).parent.parent / "backend"))
 
-from app.services.external.osrm_client import get_route_osrm
-from app.services.external.cache_service import cache_route
+from app.services.routing_cache import get_route_matrix_with_cache
 from app.db.base import SessionLocal
-from app.db.models import TransportRoutesModes, PlantMaster
+from app.db.models import TransportRoutesModes
 
 
 async def backfill():
@@ -23,30 +25,30 @@ async def backfill():
     try:
         # Fetch all routes with missing distance_km
         routes = db.query(TransportRoutesModes).filter(TransportRoutesModes.distance_km.is_(None)).all()
-        plants = {p.plant_id: (p.longitude, p.latitude) for p in db.query(PlantMaster).all()}
+        if not routes:
+            print("No routes with missing distance")
+            return
+
+        result = await get_route_matrix_with_cache(
+            db,
+            [r.origin_plant_id for r in routes],
+            [r.destination_node_id for r in routes],
+            provider="osrm",
+        )
+        for node_id in result["unresolved"]:
+            print(f"Skipping {node_id}: missing coordinates")
+
+        filled = 0
         for r in routes:
-            origin_coords = plants.get(r.origin_plant_id)
-            if not origin_coords:
-                print(f"Skipping route {r.id}: missing coordinates for origin {r.origin_plant_id}")
-                continue
-            # For now, assume destination is also a plant (extend later)
-            dest_coords = plants.get(r.destination_node_id)
-            if not dest_coords:
-                print(f"Skipping route {r.id}: missing coordinates for destination {r.destination_node_id}")
-                continue
-            origin_str = f"{origin_coords[0]},{origin_coords[1]}"
-            dest_str = f"{dest_coords[0]},{dest_coords[1]}"
-            result = await get_route_osrm(origin_str, dest_str)
-            if result:
-                distance_km = result["distance_m"] / 1000.0
-                duration_s = result["duration_s"]
-                r.distance_km = distance_km
-                # Cache result
-                cache_route(origin_str, dest_str, distance_km, duration_s, "osrm", db)
-                print(f"Filled distance for route {r.id}: {distance_km:.2f} km")
+            route = result["routes"].get((r.origin_plant_id, r.destination_node_id))
+            if route:
+                r.distance_km = route["distance_km"]
+                filled += 1
             else:
-                print(f"No OSRM result for route {r.id}")
+                print(f"No OSRM result for route {r.id} ({r.origin_plant_id} -> {r.destination_node_id})")
         db.commit()
+        print(f"Filled distance for {filled}/{len(routes)} routes: {result['cached']} pairs cached, "
+              f"{result['fetched']} fetched in {result['requests']} OSRM requests")
     finally:
         db.close()
 
@@ -1,36 +1,59 @@
 #!/usr/bin/env python3
 """
-Company Reports Ingestion Script (placeholder).
-Accepts a list of URLs to PDF/HTML reports.
+Company Reports Ingestion Script.
+Accepts a list of URLs or local paths of PDF reports; their tables are
+extracted page-parallel and the ones matching a staging table are staged.
 """
 
 import asyncio
 import sys
 import os
+import tempfile
 from pathlib import Path
 
 # Add backend to path
 sys.path.append(str(Path(__file__).parent.parent / "backend"))
 
 from app.services.ingestion.industry_data_ingestion import ingest_company_reports
+from app.services.ingestion.pdf_ingestion import is_pdf_file, stage_pdf_tables
 from app.db.base import SessionLocal
 
 
-async def main(urls):
+async def main(sources):
+    urls = [s for s in sources if s.startswith(("http://", "https://"))]
+    paths = {s: os.path.basename(s) for s in sources if s not in urls}
+
     db = SessionLocal()
     try:
-        results = await ingest_company_reports(urls)
-        for r in results:
-            print(f"{r['url']}: {r['status']}")
-        # TODO: parse and insert structured data into DB
+        with tempfile.TemporaryDirectory() as download_dir:
+            results = await ingest_company_reports(urls, download_dir=download_dir)
+            for r in results:
+                if r.get("path"):
+                    paths[r["path"]] = os.path.basename(r["url"])
+                else:
+                    print(f"{r['url']}: {r['status']} ({r.get('error')})")
+
+            # By content: report URLs often have no .pdf extension
+            pdfs = [path for path in paths if is_pdf_file(path)]
+            for path in paths:
+                if path not in pdfs:
+                    print(f"{paths[path]}: skipped, not a PDF file")
+            for summary in stage_pdf_tables(db, pdfs, user="ingest-company-reports", display_names=paths):
+                print(
+                    f"{summary['filename']}: {summary['pages']} pages ({summary['cached_pages']} cached), "
+                    f"{summary['tables_found']} tables, {len(summary['batches'])} staged batches, "
+                    f"{summary['rows_staged']} rows"
+                )
+                for error in summary["errors"]:
+                    print(f"  error: {error}")
     finally:
         db.close()
 
 
 if __name__ == "__main__":
-    # Example usage: python scripts/ingest_company_reports.py https://example.com/report.pdf
-    urls = sys.argv[1:] if len(sys.argv) > 1 else []
-    if not urls:
-        print("Provide one or more report URLs as arguments.")
+    # Example usage: python scripts/ingest_company_reports.py https://example.com/report.pdf ./local_report.pdf
+    sources = sys.argv[1:] if len(sys.argv) > 1 else []
+    if not sources:
+        print("Provide one or more report URLs or PDF paths as arguments.")
         sys.exit(1)
-    asyncio.run(main(urls))
+    asyncio.run(main(sources))